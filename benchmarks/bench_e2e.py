@@ -0,0 +1,326 @@
+"""
+End-to-end latency benchmark of ChatManager against a local fake Ollama server
+
+Drives ChatManager.send_message the way the GUI does: on a worker thread,
+with every chunk handed to a UI loop on the main thread. The fake server
+runs in a separate process (so it does not compete for the GIL) and
+streams a fixed reply as fast as possible unless --tokens-per-second is
+given, so the numbers are the app's own overhead. For each conversation
+length it reports:
+
+- client_us_per_chunk: time between consecutive chunk callbacks while the
+  server streams without delay (parsing, decoding and buffering per chunk)
+- first_render_ms: time from send to the first chunk rendered by the UI loop
+- turn_ms: time from send until send_message returns (stream and save)
+- save_ms: time to save the conversation after the turn
+- peak_memory_bytes: peak Python heap allocated during one turn (tracemalloc)
+
+The UI loop is a Tk text widget when a display is available (--gui), and a
+queue drained on the main thread otherwise, which measures the thread hop
+but not Tk's rendering cost. Results are printed as JSON (or written to
+--output) so runs on different commits can be compared.
+
+Usage:
+    python -m benchmarks.bench_e2e [--lengths 1,10,100,1000,10000] [--output results.json]
+"""
+import argparse
+import json
+import platform
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.api.ollama_client import OllamaClient
+from src.core.chat_manager import ChatManager
+from src.core.message import Message, Role
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+
+MODEL = "bench"
+# Roughly a paragraph per stored message
+MESSAGE_TEXT = "The quick brown fox jumps over the lazy dog. " * 5
+
+
+class QueueRenderer:
+    """UI loop stand-in: callbacks queued by workers, run on the main thread"""
+    name = "queue"
+
+    def __init__(self):
+        self._queue: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self.text: List[str] = []
+
+    def post(self, callback: Callable[[], None]) -> None:
+        self._queue.put(callback)
+
+    def render(self, chunk: str) -> None:
+        self.text.append(chunk)
+
+    def run_until(self, done: threading.Event) -> None:
+        while not (done.is_set() and self._queue.empty()):
+            try:
+                self._queue.get(timeout=0.005)()
+            except queue.Empty:
+                pass
+
+    def reset(self) -> None:
+        self.text = []
+
+    def close(self) -> None:
+        pass
+
+
+class TkRenderer:
+    """The GUI's update path: window.after() into a Tk text widget"""
+    name = "tk"
+
+    def __init__(self):
+        import tkinter as tk
+        self._tk = tk
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.display = tk.Text(self.root, state=tk.DISABLED)
+        self.display.pack()
+
+    def post(self, callback: Callable[[], None]) -> None:
+        self.root.after(0, callback)
+
+    def render(self, chunk: str) -> None:
+        # Same widget calls as ChatApplication._on_response_chunk
+        self.display.config(state=self._tk.NORMAL)
+        self.display.insert(self._tk.END, chunk, "message")
+        self.display.config(state=self._tk.DISABLED)
+        self.display.see(self._tk.END)
+
+    def run_until(self, done: threading.Event) -> None:
+        while not done.is_set():
+            self.root.update()
+            time.sleep(0.0005)
+        self.root.update()
+
+    def reset(self) -> None:
+        self.display.config(state=self._tk.NORMAL)
+        self.display.delete("1.0", self._tk.END)
+        self.display.config(state=self._tk.DISABLED)
+
+    def close(self) -> None:
+        self.root.destroy()
+
+
+def make_renderer(use_gui: bool):
+    """Tk renderer if requested and a display is available, else the queue"""
+    if use_gui:
+        try:
+            return TkRenderer()
+        except Exception as e:
+            print(f"Tk unavailable ({e}); using the queue renderer", file=sys.stderr)
+    return QueueRenderer()
+
+
+def start_server(args: argparse.Namespace):
+    """Start the fake server; returns (url, stop function)"""
+    if args.in_process:
+        server = FakeOllamaServer([FakeModel(
+            MODEL,
+            time_to_first_token=args.time_to_first_token,
+            tokens_per_second=args.tokens_per_second,
+            responder=lambda model, messages: "".join(f" word{i % 100}" for i in range(args.tokens))
+        )]).start()
+        return server.url, server.stop
+
+    command = [
+        sys.executable, "-m", "src.testing.fake_ollama_server", "--port", "0", "--model", MODEL,
+        "--reply-tokens", str(args.tokens), "--time-to-first-token", str(args.time_to_first_token)
+    ]
+    if args.tokens_per_second:
+        command += ["--tokens-per-second", str(args.tokens_per_second)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    url = process.stdout.readline().strip()
+
+    def stop():
+        process.terminate()
+        process.wait()
+
+    return url, stop
+
+
+def fill_conversation(manager: ChatManager, length: int) -> None:
+    """Start a conversation with `length` stored messages"""
+    manager.start_new_conversation(MODEL)
+    for i in range(length):
+        role = Role.USER if i % 2 == 0 else Role.ASSISTANT
+        manager.current_conversation.add_message(Message(role=role, content=f"{i}: {MESSAGE_TEXT}"))
+    manager.storage.save_conversation(manager.current_conversation)
+
+
+def run_turn(manager: ChatManager, renderer) -> Dict[str, Any]:
+    """Send one message as the GUI does and time it"""
+    chunk_times: List[float] = []
+    first_render: List[float] = []
+    save_times: List[float] = []
+    done = threading.Event()
+    errors: List[BaseException] = []
+
+    save = manager.storage.save_conversation
+
+    def timed_save(conversation):
+        start = time.perf_counter()
+        try:
+            return save(conversation)
+        finally:
+            save_times.append(time.perf_counter() - start)
+
+    def on_chunk(chunk: str) -> None:
+        chunk_times.append(time.perf_counter())
+
+        def update():
+            renderer.render(chunk)
+            if not first_render:
+                first_render.append(time.perf_counter())
+
+        renderer.post(update)
+
+    def worker():
+        try:
+            manager.send_message("Tell me something", on_chunk)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            turn_end.append(time.perf_counter())
+            done.set()
+
+    turn_end: List[float] = []
+    manager.storage.save_conversation = timed_save
+    renderer.reset()
+    started = time.perf_counter()
+    threading.Thread(target=worker, daemon=True).start()
+    renderer.run_until(done)
+    manager.storage.save_conversation = save
+    if errors:
+        raise errors[0]
+
+    # Keep the conversation at its benchmark length
+    del manager.current_conversation.messages[-2:]
+    gaps = [b - a for a, b in zip(chunk_times, chunk_times[1:])]
+    return {
+        "chunks": len(chunk_times),
+        "client_us_per_chunk": statistics.mean(gaps) * 1e6 if gaps else None,
+        "first_render_ms": (first_render[0] - started) * 1000 if first_render else None,
+        "turn_ms": (turn_end[0] - started) * 1000,
+        "save_ms": save_times[-1] * 1000 if save_times else None,
+    }
+
+
+def summarize(values: List[Optional[float]]) -> Optional[Dict[str, float]]:
+    """Median, p95 and minimum of a metric"""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    p95 = values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))]
+    return {
+        "median": round(statistics.median(values), 3),
+        "p95": round(p95, 3),
+        "min": round(values[0], 3),
+    }
+
+
+def bench_length(url: str, length: int, repeat: int, renderer) -> Dict[str, Any]:
+    """Benchmark turns of a conversation with `length` prior messages"""
+    with tempfile.TemporaryDirectory() as storage_dir:
+        client = OllamaClient(base_url=url)
+        manager = ChatManager(client, storage_dir=storage_dir)
+        fill_conversation(manager, length)
+        run_turn(manager, renderer)  # warm-up: connection, imports, caches
+
+        turns = [run_turn(manager, renderer) for _ in range(repeat)]
+
+        tracemalloc.start()
+        run_turn(manager, renderer)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        client.close()
+
+    return {
+        "messages": length,
+        "chunks": turns[0]["chunks"],
+        "client_us_per_chunk": summarize([t["client_us_per_chunk"] for t in turns]),
+        "first_render_ms": summarize([t["first_render_ms"] for t in turns]),
+        "turn_ms": summarize([t["turn_ms"] for t in turns]),
+        "save_ms": summarize([t["save_ms"] for t in turns]),
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, if run from a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Run the benchmark and emit JSON results"""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--lengths", default="1,10,100,1000,10000",
+                            help="comma-separated conversation lengths (messages)")
+    arg_parser.add_argument("--tokens", type=int, default=200, help="tokens per reply")
+    arg_parser.add_argument("--repeat", type=int, default=10, help="timed turns per length")
+    arg_parser.add_argument("--time-to-first-token", type=float, default=0.0)
+    arg_parser.add_argument("--tokens-per-second", type=float, default=None,
+                            help="server generation speed (default: unlimited)")
+    arg_parser.add_argument("--gui", action="store_true", help="render into a Tk widget (needs a display)")
+    arg_parser.add_argument("--in-process", action="store_true", help="run the fake server in this process")
+    arg_parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = arg_parser.parse_args()
+
+    renderer = make_renderer(args.gui)
+    url, stop_server = start_server(args)
+    results = []
+    try:
+        for length in (int(n) for n in args.lengths.split(",")):
+            result = bench_length(url, length, args.repeat, renderer)
+            results.append(result)
+            print(
+                f"{length:>6} messages: turn {result['turn_ms']['median']:.2f} ms, "
+                f"first render {result['first_render_ms']['median']:.2f} ms, "
+                f"save {result['save_ms']['median']:.2f} ms, "
+                f"{result['client_us_per_chunk']['median']:.1f} us/chunk, "
+                f"peak {result['peak_memory_bytes'] / 1024:.0f} KiB",
+                file=sys.stderr
+            )
+    finally:
+        stop_server()
+        renderer.close()
+
+    report = {
+        "benchmark": "e2e",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "tokens": args.tokens,
+            "repeat": args.repeat,
+            "time_to_first_token": args.time_to_first_token,
+            "tokens_per_second": args.tokens_per_second,
+            "renderer": renderer.name,
+            "server": "in-process" if args.in_process else "subprocess",
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark for parsing streamed /api/chat NDJSON responses
+
+Compares the previous line-based path (httpx iter_lines() + json.loads)
+with the byte-level NDJSONParser over iter_bytes(), using a stream shaped
+like a fast small model's output: one short token per line, with
+created_at timestamps and a final stats chunk. The stream is delivered
+both one line per network read (typical for a high tokens/sec model) and
+in 4 KiB reads.
+
+Usage:
+    python -m benchmarks.bench_ndjson [--tokens N]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, List
+
+import httpx
+
+from src.api import ndjson
+from src.api.ndjson import NDJSONParser
+
+
+def make_recorded_stream(tokens: int, seed: int = 7) -> List[bytes]:
+    """Build an Ollama-shaped NDJSON stream, one bytes object per line"""
+    rng = random.Random(seed)
+    words = ["the", " model", " is", " running", " locally", ",", " and", " it",
+             " streams", " tokens", " quickly", ".", "\n", " Ollama", " API"]
+    lines = []
+    for i in range(tokens):
+        lines.append(json.dumps({
+            "model": "llama3.2:1b",
+            "created_at": f"2024-06-01T12:00:{i % 60:02d}.{rng.randint(0, 999999):06d}Z",
+            "message": {"role": "assistant", "content": rng.choice(words)},
+            "done": False
+        }).encode() + b"\n")
+    lines.append(json.dumps({
+        "model": "llama3.2:1b",
+        "created_at": "2024-06-01T12:01:00.000000Z",
+        "message": {"role": "assistant", "content": ""},
+        "done_reason": "stop",
+        "done": True,
+        "total_duration": 2_500_000_000,
+        "load_duration": 20_000_000,
+        "prompt_eval_count": 26,
+        "prompt_eval_duration": 50_000_000,
+        "eval_count": tokens,
+        "eval_duration": 2_400_000_000
+    }).encode() + b"\n")
+    return lines
+
+
+def regroup(lines: List[bytes], block_size: int) -> List[bytes]:
+    """Re-split the stream into fixed-size network reads"""
+    data = b"".join(lines)
+    return [data[i:i + block_size] for i in range(0, len(data), block_size)]
+
+
+def parse_iter_lines(blocks: List[bytes]) -> int:
+    """Previous implementation: text lines + json.loads"""
+    response = httpx.Response(200, content=iter(blocks))
+    count = 0
+    for line in response.iter_lines():
+        if line:
+            chunk = json.loads(line)
+            if chunk["message"]["content"]:
+                count += 1
+    return count
+
+
+def parse_iter_bytes(blocks: List[bytes]) -> int:
+    """New implementation: byte-level NDJSON parser"""
+    response = httpx.Response(200, content=iter(blocks))
+    parser = NDJSONParser()
+    count = 0
+    for data in response.iter_bytes():
+        for chunk in parser.feed(data):
+            if chunk["message"]["content"]:
+                count += 1
+    return count
+
+
+def time_it(func: Callable[[List[bytes]], int], blocks: List[bytes], repeat: int = 5) -> float:
+    """Return best-of-N wall time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(blocks)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a results table"""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--tokens", type=int, default=20_000)
+    args = arg_parser.parse_args()
+
+    lines = make_recorded_stream(args.tokens)
+    backend = "orjson" if ndjson.orjson is not None else "json"
+    print(f"{args.tokens} tokens, JSON backend: {backend}")
+    print(f"{'delivery':>14} {'iter_lines ms':>14} {'parser ms':>10} {'us/chunk':>9} {'speedup':>8}")
+
+    for label, blocks in (("line per read", lines), ("4 KiB reads", regroup(lines, 4096))):
+        assert parse_iter_lines(blocks) == parse_iter_bytes(blocks)
+        baseline = time_it(parse_iter_lines, blocks)
+        optimized = time_it(parse_iter_bytes, blocks)
+        per_chunk = optimized * 1000 / len(lines)
+        print(f"{label:>14} {baseline:>14.2f} {optimized:>10.2f} {per_chunk:>9.2f} {baseline / optimized:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
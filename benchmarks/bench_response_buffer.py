@@ -0,0 +1,77 @@
+"""
+Micro-benchmark for streamed response accumulation
+
+Compares naive string concatenation against ResponseBuffer for long
+token streams, with and without periodic reads of the partial response.
+Occasional reads (every 100 chunks, like a checkpointing task) use
+snapshot(); per-chunk reads (a consumer following the stream) use
+read_from(), since snapshot() re-joins the whole text.
+
+Usage:
+    python -m benchmarks.bench_response_buffer
+"""
+import random
+import time
+from typing import Callable, List
+
+from src.core.response_buffer import ResponseBuffer
+
+
+def make_chunks(count: int, seed: int = 42) -> List[str]:
+    """Build a token-like chunk stream (1-8 chars per chunk)"""
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz "
+    return ["".join(rng.choices(alphabet, k=rng.randint(1, 8))) for _ in range(count)]
+
+
+def concat_naive(chunks: List[str], snapshot_every: int) -> str:
+    """Accumulate with repeated string concatenation"""
+    full_response = ""
+    last_snapshot = ""
+    for i, chunk in enumerate(chunks):
+        full_response += chunk
+        if snapshot_every and i % snapshot_every == 0:
+            # A consumer holding a reference defeats in-place concatenation
+            last_snapshot = full_response
+    return full_response
+
+
+def concat_buffer(chunks: List[str], snapshot_every: int) -> str:
+    """Accumulate with ResponseBuffer"""
+    buffer = ResponseBuffer()
+    last_snapshot = ""
+    cursor = 0
+    for i, chunk in enumerate(chunks):
+        buffer.append(chunk)
+        if snapshot_every == 1:
+            new_text, cursor = buffer.read_from(cursor)
+        elif snapshot_every and i % snapshot_every == 0:
+            last_snapshot = buffer.snapshot()
+    return buffer.getvalue()
+
+
+def time_it(func: Callable, chunks: List[str], snapshot_every: int, repeat: int = 5) -> float:
+    """Return best-of-N wall time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(chunks, snapshot_every)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a results table"""
+    print(f"{'chunks':>8} {'snapshot':>9} {'naive ms':>10} {'buffer ms':>10}")
+    for count in (10_000, 50_000, 200_000):
+        chunks = make_chunks(count)
+        assert concat_naive(chunks, 0) == concat_buffer(chunks, 0)
+        for snapshot_every in (0, 100, 1):
+            naive = time_it(concat_naive, chunks, snapshot_every)
+            buffered = time_it(concat_buffer, chunks, snapshot_every)
+            label = snapshot_every or "-"
+            print(f"{count:>8} {label:>9} {naive:>10.2f} {buffered:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Load test of the local HTTP/SSE chat server
+
+Starts a fake Ollama server and the chat server (python -m src.server) as
+separate processes, then opens many concurrent SSE streams against the
+chat server from this process's event loop. Each simulated client creates
+a conversation and sends --turns messages one after another. For each
+concurrency level it reports:
+
+- wall_seconds: time for all clients to finish
+- streams_per_second: completed replies per second
+- tokens_per_second: generated tokens delivered per second, all streams
+- ttft_ms: time from sending a message to its first token event
+- stream_ms: time from sending a message to the end of its stream
+- errors: streams that failed or ended without a reply
+
+The fake model streams at --tokens-per-second per reply, so with perfect
+concurrency wall_seconds stays near turns * tokens / tokens-per-second
+as clients are added; growth beyond that is server overhead, or the
+SERVER_MAX_OLLAMA_CONNECTIONS cap (20 by default; the server inherits it
+from the environment). The fake server itself is a threaded Python
+server and saturates at a few hundred concurrent streams, so keep
+--clients below that when measuring the chat server. Use --url to load
+an already running server instead.
+Results are printed as JSON (or written to --output).
+
+Usage:
+    python -m benchmarks.bench_server [--clients 1,10,50,100] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.bench_e2e import git_commit, summarize
+
+MODEL = "bench"
+
+
+def start_process(command: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """Start a server process that prints its URL as the last word of its first line"""
+    return subprocess.Popen(command, stdout=subprocess.PIPE, text=True, env=env)
+
+
+def read_url(process: subprocess.Popen) -> str:
+    line = process.stdout.readline().strip()
+    if not line:
+        raise RuntimeError(f"{process.args[2]} exited without printing its URL")
+    return line.split()[-1]
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    process.wait()
+
+
+async def run_turn(http: httpx.AsyncClient, conversation_id: str, content: str) -> Dict[str, Any]:
+    """Send one message and time its stream"""
+    started = time.perf_counter()
+    first_token = None
+    tokens = 0
+    ended = None
+    async with http.stream(
+        "POST", f"/api/conversations/{conversation_id}/messages", json={"content": content}
+    ) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+                if event == "token" and first_token is None:
+                    first_token = time.perf_counter()
+            elif line.startswith("data: ") and event in ("done", "error", "cancelled"):
+                ended = event
+                if event == "done":
+                    stats = json.loads(line[len("data: "):])["message"].get("stats") or {}
+                    tokens = stats.get("eval_count", 0)
+    finished = time.perf_counter()
+    return {
+        "ok": ended == "done",
+        "tokens": tokens,
+        "ttft_ms": (first_token - started) * 1000 if first_token is not None else None,
+        "stream_ms": (finished - started) * 1000,
+    }
+
+
+async def run_client(http: httpx.AsyncClient, client_id: int, turns: int) -> List[Dict[str, Any]]:
+    """One simulated user: a new conversation and several messages"""
+    results = []
+    try:
+        response = await http.post("/api/conversations", json={"model": MODEL})
+        response.raise_for_status()
+        conversation_id = response.json()["id"]
+        for turn in range(turns):
+            results.append(await run_turn(http, conversation_id, f"Client {client_id}, question {turn}"))
+    except httpx.HTTPError as e:
+        results.append({"ok": False, "tokens": 0, "ttft_ms": None, "stream_ms": None, "error": str(e)})
+    return results
+
+
+async def bench_clients(url: str, clients: int, turns: int) -> Dict[str, Any]:
+    """Run `clients` simulated users at once"""
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=300.0, limits=limits) as http:
+        started = time.perf_counter()
+        per_client = await asyncio.gather(*(run_client(http, i, turns) for i in range(clients)))
+        wall = time.perf_counter() - started
+
+    turns_run = [result for results in per_client for result in results]
+    completed = [result for result in turns_run if result["ok"]]
+    tokens = sum(result["tokens"] for result in completed)
+    return {
+        "clients": clients,
+        "streams": len(turns_run),
+        "errors": len(turns_run) - len(completed),
+        "wall_seconds": round(wall, 3),
+        "streams_per_second": round(len(completed) / wall, 2),
+        "tokens_per_second": round(tokens / wall, 1),
+        "ttft_ms": summarize([result["ttft_ms"] for result in completed]),
+        "stream_ms": summarize([result["stream_ms"] for result in completed]),
+    }
+
+
+def main() -> None:
+    """Run the load test and emit JSON results"""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--clients", default="1,10,50,100", help="comma-separated numbers of concurrent clients")
+    arg_parser.add_argument("--turns", type=int, default=3, help="messages sent by each client")
+    arg_parser.add_argument("--tokens", type=int, default=100, help="tokens per reply")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=50.0,
+                            help="fake model speed per stream (0: unlimited)")
+    arg_parser.add_argument("--time-to-first-token", type=float, default=0.1)
+    arg_parser.add_argument("--url", help="load this running chat server instead of starting one")
+    arg_parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = arg_parser.parse_args()
+
+    processes = []
+    storage = tempfile.TemporaryDirectory()
+    try:
+        url = args.url
+        if url is None:
+            fake_command = [
+                sys.executable, "-m", "src.testing.fake_ollama_server", "--port", "0", "--model", MODEL,
+                "--reply-tokens", str(args.tokens), "--time-to-first-token", str(args.time_to_first_token)
+            ]
+            if args.tokens_per_second:
+                fake_command += ["--tokens-per-second", str(args.tokens_per_second)]
+            processes.append(start_process(fake_command))
+            ollama_url = read_url(processes[-1])
+
+            env = {**os.environ, "OLLAMA_BASE_URL": ollama_url, "OLLAMA_ENDPOINTS": "[]",
+                   "SEMANTIC_SEARCH_ENABLED": "false", "LOG_LEVEL": "WARNING"}
+            processes.append(start_process(
+                [sys.executable, "-m", "src.server", "--port", "0", "--storage-dir", storage.name], env
+            ))
+            url = read_url(processes[-1])
+
+        results = []
+        for clients in (int(n) for n in args.clients.split(",")):
+            result = asyncio.run(bench_clients(url, clients, args.turns))
+            results.append(result)
+            ttft = result["ttft_ms"]
+            print(
+                f"{clients:>5} clients: {result['wall_seconds']:.2f} s, "
+                f"{result['streams_per_second']:.1f} streams/s, {result['tokens_per_second']:.0f} tokens/s, "
+                f"ttft median {ttft['median'] if ttft else float('nan'):.1f} ms, {result['errors']} errors",
+                file=sys.stderr
+            )
+    finally:
+        for process in reversed(processes):
+            stop_process(process)
+        storage.cleanup()
+
+    report = {
+        "benchmark": "server",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "turns": args.turns,
+            "tokens": args.tokens,
+            "tokens_per_second": args.tokens_per_second,
+            "time_to_first_token": args.time_to_first_token,
+            "server": args.url or "subprocess",
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Headless batch runner for prompt suites (no GUI; see src/batch.py)
+
+Simply run: python run_batch.py prompts.jsonl -o results.jsonl -m llama2
+"""
+import sys
+
+if __name__ == "__main__":
+    from src.batch import main
+    sys.exit(main())
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/SSE chat server (no GUI; see src/server/chat_server.py)
+
+Simply run: python run_server.py [--port 8765]
+"""
+import sys
+
+if __name__ == "__main__":
+    from src.server.chat_server import main
+    sys.exit(main())
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Terminal chat front-end (no GUI; see src/cli.py)
+
+Simply run: python run_terminal.py [--model llama2]
+"""
+import sys
+
+if __name__ == "__main__":
+    from src.cli import main
+    sys.exit(main())
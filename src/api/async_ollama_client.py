@@ -0,0 +1,189 @@
+"""
+Asyncio-native Ollama API client for communicating with local LLM models
+"""
+import httpx
+from typing import AsyncIterator, List, Dict, Optional
+from .ndjson import NDJSONParser
+from .stream_events import ChatStreamDecoder, ErrorEvent, StreamEvent, TokenEvent
+from ..utils.exceptions import OllamaConnectionError
+from ..utils.logger import setup_logger
+
+logger = setup_logger("async_ollama_client", "logs/app.log")
+
+
+def _log_bad_chunk(line: bytes, error: Exception) -> None:
+    """Log a stream line that could not be parsed as JSON"""
+    logger.warning(f"Failed to parse JSON chunk: {error}")
+
+
+class AsyncOllamaClient:
+    """
+    Async client for interacting with the Ollama API
+
+    Mirrors the surface of OllamaClient, but every call is a coroutine and
+    generate_stream is an async iterator. All requests share a single
+    httpx.AsyncClient connection pool, so one event loop can drive many
+    concurrent streams without a thread per message.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Initialize the async Ollama client
+
+        Args:
+            base_url: Base URL for Ollama API (default: http://localhost:11434)
+            max_connections: Maximum number of pooled connections
+            transport: Optional custom httpx transport (used in tests)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.client = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            transport=transport
+        )
+        logger.info(f"Initialized async Ollama client with base URL: {self.base_url}")
+
+    async def check_connection(self) -> bool:
+        """
+        Verify that Ollama is running and accessible
+
+        Returns:
+            True if connection successful, False otherwise
+        """
+        try:
+            response = await self.client.get(f"{self.base_url}/api/tags")
+            response.raise_for_status()
+            logger.info("Successfully connected to Ollama")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to connect to Ollama: {e}")
+            return False
+
+    async def list_models(self) -> List[str]:
+        """
+        Fetch list of available models from Ollama
+
+        Returns:
+            List of model names
+
+        Raises:
+            OllamaConnectionError: If cannot connect to Ollama
+        """
+        try:
+            response = await self.client.get(f"{self.base_url}/api/tags")
+            response.raise_for_status()
+            data = response.json()
+
+            models = [model["name"] for model in data.get("models", [])]
+            logger.info(f"Found {len(models)} available models")
+            return models
+
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error while listing models: {e}")
+            raise OllamaConnectionError(f"Failed to list models: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error while listing models: {e}")
+            raise OllamaConnectionError(f"Failed to list models: {e}")
+
+    async def generate_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        """
+        Generate streaming chat completion from Ollama
+
+        Args:
+            model: Name of the model to use (e.g., "llama2", "mistral")
+            messages: List of message dicts with 'role' and 'content' keys
+
+        Yields:
+            String chunks of the response as they arrive
+
+        Raises:
+            OllamaConnectionError: If request fails or the server reports an error
+        """
+        async for event in self.generate_events(model, messages):
+            if isinstance(event, TokenEvent):
+                yield event.content
+            elif isinstance(event, ErrorEvent):
+                raise OllamaConnectionError(f"Streaming failed: {event.message}")
+
+    async def generate_events(
+        self,
+        model: str,
+        messages: List[Dict[str, str]]
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Generate streaming chat completion from Ollama as typed events
+
+        Args:
+            model: Name of the model to use (e.g., "llama2", "mistral")
+            messages: List of message dicts with 'role' and 'content' keys
+
+        Yields:
+            TokenEvent, DoneEvent or ErrorEvent instances
+
+        Raises:
+            OllamaConnectionError: If request fails
+        """
+        try:
+            payload = {
+                "model": model,
+                "messages": messages,
+                "stream": True
+            }
+
+            logger.info(f"Sending async streaming request to model: {model}")
+            decoder = ChatStreamDecoder(model)
+
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/api/chat",
+                json=payload,
+                timeout=120.0
+            ) as response:
+                response.raise_for_status()
+
+                # Split the raw byte stream into JSON chunks
+                parser = NDJSONParser(on_error=_log_bad_chunk)
+                async for data in response.aiter_bytes():
+                    for chunk_data in parser.feed(data):
+                        for event in decoder.feed(chunk_data):
+                            yield event
+                            if isinstance(event, ErrorEvent):
+                                logger.error(f"Server error during streaming: {event.message}")
+                                return
+
+                        # Check if streaming is complete
+                        if decoder.done:
+                            logger.info("Streaming completed")
+                            return
+
+                # Stream ended without a trailing newline after the last chunk
+                for chunk_data in parser.flush():
+                    for event in decoder.feed(chunk_data):
+                        yield event
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error during streaming: {e}")
+            raise OllamaConnectionError(f"Streaming failed: {e}")
+        except httpx.RequestError as e:
+            logger.error(f"Request error during streaming: {e}")
+            raise OllamaConnectionError(f"Request failed: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error during streaming: {e}")
+            raise OllamaConnectionError(f"Streaming failed: {e}")
+
+    async def close(self) -> None:
+        """Close the HTTP client connection pool"""
+        await self.client.aclose()
+        logger.info("Closed async Ollama client connection")
@@ -0,0 +1,372 @@
+"""
+Recording of raw HTTP streams to cassette files, and replay through httpx
+"""
+import base64
+import hashlib
+import itertools
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("cassette", "logs/app.log")
+
+# Request body fields that do not change the response
+_IGNORED_FIELDS = ("keep_alive",)
+
+
+class CassetteMissError(LookupError):
+    """No cassette matches a request (and there is no fallback transport)"""
+
+
+def request_key(method: str, path: str, body: Optional[Dict[str, Any]]) -> str:
+    """
+    Hash identifying a request, used to match cassettes to requests
+
+    Args:
+        method: HTTP method
+        path: URL path (e.g. "/api/chat")
+        body: Parsed JSON body, if any
+
+    Returns:
+        Hex digest of the method, path and body (keep_alive excluded)
+    """
+    body = {k: v for k, v in (body or {}).items() if k not in _IGNORED_FIELDS}
+    canonical = json.dumps([method.upper(), path, body], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Cassette:
+    """
+    One recorded response stream
+
+    Attributes:
+        method: HTTP method of the request
+        path: URL path of the request
+        body: Parsed JSON body of the request
+        status: Response status code
+        headers: Response headers
+        headers_at: Seconds from sending the request to the response headers
+        chunks: (seconds since the request was sent, raw bytes) per chunk
+                read from the network, in order
+        recorded_at: ISO timestamp of the recording
+    """
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]]
+    status: int
+    headers: Dict[str, str]
+    headers_at: float
+    chunks: List[Tuple[float, bytes]] = field(default_factory=list)
+    recorded_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @property
+    def key(self) -> str:
+        """Request key of the cassette (see request_key)"""
+        return request_key(self.method, self.path, self.body)
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the request to the last chunk"""
+        return self.chunks[-1][0] if self.chunks else self.headers_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary"""
+        chunks = []
+        for offset, data in self.chunks:
+            try:
+                # Most chunks are NDJSON text; keep them readable in the file
+                chunks.append({"t": round(offset, 6), "text": data.decode("utf-8")})
+            except UnicodeDecodeError:
+                # A chunk boundary split a multi-byte character
+                chunks.append({"t": round(offset, 6), "b64": base64.b64encode(data).decode("ascii")})
+        return {
+            "request": {"method": self.method, "path": self.path, "body": self.body},
+            "response": {"status": self.status, "headers": self.headers, "headers_at": round(self.headers_at, 6)},
+            "chunks": chunks,
+            "recorded_at": self.recorded_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Cassette":
+        """Create a cassette from a dictionary made by to_dict()"""
+        chunks = []
+        for chunk in data["chunks"]:
+            raw = chunk["text"].encode("utf-8") if "text" in chunk else base64.b64decode(chunk["b64"])
+            chunks.append((chunk["t"], raw))
+        request, response = data["request"], data["response"]
+        return cls(
+            method=request["method"],
+            path=request["path"],
+            body=request.get("body"),
+            status=response["status"],
+            headers=response.get("headers", {}),
+            headers_at=response.get("headers_at", 0.0),
+            chunks=chunks,
+            recorded_at=data.get("recorded_at", ""),
+        )
+
+    def save(self, path: Path) -> None:
+        """Write the cassette to a JSON file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=1), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        """Read a cassette from a JSON file"""
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def load_cassettes(directory: str) -> List[Cassette]:
+    """
+    Read every cassette in a directory, oldest recording first
+
+    Unreadable files are skipped with a warning.
+
+    Args:
+        directory: Directory of cassette files
+
+    Returns:
+        Loaded cassettes
+    """
+    cassettes = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            cassettes.append(Cassette.load(path))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unreadable cassette {path.name}: {e}")
+    return cassettes
+
+
+def _parse_body(request: httpx.Request) -> Optional[Dict[str, Any]]:
+    """Parse a request's JSON body (None if it has none)"""
+    content = request.read()
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def _ends_stream(cassette: Cassette) -> bool:
+    """Whether the recorded bytes end with Ollama's final (or error) line"""
+    tail = b""
+    for _, data in reversed(cassette.chunks):
+        # Gather chunks until the whole last line is covered
+        tail = data + tail
+        if b"\n" in tail.rstrip(b"\n"):
+            break
+    try:
+        last = json.loads(tail.rstrip(b"\n").rsplit(b"\n", 1)[-1])
+    except ValueError:
+        return False
+    return isinstance(last, dict) and (last.get("done") is True or "error" in last)
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    """Passes a response stream through, saving it if it was received in full"""
+
+    def __init__(self, inner: httpx.SyncByteStream, cassette: Cassette, started_at: float, on_complete):
+        self._inner = inner
+        self._cassette = cassette
+        self._started_at = started_at
+        self._on_complete = on_complete
+        self._saved = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for data in self._inner:
+            self._cassette.chunks.append((time.perf_counter() - self._started_at, bytes(data)))
+            yield data
+        self._save()
+
+    def close(self) -> None:
+        # Clients stop reading at the final line, before the end of the
+        # body; streams abandoned earlier (cancelled, failed) are dropped
+        if _ends_stream(self._cassette):
+            self._save()
+        self._inner.close()
+
+    def _save(self) -> None:
+        if not self._saved:
+            self._saved = True
+            self._on_complete(self._cassette)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    httpx transport saving the responses of selected paths as cassettes
+
+    Wraps another transport and records, for each matching request, the
+    raw bytes of every chunk read from the network and when it arrived.
+    A cassette file is written once its response has been read to the
+    end, or closed after Ollama's final line; cancelled or failed
+    streams are dropped.
+    """
+
+    def __init__(
+        self,
+        cassette_dir: str,
+        transport: Optional[httpx.BaseTransport] = None,
+        paths: Sequence[str] = ("/api/chat",)
+    ):
+        """
+        Initialize the transport
+
+        Args:
+            cassette_dir: Directory the cassette files are written to
+            transport: Transport doing the actual requests
+                       (default: httpx.HTTPTransport())
+            paths: URL paths whose responses are recorded
+        """
+        self.cassette_dir = Path(cassette_dir)
+        self.transport = transport or httpx.HTTPTransport()
+        self.paths = tuple(paths)
+        self._counter = itertools.count()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path not in self.paths:
+            return self.transport.handle_request(request)
+
+        body = _parse_body(request)
+        started_at = time.perf_counter()
+        response = self.transport.handle_request(request)
+        cassette = Cassette(
+            method=request.method,
+            path=request.url.path,
+            body=body,
+            status=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "transfer-encoding")},
+            headers_at=time.perf_counter() - started_at,
+        )
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, cassette, started_at, self._save),
+            extensions=response.extensions,
+        )
+
+    def _save(self, cassette: Cassette) -> None:
+        """Write a completed cassette to its own file"""
+        model = str((cassette.body or {}).get("model", "unknown")).replace("/", "_").replace(":", "_")
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        name = f"{stamp}-{next(self._counter):04d}-{model}-{cassette.key[:8]}.json"
+        try:
+            cassette.save(self.cassette_dir / name)
+            logger.info(f"Recorded cassette {name} ({len(cassette.chunks)} chunks)")
+        except OSError as e:
+            logger.warning(f"Failed to write cassette {name}: {e}")
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    """Yields a cassette's chunks, sleeping to reproduce their timing"""
+
+    def __init__(self, chunks: List[Tuple[float, bytes]], started_at: float, speed: Optional[float]):
+        self._chunks = chunks
+        self._started_at = started_at
+        self._speed = speed
+
+    def __iter__(self) -> Iterator[bytes]:
+        for offset, data in self._chunks:
+            _sleep_until(self._started_at, offset, self._speed)
+            yield data
+
+
+def _sleep_until(started_at: float, offset: float, speed: Optional[float]) -> None:
+    """Sleep until offset (scaled by 1/speed) seconds after started_at"""
+    if not speed:
+        return
+    delay = started_at + offset / speed - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    httpx transport answering requests from recorded cassettes
+
+    A request is answered by the cassette recorded for the same method,
+    path and body. When there is none and match_body is False, the
+    cassettes recorded for the same path are played in turn, so a few
+    recordings can drive any number of requests with real chunk sizes
+    and timing. Requests with no cassette at all go to the fallback
+    transport, or raise CassetteMissError.
+
+    Replay reproduces the recorded delays (time to headers, then each
+    chunk's arrival time) divided by speed: 1.0 is the original pace, 10
+    is ten times faster and None sends everything without waiting.
+    Delays are measured from the start of the request, so time spent by
+    the client processing chunks is not added on top.
+    """
+
+    def __init__(
+        self,
+        cassettes: Sequence[Cassette],
+        speed: Optional[float] = 1.0,
+        match_body: bool = False,
+        fallback: Optional[httpx.BaseTransport] = None
+    ):
+        """
+        Initialize the transport
+
+        Args:
+            cassettes: Recordings to answer with (see load_cassettes)
+            speed: Playback speed factor (None: no delays)
+            match_body: Only answer requests with an exact recording
+            fallback: Transport for requests no cassette answers
+        """
+        self.speed = speed
+        self.match_body = match_body
+        self.fallback = fallback
+        self._by_key: Dict[str, Cassette] = {}
+        self._by_path: Dict[Tuple[str, str], List[Cassette]] = {}
+        for cassette in cassettes:
+            self._by_key[cassette.key] = cassette
+            self._by_path.setdefault((cassette.method, cassette.path), []).append(cassette)
+        self._turns: Dict[Tuple[str, str], Iterator[Cassette]] = {
+            route: itertools.cycle(recorded) for route, recorded in self._by_path.items()
+        }
+        self._lock = threading.Lock()
+        self.replayed = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started_at = time.perf_counter()
+        cassette = self._find(request)
+        if cassette is None:
+            if self.fallback is not None:
+                return self.fallback.handle_request(request)
+            raise CassetteMissError(f"No cassette for {request.method} {request.url.path}")
+
+        with self._lock:
+            self.replayed += 1
+        _sleep_until(started_at, cassette.headers_at, self.speed)
+        return httpx.Response(
+            status_code=cassette.status,
+            headers=cassette.headers,
+            stream=_ReplayStream(cassette.chunks, started_at, self.speed),
+            request=request,
+        )
+
+    def _find(self, request: httpx.Request) -> Optional[Cassette]:
+        """Pick the cassette answering a request"""
+        cassette = self._by_key.get(request_key(request.method, request.url.path, _parse_body(request)))
+        if cassette is not None or self.match_body:
+            return cassette
+        with self._lock:
+            turns = self._turns.get((request.method, request.url.path))
+            return next(turns) if turns is not None else None
+
+    def close(self) -> None:
+        if self.fallback is not None:
+            self.fallback.close()
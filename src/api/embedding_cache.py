@@ -0,0 +1,193 @@
+"""
+On-disk cache of embedding vectors, stored as compact float32 arrays
+"""
+import hashlib
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("embedding_cache", "logs/app.log")
+
+
+def text_key(text: str) -> str:
+    """
+    Hash identifying a text in the cache
+
+    Args:
+        text: Embedded text
+
+    Returns:
+        Hex digest of the text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _ModelStore:
+    """Vectors of one model: row index in memory, float32 rows on disk"""
+
+    def __init__(self, vectors_path: Path, keys_path: Path):
+        self.vectors_path = vectors_path
+        self.keys_path = keys_path
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Read the key file, dropping rows a crash left incomplete"""
+        if not self.keys_path.exists():
+            return
+        try:
+            lines = self.keys_path.read_text(encoding="utf-8").splitlines()
+            if not lines:
+                return
+            self.dim = int(lines[0])
+            keys = lines[1:]
+            stored_rows = self.vectors_path.stat().st_size // (4 * self.dim) if self.vectors_path.exists() else 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable embedding cache {self.keys_path}: {e}")
+            self.dim = None
+            return
+
+        if len(keys) != stored_rows:
+            logger.warning(f"Embedding cache {self.keys_path.name} is inconsistent, keeping {min(len(keys), stored_rows)} rows")
+            keys = keys[:stored_rows]
+            self._rewrite(keys)
+        self.rows = {key: row for row, key in enumerate(keys)}
+
+    def _rewrite(self, keys: List[str]) -> None:
+        """Truncate both files to the given keys"""
+        with open(self.vectors_path, 'r+b') as f:
+            f.truncate(len(keys) * 4 * self.dim)
+        self.keys_path.write_text("".join(f"{line}\n" for line in [str(self.dim)] + keys), encoding="utf-8")
+
+    def read(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Read the stored vectors of the given keys"""
+        found = sorted((self.rows[key], key) for key in set(keys) if key in self.rows)
+        if not found:
+            return {}
+        row_bytes = 4 * self.dim
+        vectors = {}
+        with open(self.vectors_path, 'rb') as f:
+            for row, key in found:
+                f.seek(row * row_bytes)
+                vector = array('f')
+                vector.frombytes(f.read(row_bytes))
+                vectors[key] = vector.tolist()
+        return vectors
+
+    def append(self, keys: List[str], vectors: List[Sequence[float]]) -> None:
+        """Append rows; vectors are written before their keys so a crash loses at most the new rows"""
+        if self.dim is None:
+            self.dim = len(vectors[0])
+            self.vectors_path.parent.mkdir(parents=True, exist_ok=True)
+            self.keys_path.write_text(f"{self.dim}\n", encoding="utf-8")
+            self.vectors_path.write_bytes(b"")
+
+        data = array('f')
+        for vector in vectors:
+            if len(vector) != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {len(vector)}")
+            data.extend(vector)
+        with open(self.vectors_path, 'ab') as f:
+            f.write(data.tobytes())
+        with open(self.keys_path, 'a', encoding="utf-8") as f:
+            f.write("".join(f"{key}\n" for key in keys))
+
+        first_row = len(self.rows)
+        for offset, key in enumerate(keys):
+            self.rows[key] = first_row + offset
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of embeddings keyed by (model, text hash)
+
+    Each model has two files: `<model>.f32` holds the vectors as raw
+    float32 rows, and `<model>.keys` holds the vector dimension on its
+    first line and then one text hash per row. Only the key index is
+    kept in memory; vectors are read from disk on lookup. Entries are
+    never evicted.
+    """
+
+    def __init__(self, cache_dir: str = "cache/embeddings"):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding the cache files
+        """
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+        self._stores: Dict[str, _ModelStore] = {}
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up the embeddings of several texts
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            One vector per text, or None where the text is not cached
+        """
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            store = self._store(model)
+            try:
+                found = store.read(keys) if store.dim is not None else {}
+            except OSError as e:
+                logger.warning(f"Failed to read embedding cache for {model}: {e}")
+                found = {}
+        return [found.get(key) for key in keys]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Store the embeddings of several texts
+
+        Texts already in the cache are skipped.
+
+        Args:
+            model: Embedding model name
+            texts: Embedded texts
+            vectors: One vector per text
+        """
+        new_keys: List[str] = []
+        new_vectors: List[Sequence[float]] = []
+        with self._lock:
+            store = self._store(model)
+            seen = set()
+            for text, vector in zip(texts, vectors):
+                key = text_key(text)
+                if key not in store.rows and key not in seen:
+                    seen.add(key)
+                    new_keys.append(key)
+                    new_vectors.append(vector)
+            if not new_keys:
+                return
+            try:
+                store.append(new_keys, new_vectors)
+            except OSError as e:
+                logger.warning(f"Failed to write embedding cache for {model}: {e}")
+                # Reload from disk next time, which repairs a half-written append
+                del self._stores[model]
+
+    def count(self, model: str) -> int:
+        """Number of cached vectors of a model"""
+        with self._lock:
+            return len(self._store(model).rows)
+
+    def _store(self, model: str) -> _ModelStore:
+        """Get (lazily loading) the store of a model (caller holds the lock)"""
+        store = self._stores.get(model)
+        if store is None:
+            # Model names contain ':' and '/'; the hash keeps sanitized names distinct
+            safe = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+            name = f"{safe}-{hashlib.sha256(model.encode('utf-8')).hexdigest()[:8]}"
+            store = _ModelStore(self.cache_dir / f"{name}.f32", self.cache_dir / f"{name}.keys")
+            self._stores[model] = store
+        return store
@@ -0,0 +1,255 @@
+"""
+Pool of Ollama endpoints with health-aware load balancing
+"""
+import contextlib
+import random
+import threading
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Set
+
+from .resilience import CircuitBreaker
+from ..utils.exceptions import CircuitOpenError
+from ..utils.logger import setup_logger
+
+logger = setup_logger("endpoint_pool", "logs/app.log")
+
+
+class Endpoint:
+    """
+    One Ollama server in a pool
+
+    Attributes:
+        url: Base URL of the server
+        circuit_breaker: Breaker that ejects the server while it is failing
+        outstanding: Requests currently in flight to this server
+        resident_models: Models last known to be loaded on this server
+    """
+
+    def __init__(self, url: str, circuit_breaker: CircuitBreaker):
+        """
+        Initialize an endpoint
+
+        Args:
+            url: Base URL of the server
+            circuit_breaker: Breaker guarding this server
+        """
+        self.url = url.rstrip('/')
+        self.circuit_breaker = circuit_breaker
+        self.outstanding = 0
+        self.resident_models: Set[str] = set()
+
+    @property
+    def healthy(self) -> bool:
+        """True unless the server is ejected and still within its recovery timeout"""
+        return self.circuit_breaker.allows_requests()
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.url!r}, outstanding={self.outstanding}, state={self.circuit_breaker.state})"
+
+
+class EndpointPool:
+    """
+    Routes requests across several Ollama servers
+
+    Each request goes to a healthy endpoint chosen by:
+    1. model affinity - endpoints that already have the model loaded
+       are preferred, so requests do not trigger extra model loads
+    2. least outstanding requests among those
+    3. random choice between ties
+
+    Every endpoint has its own CircuitBreaker: a failing server is
+    ejected (its circuit opens) and is re-admitted after a successful
+    health probe, either when a request next considers it or from the
+    periodic health check thread.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        breaker_factory: Optional[Callable[[str], CircuitBreaker]] = None
+    ):
+        """
+        Initialize the pool
+
+        Args:
+            urls: Base URLs of the Ollama servers (at least one)
+            breaker_factory: Creates the circuit breaker of the endpoint
+                             with the given URL (default: CircuitBreaker())
+
+        Raises:
+            ValueError: If urls is empty
+        """
+        if not urls:
+            raise ValueError("EndpointPool needs at least one endpoint URL")
+        breaker_factory = breaker_factory or (lambda url: CircuitBreaker())
+        self.endpoints = [Endpoint(url, breaker_factory(url)) for url in urls]
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+        self._stop_health_checks = threading.Event()
+
+    def select(self, model: Optional[str] = None, exclude: Collection[str] = ()) -> Endpoint:
+        """
+        Pick the endpoint for a request
+
+        Does not count the request as outstanding; use track() for that.
+
+        Args:
+            model: Model the request uses (enables affinity)
+            exclude: URLs to avoid (e.g. ones that already failed this
+                     request); ignored if no other endpoint is healthy
+
+        Returns:
+            The chosen endpoint
+
+        Raises:
+            CircuitOpenError: If every endpoint is ejected
+        """
+        candidates = [e for e in self.endpoints if e.healthy]
+        if not candidates:
+            remaining = min(e.circuit_breaker.retry_after() for e in self.endpoints)
+            raise CircuitOpenError(f"Ollama server is unavailable (retrying in {remaining:.0f}s)")
+
+        preferred = [e for e in candidates if e.url not in exclude]
+        if preferred:
+            candidates = preferred
+
+        with self._lock:
+            if model is not None:
+                warm = [e for e in candidates if model in e.resident_models]
+                if warm:
+                    candidates = warm
+            least = min(e.outstanding for e in candidates)
+            return random.choice([e for e in candidates if e.outstanding == least])
+
+    @contextlib.contextmanager
+    def track(self, endpoint: Endpoint) -> Iterator[Endpoint]:
+        """
+        Count a request as outstanding on an endpoint while the block runs
+
+        Args:
+            endpoint: Endpoint serving the request
+
+        Yields:
+            The same endpoint
+        """
+        with self._lock:
+            endpoint.outstanding += 1
+        try:
+            yield endpoint
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def get(self, url: str) -> Optional[Endpoint]:
+        """Find an endpoint by URL"""
+        url = url.rstrip('/')
+        for endpoint in self.endpoints:
+            if endpoint.url == url:
+                return endpoint
+        return None
+
+    def mark_resident(self, endpoint: Endpoint, model: str) -> None:
+        """Record that a model is loaded on an endpoint"""
+        with self._lock:
+            endpoint.resident_models.add(model)
+
+    def set_resident(self, endpoint: Endpoint, models: Collection[str]) -> None:
+        """Replace the set of models known to be loaded on an endpoint"""
+        with self._lock:
+            endpoint.resident_models = set(models)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Describe every endpoint (for logging and diagnostics)
+
+        Returns:
+            One dictionary per endpoint with url, state, outstanding
+            and resident_models
+        """
+        with self._lock:
+            return [
+                {
+                    "url": e.url,
+                    "state": e.circuit_breaker.state,
+                    "outstanding": e.outstanding,
+                    "resident_models": sorted(e.resident_models),
+                }
+                for e in self.endpoints
+            ]
+
+    def check_health(
+        self,
+        probe: Callable[[Endpoint], bool],
+        refresh_resident: Optional[Callable[[Endpoint], List[str]]] = None
+    ) -> None:
+        """
+        Re-probe ejected endpoints and refresh residency of healthy ones
+
+        An ejected endpoint is probed once its recovery timeout has passed;
+        a passing probe re-admits it. Healthy endpoints have their loaded
+        models refreshed so affinity stays accurate.
+
+        Args:
+            probe: Returns True if an endpoint answers
+            refresh_resident: Returns the models loaded on an endpoint
+        """
+        for endpoint in self.endpoints:
+            breaker = endpoint.circuit_breaker
+            if breaker.state != CircuitBreaker.CLOSED:
+                if not endpoint.healthy:
+                    continue
+                try:
+                    healthy = probe(endpoint)
+                except Exception:
+                    healthy = False
+                if healthy:
+                    logger.info(f"Endpoint {endpoint.url} passed health check, re-admitting")
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                    continue
+
+            if refresh_resident is not None:
+                try:
+                    self.set_resident(endpoint, refresh_resident(endpoint))
+                except Exception as e:
+                    logger.warning(f"Could not refresh loaded models of {endpoint.url}: {e}")
+
+    def start_health_checks(
+        self,
+        interval: float,
+        probe: Callable[[Endpoint], bool],
+        refresh_resident: Optional[Callable[[Endpoint], List[str]]] = None
+    ) -> threading.Thread:
+        """
+        Run check_health() every `interval` seconds on a daemon thread
+
+        Args:
+            interval: Seconds between checks
+            probe: See check_health()
+            refresh_resident: See check_health()
+
+        Returns:
+            The health check thread (an already running one is reused)
+        """
+        if self._health_thread is not None and self._health_thread.is_alive():
+            return self._health_thread
+
+        self._stop_health_checks.clear()
+
+        def loop():
+            while not self._stop_health_checks.wait(interval):
+                try:
+                    self.check_health(probe, refresh_resident)
+                except Exception as e:
+                    logger.error(f"Endpoint health check failed: {e}")
+
+        self._health_thread = threading.Thread(target=loop, daemon=True)
+        self._health_thread.start()
+        return self._health_thread
+
+    def stop_health_checks(self) -> None:
+        """Stop the periodic health check thread, if running"""
+        self._stop_health_checks.set()
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=5)
+            self._health_thread = None
@@ -0,0 +1,104 @@
+"""
+Low-overhead newline-delimited JSON (NDJSON) stream parser
+"""
+import json
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+
+if orjson is not None:
+    # orjson accepts memoryview directly, so lines are decoded without copying
+    _loads = orjson.loads
+    _DECODE_ERRORS = (orjson.JSONDecodeError,)
+    _ZERO_COPY = True
+else:
+    _loads = json.loads
+    _DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+    _ZERO_COPY = False
+
+
+class NDJSONParser:
+    """
+    Incremental parser for NDJSON byte streams
+
+    Feed raw bytes as they arrive (e.g. from httpx's iter_bytes()); complete
+    lines are decoded and yielded as Python objects. Bytes are accumulated
+    in a single bytearray and lines are located with find() instead of
+    splitting, so no intermediate str or list objects are built per chunk.
+    When orjson is installed, lines are handed to it as memoryview slices
+    of the buffer (zero-copy); otherwise the stdlib json module is used.
+
+    Lines that fail to decode are skipped and reported through on_error.
+    """
+
+    def __init__(self, on_error: Optional[Callable[[bytes, Exception], None]] = None):
+        """
+        Initialize the parser
+
+        Args:
+            on_error: Optional callback receiving (raw_line, exception) for
+                      lines that are not valid JSON
+        """
+        self._buffer = bytearray()
+        self.on_error = on_error
+        self.error_count = 0
+
+    def feed(self, data: bytes) -> Iterator[Any]:
+        """
+        Feed a block of bytes and yield every complete JSON value in it
+
+        Args:
+            data: Raw bytes from the stream
+
+        Yields:
+            Decoded JSON values, in order
+        """
+        buffer = self._buffer
+        buffer += data
+        find = buffer.find
+        start = 0
+        end = find(b"\n")
+        if end < 0:
+            return
+
+        with memoryview(buffer) as view:
+            while end >= 0:
+                stop = end - 1 if end > start and buffer[end - 1] == 0x0D else end
+                if stop > start:
+                    value = self._decode(view, start, stop)
+                    if value is not None:
+                        yield value
+                start = end + 1
+                end = find(b"\n", start)
+
+        # Drop consumed bytes; the (usually empty) partial line stays
+        del buffer[:start]
+
+    def flush(self) -> Iterator[Any]:
+        """
+        Decode a trailing line that was not newline-terminated
+
+        Yields:
+            The final JSON value, if any
+        """
+        if self._buffer.strip():
+            yield from self.feed(b"\n")
+        self._buffer.clear()
+
+    def _decode(self, view: memoryview, start: int, stop: int) -> Any:
+        """Decode one line of the buffer, returning None on failure"""
+        line = view[start:stop] if _ZERO_COPY else self._buffer[start:stop]
+        try:
+            return _loads(line)
+        except _DECODE_ERRORS as e:
+            self.error_count += 1
+            if self.on_error is not None:
+                self.on_error(bytes(line), e)
+            return None
+        finally:
+            if _ZERO_COPY:
+                line.release()
@@ -1,14 +1,86 @@
 """
 Ollama API client for communicating with local LLM models
 """
+import contextlib
+import dataclasses
 import httpx
-import json
-from typing import Iterator, List, Dict, Any
-from ..utils.exceptions import OllamaConnectionError, ModelNotFoundError
+import logging
+import socket
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Any, Optional, TypeVar
+from .cassette import RecordingTransport
+from .embedding_cache import EmbeddingCache
+from .endpoint_pool import Endpoint, EndpointPool
+from .ndjson import NDJSONParser
+from .response_cache import CachedResponse, ResponseCache
+from .resilience import CircuitBreaker, RetryPolicy, is_retryable
+from .scheduler import Priority, RequestScheduler
+from .stream_events import (
+    ChatStreamDecoder, DoneEvent, ErrorEvent, GenerationStats, StreamEvent, TokenEvent
+)
+from ..utils.cancellation import CancellationToken
+from ..utils.exceptions import (
+    CircuitOpenError, OllamaConnectionError, ModelNotFoundError, RequestCancelledError
+)
 from ..utils.logger import setup_logger
 
 logger = setup_logger("ollama_client", "logs/app.log")
 
+T = TypeVar("T")
+
+
+def _log_bad_chunk(line: bytes, error: Exception) -> None:
+    """Log a stream line that could not be parsed as JSON"""
+    logger.warning(f"Failed to parse JSON chunk: {error}")
+
+
+class _ConnectionAborter:
+    """
+    Tears down the connection of one streaming request from another thread
+
+    Streaming requests use dedicated (non-pooled) connections, so the
+    socket seen in the "connect_tcp" trace event belongs to that request
+    alone. Shutting it down wakes a thread blocked waiting for response
+    headers (model load, prompt evaluation) or body chunks, and tells
+    Ollama to stop generating. Closing the response alone would not.
+    """
+
+    def __init__(self):
+        """Initialize an aborter with no connection yet"""
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self.aborted = False
+
+    def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpx trace hook capturing the request's socket"""
+        if event_name != "connection.connect_tcp.complete":
+            return
+        sock = info["return_value"].get_extra_info("socket")
+        with self._lock:
+            self._socket = sock
+            aborted = self.aborted
+        if aborted:
+            self._shutdown(sock)
+
+    def abort(self) -> None:
+        """Shut down the connection (now, or as soon as it is opened)"""
+        with self._lock:
+            self.aborted = True
+            sock = self._socket
+        if sock is not None:
+            self._shutdown(sock)
+
+    @staticmethod
+    def _shutdown(sock: socket.socket) -> None:
+        """Shut down both directions of a socket, ignoring errors"""
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
 
 class OllamaClient:
     """
@@ -18,34 +90,99 @@ class OllamaClient:
     - Listing available models
     - Generating chat completions
     - Streaming responses
+
+    The client can spread requests over several Ollama servers; see
+    EndpointPool for how each request's server is chosen. Generation
+    requests (chat, preload, prefill, embed) are admitted by a RequestScheduler,
+    which caps concurrency per server and serves interactive requests
+    before background work. Lightweight metadata requests (tags, show,
+    ps) bypass the scheduler so they never queue behind a generation.
     """
 
-    def __init__(self, base_url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        endpoints: Optional[List[str]] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        response_cache: Optional[ResponseCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        record_dir: Optional[str] = None,
+        transport: Optional[httpx.BaseTransport] = None
+    ):
         """
         Initialize the Ollama client
 
         Args:
             base_url: Base URL for Ollama API (default: http://localhost:11434)
+            retry_policy: Retry schedule for connection-phase failures
+                          (default: RetryPolicy())
+            circuit_breaker: Circuit breaker guarding requests (default: a
+                             CircuitBreaker probing /api/tags). With several
+                             endpoints it guards the first one and the others
+                             get breakers with the same thresholds.
+            endpoints: Base URLs of several Ollama servers to balance
+                       requests across (overrides base_url)
+            scheduler: Admission control for generation requests
+                       (default: RequestScheduler())
+            response_cache: Cache replaying deterministic responses
+                            (default: no caching)
+            embedding_cache: Cache of computed embeddings (default: no caching)
+            record_dir: Record every chat stream, with the arrival time of
+                        each chunk, as a cassette file in this directory
+                        (see RecordingTransport; default: no recording)
+            transport: Optional custom httpx transport (used in tests, e.g.
+                       a ReplayTransport playing back cassettes)
         """
-        self.base_url = base_url.rstrip('/')
-        self.client = httpx.Client(timeout=60.0)
-        logger.info(f"Initialized Ollama client with base URL: {self.base_url}")
+        urls = [url.rstrip('/') for url in endpoints] if endpoints else [base_url.rstrip('/')]
+        self.base_url = urls[0]
+        self.retry_policy = retry_policy or RetryPolicy()
+        template = circuit_breaker or CircuitBreaker()
+
+        def breaker_factory(url: str) -> CircuitBreaker:
+            if url == self.base_url:
+                return template
+            return CircuitBreaker(template.failure_threshold, template.recovery_timeout)
+
+        self.pool = EndpointPool(urls, breaker_factory=breaker_factory)
+        for endpoint in self.pool.endpoints:
+            if endpoint.circuit_breaker.health_probe is None:
+                endpoint.circuit_breaker.health_probe = (lambda url=endpoint.url: self._probe(url))
+        self.circuit_breaker = template
+        self.scheduler = scheduler or RequestScheduler()
+        self.response_cache = response_cache
+        self.embedding_cache = embedding_cache
+        self.record_dir = record_dir
+        self.transport = transport
+        self.client = httpx.Client(timeout=60.0, transport=transport)
+        # Streams get their own connection each, so they can be torn down individually
+        self._stream_client: Optional[httpx.Client] = None
+        self._stream_client_lock = threading.Lock()
+        logger.info(f"Initialized Ollama client with endpoints: {', '.join(urls)}")
 
     def check_connection(self) -> bool:
         """
         Verify that Ollama is running and accessible
 
+        With several endpoints, every one is checked and the client is
+        usable if at least one answers.
+
         Returns:
             True if connection successful, False otherwise
         """
-        try:
-            response = self.client.get(f"{self.base_url}/api/tags")
-            response.raise_for_status()
-            logger.info("Successfully connected to Ollama")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to connect to Ollama: {e}")
-            return False
+        connected = False
+        for endpoint in self.pool.endpoints:
+            try:
+                response = self.client.get(f"{endpoint.url}/api/tags")
+                response.raise_for_status()
+                logger.info(f"Successfully connected to Ollama at {endpoint.url}")
+                # A healthy server closes the circuit straight away
+                endpoint.circuit_breaker.record_success()
+                connected = True
+            except Exception as e:
+                logger.error(f"Failed to connect to Ollama at {endpoint.url}: {e}")
+        return connected
 
     def list_models(self) -> List[str]:
         """
@@ -57,9 +194,13 @@ class OllamaClient:
         Raises:
             OllamaConnectionError: If cannot connect to Ollama
         """
-        try:
-            response = self.client.get(f"{self.base_url}/api/tags")
+        def fetch(endpoint: Endpoint) -> httpx.Response:
+            response = self.client.get(f"{endpoint.url}/api/tags")
             response.raise_for_status()
+            return response
+
+        try:
+            response = self._with_retries(fetch)
             data = response.json()
 
             # Extract model names from response
@@ -67,6 +208,8 @@ class OllamaClient:
             logger.info(f"Found {len(models)} available models")
             return models
 
+        except CircuitOpenError:
+            raise
         except httpx.HTTPError as e:
             logger.error(f"HTTP error while listing models: {e}")
             raise OllamaConnectionError(f"Failed to list models: {e}")
@@ -74,10 +217,325 @@ class OllamaClient:
             logger.error(f"Unexpected error while listing models: {e}")
             raise OllamaConnectionError(f"Failed to list models: {e}")
 
+    def show_model(self, model: str) -> Dict[str, Any]:
+        """
+        Fetch details about a model (/api/show)
+
+        Args:
+            model: Name of the model
+
+        Returns:
+            Raw response with "details", "model_info", "parameters", ...
+
+        Raises:
+            ModelNotFoundError: If the model does not exist
+            OllamaConnectionError: If cannot connect to Ollama
+        """
+        def fetch(endpoint: Endpoint) -> httpx.Response:
+            response = self.client.post(f"{endpoint.url}/api/show", json={"model": model})
+            response.raise_for_status()
+            return response
+
+        try:
+            return self._with_retries(fetch, model=model).json()
+
+        except CircuitOpenError:
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise ModelNotFoundError(f"Model not found: {model}")
+            logger.error(f"HTTP error while showing model {model}: {e}")
+            raise OllamaConnectionError(f"Failed to show model: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error while showing model {model}: {e}")
+            raise OllamaConnectionError(f"Failed to show model: {e}")
+
+    def list_running_models(self) -> List[str]:
+        """
+        Fetch the models currently loaded in memory (/api/ps)
+
+        With several endpoints, every available one is asked; the result
+        is the union, and each endpoint's answer updates model affinity.
+
+        Returns:
+            List of resident model names
+
+        Raises:
+            OllamaConnectionError: If cannot connect to Ollama
+        """
+        endpoints = [e for e in self.pool.endpoints if e.healthy]
+        if not endpoints:
+            # Raises CircuitOpenError with the time until the next probe
+            self.pool.select()
+
+        running: List[str] = []
+        errors = []
+        for endpoint in endpoints:
+            try:
+                models = self._fetch_running(endpoint)
+            except Exception as e:
+                errors.append(e)
+                continue
+            self.pool.set_resident(endpoint, models)
+            running.extend(model for model in models if model not in running)
+
+        if errors and len(errors) == len(endpoints):
+            logger.error(f"Failed to list running models: {errors[-1]}")
+            raise OllamaConnectionError(f"Failed to list running models: {errors[-1]}")
+        return running
+
+    def preload_model(
+        self,
+        model: str,
+        keep_alive: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        priority: Priority = Priority.BACKGROUND
+    ) -> bool:
+        """
+        Load a model into memory without generating anything
+
+        Sends an empty /api/generate request, which makes Ollama load the
+        model and keep it resident for `keep_alive`, so the next chat
+        request does not pay the load time.
+
+        Args:
+            model: Name of the model to load
+            keep_alive: How long to keep it loaded (e.g. "10m", "-1" forever)
+            cancel_token: Optional token that aborts the request
+            priority: Scheduling priority (background work can be preempted)
+
+        Returns:
+            True if the model was loaded, False if the request was cancelled
+
+        Raises:
+            OllamaConnectionError: If the request fails
+        """
+        payload: Dict[str, Any] = {"model": model}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+
+        # A token lets the scheduler preempt the load
+        cancel_token = cancel_token or CancellationToken()
+        aborter = _ConnectionAborter()
+        unregister = cancel_token.register(aborter.abort)
+
+        def load(endpoint: Endpoint) -> httpx.Response:
+            # Loading a large model on CPU can take minutes; a dedicated
+            # connection lets cancellation tear the request down
+            response = self._get_stream_client().post(
+                f"{endpoint.url}/api/generate",
+                json=payload,
+                timeout=600.0,
+                extensions={"trace": aborter.trace}
+            )
+            response.raise_for_status()
+            self.pool.mark_resident(endpoint, model)
+            return response
+
+        try:
+            logger.info(f"Preloading model: {model} (keep_alive={keep_alive})")
+            self._with_retries(load, cancel_token, model, priority=priority)
+            logger.info(f"Model loaded: {model}")
+            return True
+
+        except RequestCancelledError:
+            logger.info(f"Preload of {model} cancelled while queued")
+            return False
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if aborter.aborted:
+                logger.info(f"Preload of {model} cancelled")
+                return False
+            logger.error(f"Failed to preload model {model}: {e}")
+            raise OllamaConnectionError(f"Failed to preload model: {e}")
+        finally:
+            unregister()
+
+    def prefill(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        keep_alive: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        priority: Priority = Priority.BACKGROUND
+    ) -> Optional[GenerationStats]:
+        """
+        Evaluate a conversation prefix so the server's prompt cache is warm
+
+        Sends the messages as a chat request limited to a single output
+        token. Ollama keeps the evaluated prompt in its cache, so a later
+        request that starts with the same messages only evaluates the
+        new suffix.
+
+        Args:
+            model: Name of the model to use
+            messages: Conversation prefix in API format
+            keep_alive: How long Ollama should keep the model loaded afterwards
+            cancel_token: Optional token that aborts the prefill
+            priority: Scheduling priority (background work can be preempted)
+
+        Returns:
+            Statistics of the prefill request, or None if it was cancelled
+
+        Raises:
+            OllamaConnectionError: If the request fails
+        """
+        events = self.generate_events(
+            model, messages, cancel_token, keep_alive, options={"num_predict": 1}, priority=priority
+        )
+        for event in events:
+            if isinstance(event, DoneEvent):
+                return event.stats
+            if isinstance(event, ErrorEvent):
+                raise OllamaConnectionError(f"Prefill failed: {event.message}")
+        return None
+
+    def embed(
+        self,
+        model: str,
+        texts: List[str],
+        batch_size: int = 64,
+        max_concurrency: int = 2,
+        cancel_token: Optional[CancellationToken] = None,
+        priority: Priority = Priority.BACKGROUND
+    ) -> List[List[float]]:
+        """
+        Compute embeddings of texts (/api/embed)
+
+        Texts already in the embedding cache are not sent again. The rest
+        are deduplicated and sent batch_size at a time, with up to
+        max_concurrency batches in flight; the scheduler's per-server cap
+        still applies. Vectors are float32 precision, whether cached or not.
+
+        Args:
+            model: Name of the embedding model (e.g. "nomic-embed-text")
+            texts: Texts to embed
+            batch_size: Texts per request
+            max_concurrency: Batches sent concurrently
+            cancel_token: Optional token that abandons batches not yet sent and
+                          aborts those in flight (lets the scheduler preempt them)
+            priority: Scheduling priority of the requests
+
+        Returns:
+            One vector per text, in order
+
+        Raises:
+            ModelNotFoundError: If the model does not exist
+            RequestCancelledError: If cancel_token is cancelled before all batches finish
+            OllamaConnectionError: If a request fails
+        """
+        if not texts:
+            return []
+
+        cached = self.embedding_cache.get_many(model, texts) if self.embedding_cache else [None] * len(texts)
+        vectors: Dict[str, List[float]] = {
+            text: vector for text, vector in zip(texts, cached) if vector is not None
+        }
+        missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+
+        if missing:
+            batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+            logger.info(
+                f"Embedding {len(missing)} texts with {model} in {len(batches)} batches "
+                f"({len(texts) - len(missing)} cached)"
+            )
+            workers = max(1, min(max_concurrency, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as executor:
+                futures = [
+                    executor.submit(self._embed_batch, model, batch, cancel_token, priority)
+                    for batch in batches
+                ]
+                try:
+                    for batch, future in zip(batches, futures):
+                        embedded = future.result()
+                        if self.embedding_cache is not None:
+                            self.embedding_cache.put_many(model, batch, embedded)
+                        vectors.update(zip(batch, embedded))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        return [vectors[text] for text in texts]
+
+    def _embed_batch(
+        self,
+        model: str,
+        batch: List[str],
+        cancel_token: Optional[CancellationToken],
+        priority: Priority
+    ) -> List[List[float]]:
+        """
+        Send one /api/embed request
+
+        Like preloads, the request uses a dedicated connection that the
+        token tears down, so cancelling it (or the scheduler preempting it)
+        frees its slot at once, even while the model is still loading.
+
+        Args:
+            model: Name of the embedding model
+            batch: Texts to embed
+            cancel_token: Optional token; a cancelled batch is not sent,
+                          and one in flight is aborted
+            priority: Scheduling priority of the request
+
+        Returns:
+            One float32-precision vector per text
+
+        Raises:
+            RequestCancelledError: If cancel_token is cancelled
+        """
+        if cancel_token is not None and cancel_token.cancelled:
+            raise RequestCancelledError("Embedding cancelled")
+
+        aborter = _ConnectionAborter()
+        unregister = cancel_token.register(aborter.abort) if cancel_token is not None else (lambda: None)
+
+        def fetch(endpoint: Endpoint) -> httpx.Response:
+            # Loading the embedding model can take a while; a dedicated
+            # connection lets cancellation tear the request down
+            response = self._get_stream_client().post(
+                f"{endpoint.url}/api/embed",
+                json={"model": model, "input": batch},
+                timeout=300.0,
+                extensions={"trace": aborter.trace}
+            )
+            response.raise_for_status()
+            self.pool.mark_resident(endpoint, model)
+            return response
+
+        try:
+            embeddings = self._with_retries(fetch, cancel_token, model, priority=priority).json()["embeddings"]
+
+        except (CircuitOpenError, RequestCancelledError):
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise ModelNotFoundError(f"Model not found: {model}")
+            logger.error(f"HTTP error while embedding with {model}: {e}")
+            raise OllamaConnectionError(f"Failed to embed: {e}")
+        except Exception as e:
+            # Reading fails once the connection is torn down by cancel()
+            if aborter.aborted:
+                raise RequestCancelledError("Embedding cancelled")
+            logger.error(f"Unexpected error while embedding with {model}: {e}")
+            raise OllamaConnectionError(f"Failed to embed: {e}")
+        finally:
+            unregister()
+
+        if len(embeddings) != len(batch):
+            raise OllamaConnectionError(f"Expected {len(batch)} embeddings, got {len(embeddings)}")
+        return [array('f', vector).tolist() for vector in embeddings]
+
     def generate_stream(
         self,
         model: str,
-        messages: List[Dict[str, str]]
+        messages: List[Dict[str, str]],
+        cancel_token: Optional[CancellationToken] = None,
+        keep_alive: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        options: Optional[Dict[str, Any]] = None
     ) -> Iterator[str]:
         """
         Generate streaming chat completion from Ollama
@@ -88,13 +546,93 @@ class OllamaClient:
         Args:
             model: Name of the model to use (e.g., "llama2", "mistral")
             messages: List of message dicts with 'role' and 'content' keys
+            cancel_token: Optional token that stops the stream when cancelled
+            keep_alive: How long Ollama should keep the model loaded afterwards
+            priority: Scheduling priority of the request
+            options: Model options (e.g. {"temperature": 0}) passed through to Ollama
 
         Yields:
             String chunks of the response as they arrive
 
+        Raises:
+            OllamaConnectionError: If request fails or the server reports an error
+        """
+        for event in self.generate_events(model, messages, cancel_token, keep_alive, options, priority):
+            if isinstance(event, TokenEvent):
+                yield event.content
+            elif isinstance(event, ErrorEvent):
+                raise OllamaConnectionError(f"Streaming failed: {event.message}")
+
+    def generate_events(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        cancel_token: Optional[CancellationToken] = None,
+        keep_alive: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Iterator[StreamEvent]:
+        """
+        Generate streaming chat completion from Ollama as typed events
+
+        Yields a TokenEvent per content chunk, then a DoneEvent carrying
+        the generation statistics from the final chunk (plus client-side
+        time-to-first-token and tokens/sec). Errors reported by the server
+        inside the stream are yielded as an ErrorEvent.
+
+        If cancel_token is cancelled, the connection is torn down at once
+        (so Ollama stops generating) and the iterator ends without a
+        DoneEvent.
+
+        With a response cache configured, deterministic requests (see
+        ResponseCache.is_cacheable) that were answered before are replayed
+        from the cache as the same sequence of events, with stats.cached set.
+
+        Args:
+            model: Name of the model to use (e.g., "llama2", "mistral")
+            messages: List of message dicts with 'role' and 'content' keys
+            cancel_token: Optional token that stops the stream when cancelled
+            keep_alive: How long Ollama should keep the model loaded afterwards
+            options: Model options (e.g. {"num_predict": 1}) passed through to Ollama
+            priority: Scheduling priority; background streams may be
+                      preempted (ending like a cancelled stream)
+
+        Yields:
+            TokenEvent, DoneEvent or ErrorEvent instances
+
         Raises:
             OllamaConnectionError: If request fails
         """
+        if self.response_cache is None or not ResponseCache.is_cacheable(options):
+            yield from self._stream_events(model, messages, cancel_token, keep_alive, options, priority)
+            return
+
+        cache_key = ResponseCache.make_key(model, messages, options)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Replaying cached response for model: {model}")
+            yield from self._replay(model, cached)
+            return
+
+        chunks: List[str] = []
+        for event in self._stream_events(model, messages, cancel_token, keep_alive, options, priority):
+            if isinstance(event, TokenEvent):
+                chunks.append(event.content)
+            elif isinstance(event, DoneEvent):
+                # Only complete responses reach here (not cancelled, no error)
+                self.response_cache.put(cache_key, chunks, event.stats)
+            yield event
+
+    def _stream_events(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        cancel_token: Optional[CancellationToken],
+        keep_alive: Optional[str],
+        options: Optional[Dict[str, Any]],
+        priority: Priority
+    ) -> Iterator[StreamEvent]:
+        """Send a streaming chat request and yield its events (see generate_events)"""
         try:
             # Prepare the request payload
             payload = {
@@ -102,41 +640,62 @@ class OllamaClient:
                 "messages": messages,
                 "stream": True  # Enable streaming
             }
+            if keep_alive is not None:
+                payload["keep_alive"] = keep_alive
+            if options:
+                payload["options"] = options
 
             logger.info(f"Sending streaming request to model: {model}")
-            logger.debug(f"Request payload: {payload}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Request payload: {payload}")
+            decoder = ChatStreamDecoder(model)
 
-            # Make streaming POST request
-            with self.client.stream(
-                "POST",
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=120.0
-            ) as response:
-                response.raise_for_status()
+            aborter = _ConnectionAborter()
+            # A token lets the scheduler preempt background streams
+            cancel_token = cancel_token or CancellationToken()
+            unregister = cancel_token.register(aborter.abort)
 
-                # Process each line of the streaming response
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            # Parse JSON response
-                            chunk_data = json.loads(line)
-
-                            # Extract message content from chunk
-                            if "message" in chunk_data:
-                                content = chunk_data["message"].get("content", "")
-                                if content:
-                                    yield content
+            try:
+                # Make streaming POST request (connection phase is retried)
+                with self._open_stream("/api/chat", payload, aborter, cancel_token, model, priority) as response:
+                    # Split the raw byte stream into JSON chunks
+                    parser = NDJSONParser(on_error=_log_bad_chunk)
+                    for data in response.iter_bytes():
+                        if aborter.aborted:
+                            break
+                        for chunk_data in parser.feed(data):
+                            for event in decoder.feed(chunk_data):
+                                yield event
+                                if isinstance(event, ErrorEvent):
+                                    logger.error(f"Server error during streaming: {event.message}")
+                                    return
 
                             # Check if streaming is complete
-                            if chunk_data.get("done", False):
+                            if decoder.done:
                                 logger.info("Streaming completed")
-                                break
+                                return
+
+                    if not aborter.aborted:
+                        # Stream ended without a trailing newline after the last chunk
+                        for chunk_data in parser.flush():
+                            for event in decoder.feed(chunk_data):
+                                yield event
+
+            except (httpx.StreamError, httpx.TransportError, httpx.HTTPStatusError):
+                # Reading fails once the connection is torn down by cancel()
+                if not aborter.aborted:
+                    raise
 
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Failed to parse JSON chunk: {e}")
-                            continue
+            finally:
+                unregister()
 
+            if aborter.aborted:
+                logger.info("Streaming cancelled")
+
+        except RequestCancelledError:
+            logger.info("Streaming cancelled while queued")
+        except CircuitOpenError:
+            raise
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error during streaming: {e}")
             raise OllamaConnectionError(f"Streaming failed: {e}")
@@ -147,7 +706,280 @@ class OllamaClient:
             logger.error(f"Unexpected error during streaming: {e}")
             raise OllamaConnectionError(f"Streaming failed: {e}")
 
+    @staticmethod
+    def _replay(model: str, cached: CachedResponse) -> Iterator[StreamEvent]:
+        """
+        Yield a cached response as stream events
+
+        Args:
+            model: Model the request asked for
+            cached: Stored response
+
+        Yields:
+            A TokenEvent per stored chunk, then a DoneEvent
+        """
+        started_at = time.perf_counter()
+        first_token_at = None
+        for chunk in cached.chunks:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            yield TokenEvent(content=chunk)
+
+        stats = dataclasses.replace(
+            cached.stats,
+            model=cached.stats.model or model,
+            client_duration=time.perf_counter() - started_at,
+            time_to_first_token=first_token_at - started_at if first_token_at is not None else None,
+            chunk_count=len(cached.chunks),
+            cached=True
+        )
+        yield DoneEvent(stats=stats)
+
+    @contextlib.contextmanager
+    def _open_stream(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        aborter: "_ConnectionAborter",
+        cancel_token: Optional[CancellationToken] = None,
+        model: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Iterator[httpx.Response]:
+        """
+        Open a streaming POST request, retrying connection-phase failures
+
+        Only establishing the request (connecting and receiving a non-error
+        status) is retried. Once the response is handed to the caller,
+        failures propagate so that a partially received stream is never
+        duplicated. The request counts as outstanding on its endpoint,
+        and holds its scheduler slot, until the stream is closed.
+
+        Args:
+            path: API path (e.g. "/api/chat")
+            payload: JSON request body
+            aborter: Connection aborter for cancellation
+            cancel_token: Optional token that stops retrying when cancelled
+            model: Model used by the request (for endpoint affinity)
+            priority: Scheduling priority of the request
+
+        Yields:
+            The open streaming response
+        """
+        def connect(endpoint: Endpoint):
+            stack = contextlib.ExitStack()
+            try:
+                stack.enter_context(self._reserve(endpoint, priority, cancel_token))
+                response = stack.enter_context(self._get_stream_client().stream(
+                    "POST",
+                    f"{endpoint.url}{path}",
+                    json=payload,
+                    timeout=120.0,
+                    extensions={"trace": aborter.trace}
+                ))
+                response.raise_for_status()
+            except BaseException:
+                stack.close()
+                raise
+            if model is not None:
+                self.pool.mark_resident(endpoint, model)
+            return stack, response
+
+        stack, response = self._with_retries(connect, cancel_token, model, track=False)
+        with stack:
+            yield response
+
+    def _with_retries(
+        self,
+        operation: Callable[[Endpoint], T],
+        cancel_token: Optional[CancellationToken] = None,
+        model: Optional[str] = None,
+        track: bool = True,
+        priority: Optional[Priority] = None
+    ) -> T:
+        """
+        Run an operation through the endpoint pool, circuit breakers and retry policy
+
+        Each attempt goes to the endpoint picked by the pool. A retry
+        prefers endpoints that have not failed yet, and fails over to
+        them without waiting; backoff only applies when retrying a
+        server that already failed.
+
+        Args:
+            operation: Callable performing the request against an endpoint
+            cancel_token: Optional token that stops retrying when cancelled
+            model: Model used by the request (for endpoint affinity)
+            track: Reserve the endpoint (see _reserve) while the operation
+                   runs; streams reserve it themselves for their lifetime
+            priority: Scheduling priority; None bypasses the scheduler
+
+        Returns:
+            Result of the operation
+
+        Raises:
+            CircuitOpenError: If every endpoint's circuit is open
+            Exception: The last failure, if not retryable or out of attempts
+        """
+        attempt = 1
+        failed: List[str] = []
+        while True:
+            endpoint = self._acquire_endpoint(model, failed)
+            breaker = endpoint.circuit_breaker
+            try:
+                with self._reserve(endpoint, priority, cancel_token) if track else contextlib.nullcontext():
+                    result = operation(endpoint)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                breaker.record_failure()
+                failed.append(endpoint.url)
+                cancelled = cancel_token is not None and cancel_token.cancelled
+                healthy = [other for other in self.pool.endpoints if other.healthy]
+                if attempt >= self.retry_policy.max_attempts or cancelled or not healthy:
+                    raise
+
+                if any(other.url not in failed for other in healthy):
+                    logger.warning(f"Request to {endpoint.url} failed ({e}), failing over to another endpoint")
+                    attempt += 1
+                    continue
+
+                delay = self.retry_policy.delay(attempt)
+                logger.warning(
+                    f"Request failed ({e}), retrying in {delay:.2f}s "
+                    f"(attempt {attempt + 1}/{self.retry_policy.max_attempts})"
+                )
+                if cancel_token is not None:
+                    if cancel_token.wait(delay):
+                        raise
+                else:
+                    time.sleep(delay)
+                attempt += 1
+                continue
+
+            breaker.record_success()
+            return result
+
+    @contextlib.contextmanager
+    def _reserve(
+        self,
+        endpoint: Endpoint,
+        priority: Optional[Priority],
+        cancel_token: Optional[CancellationToken]
+    ) -> Iterator[None]:
+        """
+        Count a request as outstanding on an endpoint and hold a scheduler slot
+
+        The request counts as outstanding while it waits for its slot, so
+        the pool steers new requests away from endpoints with a queue.
+
+        Args:
+            endpoint: Endpoint serving the request
+            priority: Scheduling priority; None bypasses the scheduler
+            cancel_token: Token that abandons the wait for a slot
+        """
+        with self.pool.track(endpoint):
+            if priority is None:
+                yield
+            else:
+                with self.scheduler.slot(endpoint.url, priority, cancel_token):
+                    yield
+
+    def _acquire_endpoint(self, model: Optional[str], exclude: List[str]) -> Endpoint:
+        """
+        Pick an endpoint whose circuit breaker admits a request
+
+        Endpoints whose breaker refuses (a failed health probe, or a
+        recovery trial already in flight) are skipped in favour of the
+        next best one.
+
+        Args:
+            model: Model used by the request (for endpoint affinity)
+            exclude: URLs to avoid if possible
+
+        Returns:
+            The endpoint to send the request to
+
+        Raises:
+            CircuitOpenError: If no endpoint admits the request
+        """
+        refused: List[str] = []
+        while True:
+            endpoint = self.pool.select(model, exclude=set(exclude) | set(refused))
+            if endpoint.url in refused:
+                raise last_error
+            try:
+                endpoint.circuit_breaker.before_request()
+                return endpoint
+            except CircuitOpenError as e:
+                last_error = e
+                refused.append(endpoint.url)
+
+    def _fetch_running(self, endpoint: Endpoint) -> List[str]:
+        """
+        Ask one endpoint which models it has loaded (/api/ps)
+
+        Args:
+            endpoint: Endpoint to ask
+
+        Returns:
+            Resident model names
+        """
+        response = self.client.get(f"{endpoint.url}/api/ps")
+        response.raise_for_status()
+        return [model["name"] for model in response.json().get("models", [])]
+
+    def _probe(self, base_url: Optional[str] = None) -> bool:
+        """
+        Health probe used by the circuit breakers
+
+        Args:
+            base_url: Endpoint to probe (default: the first endpoint)
+
+        Returns:
+            True if /api/tags answers successfully
+        """
+        base_url = base_url or self.base_url
+        try:
+            response = self.client.get(f"{base_url}/api/tags", timeout=2.0)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning(f"Health probe of {base_url} failed: {e}")
+            return False
+
+    def start_health_checks(self, interval: float = 10.0) -> None:
+        """
+        Periodically re-probe ejected endpoints and refresh loaded models
+
+        Only useful with several endpoints: ejected servers are re-admitted
+        without waiting for a request to try them, and model affinity
+        follows models being loaded or unloaded on each server.
+
+        Args:
+            interval: Seconds between checks
+        """
+        self.pool.start_health_checks(
+            interval,
+            probe=lambda endpoint: self._probe(endpoint.url),
+            refresh_resident=self._fetch_running
+        )
+
+    def _get_stream_client(self) -> httpx.Client:
+        """Get (lazily creating) the HTTP client used for streaming requests"""
+        # Streams start from several threads at once; create a single client
+        with self._stream_client_lock:
+            if self._stream_client is None:
+                transport = self.transport or httpx.HTTPTransport(limits=httpx.Limits(max_keepalive_connections=0))
+                if self.record_dir is not None:
+                    transport = RecordingTransport(self.record_dir, transport)
+                self._stream_client = httpx.Client(timeout=60.0, transport=transport)
+            return self._stream_client
+
     def close(self) -> None:
         """Close the HTTP client connection"""
+        self.pool.stop_health_checks()
         self.client.close()
+        with self._stream_client_lock:
+            stream_client, self._stream_client = self._stream_client, None
+        if stream_client is not None:
+            stream_client.close()
         logger.info("Closed Ollama client connection")
@@ -0,0 +1,189 @@
+"""
+Resilience policies for the Ollama client: retries with backoff and a circuit breaker
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import httpx
+
+from ..utils.exceptions import CircuitOpenError
+from ..utils.logger import setup_logger
+
+logger = setup_logger("resilience", "logs/app.log")
+
+# HTTP statuses meaning "server temporarily unable to take the request"
+RETRYABLE_STATUS_CODES = (502, 503, 504)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Decide whether a failure happened while establishing a request
+
+    Only connection-phase failures qualify: the connection could not be
+    opened, the server dropped it before sending a response, or it
+    answered with a "temporarily unavailable" status. Timeouts while
+    reading and failures after a response started are never retried,
+    since the request may already have been (partially) processed.
+
+    Args:
+        error: Exception raised by httpx
+
+    Returns:
+        True if the request can safely be retried
+    """
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = getattr(error.response, "status_code", None)
+        return isinstance(status_code, int) and status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry schedule with jittered exponential backoff
+
+    Attributes:
+        max_attempts: Total attempts including the first one (1 disables retries)
+        base_delay: Delay before the first retry, in seconds
+        max_delay: Upper bound for a single delay, in seconds
+        jitter: Fraction of each delay that is randomized (0 - 1)
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    jitter: float = 0.5
+
+    def delay(self, attempt: int) -> float:
+        """
+        Get the delay before retry number `attempt`
+
+        Args:
+            attempt: 1 for the first retry, 2 for the second, ...
+
+        Returns:
+            Seconds to wait
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the server is down, and probes it before recovering
+
+    States:
+    - closed: requests flow normally; consecutive failures are counted
+    - open: requests are refused with CircuitOpenError until
+      recovery_timeout has passed
+    - half-open: the health probe decides; if it passes one trial
+      request is let through, and its outcome closes or re-opens
+      the circuit (a trial that never reports back is superseded
+      after another recovery_timeout)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 15.0,
+        health_probe: Optional[Callable[[], bool]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before probing again
+            health_probe: Callable returning True when the server is healthy
+            clock: Time source (injectable for tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.health_probe = health_probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+
+    def before_request(self) -> None:
+        """
+        Check whether a request may proceed
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            remaining = self.recovery_timeout - (self._clock() - self.opened_at)
+            if remaining > 0:
+                if self.state == self.HALF_OPEN:
+                    # A trial request is already in flight
+                    raise CircuitOpenError("Ollama server is unavailable (recovery in progress)")
+                raise CircuitOpenError(f"Ollama server is unavailable (retrying in {remaining:.0f}s)")
+            # Timestamp the trial so a stalled one does not block recovery forever
+            self.state = self.HALF_OPEN
+            self.opened_at = self._clock()
+
+        # Probe outside the lock; only this caller is in the half-open state
+        if self.health_probe is not None and not self._run_probe():
+            with self._lock:
+                self._open()
+            raise CircuitOpenError("Ollama server is unavailable (health check failed)")
+
+        logger.info("Circuit half-open, allowing trial request")
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit closed, Ollama server recovered")
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if needed"""
+        with self._lock:
+            self.failure_count += 1
+            if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                self._open()
+
+    def allows_requests(self) -> bool:
+        """True unless the circuit is open and still within its recovery timeout"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return True
+            return self._clock() - self.opened_at >= self.recovery_timeout
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit may be probed again (0 if not open)"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (self._clock() - self.opened_at))
+
+    def _open(self) -> None:
+        """Open the circuit (caller holds the lock)"""
+        if self.state != self.OPEN:
+            logger.warning(f"Circuit opened after {self.failure_count} failures")
+        self.state = self.OPEN
+        self.opened_at = self._clock()
+
+    def _run_probe(self) -> bool:
+        """Run the health probe, treating exceptions as unhealthy"""
+        try:
+            return bool(self.health_probe())
+        except Exception as e:
+            logger.warning(f"Health probe failed: {e}")
+            return False
@@ -0,0 +1,209 @@
+"""
+Disk-backed LRU cache of deterministic chat responses
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.stats import GenerationStats
+from ..utils.logger import setup_logger
+
+logger = setup_logger("response_cache", "logs/app.log")
+
+
+@dataclass
+class CachedResponse:
+    """
+    A stored response: the content chunks as streamed, plus final stats
+
+    Attributes:
+        chunks: Content chunks in the order they were received
+        stats: Generation statistics of the original request
+    """
+    chunks: List[str]
+    stats: GenerationStats
+
+
+class ResponseCache:
+    """
+    Size-bounded on-disk cache of chat responses, evicted least recently used
+
+    Only deterministic requests are cached: those with temperature 0 or
+    a fixed seed in their options. The key covers the model name, the
+    options (seed included) and the full message list, so any change to
+    the conversation is a miss. Pulling a new version of a model under
+    the same name is not detected; clear() the cache after updating
+    models.
+
+    Each entry is one JSON file named by its key. The file's mtime is the
+    last-use time, so LRU order survives restarts.
+    """
+
+    def __init__(self, cache_dir: str = "cache/responses", max_bytes: int = 50 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last used); loaded from disk on first use
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_cacheable(options: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether a request with these options is deterministic
+
+        Args:
+            options: Model options of the request
+
+        Returns:
+            True if temperature is 0 or a seed is fixed
+        """
+        if not options:
+            return False
+        return options.get("temperature") == 0 or options.get("seed") is not None
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]]) -> str:
+        """
+        Build the cache key of a request
+
+        Args:
+            model: Model name
+            messages: Full message list in API format
+            options: Model options (including seed)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        canonical = json.dumps(
+            {"model": model, "messages": messages, "options": options or {}},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look up a response, marking it most recently used
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        path = self._path(key)
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                return None
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                now = time.time()
+                os.utime(path, (now, now))
+                index[key] = (index[key][0], now)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return CachedResponse(
+            chunks=list(data.get("chunks", [])),
+            stats=GenerationStats.from_dict(data.get("stats", {}))
+        )
+
+    def put(self, key: str, chunks: List[str], stats: GenerationStats) -> None:
+        """
+        Store a complete response, evicting old entries if over the size limit
+
+        Args:
+            key: Key from make_key()
+            chunks: Content chunks as streamed
+            stats: Generation statistics of the response
+        """
+        data = {"chunks": chunks, "stats": stats.to_dict(), "created_at": time.time()}
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        if len(body) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        with self._lock:
+            index = self._load_index()
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(body)
+                tmp_path.replace(path)
+            except OSError as e:
+                logger.warning(f"Failed to write cache entry {key}: {e}")
+                return
+            index[key] = (len(body), time.time())
+            self._evict(index)
+
+    def clear(self) -> None:
+        """Delete every cache entry"""
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+
+    def size_bytes(self) -> int:
+        """Total size of the cache entries"""
+        with self._lock:
+            return sum(size for size, _ in self._load_index().values())
+
+    def __len__(self) -> int:
+        """Number of cache entries"""
+        with self._lock:
+            return len(self._load_index())
+
+    def _path(self, key: str) -> Path:
+        """File holding an entry"""
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        """Scan the cache directory once (caller holds the lock)"""
+        if self._index is None:
+            self._index = {}
+            if self.cache_dir.exists():
+                for path in self.cache_dir.glob("*.json"):
+                    stat = path.stat()
+                    self._index[path.stem] = (stat.st_size, stat.st_mtime)
+        return self._index
+
+    def _evict(self, index: Dict[str, Tuple[int, float]]) -> None:
+        """Remove least recently used entries until under max_bytes (caller holds the lock)"""
+        total = sum(size for size, _ in index.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            self._remove(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _remove(self, key: str) -> None:
+        """Delete one entry (caller holds the lock)"""
+        self._index.pop(key, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
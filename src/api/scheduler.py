@@ -0,0 +1,232 @@
+"""
+Request scheduler - concurrency limits and priorities for Ollama requests
+"""
+import contextlib
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..utils.cancellation import CancellationToken
+from ..utils.exceptions import RequestCancelledError
+from ..utils.logger import setup_logger
+
+logger = setup_logger("scheduler", "logs/app.log")
+
+
+class Priority(IntEnum):
+    """Request priority classes (lower value is served first)"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+@dataclass
+class _Ticket:
+    """One request waiting for or holding a slot"""
+    endpoint: str
+    priority: Priority
+    seq: int
+    cancel_token: Optional[CancellationToken]
+    enqueued_at: float
+    started_at: Optional[float] = None
+    preempted: bool = False
+
+    @property
+    def order(self):
+        """Queue order: priority first, then arrival"""
+        return (self.priority, self.seq)
+
+
+@dataclass
+class _WaitStats:
+    """Accumulated queue wait times of one priority class"""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    recent: List[float] = field(default_factory=list)
+
+    def add(self, wait: float) -> None:
+        """Record one wait, keeping the last 100 for percentiles"""
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+        self.recent.append(wait)
+        del self.recent[:-100]
+
+
+class RequestScheduler:
+    """
+    Admits requests to each endpoint under a concurrency cap
+
+    - Each endpoint runs at most its cap of requests at once; the rest
+      wait in a queue.
+    - Waiting INTERACTIVE requests are always admitted before waiting
+      BACKGROUND ones; within a class, requests are first come first served.
+    - When an interactive request has to wait because background work
+      fills the endpoint, the most recently started background request
+      is cancelled through its CancellationToken (preemption), so its
+      slot frees up right away. Background requests without a token
+      are never preempted.
+    - Queue depth, wait times and preemptions are available from metrics().
+    """
+
+    def __init__(
+        self,
+        max_concurrent_per_endpoint: int = 2,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+        preempt_background: bool = True,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_concurrent_per_endpoint: Default cap of concurrent requests per endpoint
+            endpoint_limits: Caps for specific endpoint URLs
+            preempt_background: Cancel background work to make room for interactive requests
+            clock: Time source (injectable for tests)
+        """
+        self.max_concurrent_per_endpoint = max_concurrent_per_endpoint
+        self.endpoint_limits = {url.rstrip('/'): limit for url, limit in (endpoint_limits or {}).items()}
+        self.preempt_background = preempt_background
+        self._clock = clock
+        # Reentrant, because cancelling a preempted token can run callbacks
+        # that wake waiters while the lock is held
+        self._cond = threading.Condition(threading.RLock())
+        self._seq = itertools.count()
+        self._waiting: Dict[str, List[_Ticket]] = {}
+        self._running: Dict[str, List[_Ticket]] = {}
+        self._wait_stats = {priority: _WaitStats() for priority in Priority}
+        self.preemption_count = 0
+
+    def limit_for(self, endpoint: str) -> int:
+        """Concurrency cap of an endpoint"""
+        return self.endpoint_limits.get(endpoint.rstrip('/'), self.max_concurrent_per_endpoint)
+
+    @contextlib.contextmanager
+    def slot(
+        self,
+        endpoint: str,
+        priority: Priority = Priority.INTERACTIVE,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Iterator[None]:
+        """
+        Hold a slot on an endpoint for the duration of the block
+
+        Blocks until the request is admitted.
+
+        Args:
+            endpoint: Endpoint URL the request goes to
+            priority: Priority class of the request
+            cancel_token: Token that abandons the wait (and, for background
+                          requests, allows preemption while running)
+
+        Raises:
+            RequestCancelledError: If cancel_token is cancelled while waiting
+        """
+        endpoint = endpoint.rstrip('/')
+        ticket = _Ticket(endpoint, priority, next(self._seq), cancel_token, self._clock())
+        unregister = cancel_token.register(self._wake) if cancel_token is not None else None
+        try:
+            self._admit(ticket)
+        finally:
+            if unregister is not None:
+                unregister()
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running[endpoint].remove(ticket)
+                self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of scheduler metrics
+
+        Returns:
+            Dictionary with:
+            - queue_depth: waiting requests per priority class
+            - running: running requests per endpoint
+            - wait: per priority class, count / avg / max / p95 of queue
+              wait in seconds
+            - preemptions: background requests cancelled so far
+        """
+        with self._cond:
+            waiting = [t for tickets in self._waiting.values() for t in tickets]
+            wait = {}
+            for priority, stats in self._wait_stats.items():
+                recent = sorted(stats.recent)
+                wait[priority.name.lower()] = {
+                    "count": stats.count,
+                    "avg": stats.total / stats.count if stats.count else 0.0,
+                    "max": stats.max,
+                    "p95": recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0,
+                }
+            return {
+                "queue_depth": {
+                    priority.name.lower(): sum(1 for t in waiting if t.priority == priority)
+                    for priority in Priority
+                },
+                "running": {url: len(tickets) for url, tickets in self._running.items() if tickets},
+                "wait": wait,
+                "preemptions": self.preemption_count,
+            }
+
+    def _admit(self, ticket: _Ticket) -> None:
+        """Wait until the ticket may run, then move it to the running list"""
+        endpoint = ticket.endpoint
+        with self._cond:
+            waiting = self._waiting.setdefault(endpoint, [])
+            running = self._running.setdefault(endpoint, [])
+            waiting.append(ticket)
+            try:
+                while not self._may_start(ticket, waiting, running):
+                    if ticket.cancel_token is not None and ticket.cancel_token.cancelled:
+                        raise RequestCancelledError("Request cancelled while queued")
+                    if ticket.priority == Priority.INTERACTIVE and self.preempt_background:
+                        self._preempt(waiting, running)
+                    self._cond.wait()
+            finally:
+                waiting.remove(ticket)
+                # The next waiter may now be at the head of the queue
+                self._cond.notify_all()
+
+            ticket.started_at = self._clock()
+            running.append(ticket)
+            wait = ticket.started_at - ticket.enqueued_at
+            self._wait_stats[ticket.priority].add(wait)
+
+        if wait >= 0.1:
+            logger.info(f"{ticket.priority.name.lower()} request to {endpoint} waited {wait:.2f}s for a slot")
+
+    def _may_start(self, ticket: _Ticket, waiting: List[_Ticket], running: List[_Ticket]) -> bool:
+        """True if the endpoint has room and the ticket is at the head of its queue"""
+        if len(running) >= self.limit_for(ticket.endpoint):
+            return False
+        return ticket.order == min(t.order for t in waiting)
+
+    def _preempt(self, waiting: List[_Ticket], running: List[_Ticket]) -> None:
+        """Cancel background work so each waiting interactive request gets a slot"""
+        pending = sum(1 for t in waiting if t.priority == Priority.INTERACTIVE)
+        freeing = sum(1 for t in running if t.preempted)
+        if freeing >= pending:
+            return
+        victims = [
+            t for t in running
+            if t.priority == Priority.BACKGROUND and not t.preempted and t.cancel_token is not None
+        ]
+        if not victims:
+            return
+        victim = max(victims, key=lambda t: t.started_at)
+        victim.preempted = True
+        self.preemption_count += 1
+        logger.info(f"Preempting background request on {victim.endpoint} for an interactive request")
+        victim.cancel_token.cancel()
+
+    def _wake(self) -> None:
+        """Wake waiters so they notice a cancelled token"""
+        with self._cond:
+            self._cond.notify_all()
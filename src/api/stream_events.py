@@ -0,0 +1,115 @@
+"""
+Typed events for streamed chat responses
+
+GenerationStats is defined in core.stats (so the data models do not
+depend on the API layer) and re-exported here for convenience.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+from ..core.stats import GenerationStats
+
+
+# Raw duration fields reported by Ollama in the final ("done") chunk,
+# all in nanoseconds except the *_count fields
+OLLAMA_STAT_FIELDS = (
+    "total_duration",
+    "load_duration",
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+)
+
+
+@dataclass
+class TokenEvent:
+    """A chunk of generated content"""
+    content: str
+
+
+@dataclass
+class DoneEvent:
+    """Generation finished; carries the final statistics"""
+    stats: GenerationStats
+
+
+@dataclass
+class ErrorEvent:
+    """The server reported an error inside the stream"""
+    message: str
+
+
+StreamEvent = Union[TokenEvent, DoneEvent, ErrorEvent]
+
+
+@dataclass
+class CancelledEvent:
+    """Generation was stopped before it finished (sent by response handles, not by the server)"""
+
+
+class ChatStreamDecoder:
+    """
+    Turns parsed /api/chat stream chunks into typed events
+
+    Tracks client-side timing from construction (i.e. when the request
+    is sent) so that time-to-first-token and tokens/sec can be computed
+    without relying on server clocks.
+    """
+
+    def __init__(self, model: str):
+        """
+        Initialize the decoder
+
+        Args:
+            model: Model name recorded in the resulting stats
+        """
+        self.model = model
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.chunk_count = 0
+        self.done = False
+
+    def feed(self, chunk_data: Dict[str, Any]) -> List[StreamEvent]:
+        """
+        Convert one parsed stream chunk into events
+
+        Args:
+            chunk_data: Decoded JSON object from the stream
+
+        Returns:
+            Events produced by this chunk (possibly empty)
+        """
+        events: List[StreamEvent] = []
+
+        if "error" in chunk_data:
+            events.append(ErrorEvent(message=str(chunk_data["error"])))
+            return events
+
+        message = chunk_data.get("message")
+        if message:
+            content = message.get("content", "")
+            if content:
+                if self.first_token_at is None:
+                    self.first_token_at = time.perf_counter()
+                self.chunk_count += 1
+                events.append(TokenEvent(content=content))
+
+        if chunk_data.get("done", False):
+            self.done = True
+            events.append(DoneEvent(stats=self._build_stats(chunk_data)))
+
+        return events
+
+    def _build_stats(self, chunk_data: Dict[str, Any]) -> GenerationStats:
+        """Build GenerationStats from the final chunk and client timings"""
+        stats = GenerationStats(
+            model=chunk_data.get("model", self.model) or self.model,
+            client_duration=time.perf_counter() - self.started_at,
+            chunk_count=self.chunk_count
+        )
+        for field_name in OLLAMA_STAT_FIELDS:
+            setattr(stats, field_name, int(chunk_data.get(field_name, 0) or 0))
+        if self.first_token_at is not None:
+            stats.time_to_first_token = self.first_token_at - self.started_at
+        return stats
@@ -0,0 +1,338 @@
+"""
+Headless batch runner: send a suite of prompts to one or more models
+
+Reads a JSONL file where each line is a prompt or a whole conversation:
+
+    {"id": "greeting", "prompt": "Say hello"}
+    {"id": "followup", "messages": [{"role": "user", "content": "Hi"}, ...], "options": {"seed": 1}}
+
+Every line is run against every model given with --model (or the line's
+own "model"), with up to --concurrency requests in flight. Each result is
+appended to the output JSONL as soon as it completes. The output file is
+also the checkpoint: when it already exists, jobs recorded in it are
+skipped, so a killed run picks up where it stopped (add --retry-failed to
+run failed jobs again, or --restart to start over). Throughput statistics
+are printed at the end.
+
+No Tk is imported, so this runs on machines without a display.
+
+Usage:
+    python -m src.batch prompts.jsonl -o results.jsonl -m llama2 -m mistral [-c 4]
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, TextIO
+
+from .api.ollama_client import OllamaClient
+from .api.stream_events import DoneEvent, ErrorEvent, GenerationStats, TokenEvent
+from .bootstrap import create_client
+from .config.settings import settings
+from .utils.cancellation import CancellationToken
+from .utils.logger import set_console_level, setup_logger
+
+logger = setup_logger("batch", "logs/app.log")
+
+
+@dataclass
+class BatchJob:
+    """
+    One prompt (or conversation) to run against one model
+
+    Attributes:
+        id: Identifier of the input line
+        model: Model to run it with
+        messages: Messages to send, in API format
+        options: Ollama options for the request
+    """
+    id: str
+    model: str
+    messages: List[Dict[str, str]]
+    options: Optional[Dict[str, Any]] = None
+
+    @property
+    def key(self) -> str:
+        """Identifies the job in the checkpoint"""
+        return f"{self.id}\t{self.model}"
+
+
+def load_jobs(
+    path: str,
+    models: Sequence[str],
+    options: Optional[Dict[str, Any]] = None
+) -> List[BatchJob]:
+    """
+    Read the input file and expand it into jobs
+
+    Args:
+        path: JSONL file of prompts or conversations
+        models: Models to run every line with (lines may name their own
+                "model" instead)
+        options: Ollama options for every request (a line's own
+                 "options" take precedence)
+
+    Returns:
+        One job per line and model, in file order
+
+    Raises:
+        ValueError: If a line is not valid JSON, has no prompt or options
+                    that are not an object, or no model is given for it
+    """
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON: {e}")
+            if "messages" in record:
+                messages = record["messages"]
+            elif "prompt" in record:
+                messages = [{"role": "user", "content": record["prompt"]}]
+            else:
+                raise ValueError(f"{path}:{number}: expected a \"prompt\" or \"messages\" field")
+
+            line_models = [record["model"]] if record.get("model") else list(models)
+            if not line_models:
+                raise ValueError(f"{path}:{number}: no model (use --model or a \"model\" field)")
+            record_options = record.get("options") or {}
+            if not isinstance(record_options, dict):
+                raise ValueError(f"{path}:{number}: \"options\" must be a JSON object")
+            line_options = {**(options or {}), **record_options} or None
+            for model in line_models:
+                jobs.append(BatchJob(str(record.get("id", number)), model, messages, line_options))
+    return jobs
+
+
+def read_checkpoint(path: Path, retry_failed: bool = False) -> Set[str]:
+    """
+    Find the jobs already recorded in an output file
+
+    A last line left incomplete by a killed run is cut off, so appending
+    resumes on a clean line.
+
+    Args:
+        path: Output JSONL file
+        retry_failed: Leave failed jobs out, so they run again
+
+    Returns:
+        Keys of the jobs to skip
+    """
+    if not path.exists():
+        return set()
+    data = path.read_bytes()
+    complete = data[:data.rfind(b"\n") + 1]
+    if len(complete) != len(data):
+        logger.warning(f"Dropping an incomplete last line from {path}")
+        with open(path, "r+b") as f:
+            f.truncate(len(complete))
+
+    done = set()
+    for line in complete.decode("utf-8").splitlines():
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(result, dict) or "id" not in result or "model" not in result:
+            logger.warning(f"Ignoring a line without id and model in {path}")
+            continue
+        if retry_failed and result.get("error"):
+            continue
+        done.add(f"{result['id']}\t{result['model']}")
+    return done
+
+
+class BatchRunner:
+    """
+    Runs jobs concurrently and appends each result to the output as it completes
+
+    Results are written whole and flushed one line at a time, so the
+    output doubles as the checkpoint of the run.
+    """
+
+    def __init__(self, client: OllamaClient, output: TextIO, concurrency: int = 2, progress: bool = True):
+        """
+        Initialize the runner
+
+        Args:
+            client: Client sending the requests
+            output: Open file results are appended to
+            concurrency: Requests in flight at once
+            progress: Print a line per finished job to stderr
+        """
+        self.client = client
+        self.output = output
+        self.concurrency = concurrency
+        self.progress = progress
+        self.cancel_token = CancellationToken()
+        self.results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def run(self, jobs: List[BatchJob]) -> List[Dict[str, Any]]:
+        """
+        Run the jobs, stopping early (without losing finished results) on Ctrl+C
+
+        Args:
+            jobs: Jobs to run
+
+        Returns:
+            Results of the jobs that finished
+        """
+        self._total = len(jobs)
+        self.started_at = time.perf_counter()
+        pending = iter(jobs)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch")
+        try:
+            # Submit lazily, so an interrupted run leaves nothing queued
+            in_flight = {executor.submit(self._run_job, job) for _, job in zip(range(self.concurrency), pending)}
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    job = next(pending, None)
+                    if job is not None:
+                        in_flight.add(executor.submit(self._run_job, job))
+        except KeyboardInterrupt:
+            print("Interrupted; stopping in-flight requests (rerun to resume)", file=sys.stderr)
+            self.cancel_token.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            self.finished_at = time.perf_counter()
+        return self.results
+
+    def _run_job(self, job: BatchJob) -> None:
+        """Stream one job's response and record the result"""
+        chunks: List[str] = []
+        stats: Optional[GenerationStats] = None
+        error = None
+        started = time.perf_counter()
+        try:
+            for event in self.client.generate_events(
+                job.model, job.messages, cancel_token=self.cancel_token,
+                keep_alive=settings.keep_alive_for(job.model), options=job.options
+            ):
+                if isinstance(event, TokenEvent):
+                    chunks.append(event.content)
+                elif isinstance(event, DoneEvent):
+                    stats = event.stats
+                elif isinstance(event, ErrorEvent):
+                    error = event.message
+        except Exception as e:
+            error = str(e)
+        if self.cancel_token.cancelled:
+            # Not recorded, so the job runs again on resume
+            return
+        if stats is None and error is None:
+            error = "stream ended without final statistics"
+
+        result = {
+            "id": job.id,
+            "model": job.model,
+            "response": "".join(chunks),
+            "error": error,
+            "elapsed": round(time.perf_counter() - started, 4),
+            "stats": stats.to_dict() if stats is not None else None,
+        }
+        with self._lock:
+            self.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            self.output.flush()
+            self.results.append(result)
+            if self.progress:
+                rate = stats.tokens_per_second if stats is not None else None
+                detail = f"error: {error}" if error else f"{result['elapsed']:.2f} s" + (
+                    f", {rate:.1f} tokens/s" if rate is not None else "")
+                print(f"[{len(self.results)}/{self._total}] {job.id} {job.model}: {detail}", file=sys.stderr)
+
+    def summary(self) -> Dict[str, Any]:
+        """Throughput statistics of the run"""
+        wall = self.finished_at - self.started_at
+        stats = [GenerationStats.from_dict(r["stats"]) for r in self.results if r["stats"]]
+        tokens = sum(s.eval_count for s in stats)
+        ttfts = sorted(s.time_to_first_token for s in stats if s.time_to_first_token is not None)
+        rates = [s.tokens_per_second for s in stats if s.tokens_per_second is not None]
+        return {
+            "jobs": len(self.results),
+            "failed": sum(1 for r in self.results if r["error"]),
+            "wall_seconds": round(wall, 3),
+            "jobs_per_second": round(len(self.results) / wall, 3) if wall > 0 else None,
+            "tokens": tokens,
+            "tokens_per_second": round(tokens / wall, 1) if wall > 0 else None,
+            "median_request_tokens_per_second": round(statistics.median(rates), 1) if rates else None,
+            "median_time_to_first_token": round(statistics.median(ttfts), 3) if ttfts else None,
+            "p95_time_to_first_token": round(ttfts[int(0.95 * (len(ttfts) - 1))], 3) if ttfts else None,
+        }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point; returns the exit status"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Run a JSONL suite of prompts through Ollama models, headless"
+    )
+    parser.add_argument("input", help="JSONL file of prompts or conversations")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file results are appended to (and resumed from)")
+    parser.add_argument("-m", "--model", action="append", default=[],
+                        help="model to run every line with (repeatable; default: DEFAULT_MODEL)")
+    parser.add_argument("-c", "--concurrency", type=int, default=settings.scheduler_max_concurrent,
+                        help="requests in flight at once")
+    parser.add_argument("--options", type=json.loads, default=None,
+                        help="JSON object of Ollama options for every request, e.g. '{\"temperature\": 0}'")
+    parser.add_argument("--url", default=None, help="Ollama base URL (default: from settings)")
+    parser.add_argument("--restart", action="store_true", help="discard existing results instead of resuming")
+    parser.add_argument("--retry-failed", action="store_true", help="run jobs that failed before again")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no per-job progress lines")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show info logging on the console")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        set_console_level("WARNING")
+
+    try:
+        jobs = load_jobs(args.input, args.model or [settings.default_model], args.options)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    output_path = Path(args.output)
+    if args.restart and output_path.exists():
+        output_path.unlink()
+    done = read_checkpoint(output_path, args.retry_failed)
+    remaining = [job for job in jobs if job.key not in done]
+    if done:
+        print(f"Resuming: {len(jobs) - len(remaining)} of {len(jobs)} jobs already done", file=sys.stderr)
+
+    # Same client as the GUI (retries, circuit breaker, response cache,
+    # stream recording), with the scheduler sized for the batch
+    client = create_client(
+        endpoints=[args.url] if args.url else None,
+        max_concurrent_per_endpoint=max(args.concurrency, 1)
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(output_path, "a", encoding="utf-8") as output:
+            runner = BatchRunner(client, output, max(args.concurrency, 1), progress=not args.quiet)
+            try:
+                runner.run(remaining)
+            except KeyboardInterrupt:
+                return 130
+            finally:
+                if remaining:
+                    print(json.dumps(runner.summary(), indent=2), file=sys.stderr)
+    finally:
+        client.close()
+
+    failed = sum(1 for r in runner.results if r["error"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
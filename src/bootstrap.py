@@ -0,0 +1,132 @@
+"""
+Construction of the Ollama client and chat manager from settings
+
+Shared by the GUI (src.main) and the terminal front-end (src.cli), so
+both talk to Ollama and the conversation store the same way.
+"""
+from typing import List, Optional
+from .core.chat_manager import ChatManager
+from .core.document_index import DocumentIndex
+from .core.model_catalog import ModelCatalog
+from .core.semantic_search import SemanticSearch
+from .api.embedding_cache import EmbeddingCache
+from .api.ollama_client import OllamaClient
+from .api.resilience import CircuitBreaker, RetryPolicy
+from .api.response_cache import ResponseCache
+from .api.scheduler import RequestScheduler
+from .config.settings import settings
+
+
+def create_client(
+    endpoints: Optional[List[str]] = None,
+    max_concurrent_per_endpoint: Optional[int] = None
+) -> OllamaClient:
+    """
+    Create the Ollama client configured by settings
+
+    Health checks are started when there are several endpoints. No
+    request is made to Ollama here.
+
+    Args:
+        endpoints: Ollama base URLs (default: from settings)
+        max_concurrent_per_endpoint: Scheduler cap per endpoint
+                                     (default: settings.scheduler_max_concurrent)
+
+    Returns:
+        Configured OllamaClient
+    """
+    endpoints = endpoints or settings.ollama_endpoints or [settings.ollama_base_url]
+    client = OllamaClient(
+        endpoints=endpoints,
+        retry_policy=RetryPolicy(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay
+        ),
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=settings.circuit_failure_threshold,
+            recovery_timeout=settings.circuit_recovery_timeout
+        ),
+        scheduler=RequestScheduler(
+            max_concurrent_per_endpoint=max_concurrent_per_endpoint or settings.scheduler_max_concurrent,
+            endpoint_limits=settings.scheduler_endpoint_limits,
+            preempt_background=settings.scheduler_preempt_background
+        ),
+        response_cache=ResponseCache(
+            cache_dir=settings.response_cache_dir,
+            max_bytes=settings.response_cache_max_mb * 1024 * 1024
+        ) if settings.response_cache_enabled else None,
+        embedding_cache=EmbeddingCache(settings.embedding_cache_dir),
+        record_dir=settings.record_streams_dir
+    )
+    if len(endpoints) > 1:
+        client.start_health_checks(settings.endpoint_health_check_interval)
+    return client
+
+
+def create_model_catalog(client: OllamaClient) -> ModelCatalog:
+    """
+    Create the cached model catalog configured by settings
+
+    Args:
+        client: Client the catalog fetches models with
+
+    Returns:
+        ModelCatalog (nothing is fetched until it is asked for models)
+    """
+    return ModelCatalog(client, cache_file=settings.model_cache_file, ttl=settings.model_catalog_ttl)
+
+
+def create_chat_manager(
+    client: OllamaClient,
+    model_catalog: Optional[ModelCatalog] = None,
+    model: Optional[str] = None
+) -> ChatManager:
+    """
+    Create the chat manager configured by settings and start its background work
+
+    Selects the model (warming it up if enabled), and starts indexing the
+    archive and the configured document folders in the background.
+
+    Args:
+        client: Client for API communication
+        model_catalog: Model catalog to share (default: create_model_catalog(client))
+        model: Model to select (default: settings.default_model)
+
+    Returns:
+        Configured ChatManager
+    """
+    # Local documents for retrieval; indexing runs in the background
+    document_index = DocumentIndex(
+        index_file=settings.documents_index_file,
+        chunk_size=settings.retrieval_chunk_size,
+        max_workers=settings.retrieval_workers,
+        ollama_client=client if settings.retrieval_use_embeddings else None,
+        embedding_model=settings.embedding_model
+    )
+    for path in settings.documents_paths:
+        document_index.add_path(path)
+
+    chat_manager = ChatManager(
+        client,
+        model_catalog=model_catalog or create_model_catalog(client),
+        keep_alive_policy=settings.keep_alive_for,
+        warm_up_on_select=settings.model_warmup_enabled,
+        prefill_on_load=settings.prefill_on_load,
+        prefill_min_messages=settings.prefill_min_messages,
+        semantic_search=SemanticSearch(
+            client,
+            model=settings.embedding_model,
+            index_dir=settings.semantic_index_dir,
+            batch_size=settings.embedding_batch_size,
+            max_concurrency=settings.embedding_max_concurrency
+        ) if settings.semantic_search_enabled else None,
+        document_index=document_index,
+        retrieval_top_k=settings.retrieval_top_k,
+        max_concurrent_sends=settings.max_concurrent_sends
+    )
+    chat_manager.set_model(model or settings.default_model)
+    # Catch up on conversations saved while the index was off or stale
+    chat_manager.index_archive()
+    chat_manager.refresh_documents()
+    return chat_manager
@@ -0,0 +1,336 @@
+"""
+Terminal front-end: chat with local models from a shell, without Tk
+
+Reuses ChatManager and ConversationStorage, so conversations are shared
+with the desktop app. Only the standard library is imported at startup;
+settings, httpx and the chat manager are loaded on a background thread
+while the prompt is already waiting for input, and nothing is requested
+from Ollama until it is needed.
+
+Usage:
+    python -m src.cli [--model NAME] [--conversation ID]
+
+Type a message to send it (Ctrl+C stops the response), or a command:
+/new, /list, /open, /search, /history, /model, /models, /delete, /help
+and /quit.
+"""
+import argparse
+import sys
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, TextIO
+
+if TYPE_CHECKING:
+    from .core.chat_manager import ChatManager
+
+HELP = """Commands:
+  /new [model]        start a new conversation
+  /list               list saved conversations
+  /open <n|id>        switch to a conversation from the last list or search
+  /search <query>     find saved messages
+  /history            show the current conversation
+  /model [name]       show or change the model
+  /models             list installed models
+  /delete <n|id>      delete a conversation
+  /help               show this help
+  /quit               exit (or Ctrl+D)
+Anything else is sent as a message; Ctrl+C stops a response."""
+
+
+class TerminalChat:
+    """
+    Line-based chat loop over a ChatManager
+
+    The manager is built by a factory on a background thread, so the
+    prompt appears immediately; the first command that needs it waits
+    for it.
+    """
+
+    def __init__(self, manager_factory: Callable[[], "ChatManager"], output: Optional[TextIO] = None):
+        """
+        Initialize the terminal chat
+
+        Args:
+            manager_factory: Builds the chat manager (called once, off the main thread)
+            output: Stream to write to (default: sys.stdout)
+        """
+        self.manager_factory = manager_factory
+        self.output = output or sys.stdout
+        self._manager: Optional["ChatManager"] = None
+        self._load_error: Optional[BaseException] = None
+        self._loaded = threading.Event()
+        # Conversation IDs shown by the last /list or /search, numbered from 1
+        self._listed: List[str] = []
+        self._commands: Dict[str, Callable[[str], None]] = {
+            "new": self._cmd_new,
+            "list": self._cmd_list,
+            "open": self._cmd_open,
+            "search": self._cmd_search,
+            "history": self._cmd_history,
+            "model": self._cmd_model,
+            "models": self._cmd_models,
+            "delete": self._cmd_delete,
+            "help": lambda arg: self._print(HELP),
+        }
+
+    def start(self) -> "TerminalChat":
+        """Start building the chat manager in the background"""
+        threading.Thread(target=self._load, name="cli-load", daemon=True).start()
+        return self
+
+    def _load(self) -> None:
+        try:
+            self._manager = self.manager_factory()
+        except BaseException as e:
+            self._load_error = e
+        finally:
+            self._loaded.set()
+
+    @property
+    def manager(self) -> "ChatManager":
+        """
+        The chat manager, waiting for it to be built if needed
+
+        Raises:
+            Exception: Whatever building the manager failed with
+        """
+        if not self._loaded.is_set():
+            self._print("(loading...)")
+            self._loaded.wait()
+        if self._load_error is not None:
+            raise self._load_error
+        return self._manager
+
+    def run(self, read_line: Callable[[str], str] = input) -> int:
+        """
+        Read and handle lines until /quit or end of input
+
+        Args:
+            read_line: Prompts for and returns the next line (raises
+                       EOFError at the end of input)
+
+        Returns:
+            Exit status
+        """
+        self._print("Local LLM Chat. Type a message, or /help for commands.")
+        while True:
+            try:
+                line = read_line("> ")
+            except EOFError:
+                self._print("")
+                return 0
+            except KeyboardInterrupt:
+                # Like the Python REPL: Ctrl+C discards the line
+                self._print("")
+                continue
+            if not self.handle(line):
+                return 0
+
+    def handle(self, line: str) -> bool:
+        """
+        Handle one input line
+
+        Args:
+            line: A message, or a command starting with "/"
+
+        Returns:
+            False if the line asks to quit
+        """
+        line = line.strip()
+        if not line:
+            return True
+        if not line.startswith("/"):
+            self._run_safely(self._send, line)
+            return True
+
+        name, _, arg = line[1:].partition(" ")
+        if name in ("quit", "exit", "q"):
+            return False
+        command = self._commands.get(name)
+        if command is None:
+            self._print(f"Unknown command /{name}; type /help for the list")
+        else:
+            self._run_safely(command, arg.strip())
+        return True
+
+    def _run_safely(self, action: Callable[[str], None], arg: str) -> None:
+        """Run a command, reporting errors instead of leaving the loop"""
+        try:
+            action(arg)
+        except Exception as e:
+            self._print(f"error: {e}")
+
+    def _send(self, content: str) -> None:
+        """Send a message, streaming the reply until it ends or Ctrl+C"""
+        from concurrent.futures import wait
+        from .api.stream_events import TokenEvent
+
+        def on_event(event) -> None:
+            if isinstance(event, TokenEvent):
+                self._write(event.content)
+
+        manager = self.manager
+        self._write(f"{manager.current_model}: ")
+        # The reply streams on the manager's worker pool
+        handle = manager.send_async(content)
+        handle.subscribe(on_event)
+        try:
+            # Wait in slices so Ctrl+C reaches the main thread
+            while not handle.done():
+                wait([handle.future], timeout=0.1)
+        except KeyboardInterrupt:
+            handle.cancel()
+            wait([handle.future])
+            self._write(" [stopped]")
+        self._print("")
+
+        message = handle.result()
+        stats = getattr(message, "stats", None)
+        if stats is not None and stats.tokens_per_second is not None:
+            self._print(f"({stats.eval_count} tokens, {stats.tokens_per_second:.1f} tokens/s)")
+
+    def _cmd_new(self, model: str) -> None:
+        manager = self.manager
+        if model:
+            manager.set_model(model)
+        manager.start_new_conversation()
+        self._print(f"New conversation with {manager.current_model}")
+
+    def _cmd_list(self, arg: str) -> None:
+        manager = self.manager
+        conversations = manager.get_conversation_list()
+        if not conversations:
+            self._print("No saved conversations")
+            return
+        current = manager.get_current_conversation_id()
+        self._listed = [conv["id"] for conv in conversations]
+        for number, conv in enumerate(conversations, start=1):
+            marker = "*" if conv["id"] == current else " "
+            self._print(
+                f"{marker}{number:>3}. {conv['title']}  "
+                f"[{conv['model']}, {conv['message_count']} messages, {conv['updated_at'][:16].replace('T', ' ')}]"
+            )
+
+    def _cmd_open(self, arg: str) -> None:
+        conversation_id = self._resolve(arg)
+        if not self.manager.switch_conversation(conversation_id):
+            self._print(f"No conversation {conversation_id}")
+            return
+        self._cmd_history("")
+
+    def _cmd_search(self, query: str) -> None:
+        if not query:
+            self._print("Usage: /search <query>")
+            return
+        manager = self.manager
+        hits = []
+        try:
+            hits = [(hit.conversation_id, hit.role, hit.snippet) for hit in manager.search_conversations(query)]
+        except Exception as e:
+            self._print(f"(semantic search unavailable: {e}; searching text)")
+        if not hits:
+            hits = [(m["conversation_id"], m["role"], m["snippet"]) for m in manager.storage.find_messages(query)]
+        if not hits:
+            self._print("No matches")
+            return
+
+        titles = {conv["id"]: conv["title"] for conv in manager.get_conversation_list()}
+        self._listed = [conversation_id for conversation_id, _, _ in hits]
+        for number, (conversation_id, role, snippet) in enumerate(hits, start=1):
+            self._print(f"{number:>4}. {titles.get(conversation_id, conversation_id)}")
+            self._print(f"      {role}: {snippet}")
+
+    def _cmd_history(self, arg: str) -> None:
+        from .core.message import Role
+
+        manager = self.manager
+        messages = manager.get_messages()
+        if not messages:
+            self._print("(empty conversation)")
+            return
+        model = manager.current_model
+        for message in messages:
+            label = "you" if message.role == Role.USER else model
+            suffix = " [incomplete]" if message.incomplete else ""
+            self._print(f"{label}: {message.content}{suffix}")
+
+    def _cmd_model(self, model: str) -> None:
+        if model:
+            self.manager.set_model(model)
+        self._print(f"Model: {self.manager.current_model}")
+
+    def _cmd_models(self, arg: str) -> None:
+        manager = self.manager
+        current = manager.current_model
+        # Ollama lists "llama2" as "llama2:latest"
+        current_tags = {current, current if ":" in current else f"{current}:latest"}
+        for model in manager.model_catalog.get_models():
+            self._print(("* " if model in current_tags else "  ") + model)
+
+    def _cmd_delete(self, arg: str) -> None:
+        conversation_id = self._resolve(arg)
+        if self.manager.delete_conversation(conversation_id):
+            self._listed = [c for c in self._listed if c != conversation_id]
+            self._print("Deleted")
+        else:
+            self._print(f"No conversation {conversation_id}")
+
+    def _resolve(self, arg: str) -> str:
+        """Map a number from the last listing (or an ID) to a conversation ID"""
+        if not arg:
+            raise ValueError("expected a number from /list or /search, or a conversation ID")
+        if arg.isdigit():
+            number = int(arg)
+            if not 1 <= number <= len(self._listed):
+                raise ValueError(f"no entry {number} in the last listing")
+            return self._listed[number - 1]
+        return arg
+
+    def close(self) -> None:
+        """Close the manager and its client, if the manager was built"""
+        if self._manager is not None:
+            self._manager.close()
+            self._manager.client.close()
+
+    def _write(self, text: str) -> None:
+        self.output.write(text)
+        self.output.flush()
+
+    def _print(self, text: str) -> None:
+        self._write(text + "\n")
+
+
+def _create_manager(model: Optional[str]) -> "ChatManager":
+    """Build the chat manager from settings (imports the heavy modules)"""
+    from .bootstrap import create_chat_manager, create_client
+    return create_chat_manager(create_client(), model=model)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point; returns the exit status"""
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Chat with local Ollama models in a terminal")
+    parser.add_argument("-m", "--model", default=None, help="model to chat with (default: DEFAULT_MODEL)")
+    parser.add_argument("-c", "--conversation", default=None, help="ID of a saved conversation to continue")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show info logging on the console")
+    args = parser.parse_args(argv)
+
+    from .utils.logger import set_console_level
+    # Log lines would interleave with the chat and errors are reported
+    # inline anyway; the log file keeps everything
+    set_console_level("INFO" if args.verbose else "CRITICAL")
+    if sys.stdin.isatty():
+        try:
+            import readline  # noqa: F401  (line editing and history for input())
+        except ImportError:
+            pass
+
+    chat = TerminalChat(lambda: _create_manager(args.model)).start()
+    if args.conversation:
+        chat.handle(f"/open {args.conversation}")
+    try:
+        return chat.run()
+    finally:
+        chat.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@ Application configuration using Pydantic Settings
 Reads from environment variables and .env file
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -12,6 +12,72 @@ class Settings(BaseSettings):
     # Ollama API settings
     ollama_base_url: str = "http://localhost:11434"
     default_model: str = "llama2"
+    # Several Ollama servers to balance across (JSON list; overrides ollama_base_url)
+    ollama_endpoints: List[str] = []
+    endpoint_health_check_interval: float = 10.0
+
+    # Resilience settings (retries apply to connection-phase failures only)
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    circuit_failure_threshold: int = 5
+    circuit_recovery_timeout: float = 15.0
+
+    # Request scheduling (generation requests only)
+    scheduler_max_concurrent: int = 2
+    scheduler_endpoint_limits: Dict[str, int] = {}
+    scheduler_preempt_background: bool = True
+
+    # Response cache (deterministic requests only: temperature 0 or fixed seed)
+    response_cache_enabled: bool = False
+    response_cache_dir: str = "cache/responses"
+    response_cache_max_mb: int = 50
+
+    # Record chat streams as cassettes (raw chunks with timing) for replay in tests
+    record_streams_dir: Optional[str] = None
+
+    # Embeddings (cached on disk by model and text)
+    embedding_model: str = "nomic-embed-text"
+    embedding_batch_size: int = 64
+    embedding_max_concurrency: int = 1
+    embedding_cache_dir: str = "cache/embeddings"
+
+    # Semantic search over saved conversations (uses embedding_model)
+    semantic_search_enabled: bool = True
+    semantic_index_dir: str = "cache/semantic"
+    semantic_search_results: int = 10
+
+    # Retrieval from local documents (BM25, optionally reranked with embeddings)
+    documents_paths: List[str] = []
+    documents_index_file: str = "cache/documents.json"
+    retrieval_top_k: int = 4
+    retrieval_chunk_size: int = 1000
+    retrieval_use_embeddings: bool = False
+    retrieval_workers: Optional[int] = None
+
+    # Model catalog settings
+    model_cache_file: str = "cache/models.json"
+    model_catalog_ttl: float = 300.0
+
+    # Model residency settings
+    # keep_alive values use Ollama's format: "5m", "1h", "-1" (forever), "0" (unload)
+    model_warmup_enabled: bool = True
+    keep_alive_default: str = "5m"
+    keep_alive_overrides: Dict[str, str] = {}
+
+    # Prompt cache prefill when reopening a saved conversation
+    prefill_on_load: bool = False
+    prefill_min_messages: int = 4
+
+    # Responses streamed at once by send_async (e.g. the GUI); more wait for a worker
+    max_concurrent_sends: int = 4
+
+    # Local HTTP/SSE server (python -m src.server)
+    server_host: str = "127.0.0.1"
+    server_port: int = 8765
+    # Browser origins allowed to call the server (JSON list; "*" allows any)
+    server_allowed_origins: List[str] = []
+    server_max_ollama_connections: int = 20
 
     # UI settings
     window_title: str = "Local LLM Chat"
@@ -22,6 +88,21 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     log_file: str = "logs/app.log"
 
+    def keep_alive_for(self, model: str) -> str:
+        """
+        Get the keep_alive policy for a model
+
+        Args:
+            model: Model name (an override for "llama2" also matches "llama2:latest")
+
+        Returns:
+            keep_alive value to send to Ollama
+        """
+        if model in self.keep_alive_overrides:
+            return self.keep_alive_overrides[model]
+        base_name = model.split(":", 1)[0]
+        return self.keep_alive_overrides.get(base_name, self.keep_alive_default)
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,260 @@
+"""
+Async chat manager - ChatManager variant driven by an asyncio event loop
+"""
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from .chat_manager import ChatManager, ComparisonResult, ConversationSession
+from .message import Message, Role
+from .model_catalog import ModelCatalog
+from .response_handle import ResponseHandle
+from ..api.async_ollama_client import AsyncOllamaClient
+from ..api.stream_events import DoneEvent, ErrorEvent, TokenEvent
+from ..utils.cancellation import CancellationToken
+from ..utils.exceptions import OllamaConnectionError
+from ..utils.logger import setup_logger
+
+logger = setup_logger("async_chat_manager", "logs/app.log")
+
+
+class AsyncChatManager(ChatManager):
+    """
+    Chat manager that streams responses through an AsyncOllamaClient
+
+    Conversation state, storage and model selection are inherited from
+    ChatManager; sending is asynchronous (send_message, queue_message and
+    resume_queue are coroutines), and saving the finished turn runs on a
+    worker thread so disk writes do not stall other streams on the loop.
+    Several AsyncChatManager instances (e.g. one per open conversation)
+    can share a single AsyncOllamaClient so that their streams run
+    concurrently on one event loop over one connection pool.
+
+    The ChatManager features that need the synchronous client (send_async,
+    compare_models, warm-up, prefill and queue listeners) raise TypeError.
+    """
+
+    def __init__(self, ollama_client: AsyncOllamaClient, storage_dir: str = "conversations"):
+        """
+        Initialize the async chat manager
+
+        Args:
+            ollama_client: Instance of AsyncOllamaClient for API communication
+            storage_dir: Directory to store conversation files
+        """
+        # The catalog only tracks resident models; async callers list
+        # models with the client directly
+        super().__init__(ollama_client, storage_dir, model_catalog=ModelCatalog(None, cache_file=None))
+
+    async def send_message(
+        self,
+        content: str,
+        on_chunk: Callable[[str], None],
+        cancel_token: Optional[CancellationToken] = None,
+        conversation_id: Optional[str] = None
+    ) -> Optional[Message]:
+        """
+        Send a user message and stream the AI response asynchronously
+
+        The response stops at the next chunk once cancel_token is
+        cancelled, or at once if the task running this coroutine is
+        cancelled; either way the partial text is kept as an assistant
+        message marked incomplete, as in ChatManager.send_message.
+
+        Messages queued with queue_message() meanwhile are sent once the
+        response completes, one after another, before this returns; their
+        replies stream through on_chunk as well.
+
+        Args:
+            content: User's message text
+            on_chunk: Callback function called for each response chunk
+                      Should accept a single string argument
+            cancel_token: Optional token to cancel this response with
+            conversation_id: Conversation to send to (default: the current
+                             one, or a new one if there is none); a saved
+                             conversation that is not current is loaded
+
+        Returns:
+            The assistant message added, or None if cancelled before any text
+
+        Raises:
+            ConversationBusyError: If the conversation is already generating
+            ValueError: If conversation_id is not found
+            asyncio.CancelledError: If the task was cancelled (after the
+                                    partial response is recorded)
+        """
+        cancel_token = cancel_token or CancellationToken()
+        session, api_messages = self._begin_turn(content, cancel_token, conversation_id)
+        return await self._run_turns_async(session, api_messages, cancel_token, on_chunk)
+
+    async def queue_message(
+        self,
+        content: str,
+        on_chunk: Callable[[str], None],
+        conversation_id: Optional[str] = None
+    ) -> Optional[Message]:
+        """
+        Send a user message, or queue it while the conversation is generating
+
+        A queued message is saved with the conversation and sent by the
+        send_message() (or queue_message()) call that is generating, once
+        its response completes; its reply streams through that call's
+        on_chunk. A stopped or failed response pauses the queue, as in
+        ChatManager.queue_message.
+
+        Args:
+            content: User's message text
+            on_chunk: Called with each response chunk if the message is sent now
+            conversation_id: Conversation to send to (default: the current
+                             one, or a new one if there is none)
+
+        Returns:
+            The assistant message of the oldest queued message if the
+            conversation was idle, or None if the message waits
+
+        Raises:
+            ValueError: If conversation_id is not found
+        """
+        session = self._session_for(conversation_id)
+        with session.lock:
+            session.conversation.pending.append(Message(role=Role.USER, content=content))
+        reply = await self._send_queued(session, on_chunk)
+        if reply is None and session.generating:
+            with session.lock:
+                self._save(session)
+            logger.info(f"Message queued in conversation {session.id}")
+        return reply
+
+    async def resume_queue(
+        self,
+        on_chunk: Callable[[str], None],
+        conversation_id: Optional[str] = None
+    ) -> Optional[Message]:
+        """
+        Send the queued messages of an idle conversation
+
+        Used after the queue was paused by a stopped or failed response,
+        or restored from storage (loading a conversation does not send it).
+
+        Args:
+            on_chunk: Called with each response chunk
+            conversation_id: Conversation to resume (default: the current one)
+
+        Returns:
+            The assistant message of the oldest queued message, or None if
+            the conversation is generating or has nothing queued
+
+        Raises:
+            ValueError: If conversation_id is not found
+        """
+        if conversation_id is None and self._current is None:
+            return None
+        return await self._send_queued(self._session_for(conversation_id), on_chunk)
+
+    async def _send_queued(self, session: ConversationSession, on_chunk: Callable[[str], None]) -> Optional[Message]:
+        """Send the queue of a session if it is idle"""
+        turn = self._take_queued(session)
+        if turn is None:
+            return None
+        _, api_messages, cancel_token = turn
+        return await self._run_turns_async(session, api_messages, cancel_token, on_chunk)
+
+    async def _run_turns_async(
+        self,
+        session: ConversationSession,
+        api_messages: List[Dict[str, str]],
+        cancel_token: CancellationToken,
+        on_chunk: Callable[[str], None]
+    ) -> Optional[Message]:
+        """
+        Stream a started turn, then the session's queued messages back-to-back
+
+        Returns:
+            The assistant message of the first turn
+        """
+        first: Optional[Message] = None
+        is_first = True
+        while True:
+            try:
+                message = await self._stream_turn_async(session, api_messages, cancel_token, on_chunk)
+            except BaseException:
+                self._end_generation(session)
+                raise
+            if is_first:
+                first, is_first = message, False
+
+            next_turn = self._next_queued_turn(session, message)
+            if next_turn is None:
+                return first
+            user_message, cancel_token = next_turn
+            api_messages = self._add_user_message(session, user_message)
+            logger.info(f"Sending queued message in conversation {session.id}")
+
+    async def _stream_turn_async(
+        self,
+        session: ConversationSession,
+        api_messages: List[Dict[str, str]],
+        cancel_token: CancellationToken,
+        on_chunk: Callable[[str], None]
+    ) -> Optional[Message]:
+        """Stream one response and record it (the session stays generating)"""
+        model = session.conversation.model
+        logger.info("Starting async streaming response from API")
+
+        events = self.client.generate_events(model, api_messages)
+        try:
+            stats = None
+            async for event in events:
+                if isinstance(event, TokenEvent):
+                    session.response_buffer.append(event.content)
+                    on_chunk(event.content)
+                elif isinstance(event, DoneEvent):
+                    stats = event.stats
+                elif isinstance(event, ErrorEvent):
+                    raise OllamaConnectionError(f"Streaming failed: {event.message}")
+
+                if cancel_token.cancelled:
+                    break
+
+            loop = asyncio.get_running_loop()
+            if cancel_token.cancelled:
+                return await loop.run_in_executor(None, self._cancel_turn, session, cancel_token)
+
+            return await loop.run_in_executor(None, self._complete_turn, session, stats)
+
+        except asyncio.CancelledError:
+            cancel_token.cancel()
+            # Shielded: the partial reply is saved even if cancelled again
+            await asyncio.shield(asyncio.get_running_loop().run_in_executor(
+                None, self._cancel_turn, session, cancel_token
+            ))
+            raise
+
+        except Exception as e:
+            logger.error(f"Error during async message sending: {e}")
+            raise
+
+        finally:
+            # Close the stream now rather than when the generator is collected
+            await events.aclose()
+
+    # ChatManager features that need the synchronous client
+
+    def send_async(self, *args: Any, **kwargs: Any) -> ResponseHandle:
+        """Not supported: await send_message() instead"""
+        raise TypeError("AsyncChatManager.send_async is not supported; use the async API (await send_message())")
+
+    def add_queue_listener(self, listener: Callable[[ResponseHandle], None]) -> None:
+        """Not supported: queued replies stream through the on_chunk of the call sending them"""
+        raise TypeError("AsyncChatManager has no queue listeners; use the async API (queue_message() on_chunk)")
+
+    def compare_models(self, *args: Any, **kwargs: Any) -> List[ComparisonResult]:
+        """Not supported: needs the synchronous OllamaClient"""
+        raise TypeError("AsyncChatManager.compare_models is not supported; use the async API (send_message())")
+
+    def warm_up_model(self, model_name: Optional[str] = None) -> Optional[threading.Thread]:
+        """Not supported: needs the synchronous OllamaClient"""
+        raise TypeError("AsyncChatManager.warm_up_model is not supported; use the async API")
+
+    def prefill_conversation(self) -> Optional[threading.Thread]:
+        """Not supported: needs the synchronous OllamaClient"""
+        raise TypeError("AsyncChatManager.prefill_conversation is not supported; use the async API")
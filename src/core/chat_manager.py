@@ -1,14 +1,92 @@
 """
 Chat manager - orchestrates conversation state and API communication
 """
-from typing import List, Callable, Optional, Dict
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, List, Callable, Optional, Dict, Set, Tuple
+from .document_index import DocumentChunk, DocumentIndex
 from .message import Message, Role, Conversation
+from .model_catalog import ModelCatalog
+from .response_buffer import ResponseBuffer
+from .response_handle import ResponseHandle
+from .semantic_search import SearchHit, SemanticSearch
 from ..api.ollama_client import OllamaClient
+from .stats import GenerationStats
+from ..api.stream_events import DoneEvent, ErrorEvent, TokenEvent
 from ..storage.conversation_storage import ConversationStorage
+from ..utils.cancellation import CancellationToken
+from ..utils.exceptions import ConversationBusyError, OllamaConnectionError
 from ..utils.logger import setup_logger
 
 logger = setup_logger("chat_manager", "logs/app.log")
 
+# Stopping a response should take effect within this many seconds
+CANCEL_LATENCY_BUDGET = 0.5
+
+
+@dataclass
+class ComparisonResult:
+    """
+    One model's answer in a comparison (see ChatManager.compare_models)
+
+    Attributes:
+        model: Model that answered
+        conversation: Saved conversation holding the prompt and the answer
+        stats: Generation statistics (None if the stream did not finish)
+        total_time: Seconds from sending the prompt to the end of the stream
+        error: Why the response failed, if it did
+    """
+    model: str
+    conversation: Conversation
+    stats: Optional[GenerationStats] = None
+    total_time: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def reply(self) -> Optional[Message]:
+        """The assistant message (None if no text arrived)"""
+        messages = self.conversation.messages
+        return messages[-1] if messages and messages[-1].role == Role.ASSISTANT else None
+
+
+@dataclass(eq=False)
+class ConversationSession:
+    """
+    State of one open conversation (see ChatManager)
+
+    ChatManager keeps a session for the current conversation and for
+    every conversation still generating a response, so a response keeps
+    streaming into its own conversation after the user switches away.
+
+    Attributes:
+        conversation: The conversation
+        response_buffer: Partial text of the response currently (or most
+                         recently) streaming
+        cancel_token: Token of the response being generated (None when idle)
+        last_stats: Statistics of the last completed response
+        closed: Set once the conversation is deleted; it is not saved again
+        lock: Held while the conversation changes or is saved
+    """
+    conversation: Conversation
+    response_buffer: ResponseBuffer = field(default_factory=ResponseBuffer)
+    cancel_token: Optional[CancellationToken] = None
+    last_stats: Optional[GenerationStats] = None
+    closed: bool = False
+    lock: Any = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def id(self) -> str:
+        """ID of the conversation"""
+        return self.conversation.id
+
+    @property
+    def generating(self) -> bool:
+        """True while a response is streaming into the conversation"""
+        return self.cancel_token is not None
+
 
 class ChatManager:
     """
@@ -17,20 +95,91 @@ class ChatManager:
     This class serves as the business logic layer between the GUI
     and the Ollama API. It maintains conversation state and handles
     message sending/receiving.
+
+    State is kept per conversation (see ConversationSession), so
+    several conversations can generate responses at the same time from
+    different threads. Switching to another conversation while a
+    response streams leaves that response running; it is added to its
+    own conversation and saved when it ends.
     """
 
-    def __init__(self, ollama_client: OllamaClient, storage_dir: str = "conversations"):
+    def __init__(
+        self,
+        ollama_client: OllamaClient,
+        storage_dir: str = "conversations",
+        model_catalog: Optional[ModelCatalog] = None,
+        keep_alive_policy: Optional[Callable[[str], Optional[str]]] = None,
+        warm_up_on_select: bool = False,
+        prefill_on_load: bool = False,
+        prefill_min_messages: int = 4,
+        semantic_search: Optional[SemanticSearch] = None,
+        document_index: Optional[DocumentIndex] = None,
+        retrieval_top_k: int = 4,
+        max_concurrent_sends: int = 4
+    ):
         """
         Initialize the chat manager
 
         Args:
             ollama_client: Instance of OllamaClient for API communication
             storage_dir: Directory to store conversation files
+            model_catalog: Cached model catalog (default: a ModelCatalog
+                           over ollama_client with default cache settings)
+            keep_alive_policy: Maps a model name to the keep_alive sent with
+                               its requests (None leaves Ollama's default)
+            warm_up_on_select: Preload a model in the background whenever
+                               set_model() selects it
+            prefill_on_load: Prefill the prompt cache with the history of a
+                             conversation opened with load_conversation()
+            prefill_min_messages: Shortest history worth prefilling
+            semantic_search: Index that saved conversations are added to
+                             in the background (default: no semantic search)
+            document_index: Local documents whose most relevant excerpts
+                            are added to each request (default: none)
+            retrieval_top_k: Excerpts added per message (0 disables retrieval)
+            max_concurrent_sends: Responses send_async streams at once
         """
         self.client = ollama_client
         self.storage = ConversationStorage(storage_dir)
-        self.current_conversation: Optional[Conversation] = None
+        self.model_catalog = model_catalog or ModelCatalog(ollama_client)
         self.current_model: str = "llama2"
+        # Session of the current conversation, and sessions by conversation
+        # ID: the current one plus any still generating in the background
+        self._current: Optional[ConversationSession] = None
+        self._sessions: Dict[str, ConversationSession] = {}
+        self._sessions_lock = threading.Lock()
+        # Stats of the most recently completed response, in any conversation
+        self.last_stats: Optional[GenerationStats] = None
+        # Tokens of the running model comparisons (guarded by _sessions_lock)
+        self._compare_tokens: Set[CancellationToken] = set()
+        self.last_cancel_latency: Optional[float] = None
+        self.keep_alive_policy = keep_alive_policy
+        self.warm_up_on_select = warm_up_on_select
+        # Models with a preload request in flight
+        self._warming: Dict[str, threading.Thread] = {}
+        self._warming_lock = threading.Lock()
+        self._model_state_listeners: List[Callable[[str, str], None]] = []
+        self.prefill_on_load = prefill_on_load
+        self.prefill_min_messages = prefill_min_messages
+        # Token of the running prefill, and stats of a finished one that the
+        # next message of that conversation can benefit from
+        self._prefill_token: Optional[CancellationToken] = None
+        self._prefill_stats: Optional[GenerationStats] = None
+        self._prefill_conversation_id: Optional[str] = None
+        self._prefill_lock = threading.Lock()
+        self.semantic_search = semantic_search
+        # Index updates run one at a time, in the order conversations were saved
+        self._index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-index") \
+            if semantic_search is not None else None
+        self.document_index = document_index
+        self.retrieval_top_k = retrieval_top_k
+        # Excerpts sent with the most recent message
+        self.last_context: List[DocumentChunk] = []
+        # Worker pool streaming send_async responses, started on first use
+        self.max_concurrent_sends = max_concurrent_sends
+        self._send_executor: Optional[ThreadPoolExecutor] = None
+        self._send_lock = threading.Lock()
+        self._queue_listeners: List[Callable[[ResponseHandle], None]] = []
         logger.info("Chat manager initialized with conversation storage")
 
     def start_new_conversation(self, model: str = None) -> None:
@@ -43,10 +192,60 @@ class ChatManager:
         if model:
             self.current_model = model
 
-        self.current_conversation = Conversation(model=self.current_model)
+        self._switch_to(ConversationSession(Conversation(model=self.current_model)))
         logger.info(f"Started new conversation with model: {self.current_model}")
 
-    def send_message(self, content: str, on_chunk: Callable[[str], None]) -> None:
+    @property
+    def current_conversation(self) -> Optional[Conversation]:
+        """The conversation on screen (None if there is none)"""
+        session = self._current
+        return session.conversation if session is not None else None
+
+    @property
+    def response_buffer(self) -> ResponseBuffer:
+        """Partial text of the current conversation's response"""
+        session = self._current
+        return session.response_buffer if session is not None else ResponseBuffer()
+
+    def _switch_to(self, session: Optional[ConversationSession]) -> None:
+        """
+        Make a session current, keeping the previous one if it is generating
+
+        A conversation left while generating is saved now if it never was,
+        so it can be found and reopened while its response streams.
+
+        Args:
+            session: Session to show (None for no conversation)
+        """
+        self.cancel_prefill()
+        with self._sessions_lock:
+            previous = self._current
+            keep_previous = previous is not None and previous is not session and previous.generating
+            if previous is not None and previous is not session and not keep_previous:
+                self._sessions.pop(previous.id, None)
+            self._current = session
+            if session is not None:
+                self._sessions[session.id] = session
+
+        if keep_previous and not self.storage.conversation_exists(previous.id):
+            with previous.lock:
+                self._save(previous)
+            logger.info(f"Conversation {previous.id} keeps generating in the background")
+
+    def _end_generation(self, session: ConversationSession) -> None:
+        """Mark a session idle, dropping it if it is no longer current"""
+        with self._sessions_lock:
+            session.cancel_token = None
+            if session is not self._current and self._sessions.get(session.id) is session:
+                del self._sessions[session.id]
+
+    def send_message(
+        self,
+        content: str,
+        on_chunk: Callable[[str], None],
+        cancel_token: Optional[CancellationToken] = None,
+        conversation_id: Optional[str] = None
+    ) -> Optional[Message]:
         """
         Send a user message and stream the AI response
 
@@ -56,48 +255,744 @@ class ChatManager:
         3. Streams response chunks via callback
         4. Adds complete assistant response to conversation
 
+        The response can be stopped from another thread with
+        cancel_generation() (or by cancelling cancel_token). The connection
+        is torn down immediately and the partial text is kept as an
+        assistant message marked incomplete.
+
+        With a document index, the excerpts most relevant to the message
+        are sent along with it (see last_context), but are not added to
+        the conversation, so they are not stored or re-sent later.
+
+        The response stays with its conversation even if another one is
+        made current before it ends, so several conversations can stream
+        at once from different threads.
+
+        Messages queued with queue_message() meanwhile are sent on the
+        worker pool once the response completes (not if it was stopped or
+        failed), as after send_async().
+
         Args:
             content: User's message text
             on_chunk: Callback function called for each response chunk
                       Should accept a single string argument
+            cancel_token: Optional token to cancel this response with
+            conversation_id: Conversation to send to (default: the current
+                             one, or a new one if there is none); a saved
+                             conversation that is not current is loaded
+
+        Returns:
+            The assistant message added, or None if cancelled before any text
 
         Raises:
-            ValueError: If no conversation exists
+            ConversationBusyError: If the conversation is already generating
+            ValueError: If conversation_id is not found
         """
-        if not self.current_conversation:
-            logger.warning("No active conversation, creating new one")
-            self.start_new_conversation()
+        cancel_token = cancel_token or CancellationToken()
+        session, api_messages = self._begin_turn(content, cancel_token, conversation_id)
+        try:
+            message = self._stream_turn(session, content, api_messages, cancel_token, on_chunk)
+        finally:
+            self._end_generation(session)
+        if message is not None and not message.incomplete:
+            handle = self._dispatch_queued(session)
+            if handle is not None:
+                self._notify_queue_listeners(handle)
+        return message
+
+    def send_async(
+        self,
+        content: str,
+        conversation_id: Optional[str] = None
+    ) -> ResponseHandle:
+        """
+        Send a user message and stream the AI response in the background
 
-        # Create and add user message
-        user_message = Message(role=Role.USER, content=content)
-        self.current_conversation.add_message(user_message)
-        logger.info(f"User message added: {content[:50]}...")
+        The user message is added before this returns; the response then
+        streams on the manager's worker pool (see max_concurrent_sends;
+        responses beyond that wait for a free worker). Follow it through
+        the returned handle: its partial text, events, cancellation, and
+        a future of the assistant message.
+
+        Args:
+            content: User's message text
+            conversation_id: Conversation to send to (default: the current
+                             one, or a new one if there is none); a saved
+                             conversation that is not current is loaded
+
+        Returns:
+            Handle of the response
 
-        # Get messages in API format
-        api_messages = self.current_conversation.get_messages_for_api()
+        Raises:
+            ConversationBusyError: If the conversation is already generating
+            ValueError: If conversation_id is not found
+        """
+        cancel_token = CancellationToken()
+        session, api_messages = self._begin_turn(content, cancel_token, conversation_id)
+        return self._submit_turn(session, content, api_messages, cancel_token)
+
+    def queue_message(self, content: str, conversation_id: Optional[str] = None) -> Optional[ResponseHandle]:
+        """
+        Send a user message, or queue it while the conversation is generating
+
+        Queued messages are kept in the conversation (and saved with it,
+        so they survive a restart) and are sent one after another, each as
+        soon as the previous response completes. A response that is
+        stopped or fails pauses the queue; the next queue_message() or
+        resume_queue() call carries on with the oldest queued message.
+        A queue restored from storage is not sent on load either: call
+        resume_queue() to send it.
+        Listeners registered with add_queue_listener() get the handle of
+        every response started from the queue.
+
+        Args:
+            content: User's message text
+            conversation_id: Conversation to send to (default: the current
+                             one, or a new one if there is none)
+
+        Returns:
+            Handle of the response started now, or None if the message waits
+
+        Raises:
+            ValueError: If conversation_id is not found
+        """
+        session = self._session_for(conversation_id)
+        with session.lock:
+            session.conversation.pending.append(Message(role=Role.USER, content=content))
+        handle = self._dispatch_queued(session)
+        if handle is None:
+            with session.lock:
+                self._save(session)
+            logger.info(f"Message queued in conversation {session.id}")
+        return handle
+
+    def resume_queue(self, conversation_id: Optional[str] = None) -> Optional[ResponseHandle]:
+        """
+        Send the oldest queued message of an idle conversation
+
+        Used after the queue was paused by a stopped or failed response,
+        or restored from storage.
+
+        Args:
+            conversation_id: Conversation to resume (default: the current one)
+
+        Returns:
+            Handle of the response started, or None if the conversation is
+            generating or has nothing queued
+
+        Raises:
+            ValueError: If conversation_id is not found
+        """
+        if conversation_id is None and self._current is None:
+            return None
+        return self._dispatch_queued(self._session_for(conversation_id))
+
+    def get_queued_messages(self, conversation_id: Optional[str] = None) -> List[Message]:
+        """
+        Get the messages waiting to be sent in a conversation
+
+        Args:
+            conversation_id: Conversation to look at (default: the current one)
+
+        Returns:
+            Queued user messages, oldest first
+        """
+        with self._sessions_lock:
+            session = self._current if conversation_id is None else self._sessions.get(conversation_id)
+        if session is None:
+            conversation = self.storage.load_conversation(conversation_id) if conversation_id else None
+            return list(conversation.pending) if conversation is not None else []
+        with session.lock:
+            return list(session.conversation.pending)
+
+    def add_queue_listener(self, listener: Callable[[ResponseHandle], None]) -> None:
+        """
+        Register a callback for responses started from the message queue
+
+        Listeners are called with the handle of each response that
+        queue_message() or resume_queue() did not return, i.e. queued
+        messages sent after the previous response, from the thread that
+        finished it.
+
+        Args:
+            listener: Callback to register
+        """
+        self._queue_listeners.append(listener)
+
+    def _dispatch_queued(self, session: ConversationSession) -> Optional[ResponseHandle]:
+        """Start the oldest queued message of a session if it is idle"""
+        turn = self._take_queued(session)
+        if turn is None:
+            return None
+        user_message, api_messages, cancel_token = turn
+        return self._submit_turn(session, user_message.content, api_messages, cancel_token)
+
+    def _take_queued(
+        self,
+        session: ConversationSession
+    ) -> Optional[Tuple[Message, List[Dict[str, str]], CancellationToken]]:
+        """
+        Begin a turn with the oldest queued message of a session if it is idle
+
+        Returns:
+            The user message, the conversation in API format and the
+            token of the turn, or None if generating or nothing is queued
+        """
+        cancel_token = CancellationToken()
+        with session.lock:
+            with self._sessions_lock:
+                if session.generating or session.closed or not session.conversation.pending:
+                    return None
+                session.cancel_token = cancel_token
+                self._sessions.setdefault(session.id, session)
+            user_message = session.conversation.pending.pop(0)
+        return user_message, self._add_user_message(session, user_message), cancel_token
+
+    def _next_queued_turn(
+        self,
+        session: ConversationSession,
+        previous: Optional[Message]
+    ) -> Optional[Tuple[Message, CancellationToken]]:
+        """
+        Move on to the next queued message once a response has ended
+
+        The session stays marked as generating when there is one, so a
+        message queued meanwhile waits its turn; otherwise (or if the
+        previous response was stopped) the session becomes idle.
+
+        Args:
+            session: Session the response streamed into
+            previous: The assistant message of the response that ended
+
+        Returns:
+            The next user message and the token of its response, or None
+        """
+        with session.lock:
+            queue = session.conversation.pending
+            if previous is None or previous.incomplete or session.closed or not queue:
+                self._end_generation(session)
+                return None
+            cancel_token = CancellationToken()
+            with self._sessions_lock:
+                session.cancel_token = cancel_token
+            return queue.pop(0), cancel_token
+
+    def _submit_turn(
+        self,
+        session: ConversationSession,
+        content: str,
+        api_messages: List[Dict[str, str]],
+        cancel_token: CancellationToken
+    ) -> ResponseHandle:
+        """Stream a started turn on the worker pool and return its handle"""
+        handle = ResponseHandle(session.id, session.response_buffer, cancel_token)
+        with self._send_lock:
+            if self._send_executor is None:
+                self._send_executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_sends, thread_name_prefix="chat-send"
+                )
+            self._send_executor.submit(self._run_turns, session, handle, content, api_messages, cancel_token)
+        return handle
+
+    def _run_turns(
+        self,
+        session: ConversationSession,
+        handle: ResponseHandle,
+        content: str,
+        api_messages: List[Dict[str, str]],
+        cancel_token: CancellationToken
+    ) -> None:
+        """Stream a turn, then the session's queued messages back-to-back (worker thread)"""
+        while True:
+            try:
+                message = self._stream_turn(session, content, api_messages, cancel_token, handle.publish_chunk)
+            except Exception as e:
+                self._end_generation(session)
+                handle.fail(e)
+                return
+
+            next_turn = self._next_queued_turn(session, message)
+            handle.finish(message)
+            if next_turn is None:
+                return
+
+            user_message, cancel_token = next_turn
+            content = user_message.content
+            api_messages = self._add_user_message(session, user_message)
+            handle = ResponseHandle(session.id, session.response_buffer, cancel_token)
+            logger.info(f"Sending queued message in conversation {session.id}")
+            self._notify_queue_listeners(handle)
+
+    def _notify_queue_listeners(self, handle: ResponseHandle) -> None:
+        """Tell listeners about a response started from the queue"""
+        for listener in list(self._queue_listeners):
+            try:
+                listener(handle)
+            except Exception as e:
+                logger.error(f"Queue listener failed: {e}")
+
+    def _stream_turn(
+        self,
+        session: ConversationSession,
+        content: str,
+        api_messages: List[Dict[str, str]],
+        cancel_token: CancellationToken,
+        on_chunk: Callable[[str], None]
+    ) -> Optional[Message]:
+        """
+        Stream the response of a turn started with _begin_turn and record it
+
+        The session stays marked as generating; callers end the generation.
+
+        Args:
+            session: Session the turn belongs to
+            content: User's message text
+            api_messages: Conversation in API format, ending with the message
+            cancel_token: Token of the turn
+            on_chunk: Called with each response chunk
+
+        Returns:
+            The assistant message added, or None if cancelled before any text
+        """
+        model = session.conversation.model
 
         # Stream response from API
         logger.info("Starting streaming response from API")
-        full_response = ""
 
         try:
-            for chunk in self.client.generate_stream(self.current_model, api_messages):
-                full_response += chunk
-                on_chunk(chunk)  # Call callback with each chunk
+            # Stopped while waiting for a worker
+            if cancel_token.cancelled:
+                return self._cancel_turn(session, cancel_token)
+
+            api_messages = self._with_document_context(api_messages, content)
+            stats = None
+            for event in self.client.generate_events(
+                model, api_messages, cancel_token=cancel_token,
+                keep_alive=self._keep_alive_for(model)
+            ):
+                if isinstance(event, TokenEvent):
+                    session.response_buffer.append(event.content)
+                    on_chunk(event.content)  # Call callback with each chunk
+                elif isinstance(event, DoneEvent):
+                    stats = event.stats
+                elif isinstance(event, ErrorEvent):
+                    raise OllamaConnectionError(f"Streaming failed: {event.message}")
+
+                if cancel_token.cancelled:
+                    break
 
-            # Add complete assistant response to conversation
-            assistant_message = Message(role=Role.ASSISTANT, content=full_response)
-            self.current_conversation.add_message(assistant_message)
-            logger.info(f"Assistant response completed: {len(full_response)} chars")
+            if cancel_token.cancelled:
+                return self._cancel_turn(session, cancel_token)
 
-            # Auto-save conversation after each message exchange
-            self.storage.save_conversation(self.current_conversation)
-            logger.info(f"Conversation auto-saved: {self.current_conversation.id}")
+            return self._complete_turn(session, stats)
 
         except Exception as e:
             logger.error(f"Error during message sending: {e}")
             raise
 
+    def compare_models(
+        self,
+        content: str,
+        models: List[str],
+        on_chunk: Callable[[str, str], None],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[ComparisonResult]:
+        """
+        Send one prompt to several models at once and stream every answer
+
+        Each model gets a new conversation holding the prompt and its
+        answer. The conversations share a comparison_id and are saved like
+        any other. The requests run concurrently. The scheduler and the
+        server's limit on loaded models may still make some of them wait.
+        cancel_generation() stops all of them; a failing model does not
+        affect the others.
+
+        Args:
+            content: Prompt to send
+            models: Models to compare
+            on_chunk: Called with (model, chunk) for each chunk, from
+                      worker threads
+            cancel_token: Optional token to cancel all responses with
+
+        Returns:
+            One result per model, in the order given
+        """
+        cancel_token = cancel_token or CancellationToken()
+        with self._sessions_lock:
+            self._compare_tokens.add(cancel_token)
+        comparison_id = str(uuid.uuid4())
+        logger.info(f"Comparing {len(models)} models: {', '.join(models)}")
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(models)), thread_name_prefix="compare") as executor:
+                futures = [
+                    executor.submit(self._compare_one, model, content, comparison_id, on_chunk, cancel_token)
+                    for model in models
+                ]
+                return [future.result() for future in futures]
+        finally:
+            with self._sessions_lock:
+                self._compare_tokens.discard(cancel_token)
+
+    def _compare_one(
+        self,
+        model: str,
+        content: str,
+        comparison_id: str,
+        on_chunk: Callable[[str, str], None],
+        cancel_token: CancellationToken
+    ) -> ComparisonResult:
+        """Stream one model's answer in a comparison and save its conversation"""
+        conversation = Conversation(model=model, comparison_id=comparison_id)
+        conversation.add_message(Message(role=Role.USER, content=content))
+        result = ComparisonResult(model=model, conversation=conversation)
+        buffer = ResponseBuffer()
+        started = time.perf_counter()
+        try:
+            for event in self.client.generate_events(
+                model, conversation.get_messages_for_api(), cancel_token=cancel_token,
+                keep_alive=self._keep_alive_for(model)
+            ):
+                if isinstance(event, TokenEvent):
+                    buffer.append(event.content)
+                    on_chunk(model, event.content)
+                elif isinstance(event, DoneEvent):
+                    result.stats = event.stats
+                elif isinstance(event, ErrorEvent):
+                    result.error = event.message
+                if cancel_token.cancelled:
+                    break
+        except Exception as e:
+            logger.error(f"Comparison request to {model} failed: {e}")
+            result.error = str(e)
+        result.total_time = time.perf_counter() - started
+
+        if result.stats is not None:
+            self.model_catalog.mark_resident(model)
+        if len(buffer) > 0:
+            conversation.add_message(Message(
+                role=Role.ASSISTANT,
+                content=buffer.getvalue(),
+                stats=result.stats,
+                incomplete=result.stats is None
+            ))
+        stats = result.stats
+        if stats is not None:
+            ttft = stats.time_to_first_token
+            tps = stats.tokens_per_second
+            logger.info(
+                f"Comparison {model}: ttft={f'{ttft:.3f}s' if ttft is not None else 'n/a'}, "
+                f"tokens/sec={f'{tps:.1f}' if tps is not None else 'n/a'}, total={result.total_time:.3f}s"
+            )
+        try:
+            self.storage.save_conversation(conversation)
+            self._schedule_indexing(conversation)
+        except Exception as e:
+            result.error = result.error or f"Failed to save: {e}"
+        return result
+
+    def _with_document_context(self, api_messages: List[Dict[str, str]], content: str) -> List[Dict[str, str]]:
+        """
+        Insert retrieved document excerpts before the latest user message
+
+        The excerpts go last so the earlier history stays an unchanged
+        prefix, which the server's prompt cache can reuse.
+
+        Args:
+            api_messages: Conversation in API format, ending with the user message
+            content: The user message, used as the search query
+
+        Returns:
+            Messages to send
+        """
+        self.last_context = []
+        if self.document_index is None or self.retrieval_top_k <= 0 or len(self.document_index) == 0:
+            return api_messages
+        try:
+            chunks = self.document_index.search(content, self.retrieval_top_k)
+        except Exception as e:
+            logger.warning(f"Document retrieval failed: {e}")
+            return api_messages
+        if not chunks:
+            return api_messages
+
+        self.last_context = chunks
+        excerpts = "\n\n".join(f"[{chunk.source}]\n{chunk.text}" for chunk in chunks)
+        context = {
+            "role": Role.SYSTEM.value,
+            "content": (
+                "Excerpts from the user's local documents that may help with the next message. "
+                "Use them if relevant and cite the [source] you use.\n\n" + excerpts
+            )
+        }
+        logger.info(f"Added {len(chunks)} document excerpts: {', '.join(c.source for c in chunks)}")
+        return api_messages[:-1] + [context, api_messages[-1]]
+
+    def add_documents(
+        self,
+        path: str,
+        on_done: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Optional[threading.Thread]:
+        """
+        Add a file or folder to the document index and index it in the background
+
+        Args:
+            path: File or folder to add
+            on_done: Called on the worker thread with the refresh counts
+
+        Returns:
+            The indexing thread, or None without a document index or if the
+            path is missing or already indexed
+        """
+        if self.document_index is None or not self.document_index.add_path(path):
+            return None
+        return self.refresh_documents(on_done)
+
+    def refresh_documents(
+        self,
+        on_done: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Optional[threading.Thread]:
+        """
+        Re-index changed documents in the background
+
+        Args:
+            on_done: Called on the worker thread with the refresh counts
+
+        Returns:
+            The indexing thread, or None without a document index
+        """
+        if self.document_index is None:
+            return None
+
+        def worker():
+            try:
+                counts = self.document_index.refresh()
+            except Exception as e:
+                logger.error(f"Document indexing failed: {e}")
+                return
+            if on_done:
+                on_done(counts)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def cancel_generation(self, conversation_id: Optional[str] = None) -> bool:
+        """
+        Stop a response being generated
+
+        Safe to call from any thread (e.g. a GUI Stop button).
+
+        Args:
+            conversation_id: Conversation whose response to stop (default:
+                             the current conversation's, and every running
+                             model comparison)
+
+        Returns:
+            True if a response was in flight and cancellation was requested
+        """
+        if conversation_id is None:
+            session = self._current
+            with self._sessions_lock:
+                compare_tokens = list(self._compare_tokens)
+            tokens = [session.cancel_token if session is not None else None] + compare_tokens
+        else:
+            session = self._sessions.get(conversation_id)
+            tokens = [session.cancel_token if session is not None else None]
+
+        cancelled = False
+        for token in tokens:
+            if token is not None and not token.cancelled:
+                token.cancel()
+                cancelled = True
+        if cancelled:
+            logger.info("Cancellation requested for in-flight response")
+        return cancelled
+
+    def is_generating(self, conversation_id: Optional[str] = None) -> bool:
+        """
+        Check whether a response is currently being generated
+
+        Args:
+            conversation_id: Conversation to check (default: the current
+                             conversation, or a running model comparison)
+
+        Returns:
+            True while send_message (or compare_models) is streaming
+        """
+        if conversation_id is None:
+            session = self._current
+            return (session is not None and session.generating) or bool(self._compare_tokens)
+        session = self._sessions.get(conversation_id)
+        return session is not None and session.generating
+
+    def generating_conversations(self) -> List[str]:
+        """
+        Get the conversations with a response streaming
+
+        Returns:
+            IDs of every conversation generating, current or not
+        """
+        with self._sessions_lock:
+            return [session.id for session in self._sessions.values() if session.generating]
+
+    def _cancel_turn(self, session: ConversationSession, cancel_token: CancellationToken) -> Optional[Message]:
+        """
+        Record a cancelled response and measure how long stopping took
+
+        Args:
+            session: Session the response was streaming into
+            cancel_token: The token that was cancelled
+
+        Returns:
+            The incomplete assistant message, or None if no text arrived
+        """
+        latency = time.perf_counter() - cancel_token.cancel_requested_at
+        self.last_cancel_latency = latency
+        log = logger.warning if latency > CANCEL_LATENCY_BUDGET else logger.info
+        log(f"Response cancelled after {len(session.response_buffer)} chars, stop latency {latency * 1000:.1f} ms")
+
+        if len(session.response_buffer) == 0:
+            with session.lock:
+                self._save(session)
+            return None
+        return self._complete_turn(session, incomplete=True)
+
+    def _begin_turn(
+        self,
+        content: str,
+        cancel_token: CancellationToken,
+        conversation_id: Optional[str] = None
+    ) -> Tuple[ConversationSession, List[Dict[str, str]]]:
+        """
+        Start a turn in a conversation
+
+        Marks the session as generating, adds the user message and resets
+        the response buffer.
+
+        Args:
+            content: User's message text
+            cancel_token: Token of the response about to stream
+            conversation_id: Conversation to send to (default: the current one)
+
+        Returns:
+            The session and its messages in API format
+
+        Raises:
+            ConversationBusyError: If the conversation is already generating
+            ValueError: If conversation_id is not found
+        """
+        session = self._session_for(conversation_id)
+        with self._sessions_lock:
+            if session.generating:
+                raise ConversationBusyError(f"Conversation {session.id} is already generating a response")
+            session.cancel_token = cancel_token
+            # Kept while it generates, even if it stopped being current meanwhile
+            self._sessions.setdefault(session.id, session)
+
+        return session, self._add_user_message(session, Message(role=Role.USER, content=content))
+
+    def _session_for(self, conversation_id: Optional[str]) -> ConversationSession:
+        """
+        Find the session of a conversation, loading it if it is not open
+
+        Args:
+            conversation_id: Conversation to find (default: the current
+                             one, or a new one if there is none)
+
+        Returns:
+            The session
+
+        Raises:
+            ValueError: If conversation_id is not found
+        """
+        if conversation_id is None and self._current is None:
+            logger.warning("No active conversation, creating new one")
+            self.start_new_conversation()
+
+        with self._sessions_lock:
+            session = self._current if conversation_id is None else self._sessions.get(conversation_id)
+        if session is None:
+            conversation = self.storage.load_conversation(conversation_id)
+            if conversation is None:
+                raise ValueError(f"Conversation not found: {conversation_id}")
+            with self._sessions_lock:
+                session = self._sessions.setdefault(conversation_id, ConversationSession(conversation))
+        return session
+
+    def _add_user_message(self, session: ConversationSession, user_message: Message) -> List[Dict[str, str]]:
+        """
+        Add the user message of a starting turn and reset the response buffer
+
+        Args:
+            session: Session marked as generating the turn
+            user_message: Message to add
+
+        Returns:
+            The conversation's messages in API format
+        """
+        with session.lock:
+            session.conversation.add_message(user_message)
+            messages = session.conversation.get_messages_for_api()
+        logger.info(f"User message added: {user_message.content[:50]}...")
+
+        session.response_buffer = ResponseBuffer()
+        return messages
+
+    def _complete_turn(
+        self,
+        session: ConversationSession,
+        stats: Optional[GenerationStats] = None,
+        incomplete: bool = False
+    ) -> Message:
+        """
+        Add the buffered assistant response to the conversation and save it
+
+        Args:
+            session: Session the response was streaming into
+            stats: Generation statistics to attach to the assistant message
+            incomplete: Mark the message as stopped before it finished
+
+        Returns:
+            The assistant message that was added
+        """
+        conversation = session.conversation
+        full_response = session.response_buffer.getvalue()
+        # Whatever answered is now loaded on the server
+        self.model_catalog.mark_resident(conversation.model)
+        assistant_message = Message(
+            role=Role.ASSISTANT,
+            content=full_response,
+            stats=stats,
+            incomplete=incomplete
+        )
+        session.last_stats = stats
+        self.last_stats = stats
+        if stats is not None:
+            self._apply_prefill_saving(conversation.id, stats)
+        logger.info(f"Assistant response completed: {len(full_response)} chars")
+        if stats is not None:
+            ttft = stats.time_to_first_token
+            tps = stats.tokens_per_second
+            logger.info(
+                f"Generation stats: ttft={f'{ttft:.3f}s' if ttft is not None else 'n/a'}, "
+                f"tokens/sec={f'{tps:.1f}' if tps is not None else 'n/a'}, "
+                f"prompt_tokens={stats.prompt_eval_count}, load={stats.load_duration / 1e9:.3f}s"
+            )
+
+        # Auto-save conversation after each message exchange
+        with session.lock:
+            conversation.add_message(assistant_message)
+            self._save(session)
+        return assistant_message
+
+    def _save(self, session: ConversationSession) -> None:
+        """Save a session's conversation and queue it for indexing (hold session.lock)"""
+        if session.closed:
+            return
+        self.storage.save_conversation(session.conversation)
+        logger.info(f"Conversation auto-saved: {session.id}")
+        self._schedule_indexing(session.conversation)
+
     def set_model(self, model_name: str) -> None:
         """
         Change the active model
@@ -105,10 +1000,287 @@ class ChatManager:
         Args:
             model_name: Name of the model to use
         """
+        if model_name != self.current_model:
+            # A prefill only warms the cache of the model it ran on
+            self.cancel_prefill()
         self.current_model = model_name
         if self.current_conversation:
             self.current_conversation.model = model_name
         logger.info(f"Model changed to: {model_name}")
+        if self.warm_up_on_select:
+            self.warm_up_model(model_name)
+
+    def warm_up_model(self, model_name: Optional[str] = None) -> Optional[threading.Thread]:
+        """
+        Load a model into memory on a background thread
+
+        Sends an empty generate request with the model's keep_alive policy,
+        so the first message after switching models does not pay the load
+        time. Listeners registered with add_model_state_listener() are told
+        when loading starts and finishes.
+
+        Args:
+            model_name: Model to load (default: the current model)
+
+        Returns:
+            The warm-up thread, or None if the model is already loaded or loading
+        """
+        model = model_name or self.current_model
+        if self.model_catalog.is_resident(model):
+            return None
+
+        with self._warming_lock:
+            if model in self._warming:
+                return None
+
+            def worker():
+                state = "cold"
+                try:
+                    # Returns False if the scheduler preempted the load
+                    if self.client.preload_model(model, keep_alive=self._keep_alive_for(model)):
+                        self.model_catalog.mark_resident(model)
+                        state = "loaded"
+                except Exception as e:
+                    logger.warning(f"Warm-up of model {model} failed: {e}")
+                finally:
+                    with self._warming_lock:
+                        self._warming.pop(model, None)
+                self._notify_model_state(model, state)
+
+            thread = threading.Thread(target=worker, daemon=True)
+            self._warming[model] = thread
+
+        self._notify_model_state(model, "loading")
+        thread.start()
+        return thread
+
+    def prefill_conversation(self) -> Optional[threading.Thread]:
+        """
+        Evaluate the current conversation's history on a background thread
+
+        Ollama caches the evaluated prompt, so when the next message is
+        sent only the new text has to be evaluated, cutting its time to
+        first token. Any prefill already running is cancelled first.
+
+        Returns:
+            The prefill thread, or None if the history is too short
+        """
+        self.cancel_prefill()
+        conversation = self.current_conversation
+        if not conversation or len(conversation.messages) < self.prefill_min_messages:
+            return None
+
+        model = self.current_model
+        messages = conversation.get_messages_for_api()
+        token = CancellationToken()
+        with self._prefill_lock:
+            self._prefill_token = token
+
+        def worker():
+            try:
+                stats = self.client.prefill(
+                    model, messages, keep_alive=self._keep_alive_for(model), cancel_token=token
+                )
+            except Exception as e:
+                logger.warning(f"Prefill of conversation {conversation.id} failed: {e}")
+                stats = None
+
+            with self._prefill_lock:
+                if self._prefill_token is not token:
+                    return
+                self._prefill_token = None
+                if stats is None or token.cancelled:
+                    return
+                self._prefill_stats = stats
+                self._prefill_conversation_id = conversation.id
+
+            self.model_catalog.mark_resident(model)
+            logger.info(
+                f"Prefilled conversation {conversation.id}: {stats.prompt_eval_count} prompt tokens "
+                f"in {stats.prompt_eval_duration / 1e9:.3f}s"
+            )
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def cancel_prefill(self) -> bool:
+        """
+        Stop a running prefill and forget any finished one
+
+        Returns:
+            True if a prefill was running and has been cancelled
+        """
+        with self._prefill_lock:
+            token = self._prefill_token
+            self._prefill_token = None
+            self._prefill_stats = None
+            self._prefill_conversation_id = None
+        if token is None:
+            return False
+        token.cancel()
+        logger.info("Cancelled conversation prefill")
+        return True
+
+    def is_prefilling(self) -> bool:
+        """
+        Check whether a prefill is running
+
+        Returns:
+            True while a background prefill is in flight
+        """
+        return self._prefill_token is not None
+
+    def _apply_prefill_saving(self, conversation_id: str, stats: GenerationStats) -> None:
+        """
+        Record on stats how much prompt evaluation a finished prefill saved
+
+        Only the first response after a prefill benefits from it. The saving
+        counts only if the server evaluated fewer prompt tokens than the
+        prefill did, i.e. the cached prefix was actually reused.
+
+        Args:
+            conversation_id: Conversation the response belongs to
+            stats: Statistics of the response that just completed
+        """
+        with self._prefill_lock:
+            prefill = self._prefill_stats
+            if prefill is None or self._prefill_conversation_id != conversation_id:
+                return
+            self._prefill_stats = None
+            self._prefill_conversation_id = None
+
+        cache_hit = 0 < stats.prompt_eval_count < prefill.prompt_eval_count
+        stats.prefill_saved = prefill.prompt_eval_duration / 1e9 if cache_hit else 0.0
+        logger.info(
+            f"First response after prefill: prompt_tokens={stats.prompt_eval_count} "
+            f"(prefix {prefill.prompt_eval_count}), estimated time to first token saved "
+            f"{stats.prefill_saved:.3f}s"
+        )
+
+    def get_model_state(self, model_name: Optional[str] = None) -> str:
+        """
+        Get whether a model is loaded in memory
+
+        Args:
+            model_name: Model to check (default: the current model)
+
+        Returns:
+            "loading", "loaded" or "cold"
+        """
+        model = model_name or self.current_model
+        with self._warming_lock:
+            if model in self._warming:
+                return "loading"
+        return "loaded" if self.model_catalog.is_resident(model) else "cold"
+
+    def add_model_state_listener(self, listener: Callable[[str, str], None]) -> None:
+        """
+        Register a callback for model residency changes
+
+        Listeners are called as listener(model, state) with the states of
+        get_model_state(), possibly from a background thread.
+
+        Args:
+            listener: Callback to register
+        """
+        self._model_state_listeners.append(listener)
+
+    def _notify_model_state(self, model: str, state: str) -> None:
+        """Call every model state listener, logging listener errors"""
+        for listener in list(self._model_state_listeners):
+            try:
+                listener(model, state)
+            except Exception as e:
+                logger.error(f"Model state listener failed: {e}")
+
+    def _keep_alive_for(self, model: str) -> Optional[str]:
+        """Look up the keep_alive policy for a model"""
+        if self.keep_alive_policy is None:
+            return None
+        return self.keep_alive_policy(model)
+
+    def get_partial_response(self, conversation_id: Optional[str] = None) -> str:
+        """
+        Get the text streamed so far for the in-flight response
+
+        Safe to call from another thread while send_message is running.
+
+        Args:
+            conversation_id: Conversation to look at (default: the current one)
+
+        Returns:
+            Partial (or last complete) assistant response text; empty for a
+            conversation that is neither current nor generating
+        """
+        if conversation_id is None:
+            return self.response_buffer.snapshot()
+        session = self._sessions.get(conversation_id)
+        return session.response_buffer.snapshot() if session is not None else ""
+
+    def get_conversation_stats(self) -> List[GenerationStats]:
+        """
+        Get generation statistics for the current conversation
+
+        Returns:
+            Stats of each assistant message that has them, in order
+        """
+        return [msg.stats for msg in self.get_messages() if msg.stats is not None]
+
+    def get_stats_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize generation statistics across all saved conversations
+
+        Results are grouped per model, and within each model per
+        conversation-length bucket (number of context messages), so it is
+        visible where latency goes as conversations grow.
+
+        Returns:
+            Mapping of model name to a summary dictionary with overall
+            averages and a "by_history_length" breakdown
+        """
+        grouped: Dict[str, Dict[str, List[GenerationStats]]] = {}
+        for row in self.storage.list_generation_stats():
+            stats = GenerationStats.from_dict(row["stats"])
+            bucket = self._history_bucket(row["history_length"])
+            grouped.setdefault(row["model"], {}).setdefault(bucket, []).append(stats)
+
+        report = {}
+        for model, buckets in grouped.items():
+            all_stats = [s for bucket_stats in buckets.values() for s in bucket_stats]
+            summary = self._summarize_stats(all_stats)
+            summary["by_history_length"] = {
+                bucket: self._summarize_stats(bucket_stats)
+                for bucket, bucket_stats in sorted(buckets.items(), key=lambda item: int(item[0].split("-")[0]))
+            }
+            report[model] = summary
+        return report
+
+    @staticmethod
+    def _history_bucket(history_length: int) -> str:
+        """Map a context length to a power-of-two bucket label (e.g. "4-7")"""
+        if history_length < 1:
+            return "0"
+        low = 1 << (history_length.bit_length() - 1)
+        return f"{low}-{low * 2 - 1}"
+
+    @staticmethod
+    def _summarize_stats(stats_list: List[GenerationStats]) -> Dict[str, Any]:
+        """Average the interesting latency figures of a list of stats"""
+        def average(values):
+            values = [v for v in values if v is not None]
+            return sum(values) / len(values) if values else None
+
+        return {
+            "count": len(stats_list),
+            "avg_time_to_first_token": average(s.time_to_first_token for s in stats_list),
+            "avg_tokens_per_second": average(s.tokens_per_second for s in stats_list),
+            "avg_load_seconds": average(s.load_duration / 1e9 for s in stats_list),
+            "avg_prompt_eval_seconds": average(s.prompt_eval_duration / 1e9 for s in stats_list),
+            "avg_prompt_tokens": average(s.prompt_eval_count for s in stats_list),
+            "avg_client_seconds": average(s.client_duration for s in stats_list),
+            "avg_prefill_saved_seconds": average(s.prefill_saved for s in stats_list),
+        }
 
     def get_messages(self) -> List[Message]:
         """
@@ -131,21 +1303,36 @@ class ChatManager:
         """
         Load a conversation from storage and make it the current conversation
 
+        A conversation still generating in the background is not reloaded;
+        its live session becomes current again, with the response still
+        streaming into it.
+
+        If prefill_on_load is enabled, the conversation history is sent to
+        the server in the background so the next message starts faster.
+
+        Queued messages restored with the conversation stay queued until
+        resume_queue() is called, so nothing is sent just by opening it.
+
         Args:
             conversation_id: ID of conversation to load
 
         Returns:
             True if loaded successfully, False otherwise
         """
-        conversation = self.storage.load_conversation(conversation_id)
-        if conversation:
-            self.current_conversation = conversation
-            self.current_model = conversation.model
-            logger.info(f"Loaded conversation: {conversation_id}")
-            return True
-        else:
-            logger.warning(f"Failed to load conversation: {conversation_id}")
-            return False
+        session = self._sessions.get(conversation_id)
+        if session is None or session.closed:
+            conversation = self.storage.load_conversation(conversation_id)
+            if not conversation:
+                logger.warning(f"Failed to load conversation: {conversation_id}")
+                return False
+            session = ConversationSession(conversation)
+
+        self._switch_to(session)
+        self.current_model = session.conversation.model
+        logger.info(f"Loaded conversation: {conversation_id}")
+        if self.prefill_on_load and not session.generating:
+            self.prefill_conversation()
+        return True
 
     def switch_conversation(self, conversation_id: str) -> bool:
         """
@@ -174,20 +1361,116 @@ class ChatManager:
         """
         Delete a conversation from storage
 
+        A response still generating in the conversation is stopped and
+        discarded.
+
         Args:
             conversation_id: ID of conversation to delete
 
         Returns:
             True if deleted successfully, False otherwise
         """
-        success = self.storage.delete_conversation(conversation_id)
+        session = self._sessions.get(conversation_id)
+        if session is None:
+            success = self.storage.delete_conversation(conversation_id)
+        else:
+            with session.lock:
+                success = self.storage.delete_conversation(conversation_id)
+                session.closed = success
+            if success:
+                self.cancel_generation(conversation_id)
+
         if success:
+            if self.semantic_search is not None:
+                self._submit_indexing(self.semantic_search.remove_conversation, conversation_id)
             # If we deleted the current conversation, clear it
-            if self.current_conversation and self.current_conversation.id == conversation_id:
-                self.current_conversation = None
+            if session is not None and session is self._current:
+                self._switch_to(None)
                 logger.info("Deleted current conversation, cleared active conversation")
         return success
 
+    def index_archive(self) -> Optional[Future]:
+        """
+        Add every saved conversation to the semantic index in the background
+
+        Messages indexed before are skipped, so this is cheap after the
+        first run.
+
+        Returns:
+            Future of the number of messages added, or None without semantic search
+        """
+        if self.semantic_search is None:
+            return None
+        return self._submit_indexing(self._run_indexing, self.semantic_search.index_storage, self.storage)
+
+    def search_conversations(self, query: str, k: int = 10) -> List[SearchHit]:
+        """
+        Find saved messages similar in meaning to a query
+
+        Blocks while the query is embedded; GUI callers should run it on
+        a background thread.
+
+        Args:
+            query: Search text
+            k: Maximum number of hits
+
+        Returns:
+            Hits, best first (empty without semantic search)
+
+        Raises:
+            ModelNotFoundError: If the embedding model is not installed
+            OllamaConnectionError: If the query cannot be embedded
+        """
+        if self.semantic_search is None:
+            return []
+        return self.semantic_search.search(query, k)
+
+    def _schedule_indexing(self, conversation: Conversation) -> None:
+        """Queue a just-saved conversation for semantic indexing"""
+        if self._index_executor is None:
+            return
+        # Snapshot, since the conversation keeps changing while the update waits
+        messages = list(conversation.messages)
+        self._submit_indexing(self._run_indexing, self.semantic_search.index_conversation, conversation.id, messages)
+
+    def _submit_indexing(self, operation: Callable[..., Any], *args: Any) -> Optional[Future]:
+        """Queue an index update (None after close())"""
+        try:
+            return self._index_executor.submit(operation, *args)
+        except RuntimeError:
+            # Shut down by close(); the archive pass at the next start catches up
+            return None
+
+    @staticmethod
+    def _run_indexing(operation: Callable[..., int], *args: Any) -> int:
+        """Run an index update, logging failures (they only delay indexing until the next save)"""
+        try:
+            return operation(*args)
+        except Exception as e:
+            logger.warning(f"Semantic indexing failed: {e}")
+            return 0
+
+    def close(self) -> None:
+        """
+        Stop every response and comparison still generating and release the worker pools
+
+        Stopped responses keep their partial text, as with
+        cancel_generation(). Queued index updates are dropped (the
+        archive pass at the next start picks them up). Does not wait for
+        the workers to finish.
+        """
+        with self._sessions_lock:
+            tokens = [session.cancel_token for session in self._sessions.values() if session.generating]
+            tokens += self._compare_tokens
+        for token in tokens:
+            token.cancel()
+        with self._send_lock:
+            executor, self._send_executor = self._send_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if self._index_executor is not None:
+            self._index_executor.shutdown(wait=False, cancel_futures=True)
+
     def get_current_conversation_id(self) -> Optional[str]:
         """
         Get the ID of the current conversation
@@ -0,0 +1,463 @@
+"""
+Document index - retrieval of local file excerpts for chat context (BM25)
+"""
+import json
+import math
+import multiprocessing
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from ..api.scheduler import Priority
+from ..utils.logger import setup_logger
+
+logger = setup_logger("document_index", "logs/app.log")
+
+# Plain-text formats worth indexing; everything else is skipped
+TEXT_EXTENSIONS = {
+    ".txt", ".md", ".markdown", ".rst", ".py", ".js", ".ts", ".java", ".c", ".h",
+    ".cpp", ".go", ".rs", ".rb", ".sh", ".json", ".yaml", ".yml", ".toml", ".ini",
+    ".cfg", ".csv", ".html", ".css", ".sql", ".tex", ".log",
+}
+SKIPPED_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv"}
+
+_TOKEN_RE = re.compile(r"\w\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms for BM25
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Words of two or more characters
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def chunk_lines(lines: Iterable[str], chunk_size: int = 1000, overlap: int = 200) -> Iterator[Tuple[int, str]]:
+    """
+    Group lines into chunks of about chunk_size characters
+
+    Lines are never split, except lines longer than chunk_size. Each
+    chunk starts with up to `overlap` characters of trailing lines from
+    the previous chunk, so text cut at a boundary is found in both.
+
+    Args:
+        lines: Lines of a document (with or without line endings)
+        chunk_size: Target chunk length in characters
+        overlap: Characters repeated from the previous chunk
+
+    Yields:
+        (1-based line number where the chunk starts, chunk text)
+    """
+    current: List[Tuple[int, str]] = []
+    size = 0
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        while len(line) > chunk_size:
+            # Very long lines (minified files, CSV rows) are cut up as they are
+            yield number, line[:chunk_size]
+            line = line[chunk_size - overlap:] if overlap < chunk_size else line[chunk_size:]
+        current.append((number, line))
+        size += len(line) + 1
+        if size >= chunk_size:
+            yield current[0][0], "\n".join(text for _, text in current)
+            kept: List[Tuple[int, str]] = []
+            kept_size = 0
+            for entry in reversed(current[1:]):
+                if kept_size + len(entry[1]) + 1 > overlap:
+                    break
+                kept.insert(0, entry)
+                kept_size += len(entry[1]) + 1
+            current, size = kept, kept_size
+
+    if current and any(text.strip() for _, text in current):
+        yield current[0][0], "\n".join(text for _, text in current)
+
+
+def _is_binary(path: str) -> bool:
+    """True if the file starts with a NUL byte within its first block"""
+    with open(path, 'rb') as f:
+        return b"\0" in f.read(1024)
+
+
+def process_file(path: str, chunk_size: int, overlap: int) -> Dict[str, Any]:
+    """
+    Read, chunk and tokenize one file
+
+    Runs in worker processes, so it only takes and returns plain data.
+    The file is streamed line by line and never held in memory whole.
+
+    Args:
+        path: File to process
+        chunk_size: Target chunk length in characters
+        overlap: Characters repeated between consecutive chunks
+
+    Returns:
+        File entry: path, mtime, size and chunks (text, line, term counts, length)
+    """
+    stat = os.stat(path)
+    entry: Dict[str, Any] = {"path": path, "mtime": stat.st_mtime, "size": stat.st_size, "chunks": []}
+    if _is_binary(path):
+        return entry
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line, text in chunk_lines(f, chunk_size, overlap):
+            terms = tokenize(text)
+            if terms:
+                entry["chunks"].append({"text": text, "line": line, "tf": dict(Counter(terms)), "length": len(terms)})
+    return entry
+
+
+@dataclass
+class DocumentChunk:
+    """
+    An excerpt of a local file returned by a search
+
+    Attributes:
+        path: File the excerpt comes from
+        line: Line number where the excerpt starts
+        text: Excerpt text
+        score: Relevance score (higher is better)
+    """
+    path: str
+    line: int
+    text: str
+    score: float = 0.0
+
+    @property
+    def source(self) -> str:
+        """Citation of the excerpt, e.g. 'notes/plan.md:12'"""
+        return f"{self.path}:{self.line}"
+
+
+class DocumentIndex:
+    """
+    Persistent BM25 index over chunks of local files and folders
+
+    - Roots (files or folders) are added with add_path(); folders are
+      walked recursively, keeping text files only.
+    - refresh() re-processes only files whose mtime or size changed and
+      drops deleted ones. Files are read, chunked and tokenized in a
+      process pool; ranking data is rebuilt in memory afterwards.
+    - search() ranks chunks with Okapi BM25. Given an ollama_client, the
+      best BM25 candidates are additionally ranked by embedding
+      similarity and both rankings are merged (reciprocal rank fusion).
+
+    The index (roots, file mtimes, chunks and term counts) is stored as
+    one JSON file, so restarting does not re-read unchanged files.
+    """
+
+    K1 = 1.5
+    B = 0.75
+    # Reciprocal rank fusion constant
+    RRF_K = 60
+
+    def __init__(
+        self,
+        index_file: str = "cache/documents.json",
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        max_workers: Optional[int] = None,
+        ollama_client: Any = None,
+        embedding_model: str = "nomic-embed-text"
+    ):
+        """
+        Initialize the index, loading it from disk if present
+
+        Args:
+            index_file: JSON file the index is persisted to
+            chunk_size: Target chunk length in characters
+            overlap: Characters repeated between consecutive chunks
+            max_workers: Worker processes for refresh() (default: CPU count;
+                         1 processes files in this process)
+            ollama_client: Client used to embed candidates (default: BM25 only)
+            embedding_model: Embedding model for hybrid ranking
+        """
+        self.index_file = Path(index_file)
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.max_workers = max_workers
+        self.ollama_client = ollama_client
+        self.embedding_model = embedding_model
+        self._lock = threading.RLock()
+        # One refresh at a time, so files are never processed twice
+        self._refresh_lock = threading.Lock()
+        self.roots: List[str] = []
+        self._files: Dict[str, Dict[str, Any]] = {}
+        # Ranking data derived from _files
+        self._chunks: List[Tuple[str, Dict[str, Any]]] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._avg_length = 0.0
+        # Changes to roots or files not written to the index file yet
+        self._unsaved_changes = 0
+        self._load()
+
+    def add_path(self, path: str) -> bool:
+        """
+        Add a file or folder to the indexed roots (call refresh() to index it)
+
+        Args:
+            path: File or folder path
+
+        Returns:
+            True if added, False if it does not exist or is already a root
+        """
+        resolved = str(Path(path).expanduser().resolve())
+        if not os.path.exists(resolved):
+            logger.warning(f"Cannot index missing path: {path}")
+            return False
+        with self._lock:
+            if resolved in self.roots:
+                return False
+            self.roots.append(resolved)
+            self._unsaved_changes += 1
+        return True
+
+    def remove_path(self, path: str) -> bool:
+        """
+        Stop indexing a root and drop its files
+
+        Args:
+            path: Root previously passed to add_path()
+
+        Returns:
+            True if the root was removed
+        """
+        resolved = str(Path(path).expanduser().resolve())
+        with self._lock:
+            if resolved not in self.roots:
+                return False
+            self.roots.remove(resolved)
+            self._unsaved_changes += 1
+        self.refresh()
+        return True
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the files under the roots
+
+        Returns:
+            Counts of "indexed" (new or changed), "removed" and "unchanged" files
+        """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> Dict[str, int]:
+        """Refresh the index (caller holds the refresh lock)"""
+        with self._lock:
+            roots = list(self.roots)
+            known = {path: (entry["mtime"], entry["size"]) for path, entry in self._files.items()}
+
+        current = {}
+        for path in self._walk(roots):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            current[path] = (stat.st_mtime, stat.st_size)
+
+        changed = [path for path, signature in current.items() if known.get(path) != signature]
+        removed = [path for path in known if path not in current]
+        entries = self._process(changed)
+
+        with self._lock:
+            for path in removed:
+                self._files.pop(path, None)
+            for entry in entries:
+                self._files[entry["path"]] = entry
+            if changed or removed:
+                self._rebuild()
+                self._unsaved_changes += 1
+        # Written outside the lock, so searches are not held up by the dump
+        self._save()
+
+        counts = {"indexed": len(entries), "removed": len(removed), "unchanged": len(current) - len(changed)}
+        logger.info(
+            f"Document index refreshed: {counts['indexed']} indexed, {counts['removed']} removed, "
+            f"{counts['unchanged']} unchanged ({len(self._chunks)} chunks)"
+        )
+        return counts
+
+    def search(self, query: str, k: int = 4) -> List[DocumentChunk]:
+        """
+        Find the chunks most relevant to a query
+
+        Args:
+            query: Text to match (usually the user's message)
+            k: Maximum number of chunks
+
+        Returns:
+            Chunks, most relevant first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            scores: Dict[int, float] = {}
+            total = len(self._chunks)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings:
+                    length = self._chunks[chunk_id][1]["length"]
+                    norm = tf * (self.K1 + 1) / (tf + self.K1 * (1 - self.B + self.B * length / self._avg_length))
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * norm
+
+            # Hybrid ranking re-orders a wider pool of BM25 candidates
+            limit = k * 4 if self.ollama_client is not None else k
+            chunks = []
+            for chunk_id in sorted(scores, key=scores.get, reverse=True)[:limit]:
+                path, chunk = self._chunks[chunk_id]
+                chunks.append(DocumentChunk(path=path, line=chunk["line"], text=chunk["text"], score=scores[chunk_id]))
+
+        if self.ollama_client is not None and len(chunks) > 1:
+            chunks = self._rerank(query, chunks)
+        return chunks[:k]
+
+    def __len__(self) -> int:
+        """Number of indexed chunks"""
+        with self._lock:
+            return len(self._chunks)
+
+    def _rerank(self, query: str, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
+        """Merge the BM25 ranking with an embedding-similarity ranking of the same chunks"""
+        try:
+            vectors = self.ollama_client.embed(
+                self.embedding_model,
+                [query] + [c.text for c in chunks],
+                priority=Priority.INTERACTIVE
+            )
+        except Exception as e:
+            logger.warning(f"Embedding rerank failed, using BM25 only: {e}")
+            return chunks
+
+        query_vector = vectors[0]
+        query_norm = math.sqrt(sum(x * x for x in query_vector)) or 1.0
+
+        def similarity(vector):
+            norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+            return sum(a * b for a, b in zip(query_vector, vector)) / (norm * query_norm)
+
+        # chunks are in BM25 order already
+        fused = {i: 1 / (self.RRF_K + i + 1) for i in range(len(chunks))}
+        by_embedding = sorted(range(len(chunks)), key=lambda i: similarity(vectors[i + 1]), reverse=True)
+        for rank, i in enumerate(by_embedding, start=1):
+            fused[i] += 1 / (self.RRF_K + rank)
+        order = sorted(fused, key=fused.get, reverse=True)
+        return [
+            DocumentChunk(path=chunks[i].path, line=chunks[i].line, text=chunks[i].text, score=fused[i])
+            for i in order
+        ]
+
+    def _walk(self, roots: List[str]) -> Iterator[str]:
+        """Yield text files under the roots"""
+        seen = set()
+        for root in roots:
+            if os.path.isfile(root):
+                candidates = [root]
+            else:
+                candidates = []
+                for folder, dirs, names in os.walk(root):
+                    # Prune in place so os.walk does not descend into them
+                    dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS and not d.startswith(".")]
+                    candidates.extend(os.path.join(folder, name) for name in names)
+            for path in candidates:
+                if path not in seen and Path(path).suffix.lower() in TEXT_EXTENSIONS:
+                    seen.add(path)
+                    yield path
+
+    def _process(self, paths: List[str]) -> List[Dict[str, Any]]:
+        """Process files, in a process pool when there are several"""
+        if not paths:
+            return []
+        if len(paths) == 1 or self.max_workers == 1:
+            entries = [self._process_safely(path) for path in paths]
+            return [entry for entry in entries if entry is not None]
+
+        entries = []
+        workers = min(self.max_workers or os.cpu_count() or 1, len(paths))
+        # Spawned workers: forking a process with GUI and HTTP threads is unsafe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {
+                executor.submit(process_file, path, self.chunk_size, self.overlap): path for path in paths
+            }
+            for future, path in futures.items():
+                try:
+                    entries.append(future.result())
+                except Exception as e:
+                    logger.warning(f"Failed to index {path}: {e}")
+        return entries
+
+    def _process_safely(self, path: str) -> Optional[Dict[str, Any]]:
+        """Process one file in this process, logging failures"""
+        try:
+            return process_file(path, self.chunk_size, self.overlap)
+        except Exception as e:
+            logger.warning(f"Failed to index {path}: {e}")
+            return None
+
+    def _rebuild(self) -> None:
+        """Recompute chunk list and postings from the file entries (caller holds the lock)"""
+        self._chunks = [(path, chunk) for path, entry in sorted(self._files.items()) for chunk in entry["chunks"]]
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for chunk_id, (_, chunk) in enumerate(self._chunks):
+            for term, tf in chunk["tf"].items():
+                postings.setdefault(term, []).append((chunk_id, tf))
+        self._postings = postings
+        self._avg_length = (
+            sum(chunk["length"] for _, chunk in self._chunks) / len(self._chunks) if self._chunks else 0.0
+        )
+
+    def _load(self) -> None:
+        """Load the persisted index, if any"""
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("chunk_size") != self.chunk_size or data.get("overlap") != self.overlap:
+                # Chunks were cut differently; keep the roots and re-index everything
+                logger.info("Chunking settings changed, documents will be re-indexed")
+                self.roots = data.get("roots", [])
+                self._unsaved_changes += 1
+                return
+            self.roots = data.get("roots", [])
+            self._files = data.get("files", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable document index {self.index_file}: {e}")
+            return
+        self._rebuild()
+        logger.info(f"Loaded document index: {len(self._files)} files, {len(self._chunks)} chunks")
+
+    def _save(self) -> None:
+        """Persist the index atomically if it changed (caller holds the refresh lock)"""
+        with self._lock:
+            changes = self._unsaved_changes
+            if not changes:
+                return
+            # File entries are replaced, never modified, so shallow copies suffice
+            data = {
+                "chunk_size": self.chunk_size,
+                "overlap": self.overlap,
+                "roots": list(self.roots),
+                "files": dict(self._files),
+            }
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_file.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            tmp_path.replace(self.index_file)
+        except OSError as e:
+            logger.warning(f"Failed to save document index: {e}")
+            return
+        with self._lock:
+            # Changes made while writing stay pending for the next refresh
+            self._unsaved_changes -= changes
@@ -4,8 +4,9 @@ Data models for chat messages and conversations
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List
+from typing import List, Optional
 import uuid
+from .stats import GenerationStats
 
 
 class Role(Enum):
@@ -25,20 +26,29 @@ class Message:
         content: The message text
         timestamp: When the message was created
         id: Unique identifier for the message
+        stats: Generation statistics (assistant messages only)
+        incomplete: True if generation was stopped before it finished
     """
     role: Role
     content: str
     timestamp: datetime = field(default_factory=datetime.now)
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    stats: Optional[GenerationStats] = None
+    incomplete: bool = False
 
     def to_dict(self) -> dict:
         """Convert message to dictionary format"""
-        return {
+        data = {
             "role": self.role.value,
             "content": self.content,
             "timestamp": self.timestamp.isoformat(),
             "id": self.id
         }
+        if self.stats is not None:
+            data["stats"] = self.stats.to_dict()
+        if self.incomplete:
+            data["incomplete"] = True
+        return data
 
 
 @dataclass
@@ -52,11 +62,17 @@ class Conversation:
         id: Unique conversation identifier (alias for conversation_id)
         messages: List of messages in the conversation
         created_at: When the conversation started
+        comparison_id: Shared by the conversations of one model comparison
+                       (None for ordinary conversations)
+        pending: User messages queued while a response was generating,
+                 oldest first; each joins messages when it is sent
     """
     model: str = "llama2"
     conversation_id: str = None
     messages: List[Message] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
+    comparison_id: Optional[str] = None
+    pending: List[Message] = field(default_factory=list)
 
     def __post_init__(self):
         """Initialize conversation ID if not provided"""
@@ -90,5 +106,6 @@ class Conversation:
         ]
 
     def clear(self) -> None:
-        """Clear all messages from conversation"""
+        """Clear all messages from conversation, including queued ones"""
         self.messages.clear()
+        self.pending.clear()
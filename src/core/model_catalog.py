@@ -0,0 +1,303 @@
+"""
+Model catalog - cached view of the models available in Ollama
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+from ..api.ollama_client import OllamaClient
+from ..utils.logger import setup_logger
+
+logger = setup_logger("model_catalog", "logs/app.log")
+
+
+@dataclass
+class ModelInfo:
+    """
+    Details about a single model, as reported by /api/show
+
+    Attributes:
+        name: Model name
+        context_length: Maximum context window in tokens (if known)
+        parameter_size: Human-readable parameter count (e.g. "7B")
+        quantization_level: Quantization (e.g. "Q4_0")
+        family: Model family (e.g. "llama")
+    """
+    name: str
+    context_length: Optional[int] = None
+    parameter_size: str = ""
+    quantization_level: str = ""
+    family: str = ""
+
+    @classmethod
+    def from_show_response(cls, name: str, data: Dict[str, Any]) -> "ModelInfo":
+        """Build ModelInfo from a raw /api/show response"""
+        details = data.get("details", {}) or {}
+        context_length = None
+        for key, value in (data.get("model_info", {}) or {}).items():
+            if key.endswith(".context_length"):
+                context_length = int(value)
+                break
+        return cls(
+            name=name,
+            context_length=context_length,
+            parameter_size=details.get("parameter_size", ""),
+            quantization_level=details.get("quantization_level", ""),
+            family=details.get("family", "")
+        )
+
+
+class ModelCatalog:
+    """
+    Caches the list of available models and per-model details
+
+    - The model list is kept in memory for `ttl` seconds, so repeated UI
+      paths (startup, theme switches) do not re-query /api/tags.
+    - The last known list is persisted to disk, so the model dropdown can
+      be populated instantly at startup before the server answers.
+    - refresh_async() updates the list on a background thread.
+    - /api/show details are cached (and persisted) per model.
+    - Models resident in memory (/api/ps) are tracked so callers can
+      show and prefer warm models; residency is never persisted.
+
+    A catalog without a client only tracks residency (the async chat
+    manager uses one); fetching from it raises TypeError.
+    """
+
+    def __init__(
+        self,
+        client: Optional[OllamaClient],
+        cache_file: Optional[str] = "cache/models.json",
+        ttl: float = 300.0
+    ):
+        """
+        Initialize the model catalog
+
+        Args:
+            client: OllamaClient used for fetching (None: residency only)
+            cache_file: JSON file for the persisted catalog (None disables)
+            ttl: Seconds an in-memory model list stays fresh
+        """
+        self.client = client
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._models: List[str] = []
+        self._fetched_at: Optional[float] = None
+        self._details: Dict[str, ModelInfo] = {}
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._resident: Set[str] = set()
+        self._load_cache()
+
+    def cached_models(self) -> List[str]:
+        """
+        Get the last known model list without touching the network
+
+        Returns:
+            Model names (possibly stale, empty if never fetched)
+        """
+        with self._lock:
+            return list(self._models)
+
+    def is_fresh(self) -> bool:
+        """True if the in-memory model list was fetched within the TTL"""
+        with self._lock:
+            return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def get_models(self, force_refresh: bool = False) -> List[str]:
+        """
+        Get available models, fetching only when the cache is stale
+
+        Args:
+            force_refresh: Always query the server
+
+        Returns:
+            List of model names
+
+        Raises:
+            OllamaConnectionError: If fetching fails
+        """
+        if not force_refresh and self.is_fresh():
+            return self.cached_models()
+        return self._fetch_models()
+
+    def refresh_async(
+        self,
+        on_success: Optional[Callable[[List[str]], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None
+    ) -> Optional[threading.Thread]:
+        """
+        Refresh the model list on a background thread
+
+        Callbacks run on the background thread; GUI callers must hand
+        results back to their own thread.
+
+        Args:
+            on_success: Called with the fresh model list
+            on_error: Called with the exception if fetching fails
+
+        Returns:
+            The refresh thread, or None if a refresh is already running
+        """
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return None
+
+            def worker():
+                try:
+                    models = self._fetch_models()
+                except Exception as e:
+                    logger.warning(f"Background model refresh failed: {e}")
+                    if on_error:
+                        on_error(e)
+                    return
+                self.refresh_resident()
+                if on_success:
+                    on_success(models)
+
+            self._refresh_thread = threading.Thread(target=worker, daemon=True)
+            self._refresh_thread.start()
+            return self._refresh_thread
+
+    def refresh_resident(self) -> List[str]:
+        """
+        Query which models are currently loaded in memory (/api/ps)
+
+        Failures are logged and leave the previous residency unchanged.
+
+        Returns:
+            Names of resident models
+        """
+        try:
+            resident = list(self._fetching_client().list_running_models())
+        except Exception as e:
+            logger.warning(f"Could not fetch running models: {e}")
+            return self.resident_models()
+        with self._lock:
+            self._resident = set(resident)
+        return resident
+
+    def resident_models(self) -> List[str]:
+        """
+        Get the models last known to be loaded in memory
+
+        Returns:
+            Resident model names
+        """
+        with self._lock:
+            return sorted(self._resident)
+
+    def is_resident(self, model: str) -> bool:
+        """True if the model was loaded in memory at the last check"""
+        with self._lock:
+            return model in self._resident
+
+    def mark_resident(self, model: str) -> None:
+        """
+        Record that a model is loaded (e.g. after a preload or a response)
+
+        Args:
+            model: Model name
+        """
+        with self._lock:
+            self._resident.add(model)
+
+    def warm_first(self, models: List[str]) -> List[str]:
+        """
+        Order models so resident ones come first, otherwise keeping order
+
+        Args:
+            models: Model names
+
+        Returns:
+            Reordered copy of models
+        """
+        with self._lock:
+            resident = set(self._resident)
+        return sorted(models, key=lambda name: name not in resident)
+
+    def get_model_info(self, model: str, fetch: bool = True) -> Optional[ModelInfo]:
+        """
+        Get cached details for a model, fetching /api/show on first use
+
+        Args:
+            model: Model name
+            fetch: Query the server if details are not cached yet
+
+        Returns:
+            ModelInfo, or None if unknown and not fetched (or fetch failed)
+        """
+        with self._lock:
+            info = self._details.get(model)
+        if info is not None or not fetch:
+            return info
+
+        try:
+            info = ModelInfo.from_show_response(model, self._fetching_client().show_model(model))
+        except Exception as e:
+            logger.warning(f"Could not fetch details for model {model}: {e}")
+            return None
+
+        with self._lock:
+            self._details[model] = info
+        self._save_cache()
+        return info
+
+    def invalidate(self) -> None:
+        """Mark the in-memory model list stale (the persisted list is kept)"""
+        with self._lock:
+            self._fetched_at = None
+
+    def _fetch_models(self) -> List[str]:
+        """Query the server and update memory and disk caches"""
+        models = self._fetching_client().list_models()
+        with self._lock:
+            self._models = list(models)
+            self._fetched_at = time.monotonic()
+            # Drop details of models that no longer exist
+            self._details = {name: info for name, info in self._details.items() if name in models}
+        self._save_cache()
+        return list(models)
+
+    def _fetching_client(self) -> OllamaClient:
+        """The client to query the server with"""
+        if self.client is None:
+            raise TypeError("This model catalog has no client and only tracks resident models")
+        return self.client
+
+    def _load_cache(self) -> None:
+        """Load the persisted catalog, if any"""
+        if self.cache_file is None or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._models = list(data.get("models", []))
+            self._details = {
+                name: ModelInfo(**info) for name, info in data.get("details", {}).items()
+            }
+            logger.info(f"Loaded {len(self._models)} cached models from {self.cache_file}")
+        except Exception as e:
+            logger.warning(f"Failed to read model cache {self.cache_file}: {e}")
+
+    def _save_cache(self) -> None:
+        """Persist the catalog to disk"""
+        if self.cache_file is None:
+            return
+        with self._lock:
+            data = {
+                "models": self._models,
+                "updated_at": datetime.now().isoformat(),
+                "details": {name: asdict(info) for name, info in self._details.items()}
+            }
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_file.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            tmp_path.replace(self.cache_file)
+        except Exception as e:
+            logger.warning(f"Failed to write model cache {self.cache_file}: {e}")
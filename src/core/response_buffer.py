@@ -0,0 +1,106 @@
+"""
+Response buffer - accumulates streamed response chunks efficiently
+"""
+import threading
+from typing import List, Tuple
+
+
+class ResponseBuffer:
+    """
+    Accumulates streamed response chunks without repeated string copies
+
+    Chunks are appended to a list (O(1) amortized) and only joined when
+    the text is actually needed. snapshot() returns the whole text, so
+    each call that follows an append copies it (O(length)); it is meant
+    for occasional reads such as redraws, checkpoints and the final text.
+    Readers following the stream chunk by chunk should use read_from(),
+    which only joins the chunks they have not seen yet.
+
+    The buffer is safe to read from other threads while one thread appends.
+    """
+
+    def __init__(self):
+        """Initialize an empty response buffer"""
+        self._chunks: List[str] = []
+        self._length = 0
+        # Text of the first _joined_count chunks, cached by snapshot()
+        self._joined = ""
+        self._joined_count = 0
+        self._snapshot_lock = threading.Lock()
+
+    def append(self, chunk: str) -> None:
+        """
+        Append a chunk of response text
+
+        Appends are lock-free; only one thread (the streaming thread)
+        should append to a given buffer.
+
+        Args:
+            chunk: Text chunk to append
+        """
+        if chunk:
+            self._chunks.append(chunk)
+            self._length += len(chunk)
+
+    def snapshot(self) -> str:
+        """
+        Get the response text accumulated so far
+
+        The result is cached until the next append; after one, the new
+        chunks are added to a copy of the cached text, so the call costs
+        O(length). Use read_from() to follow a stream incrementally.
+
+        Returns:
+            Partial response text
+        """
+        with self._snapshot_lock:
+            count = len(self._chunks)
+            if count != self._joined_count:
+                self._joined += "".join(self._chunks[self._joined_count:count])
+                self._joined_count = count
+            return self._joined
+
+    def read_from(self, cursor: int = 0) -> Tuple[str, int]:
+        """
+        Get the text appended since a previous read
+
+        Only the new chunks are joined, so polling costs O(new text).
+
+        Args:
+            cursor: Cursor returned by the previous read (0: from the start)
+
+        Returns:
+            The new text, and the cursor to pass to the next read
+        """
+        count = len(self._chunks)
+        return "".join(self._chunks[cursor:count]), count
+
+    def getvalue(self) -> str:
+        """
+        Get the complete response text
+
+        Returns:
+            Full response text
+        """
+        return self.snapshot()
+
+    def clear(self) -> None:
+        """Discard all accumulated text"""
+        with self._snapshot_lock:
+            self._chunks = []
+            self._length = 0
+            self._joined = ""
+            self._joined_count = 0
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of non-empty chunks appended so far"""
+        return len(self._chunks)
+
+    def __len__(self) -> int:
+        """Number of characters accumulated so far"""
+        return self._length
+
+    def __str__(self) -> str:
+        """Return the accumulated text"""
+        return self.snapshot()
@@ -0,0 +1,158 @@
+"""
+Response handle - a response being generated in the background
+"""
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Union
+from .message import Message
+from .response_buffer import ResponseBuffer
+from .stats import GenerationStats
+from ..api.stream_events import CancelledEvent, DoneEvent, ErrorEvent, TokenEvent
+from ..utils.cancellation import CancellationToken
+from ..utils.logger import setup_logger
+
+logger = setup_logger("response_handle", "logs/app.log")
+
+ResponseEvent = Union[TokenEvent, DoneEvent, ErrorEvent, CancelledEvent]
+
+
+class ResponseHandle:
+    """
+    A response started with ChatManager.send_async
+
+    Gives access to the response while it streams (its partial text and
+    events) and once it ends (the assistant message and its statistics).
+    All methods are safe to call from any thread.
+
+    Subscribers get a TokenEvent per chunk and then exactly one final
+    event: DoneEvent when the response completes, CancelledEvent when it
+    is stopped, or ErrorEvent when it fails.
+    """
+
+    def __init__(self, conversation_id: str, buffer: ResponseBuffer, cancel_token: CancellationToken):
+        """
+        Initialize the handle
+
+        Args:
+            conversation_id: Conversation the response belongs to
+            buffer: Buffer the response streams into
+            cancel_token: Token that stops the response
+        """
+        self.conversation_id = conversation_id
+        # Resolves to the assistant message (None if cancelled before any
+        # text), or to the exception the response failed with
+        self.future: "Future[Optional[Message]]" = Future()
+        self.future.set_running_or_notify_cancel()
+        self._buffer = buffer
+        self._cancel_token = cancel_token
+        self._listeners: List[Callable[[ResponseEvent], None]] = []
+        # Characters delivered to listeners so far, and the final event once sent
+        self._published = 0
+        self._final_event: Optional[ResponseEvent] = None
+        self._lock = threading.RLock()
+
+    @property
+    def text(self) -> str:
+        """Text received so far (the whole response once done)"""
+        return self._buffer.snapshot()
+
+    @property
+    def stats(self) -> Optional[GenerationStats]:
+        """Generation statistics, once the response has completed"""
+        if not self.future.done() or self.future.exception() is not None:
+            return None
+        message = self.future.result()
+        return message.stats if message is not None else None
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancellation was requested"""
+        return self._cancel_token.cancelled
+
+    def cancel(self) -> bool:
+        """
+        Stop the response, keeping the text received so far
+
+        Returns:
+            True if the response was still running and is being stopped
+        """
+        if self.future.done() or self._cancel_token.cancelled:
+            return False
+        self._cancel_token.cancel()
+        return True
+
+    def done(self) -> bool:
+        """Check whether the response has ended (completed, stopped or failed)"""
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """
+        Wait for the response to end
+
+        Args:
+            timeout: Seconds to wait (None: no limit)
+
+        Returns:
+            The assistant message, or None if cancelled before any text
+
+        Raises:
+            TimeoutError: If the response has not ended in time
+            Exception: Whatever the response failed with
+        """
+        return self.future.result(timeout)
+
+    def subscribe(self, listener: Callable[[ResponseEvent], None]) -> None:
+        """
+        Register a callback for the events of this response
+
+        Events that happened before subscribing are not lost: the text
+        received so far arrives first as a single TokenEvent, followed by
+        the final event if the response has already ended. Later events
+        are delivered from the worker thread streaming the response.
+
+        Args:
+            listener: Called with each event
+        """
+        with self._lock:
+            if self._published:
+                self._deliver(listener, TokenEvent(content=self._buffer.snapshot()[:self._published]))
+            if self._final_event is not None:
+                self._deliver(listener, self._final_event)
+            else:
+                self._listeners.append(listener)
+
+    def publish_chunk(self, chunk: str) -> None:
+        """Deliver a received chunk to subscribers (called by ChatManager)"""
+        with self._lock:
+            self._published += len(chunk)
+            for listener in self._listeners:
+                self._deliver(listener, TokenEvent(content=chunk))
+
+    def finish(self, message: Optional[Message]) -> None:
+        """Resolve the handle with the response's outcome (called by ChatManager)"""
+        if message is None or message.incomplete:
+            event = CancelledEvent()
+        else:
+            event = DoneEvent(stats=message.stats)
+        self.future.set_result(message)
+        self._publish_final(event)
+
+    def fail(self, error: BaseException) -> None:
+        """Resolve the handle with the error the response failed with (called by ChatManager)"""
+        self.future.set_exception(error)
+        self._publish_final(ErrorEvent(message=str(error)))
+
+    def _publish_final(self, event: ResponseEvent) -> None:
+        with self._lock:
+            self._final_event = event
+            listeners, self._listeners = self._listeners, []
+            for listener in listeners:
+                self._deliver(listener, event)
+
+    @staticmethod
+    def _deliver(listener: Callable[[ResponseEvent], None], event: ResponseEvent) -> None:
+        """Call a listener, logging its errors so they do not break the stream"""
+        try:
+            listener(event)
+        except Exception as e:
+            logger.error(f"Response listener failed: {e}")
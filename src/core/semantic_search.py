@@ -0,0 +1,553 @@
+"""
+Semantic search over conversation history using Ollama embeddings
+"""
+import functools
+import heapq
+import json
+import math
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from .message import Message
+from ..api.ollama_client import OllamaClient
+from ..api.scheduler import Priority
+from ..storage.conversation_storage import ConversationStorage
+from ..utils.cancellation import CancellationToken
+from ..utils.exceptions import ModelNotFoundError, RequestCancelledError
+from ..utils.logger import setup_logger
+
+logger = setup_logger("semantic_search", "logs/app.log")
+
+SNIPPET_LENGTH = 200
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Import numpy on first use (None if not installed)"""
+    try:
+        import numpy
+    except ImportError:
+        logger.info("numpy not installed, semantic search falls back to a pure Python scan")
+        return None
+    return numpy
+
+
+@dataclass
+class SearchHit:
+    """
+    A message matching a search query
+
+    Attributes:
+        conversation_id: Conversation containing the message
+        message_id: ID of the matching message
+        role: Role of the message ("user" or "assistant")
+        snippet: Beginning of the message text
+        score: Cosine similarity to the query (-1 to 1)
+    """
+    conversation_id: str
+    message_id: str
+    role: str
+    snippet: str
+    score: float
+
+
+def _normalized(vector: Sequence[float]) -> List[float]:
+    """Scale a vector to unit length, so dot products are cosine similarities"""
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm > 0 else list(vector)
+
+
+class VectorIndex:
+    """
+    Append-only matrix of unit-length float32 vectors with row metadata
+
+    Files in index_dir:
+    - vectors.f32: the matrix, one raw float32 row per entry
+    - rows.jsonl: one line per row with its metadata, plus
+      {"removed": conversation_id} lines marking rows as deleted
+    - meta.json: embedding model and vector dimension
+
+    With numpy installed, queries memory-map the matrix and score every
+    row with a single matrix-vector product, then pick the top k with
+    argpartition. Without it, rows are scanned in pure Python.
+    Removed rows stay in the files until they outnumber the live ones,
+    at which point the files are rewritten.
+    """
+
+    def __init__(self, index_dir: str = "cache/semantic", use_numpy: Optional[bool] = None):
+        """
+        Initialize the index, loading row metadata from disk
+
+        Args:
+            index_dir: Directory holding the index files
+            use_numpy: Force (True) or disable (False) the numpy backend;
+                       None uses numpy if installed
+        """
+        self.index_dir = Path(index_dir)
+        self.vectors_path = self.index_dir / "vectors.f32"
+        self.rows_path = self.index_dir / "rows.jsonl"
+        self.meta_path = self.index_dir / "meta.json"
+        self.use_numpy = use_numpy
+        self.model: Optional[str] = None
+        self.dim: Optional[int] = None
+        self._rows: List[Dict[str, str]] = []
+        self._message_rows: Dict[str, int] = {}
+        self._deleted: Set[int] = set()
+        self._lock = threading.RLock()
+        self._matrix = None
+        self._load()
+
+    def __len__(self) -> int:
+        """Number of live (not removed) rows"""
+        with self._lock:
+            return len(self._rows) - len(self._deleted)
+
+    def contains(self, message_id: str) -> bool:
+        """True if a message is indexed"""
+        with self._lock:
+            return message_id in self._message_rows
+
+    def reset(self, model: str, dim: int) -> None:
+        """
+        Drop every row and start an index for a (new) embedding model
+
+        Args:
+            model: Embedding model the vectors come from
+            dim: Vector dimension of that model
+        """
+        with self._lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            self.vectors_path.write_bytes(b"")
+            self.rows_path.write_text("", encoding="utf-8")
+            self.meta_path.write_text(json.dumps({"model": model, "dim": dim}), encoding="utf-8")
+            self.model = model
+            self.dim = dim
+            self._rows = []
+            self._message_rows = {}
+            self._deleted = set()
+            self._matrix = None
+
+    def adopt(self, other: "VectorIndex") -> None:
+        """
+        Replace this index with another one, moving its files here
+
+        Args:
+            other: Index to take over (its directory is left empty)
+        """
+        with self._lock, other._lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            # Drop the memory maps before replacing the files under them
+            self._matrix = other._matrix = None
+            other.vectors_path.replace(self.vectors_path)
+            other.rows_path.replace(self.rows_path)
+            other.meta_path.replace(self.meta_path)
+            self.model, self.dim = other.model, other.dim
+            self._rows, self._message_rows, self._deleted = other._rows, other._message_rows, other._deleted
+            other.model = other.dim = None
+            other._rows, other._message_rows, other._deleted = [], {}, set()
+
+    def add(self, entries: List[Dict[str, str]], vectors: List[Sequence[float]]) -> None:
+        """
+        Append rows
+
+        Args:
+            entries: Metadata per row (conversation_id, message_id, role, snippet)
+            vectors: One embedding per row, of the index dimension
+        """
+        data = array('f')
+        for vector in vectors:
+            if len(vector) != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {len(vector)}")
+            data.extend(_normalized(vector))
+
+        with self._lock:
+            # Vectors first: rows without metadata are cut off on load
+            with open(self.vectors_path, 'ab') as f:
+                f.write(data.tobytes())
+            with open(self.rows_path, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+            for entry in entries:
+                self._message_rows[entry["message_id"]] = len(self._rows)
+                self._rows.append(entry)
+            self._matrix = None
+
+    def remove_conversation(self, conversation_id: str) -> int:
+        """
+        Mark the rows of a conversation as deleted
+
+        Args:
+            conversation_id: Conversation whose messages are removed
+
+        Returns:
+            Number of rows removed
+        """
+        with self._lock:
+            rows = [
+                row for row, entry in enumerate(self._rows)
+                if entry["conversation_id"] == conversation_id and row not in self._deleted
+            ]
+            if not rows:
+                return 0
+            with open(self.rows_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"removed": conversation_id}) + "\n")
+            self._mark_removed(conversation_id)
+            if len(self._deleted) > len(self._rows) // 2:
+                self._compact()
+            return len(rows)
+
+    def top_k(self, query: Sequence[float], k: int = 10) -> List[Tuple[Dict[str, str], float]]:
+        """
+        Find the rows most similar to a query vector
+
+        Args:
+            query: Query embedding
+            k: Number of rows to return
+
+        Returns:
+            (row metadata, cosine similarity) pairs, best first
+        """
+        with self._lock:
+            if self.dim is None or k <= 0 or len(self._rows) == len(self._deleted):
+                return []
+            if len(query) != self.dim:
+                raise ValueError(f"Expected a {self.dim}-dimensional query, got {len(query)}")
+            np = _numpy() if self.use_numpy is not False else None
+            if self.use_numpy and np is None:
+                raise ImportError("numpy is required for use_numpy=True")
+            query = _normalized(query)
+            scored = self._top_k_numpy(np, query, k) if np is not None else self._top_k_python(query, k)
+            return [(self._rows[row], score) for row, score in scored]
+
+    def _top_k_numpy(self, np: Any, query: List[float], k: int) -> List[Tuple[int, float]]:
+        """Score all rows with one matmul over the memory-mapped matrix"""
+        n = len(self._rows)
+        if self._matrix is None or self._matrix.shape[0] != n:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+        scores = self._matrix @ np.asarray(query, dtype=np.float32)
+        if self._deleted:
+            scores[np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))] = -np.inf
+
+        k = min(k, n - len(self._deleted))
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def _top_k_python(self, query: List[float], k: int) -> List[Tuple[int, float]]:
+        """Score rows one by one, reading the matrix in blocks"""
+        n = len(self._rows)
+        rows_per_block = 4096
+        scored = []
+        with open(self.vectors_path, 'rb') as f:
+            for first in range(0, n, rows_per_block):
+                count = min(rows_per_block, n - first)
+                block = array('f')
+                block.frombytes(f.read(count * self.dim * 4))
+                for offset in range(count):
+                    row = first + offset
+                    if row in self._deleted:
+                        continue
+                    start = offset * self.dim
+                    score = sum(a * b for a, b in zip(block[start:start + self.dim], query))
+                    scored.append((score, row))
+        return [(row, score) for score, row in heapq.nlargest(k, scored)]
+
+    def _load(self) -> None:
+        """Read metadata, keeping only rows present in both files"""
+        if not self.meta_path.exists():
+            return
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            self.model = meta["model"]
+            self.dim = int(meta["dim"])
+            lines = self.rows_path.read_text(encoding="utf-8").splitlines() if self.rows_path.exists() else []
+            stored_rows = self.vectors_path.stat().st_size // (4 * self.dim) if self.vectors_path.exists() else 0
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable semantic index in {self.index_dir}: {e}")
+            self.model = self.dim = None
+            return
+
+        removed = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Torn last line of an interrupted append
+                break
+            if "removed" in entry:
+                removed.append(entry["removed"])
+            elif len(self._rows) < stored_rows:
+                self._message_rows[entry["message_id"]] = len(self._rows)
+                self._rows.append(entry)
+        for conversation_id in removed:
+            self._mark_removed(conversation_id)
+
+        if len(self._rows) != stored_rows or len(lines) != len(self._rows) + len(removed):
+            logger.warning(f"Semantic index in {self.index_dir} is inconsistent, rewriting it")
+            try:
+                self._compact()
+            except OSError as e:
+                logger.warning(f"Failed to rewrite semantic index: {e}")
+                self.model = self.dim = None
+                self._rows, self._message_rows, self._deleted = [], {}, set()
+                return
+        logger.info(f"Loaded semantic index with {len(self)} vectors ({self.model})")
+
+    def _mark_removed(self, conversation_id: str) -> None:
+        """Add a conversation's rows to the deleted set (caller holds the lock)"""
+        for row, entry in enumerate(self._rows):
+            if entry["conversation_id"] == conversation_id:
+                self._deleted.add(row)
+                self._message_rows.pop(entry["message_id"], None)
+
+    def _compact(self) -> None:
+        """Rewrite both files without deleted rows (caller holds the lock)"""
+        keep = [row for row in range(len(self._rows)) if row not in self._deleted]
+        row_bytes = 4 * self.dim
+        vectors_tmp = self.vectors_path.with_suffix(".tmp")
+        rows_tmp = self.rows_path.with_suffix(".tmp")
+        with open(self.vectors_path, 'rb') as src, open(vectors_tmp, 'wb') as dst:
+            for row in keep:
+                src.seek(row * row_bytes)
+                dst.write(src.read(row_bytes))
+        with open(rows_tmp, 'w', encoding='utf-8') as f:
+            f.write("".join(json.dumps(self._rows[row], ensure_ascii=False) + "\n" for row in keep))
+
+        # Drop the memory map before replacing the file under it
+        self._matrix = None
+        vectors_tmp.replace(self.vectors_path)
+        rows_tmp.replace(self.rows_path)
+        self._rows = [self._rows[row] for row in keep]
+        self._message_rows = {entry["message_id"]: row for row, entry in enumerate(self._rows)}
+        self._deleted = set()
+
+
+class SemanticSearch:
+    """
+    Embeds conversation messages and answers similarity queries
+
+    Messages are indexed once, by message ID; re-indexing a conversation
+    only embeds its new messages, and vectors already computed are reused
+    from the client's embedding cache.
+
+    Indexing is background work: each pass has its own cancellation
+    token, so the scheduler can preempt it for an interactive request,
+    and the pass then waits for a free slot and carries on.
+
+    After the embedding model changes, the index keeps serving searches
+    with the old model's vectors while the new model's are built in a
+    side index (index_dir + ".rebuild") as conversations are indexed; it
+    replaces the old index once index_storage() has covered every saved
+    conversation.
+    """
+
+    def __init__(
+        self,
+        ollama_client: OllamaClient,
+        model: str = "nomic-embed-text",
+        index_dir: str = "cache/semantic",
+        batch_size: int = 64,
+        max_concurrency: int = 1,
+        index: Optional[VectorIndex] = None
+    ):
+        """
+        Initialize semantic search
+
+        Args:
+            ollama_client: Client used to compute embeddings
+            model: Ollama embedding model
+            index_dir: Directory of the vector index
+            batch_size: Texts per embedding request
+            max_concurrency: Embedding requests in flight at once while
+                             indexing (each takes a scheduler slot)
+            index: Vector index to use (default: a VectorIndex in index_dir)
+        """
+        self.client = ollama_client
+        self.model = model
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.index = index or VectorIndex(index_dir)
+        # Index of self.model being built while self.index holds another model's vectors
+        self._rebuild: Optional[VectorIndex] = None
+        # Serializes indexing so a message is never embedded twice
+        self._index_lock = threading.Lock()
+        # Set once the embedding model turned out to be missing
+        self.unavailable_reason: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        """False if the embedding model is missing on the server"""
+        return self.unavailable_reason is None
+
+    def index_conversation(self, conversation_id: str, messages: List[Message]) -> int:
+        """
+        Embed and index the messages of a conversation not indexed yet
+
+        Args:
+            conversation_id: Conversation the messages belong to
+            messages: Messages of the conversation
+
+        Returns:
+            Number of messages added to the index
+        """
+        if not self.available:
+            return 0
+        with self._index_lock:
+            index = self._target_index()
+            new = [m for m in messages if m.content.strip() and not index.contains(m.id)]
+            if not new:
+                return 0
+            vectors = self._embed_preemptibly([m.content for m in new])
+            if vectors is None:
+                return 0
+
+            if index.dim != len(vectors[0]):
+                # New index, or the model now returns another dimension
+                index.reset(self.model, len(vectors[0]))
+            entries = [
+                {
+                    "conversation_id": conversation_id,
+                    "message_id": m.id,
+                    "role": m.role.value,
+                    "snippet": " ".join(m.content.split())[:SNIPPET_LENGTH],
+                }
+                for m in new
+            ]
+            index.add(entries, vectors)
+            logger.info(f"Indexed {len(new)} messages of conversation {conversation_id}")
+            return len(new)
+
+    def _target_index(self) -> VectorIndex:
+        """Index new vectors go to: the side index while rebuilding for a new model (hold _index_lock)"""
+        if self.index.model in (None, self.model):
+            return self.index
+        if self._rebuild is None:
+            logger.info(f"Embedding model changed to {self.model}, rebuilding semantic index in the background")
+            self._rebuild = VectorIndex(str(self.index.index_dir) + ".rebuild", use_numpy=self.index.use_numpy)
+            if self._rebuild.model not in (None, self.model):
+                # Left over from a rebuild for yet another model
+                self._rebuild.reset(self.model, self._rebuild.dim)
+        return self._rebuild
+
+    def _embed_preemptibly(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """
+        Embed texts as background work, starting over when preempted
+
+        Batches finished before a preemption come from the embedding
+        cache on the next attempt.
+
+        Returns:
+            The vectors, or None if the embedding model is missing
+        """
+        while True:
+            try:
+                return self.client.embed(
+                    self.model,
+                    texts,
+                    batch_size=self.batch_size,
+                    max_concurrency=self.max_concurrency,
+                    cancel_token=CancellationToken()
+                )
+            except RequestCancelledError:
+                logger.info("Semantic indexing preempted by an interactive request, waiting for a free slot")
+            except ModelNotFoundError as e:
+                self._mark_unavailable(e)
+                return None
+
+    def index_storage(self, storage: ConversationStorage) -> int:
+        """
+        Index every saved conversation (already indexed messages are skipped)
+
+        Args:
+            storage: Conversation storage to read
+
+        Returns:
+            Number of messages added to the index
+        """
+        added = 0
+        for info in storage.list_conversations():
+            if not self.available:
+                return added
+            conversation = storage.load_conversation(info["id"])
+            if conversation is not None:
+                added += self.index_conversation(conversation.id, conversation.messages)
+
+        with self._index_lock:
+            rebuild = self._target_index() if self.available else None
+            if rebuild is self._rebuild and rebuild is not None and rebuild.model is not None:
+                # Every conversation has the new model's vectors now
+                self.index.adopt(rebuild)
+                rebuild.index_dir.rmdir()
+                self._rebuild = None
+                logger.info(f"Semantic index rebuilt with {self.model}")
+        return added
+
+    def remove_conversation(self, conversation_id: str) -> None:
+        """
+        Remove a conversation's messages from the index
+
+        Args:
+            conversation_id: Deleted conversation
+        """
+        with self._index_lock:
+            removed = self.index.remove_conversation(conversation_id)
+            if self._rebuild is not None:
+                self._rebuild.remove_conversation(conversation_id)
+        if removed:
+            logger.info(f"Removed {removed} messages of conversation {conversation_id} from the semantic index")
+
+    def search(self, query: str, k: int = 10) -> List[SearchHit]:
+        """
+        Find the messages most similar in meaning to a query
+
+        Args:
+            query: Search text
+            k: Maximum number of hits
+
+        Returns:
+            Hits, best first
+
+        Raises:
+            ModelNotFoundError: If the embedding model is not installed
+            OllamaConnectionError: If the query cannot be embedded
+        """
+        if not query.strip():
+            return []
+        index = self.index
+        if index.model not in (None, self.model):
+            # Still rebuilding for a new model: query the old model's vectors
+            # with the old model, or the partial new index if it is gone
+            try:
+                return self._search_index(index, index.model, query, k)
+            except ModelNotFoundError:
+                index = self._rebuild
+                if index is None:
+                    return []
+        try:
+            return self._search_index(index, self.model, query, k)
+        except ModelNotFoundError as e:
+            self._mark_unavailable(e)
+            raise
+
+    def _search_index(self, index: VectorIndex, model: str, query: str, k: int) -> List[SearchHit]:
+        """Embed a query with the index's model and return the index's best hits"""
+        if len(index) == 0:
+            return []
+        vector = self.client.embed(model, [query], priority=Priority.INTERACTIVE)[0]
+        return [
+            SearchHit(
+                conversation_id=entry["conversation_id"],
+                message_id=entry["message_id"],
+                role=entry["role"],
+                snippet=entry["snippet"],
+                score=score
+            )
+            for entry, score in index.top_k(vector, k)
+        ]
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        """Stop indexing until restart because the embedding model is missing"""
+        if self.unavailable_reason is None:
+            logger.warning(f"Semantic search disabled: {error} (run: ollama pull {self.model})")
+        self.unavailable_reason = f"Embedding model {self.model} is not installed (ollama pull {self.model})"
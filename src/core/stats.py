@@ -0,0 +1,76 @@
+"""
+Generation statistics - timing and token counts of one response
+"""
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class GenerationStats:
+    """
+    Timing and token statistics for a single generation
+
+    Attributes:
+        model: Model that produced the response
+        total_duration: Server-side total time (ns)
+        load_duration: Time spent loading the model (ns)
+        prompt_eval_count: Number of prompt tokens evaluated
+        prompt_eval_duration: Time spent evaluating the prompt (ns)
+        eval_count: Number of tokens generated
+        eval_duration: Time spent generating tokens (ns)
+        time_to_first_token: Client-measured seconds until first content chunk
+        client_duration: Client-measured seconds for the whole stream
+        chunk_count: Number of content chunks received
+        prefill_saved: Estimated seconds of prompt evaluation skipped because
+                       a background prefill had already cached the prefix
+        cached: The response was replayed from the response cache (server
+                fields are those of the original generation)
+    """
+    model: str = ""
+    total_duration: int = 0
+    load_duration: int = 0
+    prompt_eval_count: int = 0
+    prompt_eval_duration: int = 0
+    eval_count: int = 0
+    eval_duration: int = 0
+    time_to_first_token: Optional[float] = None
+    client_duration: float = 0.0
+    chunk_count: int = 0
+    prefill_saved: Optional[float] = None
+    cached: bool = False
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """
+        Client-side generation rate (tokens after the first, per second)
+
+        Falls back to counting content chunks when the server did not
+        report eval_count.
+        """
+        tokens = self.eval_count or self.chunk_count
+        if self.time_to_first_token is None or tokens < 2:
+            return None
+        generation_time = self.client_duration - self.time_to_first_token
+        if generation_time <= 0:
+            return None
+        return (tokens - 1) / generation_time
+
+    @property
+    def server_tokens_per_second(self) -> Optional[float]:
+        """Generation rate as reported by the server (eval_count / eval_duration)"""
+        if not self.eval_count or not self.eval_duration:
+            return None
+        return self.eval_count / (self.eval_duration / 1e9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert stats to dictionary format (includes derived rates)"""
+        data = asdict(self)
+        data["tokens_per_second"] = self.tokens_per_second
+        data["server_tokens_per_second"] = self.server_tokens_per_second
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GenerationStats":
+        """Create stats from a dictionary, ignoring derived and unknown keys"""
+        fields = cls.__dataclass_fields__
+        return cls(**{key: value for key, value in data.items() if key in fields})
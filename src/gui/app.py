@@ -2,11 +2,15 @@
 Main GUI application using Tkinter with modern UI design
 """
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-from typing import List
-from ..core.chat_manager import ChatManager
-from ..core.message import Role
+from tkinter import ttk, scrolledtext, messagebox, filedialog
+from typing import Dict, List, Optional
+from ..api.stream_events import ErrorEvent, TokenEvent
+from ..core.chat_manager import ChatManager, ComparisonResult
+from ..core.message import Message, Role
+from ..core.response_handle import ResponseHandle
+from ..core.semantic_search import SearchHit
 from ..config.settings import settings
+from ..utils.cancellation import CancellationToken
 from ..utils.logger import setup_logger
 import threading
 
@@ -66,7 +70,12 @@ class ChatApplication:
             theme: UI theme - "light" or "dark" (default: "light")
         """
         self.chat_manager = chat_manager
-        self.is_processing = False
+        # Responses in flight from this window, by conversation
+        self._handles: Dict[str, ResponseHandle] = {}
+        # Conversation whose streaming reply is on screen, and how many of
+        # its characters are shown
+        self._live_conversation_id: Optional[str] = None
+        self._live_shown = 0
         self.theme = theme
         self.colors = ModernColors()
 
@@ -83,6 +92,15 @@ class ChatApplication:
         # Setup UI components
         self._setup_ui()
 
+        # Track warm-up of the selected model (listener runs on worker threads)
+        self.chat_manager.add_model_state_listener(
+            lambda model, state: self.window.after(0, self._update_model_status)
+        )
+        # Follow queued messages as they are sent (listener runs on worker threads)
+        self.chat_manager.add_queue_listener(
+            lambda handle: self.window.after(0, lambda: self._on_queued_response(handle))
+        )
+
         # Load available models
         self._load_models()
 
@@ -159,6 +177,25 @@ class ChatApplication:
         )
         sidebar_title.pack()
 
+        # Semantic search box (Enter searches, Escape returns to the list)
+        if self.chat_manager.semantic_search is not None:
+            self.search_var = tk.StringVar()
+            search_entry = tk.Entry(
+                sidebar,
+                textvariable=self.search_var,
+                bg=colors['surface_variant'],
+                fg=colors['text_primary'],
+                insertbackground=colors['text_primary'],
+                font=("Segoe UI", 10),
+                relief=tk.FLAT,
+                highlightthickness=1,
+                highlightbackground=colors['border'],
+                highlightcolor=colors['primary']
+            )
+            search_entry.pack(fill=tk.X, padx=10, pady=(0, 10), ipady=4)
+            search_entry.bind("<Return>", self._on_search)
+            search_entry.bind("<Escape>", self._on_clear_search)
+
         # Scrollable conversation list
         list_frame = tk.Frame(sidebar, bg=colors['surface'])
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
@@ -206,6 +243,24 @@ class ChatApplication:
         sidebar_new_btn.pack(fill=tk.X, pady=(0, 5))
         self._add_button_hover(sidebar_new_btn, colors['primary'], colors['primary_hover'])
 
+        # Add Documents button (folders whose excerpts are sent with messages)
+        if self.chat_manager.document_index is not None:
+            self.documents_btn = tk.Button(
+                sidebar_footer,
+                text=self._documents_label(),
+                command=self._on_add_documents,
+                bg=colors['surface_variant'],
+                fg=colors['text_primary'],
+                font=("Segoe UI", 10),
+                relief=tk.FLAT,
+                padx=15,
+                pady=8,
+                cursor="hand2",
+                borderwidth=0
+            )
+            self.documents_btn.pack(fill=tk.X, pady=(0, 5))
+            self._add_button_hover(self.documents_btn, colors['surface_variant'], colors['border'])
+
         # Delete button
         self.delete_btn = tk.Button(
             sidebar_footer,
@@ -274,10 +329,38 @@ class ChatApplication:
         self.model_selector.pack(side=tk.LEFT)
         self.model_selector.bind("<<ComboboxSelected>>", self._on_model_change)
 
+        # Shows whether the selected model is loaded in memory
+        self.model_status_label = tk.Label(
+            left_section,
+            text="",
+            bg=colors['surface'],
+            fg=colors['text_secondary'],
+            font=("Segoe UI", 9)
+        )
+        self.model_status_label.pack(side=tk.LEFT, padx=(10, 0))
+        self._update_model_status()
+
         # Right section - Theme toggle and New chat button
         right_section = tk.Frame(toolbar, bg=colors['surface'])
         right_section.pack(side=tk.RIGHT, padx=20, pady=15)
 
+        # Compare button - one prompt to several models side by side
+        self.compare_btn = tk.Button(
+            right_section,
+            text="⚖ Compare",
+            command=self._open_compare_window,
+            bg=colors['surface_variant'],
+            fg="black" if self.theme == "dark" else colors['text_primary'],
+            font=("Segoe UI", 10),
+            relief=tk.FLAT,
+            padx=20,
+            pady=10,
+            cursor="hand2",
+            borderwidth=0
+        )
+        self.compare_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self._add_button_hover(self.compare_btn, colors['surface_variant'], colors['border'])
+
         # Theme toggle button
         self.theme_btn = tk.Button(
             right_section,
@@ -367,6 +450,12 @@ class ChatApplication:
             "separator",
             foreground=colors['border']
         )
+        self.chat_display.tag_config(
+            "pending",
+            foreground=colors['text_secondary'],
+            font=("Segoe UI", 12, "italic"),
+            spacing1=10
+        )
 
         # Make chat display read-only
         self.chat_display.config(state=tk.DISABLED)
@@ -425,6 +514,24 @@ class ChatApplication:
         self.send_btn.pack()
         self._add_button_hover(self.send_btn, colors['success'], colors['success_hover'])
 
+        # Stop button - cancels the response being generated
+        self.stop_btn = tk.Button(
+            button_container,
+            text="■ Stop",
+            command=self._on_stop,
+            bg=colors['surface_variant'],
+            fg=colors['text_primary'],
+            font=("Segoe UI", 10),
+            relief=tk.FLAT,
+            cursor="hand2",
+            padx=25,
+            pady=6,
+            borderwidth=0,
+            state=tk.NORMAL if self._current_replying() else tk.DISABLED
+        )
+        self.stop_btn.pack(fill=tk.X, pady=(5, 0))
+        self._add_button_hover(self.stop_btn, colors['surface_variant'], colors['border'])
+
         # Focus on input field
         self.message_input.focus()
 
@@ -445,9 +552,6 @@ class ChatApplication:
         """Toggle between light and dark themes"""
         self.theme = "dark" if self.theme == "light" else "light"
 
-        # Save current conversation state
-        messages = self.chat_manager.get_messages()
-
         # Rebuild UI with new theme
         for widget in self.window.winfo_children():
             widget.destroy()
@@ -458,54 +562,106 @@ class ChatApplication:
         self._load_conversation_list()
 
         # Restore conversation
-        if messages:
-            self.chat_display.config(state=tk.NORMAL)
-            for msg in messages:
-                sender = "You" if msg.role == Role.USER else "Assistant"
-                tag = "user" if msg.role == Role.USER else "assistant"
-                self._display_message(sender, msg.content, tag)
-            self.chat_display.config(state=tk.DISABLED)
+        self._show_current_conversation()
+        self._update_input_state()
 
         self._load_models()
         logger.info(f"Theme switched to {self.theme}")
 
     def _load_models(self) -> None:
-        """Load available models from Ollama and populate dropdown"""
-        try:
-            models = self.chat_manager.client.list_models()
-            if models:
-                self.model_selector["values"] = models
-                # Set first model as default if current model not in list
-                if self.model_var.get() not in models:
-                    self.model_var.set(models[0])
-                    self.chat_manager.set_model(models[0])
-                logger.info(f"Loaded {len(models)} models")
-            else:
-                logger.warning("No models found")
-                messagebox.showwarning(
-                    "No Models",
-                    "No models found in Ollama. Please pull a model first."
-                )
-        except Exception as e:
-            logger.error(f"Failed to load models: {e}")
-            messagebox.showerror("Error", f"Failed to load models: {e}")
+        """
+        Populate the model dropdown from the model catalog
+
+        The last known list is shown immediately; if it is stale, a
+        background refresh updates the dropdown when the server answers.
+        """
+        catalog = self.chat_manager.model_catalog
+        cached = catalog.cached_models()
+        if cached:
+            self._populate_models(cached)
+
+        if catalog.is_fresh():
+            return
+
+        def on_success(models):
+            self.window.after(0, lambda: self._on_models_refreshed(models))
+
+        def on_error(error):
+            if not cached:
+                self.window.after(0, lambda: messagebox.showerror(
+                    "Error",
+                    f"Failed to load models: {error}"
+                ))
+
+        catalog.refresh_async(on_success=on_success, on_error=on_error)
+
+    def _on_models_refreshed(self, models: List[str]) -> None:
+        """
+        Handle a completed background model refresh
+
+        Args:
+            models: Fresh list of model names
+        """
+        if models:
+            self._populate_models(models)
+        else:
+            logger.warning("No models found")
+            messagebox.showwarning(
+                "No Models",
+                "No models found in Ollama.\n\n"
+                "Please pull a model first:\n"
+                "  ollama pull llama2\n"
+                "  ollama pull mistral\n\n"
+                "You can continue, but won't be able to chat until a model is available."
+            )
+
+    def _populate_models(self, models: List[str]) -> None:
+        """
+        Fill the model dropdown
+
+        Args:
+            models: Model names to offer
+        """
+        # Offer models that are already loaded first
+        models = self.chat_manager.model_catalog.warm_first(models)
+        self.model_selector["values"] = models
+        # Set first model as default if current model not in list
+        if self.model_var.get() not in models:
+            self.model_var.set(models[0])
+            self.chat_manager.set_model(models[0])
+        logger.info(f"Loaded {len(models)} models")
 
     def _on_model_change(self, event=None) -> None:
         """Handle model selection change"""
         selected_model = self.model_var.get()
         self.chat_manager.set_model(selected_model)
+        self._update_model_status()
         logger.info(f"User selected model: {selected_model}")
 
-    def _on_new_chat(self) -> None:
-        """Handle new chat button click"""
-        if self.is_processing:
-            messagebox.showinfo("Please Wait", "Please wait for current response to complete")
-            return
+    def _update_model_status(self) -> None:
+        """Show whether the selected model is loaded, loading or cold"""
+        state = self.chat_manager.get_model_state()
+        text = {
+            "loaded": "● loaded",
+            "loading": "◌ loading…",
+            "cold": "○ not loaded"
+        }.get(state, "")
+        self.model_status_label.config(text=text)
+
+    def _on_stop(self) -> None:
+        """Handle stop button click - cancel the current conversation's response"""
+        handle = self._handles.get(self.chat_manager.get_current_conversation_id())
+        if handle is not None and handle.cancel():
+            self.stop_btn.config(state=tk.DISABLED)
+            logger.info("User stopped response generation")
 
+    def _on_new_chat(self) -> None:
+        """Handle new chat button click (a reply still streaming carries on in the background)"""
         # Clear chat display
         self.chat_display.config(state=tk.NORMAL)
         self.chat_display.delete(1.0, tk.END)
         self.chat_display.config(state=tk.DISABLED)
+        self._live_conversation_id = None
 
         # Start new conversation
         self.chat_manager.start_new_conversation()
@@ -516,6 +672,7 @@ class ChatApplication:
         # Clear selection and disable delete button
         self.conversation_listbox.selection_clear(0, tk.END)
         self.delete_btn.config(state=tk.DISABLED)
+        self._update_input_state()
 
         logger.info("New chat started")
 
@@ -537,103 +694,176 @@ class ChatApplication:
         # Get message text
         message = self.message_input.get(1.0, tk.END).strip()
 
-        # Validate input
-        if not message:
-            return
+        if self.chat_manager.current_conversation is None:
+            self.chat_manager.start_new_conversation()
+        conversation_id = self.chat_manager.get_current_conversation_id()
 
-        if self.is_processing:
-            messagebox.showinfo("Please Wait", "Please wait for current response to complete")
+        try:
+            if message:
+                # Sent now, or queued behind the response being generated
+                handle = self.chat_manager.queue_message(message, conversation_id=conversation_id)
+            else:
+                # Sending nothing resumes a queue paused by Stop, an error or a restart
+                handle = self.chat_manager.resume_queue(conversation_id)
+                if handle is None:
+                    return
+        except Exception as e:
+            logger.error(f"Error sending message: {e}")
+            messagebox.showerror("Error", f"Failed to send message: {e}")
             return
 
         # Clear input field
         self.message_input.delete(1.0, tk.END)
 
-        # Display user message
-        self._display_message("You", message, "user")
-
-        # Disable input while processing
-        self._set_input_enabled(False)
-        self.is_processing = True
+        if handle is not None:
+            self._watch_response(handle)
+        self._show_current_conversation()
+        self._update_input_state()
+        self._load_conversation_list()
 
-        # Send message in background thread
-        thread = threading.Thread(
-            target=self._send_message_async,
-            args=(message,),
-            daemon=True
-        )
-        thread.start()
+    def _on_queued_response(self, handle: ResponseHandle) -> None:
+        """Show a queued message that started sending after the previous response"""
+        self._watch_response(handle)
+        if handle.conversation_id == self.chat_manager.get_current_conversation_id():
+            self._show_current_conversation()
+        self._update_input_state()
+        self._load_conversation_list()
 
-    def _send_message_async(self, message: str) -> None:
+    def _watch_response(self, handle: ResponseHandle) -> None:
         """
-        Send message to API in background thread
+        Follow a response's events and mirror them in the window
+
+        Events arrive on the chat manager's worker thread; display updates
+        are scheduled on the main thread.
 
         Args:
-            message: User's message text
+            handle: Handle of the response (its conversation may stop being
+                    the current one while the response streams)
         """
-        try:
-            # Prepare for streaming response
-            self._prepare_assistant_message()
+        conversation_id = handle.conversation_id
+        self._handles[conversation_id] = handle
+        received = 0
+
+        def on_event(event) -> None:
+            nonlocal received
+            if isinstance(event, TokenEvent):
+                received += len(event.content)
+                self._on_response_chunk(conversation_id, event.content, received)
+                return
+
+            if isinstance(event, ErrorEvent):
+                logger.error(f"Error sending message: {event.message}")
+                self.window.after(0, lambda: messagebox.showerror(
+                    "Error",
+                    f"Failed to send message: {event.message}"
+                ))
+            # Finalize response display, re-enable input and refresh the list
+            self.window.after(0, lambda: self._finalize_assistant_message(handle))
+
+        handle.subscribe(on_event)
+
+    def _prepare_assistant_message(self, conversation_id: str, partial: str = "") -> None:
+        """
+        Prepare chat display for streaming assistant response
 
-            # Send message and receive streaming response
-            self.chat_manager.send_message(
-                message,
-                on_chunk=self._on_response_chunk
-            )
+        Args:
+            conversation_id: Conversation the response belongs to
+            partial: Text of the response received so far
+        """
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.insert(tk.END, "\nAssistant:\n", "assistant")
+        self.chat_display.insert(tk.END, partial, "message")
+        self.chat_display.config(state=tk.DISABLED)
+        self.chat_display.see(tk.END)
+        self._live_conversation_id = conversation_id
+        self._live_shown = len(partial)
 
-            # Finalize response display
-            self._finalize_assistant_message()
+    def _on_response_chunk(self, conversation_id: str, chunk: str, received: int) -> None:
+        """
+        Handle each chunk of streaming response
 
-            # Refresh conversation list (in case this was a new conversation)
-            self.window.after(0, self._load_conversation_list)
+        The chunk is shown only while its conversation is on screen, and
+        only the part not already shown when the conversation was opened.
+        It goes above the queued messages, at the "live" mark.
 
-        except Exception as e:
-            logger.error(f"Error sending message: {e}")
-            self.window.after(0, lambda: messagebox.showerror(
-                "Error",
-                f"Failed to send message: {e}"
-            ))
-        finally:
-            # Re-enable input
-            self.window.after(0, lambda: self._set_input_enabled(True))
-            self.is_processing = False
-
-    def _prepare_assistant_message(self) -> None:
-        """Prepare chat display for streaming assistant response"""
+        Args:
+            conversation_id: Conversation the chunk belongs to
+            chunk: Text chunk from API
+            received: Characters of the response received up to this chunk
+        """
         def update():
+            if self._live_conversation_id != conversation_id or received <= self._live_shown:
+                return
+            text = chunk[len(chunk) - (received - self._live_shown):]
+            self._live_shown = received
             self.chat_display.config(state=tk.NORMAL)
-            self.chat_display.insert(tk.END, "\nAssistant:\n", "assistant")
-            self.chat_display.insert(tk.END, "", "message")
+            self.chat_display.insert("live", text, "message")
             self.chat_display.config(state=tk.DISABLED)
-            self.chat_display.see(tk.END)
+            self.chat_display.see("live")
 
+        # Schedule UI update on main thread
         self.window.after(0, update)
 
-    def _on_response_chunk(self, chunk: str) -> None:
+    def _finalize_assistant_message(self, handle: ResponseHandle) -> None:
         """
-        Handle each chunk of streaming response
+        Finalize assistant message display
 
         Args:
-            chunk: Text chunk from API
+            handle: Handle of the response that ended
         """
-        def update():
-            self.chat_display.config(state=tk.NORMAL)
-            self.chat_display.insert(tk.END, chunk, "message")
-            self.chat_display.config(state=tk.DISABLED)
-            self.chat_display.see(tk.END)
+        conversation_id = handle.conversation_id
+        # A queued message of the same conversation may already be sending
+        if self._handles.get(conversation_id) is handle:
+            del self._handles[conversation_id]
+        if self._live_conversation_id == conversation_id:
+            # Redraw from the conversation, where the response is now stored
+            self._show_current_conversation()
+
+        self._update_input_state()
+        # Refresh conversation list (in case this was a new conversation)
+        self._load_conversation_list()
 
-        # Schedule UI update on main thread
-        self.window.after(0, update)
+    def _show_current_conversation(self) -> None:
+        """
+        Redraw the chat display from the current conversation
 
-    def _finalize_assistant_message(self) -> None:
-        """Finalize assistant message display"""
-        def update():
-            self.chat_display.config(state=tk.NORMAL)
-            self.chat_display.insert(tk.END, "\n", "message")
-            self.chat_display.insert(tk.END, "-" * 80 + "\n", "separator")
-            self.chat_display.config(state=tk.DISABLED)
-            self.chat_display.see(tk.END)
+        Includes a reply still streaming, followed by the messages queued
+        behind it.
+        """
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.delete(1.0, tk.END)
+        self._live_conversation_id = None
 
-        self.window.after(0, update)
+        # Copy first: a reply finishing in the background adds a message
+        messages = list(self.chat_manager.get_messages())
+        for msg in messages:
+            self._display_stored_message(msg)
+        self.chat_display.config(state=tk.DISABLED)
+
+        conversation_id = self.chat_manager.get_current_conversation_id()
+        if conversation_id in self._handles and messages and messages[-1].role == Role.USER:
+            self._prepare_assistant_message(
+                conversation_id, self.chat_manager.get_partial_response(conversation_id)
+            )
+
+        # Streamed text goes in front of the queued messages
+        live = self.chat_display.index("end-1c")
+        for msg in self.chat_manager.get_queued_messages():
+            self._display_message("You (queued)", msg.content, "pending")
+        self.chat_display.mark_set("live", live)
+        self.chat_display.mark_gravity("live", tk.RIGHT)
+
+    def _current_replying(self) -> bool:
+        """True while the current conversation has a reply in flight"""
+        return self.chat_manager.get_current_conversation_id() in self._handles
+
+    def _update_input_state(self) -> None:
+        """
+        Offer Stop while the current conversation is generating
+
+        Input stays enabled: messages sent meanwhile are queued.
+        """
+        self.stop_btn.config(state=tk.NORMAL if self._current_replying() else tk.DISABLED)
 
     def _display_message(self, sender: str, message: str, tag: str) -> None:
         """
@@ -651,25 +881,18 @@ class ChatApplication:
         self.chat_display.config(state=tk.DISABLED)
         self.chat_display.see(tk.END)
 
-    def _set_input_enabled(self, enabled: bool) -> None:
+    def _display_stored_message(self, msg: Message) -> None:
         """
-        Enable or disable input controls with visual feedback
+        Display a message from the conversation history
 
         Args:
-            enabled: True to enable, False to disable
+            msg: Message to display
         """
-        colors = self._get_theme_colors()
-        state = tk.NORMAL if enabled else tk.DISABLED
-
-        self.message_input.config(state=state)
-        self.send_btn.config(state=state)
-
-        # Visual feedback for disabled state
-        if not enabled:
-            self.send_btn.config(bg=colors['border'])
-        else:
-            self.send_btn.config(bg=colors['success'])
-            self.message_input.focus()
+        sender = "You" if msg.role == Role.USER else "Assistant"
+        tag = "user" if msg.role == Role.USER else "assistant"
+        if msg.incomplete:
+            sender += " (stopped)"
+        self._display_message(sender, msg.content, tag)
 
     def _load_conversation_list(self) -> None:
         """Load and display conversation list in sidebar"""
@@ -682,18 +905,258 @@ class ChatApplication:
         # Store conversation IDs for later reference
         self.conversation_ids = []
 
+        # Conversations still generating are marked, wherever they were sent from
+        generating = set(self._handles).union(self.chat_manager.generating_conversations())
+        current_id = self.chat_manager.get_current_conversation_id()
+
         # Add each conversation to listbox
         for conv in conversations:
             title = conv.get('title', 'Untitled')
+            if conv.get('comparison_id'):
+                # Compared conversations share a title; tell them apart by model
+                title = f"⚖ {conv['model']}: {title}"
             # Truncate long titles
             if len(title) > 30:
                 title = title[:27] + "..."
+            if conv['id'] in generating:
+                title = "● " + title
 
             self.conversation_listbox.insert(tk.END, title)
             self.conversation_ids.append(conv['id'])
+            if conv['id'] == current_id:
+                self.conversation_listbox.selection_set(tk.END)
+        self.delete_btn.config(state=tk.NORMAL if self.conversation_listbox.curselection() else tk.DISABLED)
 
         logger.info(f"Loaded {len(conversations)} conversations in sidebar")
 
+    def _documents_label(self) -> str:
+        """Text of the Add Documents button, with the number of indexed excerpts"""
+        count = len(self.chat_manager.document_index)
+        return f"📁 Documents ({count} excerpts)" if count else "📁 Add Documents"
+
+    def _on_add_documents(self) -> None:
+        """Pick a folder and index it in the background"""
+        folder = filedialog.askdirectory(title="Add a folder to chat about")
+        if not folder:
+            return
+
+        def on_done(counts):
+            def update():
+                if self.documents_btn.winfo_exists():
+                    self.documents_btn.config(text=self._documents_label(), state=tk.NORMAL)
+            self.window.after(0, update)
+
+        if self.chat_manager.add_documents(folder, on_done=on_done) is not None:
+            self.documents_btn.config(text="📁 Indexing…", state=tk.DISABLED)
+
+    def _on_search(self, event=None) -> str:
+        """Run a semantic search in the background and list the hits in the sidebar"""
+        query = self.search_var.get().strip()
+        if not query:
+            self._load_conversation_list()
+            return "break"
+
+        self.conversation_listbox.delete(0, tk.END)
+        self.conversation_listbox.insert(tk.END, "Searching…")
+        self.conversation_ids = [None]
+
+        def worker():
+            try:
+                hits = self.chat_manager.search_conversations(query, settings.semantic_search_results)
+            except Exception as e:
+                logger.warning(f"Search failed: {e}")
+                self.window.after(0, lambda: self._show_search_results(query, [], str(e)))
+                return
+            self.window.after(0, lambda: self._show_search_results(query, hits))
+
+        threading.Thread(target=worker, daemon=True).start()
+        return "break"
+
+    def _show_search_results(self, query: str, hits: List[SearchHit], error: Optional[str] = None) -> None:
+        """Replace the conversation list with search hits (ignored if the query changed)"""
+        if self.search_var.get().strip() != query:
+            return
+        self.conversation_listbox.delete(0, tk.END)
+        self.conversation_ids = []
+
+        if error or not hits:
+            self.conversation_listbox.insert(tk.END, error or "No matches")
+            self.conversation_ids.append(None)
+            return
+
+        for hit in hits:
+            prefix = "You: " if hit.role == "user" else ""
+            snippet = prefix + hit.snippet
+            if len(snippet) > 30:
+                snippet = snippet[:27] + "..."
+            self.conversation_listbox.insert(tk.END, snippet)
+            self.conversation_ids.append(hit.conversation_id)
+        logger.info(f"Search returned {len(hits)} hits")
+
+    def _on_clear_search(self, event=None) -> str:
+        """Clear the search box and show the conversation list again"""
+        self.search_var.set("")
+        self._load_conversation_list()
+        return "break"
+
+    def _open_compare_window(self) -> None:
+        """Open a window sending one prompt to several models side by side"""
+        models = list(self.model_selector['values'])
+        if not models:
+            messagebox.showinfo("Compare Models", "No models available")
+            return
+        colors = self._get_theme_colors()
+
+        window = tk.Toplevel(self.window, bg=colors['bg'])
+        window.title("Compare Models")
+        window.geometry(f"{settings.window_width + 200}x{settings.window_height}")
+
+        controls = tk.Frame(window, bg=colors['bg'])
+        controls.pack(side=tk.TOP, fill=tk.X, padx=15, pady=15)
+
+        model_list = tk.Listbox(
+            controls,
+            selectmode=tk.MULTIPLE,
+            exportselection=False,
+            height=min(len(models), 6),
+            bg=colors['surface'],
+            fg=colors['text_primary'],
+            font=("Segoe UI", 10),
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=colors['border'],
+            selectbackground=colors['primary'],
+            selectforeground="white"
+        )
+        for model in models:
+            model_list.insert(tk.END, model)
+            if model == self.model_var.get():
+                model_list.selection_set(tk.END)
+        model_list.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+
+        prompt_input = tk.Text(
+            controls,
+            height=4,
+            wrap=tk.WORD,
+            font=("Segoe UI", 11),
+            bg=colors['surface'],
+            fg=colors['text_primary'],
+            relief=tk.FLAT,
+            padx=10,
+            pady=10,
+            highlightthickness=1,
+            highlightbackground=colors['border'],
+            insertbackground=colors['primary']
+        )
+        prompt_input.insert(tk.END, self.message_input.get(1.0, tk.END).strip())
+        prompt_input.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        buttons = tk.Frame(controls, bg=colors['bg'])
+        buttons.pack(side=tk.LEFT, padx=(10, 0))
+        run_btn = tk.Button(
+            buttons, text="Compare →", bg=colors['success'], fg="white",
+            font=("Segoe UI", 11, "bold"), relief=tk.FLAT, padx=20, pady=10, borderwidth=0, cursor="hand2"
+        )
+        run_btn.pack(fill=tk.X)
+        # Token of the running comparison (None when idle)
+        running: List[Optional[CancellationToken]] = [None]
+
+        def stop():
+            if running[0] is not None:
+                running[0].cancel()
+
+        stop_btn = tk.Button(
+            buttons, text="■ Stop", command=stop, bg=colors['surface_variant'],
+            fg=colors['text_primary'], font=("Segoe UI", 10), relief=tk.FLAT, padx=20, pady=6,
+            borderwidth=0, cursor="hand2", state=tk.DISABLED
+        )
+        stop_btn.pack(fill=tk.X, pady=(5, 0))
+
+        panes = tk.PanedWindow(window, orient=tk.HORIZONTAL, bg=colors['border'], sashwidth=4)
+        panes.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
+
+        def run():
+            selected = [models[i] for i in model_list.curselection()]
+            prompt = prompt_input.get(1.0, tk.END).strip()
+            if not selected or not prompt:
+                messagebox.showinfo("Compare Models", "Select at least one model and enter a prompt", parent=window)
+                return
+            if running[0] is not None:
+                messagebox.showinfo("Please Wait", "A comparison is still being generated", parent=window)
+                return
+
+            for pane in panes.panes():
+                panes.forget(pane)
+            headers, displays = {}, {}
+            for model in selected:
+                pane = tk.Frame(panes, bg=colors['surface'])
+                headers[model] = tk.Label(
+                    pane, text=f"{model}\nwaiting…", justify=tk.LEFT, anchor="w",
+                    bg=colors['surface'], fg=colors['text_secondary'], font=("Segoe UI", 10)
+                )
+                headers[model].pack(fill=tk.X, padx=10, pady=(10, 5))
+                displays[model] = scrolledtext.ScrolledText(
+                    pane, wrap=tk.WORD, font=("Segoe UI", 11), bg=colors['surface'],
+                    fg=colors['text_primary'], relief=tk.FLAT, padx=10, pady=10, borderwidth=0
+                )
+                displays[model].pack(fill=tk.BOTH, expand=True)
+                displays[model].config(state=tk.DISABLED)
+                panes.add(pane, stretch="always", minsize=150)
+
+            cancel_token = running[0] = CancellationToken()
+            run_btn.config(state=tk.DISABLED)
+            stop_btn.config(state=tk.NORMAL)
+
+            def on_chunk(model: str, chunk: str) -> None:
+                def update():
+                    if not displays[model].winfo_exists():
+                        return
+                    if headers[model].cget("text").endswith("waiting…"):
+                        headers[model].config(text=f"{model}\nstreaming…")
+                    displays[model].config(state=tk.NORMAL)
+                    displays[model].insert(tk.END, chunk)
+                    displays[model].config(state=tk.DISABLED)
+                    displays[model].see(tk.END)
+                self.window.after(0, update)
+
+            def worker():
+                results: List[ComparisonResult] = []
+                try:
+                    results = self.chat_manager.compare_models(prompt, selected, on_chunk, cancel_token)
+                except Exception as e:
+                    logger.error(f"Comparison failed: {e}")
+                    error = str(e)
+                    self.window.after(0, lambda: messagebox.showerror("Error", f"Comparison failed: {error}"))
+                finally:
+                    self.window.after(0, lambda: finish(results))
+
+            def finish(results: List[ComparisonResult]) -> None:
+                running[0] = None
+                self._load_conversation_list()
+                if not window.winfo_exists():
+                    return
+                run_btn.config(state=tk.NORMAL)
+                stop_btn.config(state=tk.DISABLED)
+                for result in results:
+                    headers[result.model].config(text=f"{result.model}\n{self._comparison_summary(result)}")
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        run_btn.config(command=run)
+        prompt_input.focus()
+
+    @staticmethod
+    def _comparison_summary(result: ComparisonResult) -> str:
+        """One-line timing summary of a model's answer"""
+        if result.error:
+            return f"error: {result.error}"
+        stats = result.stats
+        if stats is None:
+            return f"stopped after {result.total_time:.1f} s"
+        ttft = f"{stats.time_to_first_token:.2f} s" if stats.time_to_first_token is not None else "n/a"
+        tps = f"{stats.tokens_per_second:.1f}" if stats.tokens_per_second is not None else "n/a"
+        return f"first token {ttft} · {tps} tokens/s · total {result.total_time:.1f} s"
+
     def _on_conversation_select(self, event=None) -> None:
         """Handle conversation selection from sidebar"""
         selection = self.conversation_listbox.curselection()
@@ -704,34 +1167,32 @@ class ChatApplication:
         # Enable delete button
         self.delete_btn.config(state=tk.NORMAL)
 
-        # Get selected conversation ID
+        # Get selected conversation ID (placeholder rows have none)
         index = selection[0]
         conversation_id = self.conversation_ids[index]
+        if conversation_id is None:
+            self.delete_btn.config(state=tk.DISABLED)
+            return
 
         # Don't reload if it's already the current conversation
         current_id = self.chat_manager.get_current_conversation_id()
         if current_id == conversation_id:
             return
 
-        # Load the conversation
+        # Load the conversation (one left while generating carries on in the background)
         success = self.chat_manager.load_conversation(conversation_id)
         if success:
             # Clear and reload chat display
-            self.chat_display.config(state=tk.NORMAL)
-            self.chat_display.delete(1.0, tk.END)
-
-            # Display all messages
-            messages = self.chat_manager.get_messages()
-            for msg in messages:
-                sender = "You" if msg.role == Role.USER else "Assistant"
-                tag = "user" if msg.role == Role.USER else "assistant"
-                self._display_message(sender, msg.content, tag)
-
-            self.chat_display.config(state=tk.DISABLED)
+            self._show_current_conversation()
+            self._update_input_state()
 
             # Update model selector
             self.model_var.set(self.chat_manager.current_model)
 
+            # The conversation left may have been saved just now to keep generating
+            if current_id in self._handles:
+                self._load_conversation_list()
+
             logger.info(f"Loaded conversation: {conversation_id}")
         else:
             messagebox.showerror("Error", "Failed to load conversation")
@@ -763,6 +1224,8 @@ class ChatApplication:
                 self.chat_display.config(state=tk.NORMAL)
                 self.chat_display.delete(1.0, tk.END)
                 self.chat_display.config(state=tk.DISABLED)
+                self._live_conversation_id = None
+                self._update_input_state()
 
             # Refresh conversation list
             self._load_conversation_list()
@@ -15,8 +15,7 @@ Requirements:
 import sys
 from tkinter import messagebox
 from .gui.app import ChatApplication
-from .core.chat_manager import ChatManager
-from .api.ollama_client import OllamaClient
+from .bootstrap import create_chat_manager, create_client, create_model_catalog
 from .config.settings import settings
 from .utils.logger import setup_logger
 from .utils.exceptions import OllamaConnectionError
@@ -33,8 +32,9 @@ def main():
 
     try:
         # Initialize Ollama API client
-        logger.info(f"Connecting to Ollama at {settings.ollama_base_url}")
-        ollama_client = OllamaClient(base_url=settings.ollama_base_url)
+        endpoints = settings.ollama_endpoints or [settings.ollama_base_url]
+        logger.info(f"Connecting to Ollama at {', '.join(endpoints)}")
+        ollama_client = create_client()
 
         # Verify Ollama connection
         if not ollama_client.check_connection():
@@ -43,7 +43,7 @@ def main():
                 "Please ensure:\n"
                 "1. Ollama is installed\n"
                 "2. Ollama is running (try: ollama serve)\n"
-                f"3. API is accessible at {settings.ollama_base_url}"
+                f"3. API is accessible at {', '.join(endpoints)}"
             )
             logger.error("Ollama connection failed")
             messagebox.showerror("Connection Error", error_msg)
@@ -51,26 +51,15 @@ def main():
 
         logger.info("Successfully connected to Ollama")
 
-        # Check if any models are available
-        try:
-            models = ollama_client.list_models()
-            if not models:
-                warning_msg = (
-                    "No models found in Ollama.\n\n"
-                    "Please pull a model first:\n"
-                    "  ollama pull llama2\n"
-                    "  ollama pull mistral\n\n"
-                    "You can continue, but won't be able to chat until a model is available."
-                )
-                logger.warning("No models found")
-                messagebox.showwarning("No Models", warning_msg)
-        except Exception as e:
-            logger.warning(f"Could not check models: {e}")
-
-        # Initialize chat manager
+        # The GUI shows the last known model list at once and refreshes it
+        # in the background (warning then if there are no models)
+        model_catalog = create_model_catalog(ollama_client)
+        models = model_catalog.cached_models()
+        logger.info(f"Last known models: {', '.join(models) if models else 'none yet'}")
+
+        # Initialize chat manager (indexing runs in the background)
         logger.info("Initializing chat manager")
-        chat_manager = ChatManager(ollama_client)
-        chat_manager.set_model(settings.default_model)
+        chat_manager = create_chat_manager(ollama_client, model_catalog)
 
         # Launch GUI application
         logger.info("Launching GUI")
@@ -93,6 +82,8 @@ def main():
 
     finally:
         # Cleanup
+        if 'chat_manager' in locals():
+            chat_manager.close()
         if 'ollama_client' in locals():
             ollama_client.close()
         logger.info("Application shutdown complete")
@@ -0,0 +1,7 @@
+"""
+Run the local chat server: python -m src.server [--host HOST] [--port PORT]
+"""
+import sys
+from .chat_server import main
+
+sys.exit(main())
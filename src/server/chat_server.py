@@ -0,0 +1,681 @@
+"""
+Local HTTP server exposing saved conversations and streaming chat to other programs
+
+Scripts, editor plugins and browser tabs talk to one process that owns
+the conversation store and a single pooled connection to Ollama, instead
+of each opening their own. Everything runs on one asyncio event loop:
+responses stream through a shared AsyncOllamaClient, so many streams run
+concurrently without a thread each. Disk access (loading, listing,
+searching) runs on worker threads so it does not stall the streams.
+
+Endpoints (JSON in and out, except the message stream):
+
+    GET    /api/health                         server status
+    GET    /api/models                         installed models
+    GET    /api/conversations                  saved conversations, newest first
+    POST   /api/conversations                  start one: {"model": "llama2"}
+    GET    /api/conversations/{id}             a conversation with its messages
+    DELETE /api/conversations/{id}             delete a conversation
+    POST   /api/conversations/{id}/messages    send {"content": "...", "model": optional};
+                                               the reply streams as Server-Sent Events
+    POST   /api/conversations/{id}/cancel      stop the reply streaming in a conversation
+    GET    /api/search?q=...&k=10              find saved messages
+
+The message stream sends a "start" event, then "token" events
+({"content": "..."}), and ends with "done" ({"message": {...}}),
+"cancelled" ({"message": {...} or null}) or "error" ({"error": "..."}).
+A conversation streams one reply at a time (409 otherwise); different
+conversations stream concurrently.
+
+Replies stream from the first configured Ollama endpoint only: the
+AsyncOllamaClient has no endpoint pool, request scheduler or retries.
+Requests whose Host header names another machine are refused (403), so
+a web page cannot reach the server through DNS rebinding.
+"""
+import asyncio
+import ipaddress
+import json
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ..api.async_ollama_client import AsyncOllamaClient
+from ..core.async_chat_manager import AsyncChatManager
+from ..core.message import Conversation, Role
+from ..core.semantic_search import SemanticSearch
+from ..storage.conversation_storage import ConversationStorage
+from ..utils.cancellation import CancellationToken
+from ..utils.exceptions import OllamaConnectionError
+from ..utils.logger import setup_logger
+
+logger = setup_logger("chat_server", "logs/app.log")
+
+# Limits on what a client may send
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+REQUEST_TIMEOUT = 30.0
+
+
+class _RequestError(Exception):
+    """A request the server answers with an error status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class _Request:
+    """A parsed HTTP request"""
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: bytes = b""
+
+    def json(self) -> Dict[str, Any]:
+        """The body as a JSON object ({} if empty)"""
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError as e:
+            raise _RequestError(400, f"invalid JSON body: {e}")
+        if not isinstance(data, dict):
+            raise _RequestError(400, "expected a JSON object")
+        return data
+
+
+@dataclass
+class ChatSession:
+    """
+    An open conversation and the reply streaming in it, if any
+
+    Attributes:
+        manager: Chat manager holding the conversation
+        task: Task streaming the current reply (None when idle)
+        cancel_token: Token of the current reply
+    """
+    manager: AsyncChatManager
+    task: Optional[asyncio.Task] = None
+    cancel_token: Optional[CancellationToken] = field(default=None, repr=False)
+
+    @property
+    def streaming(self) -> bool:
+        """Whether a reply is streaming"""
+        return self.task is not None and not self.task.done()
+
+
+def _conversation_dict(conversation: Conversation) -> Dict[str, Any]:
+    """Convert a conversation to the JSON sent to clients"""
+    return {
+        "id": conversation.id,
+        "model": conversation.model,
+        "created_at": conversation.created_at.isoformat(),
+        "comparison_id": conversation.comparison_id,
+        "messages": [message.to_dict() for message in conversation.messages],
+    }
+
+
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+class ChatServer:
+    """
+    Asyncio HTTP server wrapping chat managers and the conversation store
+
+    Each conversation in use gets its own AsyncChatManager (its session);
+    all of them share the server's AsyncOllamaClient and storage
+    directory. Idle saved sessions beyond max_sessions are dropped,
+    oldest first, and reloaded from storage when used again.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOllamaClient,
+        storage_dir: str = "conversations",
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        default_model: str = "llama2",
+        semantic_search: Optional[SemanticSearch] = None,
+        allowed_origins: Sequence[str] = (),
+        max_sessions: int = 64
+    ):
+        """
+        Initialize the server (call start() to listen)
+
+        Args:
+            client: Client streaming from Ollama, shared by all sessions
+            storage_dir: Directory of the conversation files
+            host: Interface to listen on (keep it local: there is no authentication)
+            port: Port to listen on (0 picks a free one)
+            default_model: Model of new conversations that name none
+            semantic_search: Index used by /api/search and updated after
+                             each reply (default: plain text search only)
+            allowed_origins: Browser origins allowed to call the API
+                             ("*" allows any); requests from other
+                             origins are refused
+            max_sessions: Idle conversations kept in memory
+        """
+        self.client = client
+        self.storage_dir = storage_dir
+        self.storage = ConversationStorage(storage_dir)
+        self.host = host
+        self.port = port
+        self.default_model = default_model
+        self.semantic_search = semantic_search
+        self.allowed_origins = set(allowed_origins)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        # Index updates run one at a time, in the order replies finished
+        self._index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="server-index") \
+            if semantic_search is not None else None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes: List[Tuple[str, "re.Pattern[str]", Callable[..., Awaitable[Any]]]] = [
+            ("GET", re.compile(r"/api/health"), self._health),
+            ("GET", re.compile(r"/api/models"), self._models),
+            ("GET", re.compile(r"/api/conversations"), self._list_conversations),
+            ("POST", re.compile(r"/api/conversations"), self._create_conversation),
+            ("GET", re.compile(r"/api/conversations/([^/]+)"), self._get_conversation),
+            ("DELETE", re.compile(r"/api/conversations/([^/]+)"), self._delete_conversation),
+            ("POST", re.compile(r"/api/conversations/([^/]+)/messages"), self._send_message),
+            ("POST", re.compile(r"/api/conversations/([^/]+)/cancel"), self._cancel),
+            ("GET", re.compile(r"/api/search"), self._search),
+        ]
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "ChatServer":
+        """Start listening (the port is known once this returns)"""
+        # A deep backlog, so bursts of clients are not refused (or delayed by SYN retries)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Chat server listening on {self.url}")
+        return self
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        """Stop listening and cancel the replies still streaming"""
+        if self._server is not None:
+            self._server.close()
+        tasks = [session.task for session in self._sessions.values() if session.streaming]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        if self._index_executor is not None:
+            self._index_executor.shutdown(wait=False)
+        logger.info("Chat server stopped")
+
+    def index_archive(self) -> None:
+        """Add every saved conversation to the semantic index in the background"""
+        if self._index_executor is not None:
+            self._index_executor.submit(self._run_indexing, self.semantic_search.index_storage, self.storage)
+
+    @property
+    def active_streams(self) -> int:
+        """Number of replies streaming"""
+        return sum(1 for session in self._sessions.values() if session.streaming)
+
+    # Connection handling
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one request (connections are not kept alive)"""
+        request = None
+        try:
+            request = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT)
+            if request is not None:
+                await self._dispatch(request, writer)
+        except _RequestError as e:
+            await self._send_json(writer, e.status, {"error": str(e)}, request)
+        except asyncio.TimeoutError:
+            await self._send_json(writer, 408, {"error": "request timed out"}, request)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.exception(f"Unexpected error serving request: {e}")
+            await self._send_json(writer, 500, {"error": "internal server error"}, request)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[_Request]:
+        """Read and parse one request (None if the client sent nothing)"""
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if len(headers) >= MAX_HEADERS:
+                    raise _RequestError(431, "too many headers")
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length") or 0)
+            if length < 0:
+                raise ValueError("negative Content-Length")
+        except ValueError:
+            # Also raised by readline() for lines over the reader's limit
+            raise _RequestError(400, "malformed request")
+        if length > MAX_BODY_BYTES:
+            raise _RequestError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        return _Request(method.upper(), url.path.rstrip("/") or "/", parse_qs(url.query), headers, body)
+
+    async def _dispatch(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        """Route a request to its handler and send the response"""
+        host = request.headers.get("host")
+        if host is not None and not self._host_allowed(host):
+            raise _RequestError(403, f"host {host} is not allowed")
+        origin = request.headers.get("origin")
+        if origin is not None and not self._origin_allowed(origin):
+            raise _RequestError(403, f"origin {origin} is not allowed")
+        if request.method == "OPTIONS":
+            await self._send(writer, 204, b"", request, {
+                "Access-Control-Allow-Methods": "GET, POST, DELETE, OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type",
+                "Access-Control-Max-Age": "600",
+            })
+            return
+
+        path_matched = False
+        for method, pattern, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            path_matched = True
+            if method != request.method:
+                continue
+            try:
+                if handler == self._send_message:
+                    # Streams its own response
+                    await handler(request, writer, *match.groups())
+                    return
+                status, payload = await handler(request, *match.groups())
+            except OllamaConnectionError as e:
+                raise _RequestError(502, str(e))
+            await self._send_json(writer, status, payload, request)
+            return
+        raise _RequestError(405 if path_matched else 404, f"no route for {request.method} {request.path}")
+
+    def _host_allowed(self, host: str) -> bool:
+        """
+        Check the Host header against the server's own address
+
+        A page whose domain was re-pointed at this machine (DNS rebinding)
+        sends its own domain as Host, so only this server's host, localhost
+        and IP addresses are accepted, with this server's port.
+        """
+        try:
+            url = urlsplit(f"//{host}")
+            name, port = url.hostname or "", url.port
+        except ValueError:
+            return False
+        if port is not None and port != self.port:
+            return False
+        if name in ("localhost", self.host.lower()):
+            return True
+        try:
+            ipaddress.ip_address(name)
+        except ValueError:
+            return False
+        return True
+
+    def _origin_allowed(self, origin: str) -> bool:
+        return "*" in self.allowed_origins or origin in self.allowed_origins
+
+    def _response_head(self, status: int, request: Optional[_Request], headers: Dict[str, str]) -> bytes:
+        """Status line and headers of a response"""
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", "Connection: close"]
+        origin = request.headers.get("origin") if request is not None else None
+        if origin is not None and self._origin_allowed(origin):
+            lines += [f"Access-Control-Allow-Origin: {origin}", "Vary: Origin"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: bytes,
+        request: Optional[_Request],
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Send a complete response"""
+        headers = {**(headers or {}), "Content-Length": str(len(body))}
+        writer.write(self._response_head(status, request, headers) + body)
+        await writer.drain()
+
+    async def _send_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        request: Optional[_Request]
+    ) -> None:
+        """Send a JSON response"""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            await self._send(writer, status, body, request, {"Content-Type": "application/json"})
+        except ConnectionError:
+            pass
+
+    # Sessions
+
+    async def _session(self, conversation_id: str) -> ChatSession:
+        """
+        The session of a conversation, loading it from storage if needed
+
+        Raises:
+            _RequestError: 404 if there is no such conversation
+        """
+        session = self._sessions.get(conversation_id)
+        if session is None:
+            manager = AsyncChatManager(self.client, self.storage_dir)
+            if not await asyncio.to_thread(manager.load_conversation, conversation_id):
+                raise _RequestError(404, f"no conversation {conversation_id}")
+            # Another request may have opened it while this one was loading
+            session = self._sessions.get(conversation_id) or ChatSession(manager)
+            self._sessions[conversation_id] = session
+        self._sessions.move_to_end(conversation_id)
+        self._evict_idle_sessions()
+        return session
+
+    def _evict_idle_sessions(self) -> None:
+        """Drop the least recently used idle sessions beyond max_sessions"""
+        excess = len(self._sessions) - self.max_sessions
+        if excess <= 0:
+            return
+        evictable = []
+        for conversation_id, session in self._sessions.items():
+            if len(evictable) == excess:
+                break
+            # Conversations not saved yet (new, or whose only reply failed) exist only here
+            if not session.streaming and session.manager.get_messages() \
+                    and self.storage.conversation_exists(conversation_id):
+                evictable.append(conversation_id)
+        for conversation_id in evictable:
+            del self._sessions[conversation_id]
+
+    # Handlers: each returns (status, JSON payload)
+
+    async def _health(self, request: _Request) -> Tuple[int, Dict[str, Any]]:
+        return 200, {"status": "ok", "active_streams": self.active_streams, "sessions": len(self._sessions)}
+
+    async def _models(self, request: _Request) -> Tuple[int, Dict[str, Any]]:
+        return 200, {"models": await self.client.list_models()}
+
+    async def _list_conversations(self, request: _Request) -> Tuple[int, Dict[str, Any]]:
+        conversations = await asyncio.to_thread(self.storage.list_conversations)
+        # Conversations started here but without messages yet are not saved
+        saved = {conv["id"] for conv in conversations}
+        for conversation_id, session in self._sessions.items():
+            if conversation_id in saved:
+                continue
+            conversation = session.manager.current_conversation
+            conversations.insert(0, {
+                "id": conversation.id,
+                "title": "New Conversation",
+                "model": conversation.model,
+                "created_at": conversation.created_at.isoformat(),
+                "updated_at": conversation.created_at.isoformat(),
+                "message_count": len(conversation.messages),
+                "comparison_id": conversation.comparison_id,
+            })
+        for conv in conversations:
+            session = self._sessions.get(conv["id"])
+            conv["streaming"] = session is not None and session.streaming
+        return 200, {"conversations": conversations}
+
+    async def _create_conversation(self, request: _Request) -> Tuple[int, Dict[str, Any]]:
+        model = request.json().get("model") or self.default_model
+        if not isinstance(model, str):
+            raise _RequestError(400, "\"model\" must be a string")
+        manager = AsyncChatManager(self.client, self.storage_dir)
+        manager.start_new_conversation(model)
+        conversation_id = manager.get_current_conversation_id()
+        self._sessions[conversation_id] = ChatSession(manager)
+        self._evict_idle_sessions()
+        return 201, _conversation_dict(manager.current_conversation)
+
+    async def _get_conversation(self, request: _Request, conversation_id: str) -> Tuple[int, Dict[str, Any]]:
+        session = await self._session(conversation_id)
+        payload = _conversation_dict(session.manager.current_conversation)
+        payload["streaming"] = session.streaming
+        if session.streaming:
+            payload["partial_response"] = session.manager.get_partial_response()
+        return 200, payload
+
+    async def _delete_conversation(self, request: _Request, conversation_id: str) -> Tuple[int, Dict[str, Any]]:
+        session = self._sessions.pop(conversation_id, None)
+        if session is not None and session.streaming:
+            session.task.cancel()
+            await asyncio.gather(session.task, return_exceptions=True)
+        deleted = await asyncio.to_thread(self.storage.delete_conversation, conversation_id)
+        if not deleted and session is None:
+            raise _RequestError(404, f"no conversation {conversation_id}")
+        if self._index_executor is not None:
+            self._index_executor.submit(self._run_indexing, self.semantic_search.remove_conversation, conversation_id)
+        return 200, {"deleted": conversation_id}
+
+    async def _cancel(self, request: _Request, conversation_id: str) -> Tuple[int, Dict[str, Any]]:
+        session = self._sessions.get(conversation_id)
+        if session is None or not session.streaming:
+            return 200, {"cancelled": False}
+        session.cancel_token.cancel()
+        # Interrupts the stream even while it waits for the next chunk
+        session.task.cancel()
+        return 200, {"cancelled": True}
+
+    async def _search(self, request: _Request) -> Tuple[int, Dict[str, Any]]:
+        query = (request.query.get("q") or [""])[0].strip()
+        if not query:
+            raise _RequestError(400, "missing query parameter q")
+        try:
+            k = min(max(int((request.query.get("k") or ["10"])[0]), 1), 100)
+        except ValueError:
+            raise _RequestError(400, "k must be an integer")
+
+        if self.semantic_search is not None:
+            try:
+                hits = await asyncio.to_thread(self.semantic_search.search, query, k)
+                if hits:
+                    return 200, {"mode": "semantic", "results": [{
+                        "conversation_id": hit.conversation_id,
+                        "message_id": hit.message_id,
+                        "role": hit.role,
+                        "snippet": hit.snippet,
+                        "score": hit.score,
+                    } for hit in hits]}
+            except Exception as e:
+                logger.warning(f"Semantic search failed, falling back to text search: {e}")
+        matches = await asyncio.to_thread(self.storage.find_messages, query, k)
+        return 200, {"mode": "text", "results": matches}
+
+    # Streaming
+
+    async def _send_message(self, request: _Request, writer: asyncio.StreamWriter, conversation_id: str) -> None:
+        """Stream a reply as Server-Sent Events"""
+        data = request.json()
+        content, model = data.get("content"), data.get("model")
+        if not isinstance(content, str) or not content.strip():
+            raise _RequestError(400, "\"content\" must be a non-empty string")
+        if model is not None and not isinstance(model, str):
+            raise _RequestError(400, "\"model\" must be a string")
+        session = await self._session(conversation_id)
+        if session.streaming:
+            raise _RequestError(409, "a reply is already streaming in this conversation")
+
+        manager = session.manager
+        if model:
+            manager.set_model(model)
+        chunks: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        session.cancel_token = CancellationToken()
+        session.task = asyncio.ensure_future(
+            manager.send_message(content, chunks.put_nowait, cancel_token=session.cancel_token)
+        )
+        session.task.add_done_callback(lambda task: chunks.put_nowait(None))
+
+        try:
+            writer.write(self._response_head(200, request, {
+                "Content-Type": "text/event-stream; charset=utf-8",
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            }))
+            writer.write(_sse("start", {"conversation_id": conversation_id, "model": manager.current_model}))
+            await writer.drain()
+
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                # Send whatever else arrived meanwhile in the same event
+                parts = [chunk]
+                while not chunks.empty():
+                    parts.append(chunks.get_nowait())
+                ended = parts[-1] is None
+                writer.write(_sse("token", {"content": "".join(p for p in parts if p is not None)}))
+                await writer.drain()
+                if ended:
+                    break
+
+            writer.write(self._final_event(session))
+            await writer.drain()
+        except ConnectionError:
+            logger.info(f"Client left while streaming in {conversation_id}; stopping the reply")
+            await self._stop_reply(session)
+        except asyncio.CancelledError:
+            # The server is stopping
+            await self._stop_reply(session)
+            raise
+        finally:
+            self._schedule_indexing(manager)
+
+    @staticmethod
+    async def _stop_reply(session: ChatSession) -> None:
+        """Cancel a session's reply and wait until its partial text is saved"""
+        if session.task.done():
+            return
+        session.cancel_token.cancel()
+        session.task.cancel()
+        await asyncio.gather(session.task, return_exceptions=True)
+
+    @staticmethod
+    def _final_event(session: ChatSession) -> bytes:
+        """The event ending a finished reply's stream"""
+        task = session.task
+        if not task.cancelled() and task.exception() is not None:
+            return _sse("error", {"error": str(task.exception())})
+        message = None if task.cancelled() else task.result()
+        if message is not None and not message.incomplete:
+            return _sse("done", {"message": message.to_dict()})
+        # Cancelled: the partial reply, if any text arrived, was kept
+        messages = session.manager.get_messages()
+        partial = messages[-1] if messages and messages[-1].role == Role.ASSISTANT and messages[-1].incomplete else None
+        return _sse("cancelled", {"message": partial.to_dict() if partial is not None else None})
+
+    # Semantic index
+
+    def _schedule_indexing(self, manager: AsyncChatManager) -> None:
+        """Queue a conversation that just got a reply for semantic indexing"""
+        if self._index_executor is None or manager.current_conversation is None:
+            return
+        # Snapshot, since the conversation keeps changing while the update waits
+        conversation = manager.current_conversation
+        self._index_executor.submit(
+            self._run_indexing, self.semantic_search.index_conversation, conversation.id, list(conversation.messages)
+        )
+
+    @staticmethod
+    def _run_indexing(operation: Callable[..., Any], *args: Any) -> Any:
+        """Run an index update, logging failures (they only delay indexing until the next reply)"""
+        try:
+            return operation(*args)
+        except Exception as e:
+            logger.warning(f"Semantic indexing failed: {e}")
+            return 0
+
+
+async def serve(host: str, port: int, storage_dir: str = "conversations") -> None:
+    """Run the server configured by settings until cancelled"""
+    from ..bootstrap import create_client
+    from ..config.settings import settings
+
+    endpoints = settings.ollama_endpoints or [settings.ollama_base_url]
+    if len(endpoints) > 1:
+        # AsyncOllamaClient has no endpoint pool, scheduler or retries
+        logger.warning(f"The chat server streams from the first Ollama endpoint only ({endpoints[0]})")
+    client = AsyncOllamaClient(base_url=endpoints[0], max_connections=settings.server_max_ollama_connections)
+    # Searching embeds the query with the regular (synchronous) client, off the loop
+    search_client = create_client() if settings.semantic_search_enabled else None
+    server = ChatServer(
+        client,
+        storage_dir=storage_dir,
+        host=host,
+        port=port,
+        default_model=settings.default_model,
+        semantic_search=SemanticSearch(
+            search_client,
+            model=settings.embedding_model,
+            index_dir=settings.semantic_index_dir,
+            batch_size=settings.embedding_batch_size,
+            max_concurrency=settings.embedding_max_concurrency
+        ) if search_client is not None else None,
+        allowed_origins=settings.server_allowed_origins
+    )
+    try:
+        await server.start()
+        server.index_archive()
+        print(f"Serving on {server.url}", flush=True)
+        await server.serve_forever()
+    finally:
+        await server.stop()
+        await client.close()
+        if search_client is not None:
+            search_client.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point; returns the exit status"""
+    import argparse
+    from ..config.settings import settings
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.server",
+        description="Serve conversations and streaming chat over a local HTTP/SSE API"
+    )
+    parser.add_argument("--host", default=settings.server_host, help="interface to listen on")
+    parser.add_argument("--port", type=int, default=settings.server_port, help="port to listen on (0: any free port)")
+    parser.add_argument("--storage-dir", default="conversations", help="directory of the conversation files")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.storage_dir))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -5,7 +5,8 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
+from ..core.stats import GenerationStats
 from ..core.message import Conversation, Message, Role
 from ..utils.logger import setup_logger
 
@@ -51,16 +52,12 @@ class ConversationStorage:
                 "model": conversation.model,
                 "created_at": conversation.created_at.isoformat(),
                 "updated_at": datetime.now().isoformat(),
-                "messages": [
-                    {
-                        "id": msg.id,
-                        "role": msg.role.value,
-                        "content": msg.content,
-                        "timestamp": msg.timestamp.isoformat()
-                    }
-                    for msg in conversation.messages
-                ]
+                "messages": [msg.to_dict() for msg in conversation.messages]
             }
+            if conversation.comparison_id is not None:
+                data["comparison_id"] = conversation.comparison_id
+            if conversation.pending:
+                data["pending"] = [msg.to_dict() for msg in conversation.pending]
 
             # Write to file
             with open(file_path, 'w', encoding='utf-8') as f:
@@ -98,16 +95,13 @@ class ConversationStorage:
                 conversation_id=data["id"]
             )
             conversation.created_at = datetime.fromisoformat(data["created_at"])
+            conversation.comparison_id = data.get("comparison_id")
 
-            # Reconstruct messages
+            # Reconstruct messages, and those still queued for sending
             for msg_data in data["messages"]:
-                message = Message(
-                    role=Role(msg_data["role"]),
-                    content=msg_data["content"]
-                )
-                message.id = msg_data["id"]
-                message.timestamp = datetime.fromisoformat(msg_data["timestamp"])
-                conversation.messages.append(message)
+                conversation.messages.append(self._message_from_dict(msg_data))
+            for msg_data in data.get("pending", []):
+                conversation.pending.append(self._message_from_dict(msg_data))
 
             logger.info(f"Loaded conversation: {conversation_id}")
             return conversation
@@ -128,6 +122,7 @@ class ConversationStorage:
             - created_at: creation timestamp
             - updated_at: last update timestamp
             - message_count: number of messages
+            - comparison_id: comparison the conversation belongs to, or None
         """
         conversations = []
 
@@ -143,7 +138,8 @@ class ConversationStorage:
                         "model": data["model"],
                         "created_at": data["created_at"],
                         "updated_at": data.get("updated_at", data["created_at"]),
-                        "message_count": len(data.get("messages", []))
+                        "message_count": len(data.get("messages", [])),
+                        "comparison_id": data.get("comparison_id")
                     })
 
                 except Exception as e:
@@ -160,6 +156,95 @@ class ConversationStorage:
             logger.error(f"Failed to list conversations: {e}")
             return []
 
+    def list_generation_stats(self) -> List[Dict[str, Any]]:
+        """
+        Collect generation statistics from all saved conversations
+
+        Returns:
+            List of dictionaries, one per assistant message with stats:
+            - conversation_id: conversation the message belongs to
+            - model: model that produced the message
+            - history_length: number of messages sent as context
+            - stats: GenerationStats dictionary
+        """
+        rows = []
+
+        for file_path in self.storage_dir.glob("*.json"):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to read conversation file {file_path}: {e}")
+                continue
+
+            for index, msg_data in enumerate(data.get("messages", [])):
+                stats = msg_data.get("stats")
+                if not stats:
+                    continue
+                rows.append({
+                    "conversation_id": data["id"],
+                    "model": stats.get("model") or data["model"],
+                    "history_length": index,
+                    "stats": stats
+                })
+
+        return rows
+
+    def find_messages(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        Find saved messages containing every word of a query
+
+        A plain text search that works without embeddings; matching is
+        case-insensitive and the most recently updated conversations come
+        first.
+
+        Args:
+            query: Words to look for
+            limit: Maximum number of matches
+
+        Returns:
+            List of dictionaries, one per matching message:
+            - conversation_id: conversation the message belongs to
+            - title: title of that conversation
+            - message_id: ID of the message
+            - role: "user" or "assistant"
+            - snippet: text around the first matching word
+        """
+        words = query.lower().split()
+        if not words:
+            return []
+
+        conversations = []
+        for file_path in self.storage_dir.glob("*.json"):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to read conversation file {file_path}: {e}")
+                continue
+            conversations.append(data)
+        conversations.sort(key=lambda d: d.get("updated_at", d.get("created_at", "")), reverse=True)
+
+        matches = []
+        for data in conversations:
+            for msg_data in data.get("messages", []):
+                text = msg_data["content"].lower()
+                if not all(word in text for word in words):
+                    continue
+                start = max(text.index(words[0]) - 30, 0)
+                snippet = msg_data["content"][start:start + 80].replace('\n', ' ').strip()
+                matches.append({
+                    "conversation_id": data["id"],
+                    "title": data.get("title", "Untitled Conversation"),
+                    "message_id": msg_data["id"],
+                    "role": msg_data["role"],
+                    "snippet": ("..." if start else "") + snippet
+                })
+                if len(matches) >= limit:
+                    return matches
+
+        return matches
+
     def delete_conversation(self, conversation_id: str) -> bool:
         """
         Delete a conversation from disk
@@ -185,6 +270,20 @@ class ConversationStorage:
             logger.error(f"Failed to delete conversation {conversation_id}: {e}")
             return False
 
+    @staticmethod
+    def _message_from_dict(msg_data: Dict[str, Any]) -> Message:
+        """Rebuild a message saved with Message.to_dict()"""
+        message = Message(
+            role=Role(msg_data["role"]),
+            content=msg_data["content"]
+        )
+        message.id = msg_data["id"]
+        message.timestamp = datetime.fromisoformat(msg_data["timestamp"])
+        if msg_data.get("stats"):
+            message.stats = GenerationStats.from_dict(msg_data["stats"])
+        message.incomplete = msg_data.get("incomplete", False)
+        return message
+
     def _generate_title(self, conversation: Conversation) -> str:
         """
         Generate a title for the conversation from first user message
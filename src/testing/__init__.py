@@ -0,0 +1 @@
+# Testing utilities
@@ -0,0 +1,551 @@
+"""
+Local stand-in for the Ollama HTTP API, for offline tests and benchmarks
+
+Usage (standalone, e.g. to point the GUI or a benchmark at it):
+    python -m src.testing.fake_ollama_server [--port 11500] [--tokens-per-second 30]
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+# Builds the reply text from the request's model and messages
+Responder = Callable[[str, List[Dict[str, str]]], str]
+
+_TOKEN_RE = re.compile(r"\s*\S+|\s+")
+
+
+def split_tokens(text: str) -> List[str]:
+    """
+    Split text into pseudo-tokens (a word with its leading whitespace)
+
+    Args:
+        text: Reply text
+
+    Returns:
+        Pieces that concatenate back to text
+    """
+    return _TOKEN_RE.findall(text)
+
+
+def fake_embedding(text: str, dim: int = 64) -> List[float]:
+    """
+    Deterministic unit-length embedding of a text
+
+    Words are hashed into dimensions (the hashing trick), so texts that
+    share words get similar vectors, which is enough for search tests.
+
+    Args:
+        text: Text to embed
+        dim: Vector dimension
+
+    Returns:
+        Embedding vector
+    """
+    vector = [0.0] * dim
+    for word in re.findall(r"\w+", text.lower()):
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        vector[digest[0] % dim] += 1.0 if digest[1] % 2 else -1.0
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+def default_responder(model: str, messages: List[Dict[str, str]]) -> str:
+    """Reply that echoes the last message"""
+    last = messages[-1]["content"] if messages else ""
+    return f"This is {model} answering: {last}"
+
+
+@dataclass
+class FakeModel:
+    """
+    A model served by FakeOllamaServer, and how it behaves
+
+    Attributes:
+        name: Model name (e.g. "llama2:latest")
+        load_delay: Seconds before the first request after loading
+                    answers (before response headers, as in Ollama)
+        time_to_first_token: Seconds between the headers and the first chunk
+        tokens_per_second: Generation speed (None: as fast as possible)
+        chunk_tokens: Tokens per streamed chunk
+        responder: Builds the reply (default: echo the last message)
+        embedding_dim: Size of /api/embed vectors
+        context_length: Reported by /api/show
+        family: Reported by /api/show
+        parameter_size: Reported by /api/show
+        quantization_level: Reported by /api/show
+    """
+    name: str
+    load_delay: float = 0.0
+    time_to_first_token: float = 0.0
+    tokens_per_second: Optional[float] = None
+    chunk_tokens: int = 1
+    responder: Responder = default_responder
+    embedding_dim: int = 64
+    context_length: int = 4096
+    family: str = "llama"
+    parameter_size: str = "7B"
+    quantization_level: str = "Q4_0"
+
+
+@dataclass
+class RecordedRequest:
+    """A request received by the server"""
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]]
+    received_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Fault:
+    """An injected failure waiting for a matching request"""
+    path: Optional[str]
+    status: Optional[int] = None
+    message: str = "injected failure"
+    disconnect_after: Optional[int] = None
+    error_after: Optional[int] = None
+
+
+class FakeOllamaServer:
+    """
+    In-process HTTP server implementing the Ollama endpoints the app uses
+
+    Implements /api/tags, /api/ps, /api/show, /api/chat, /api/generate
+    and /api/embed with Ollama's response shapes: NDJSON streams with
+    chunked transfer encoding, final statistics, keep_alive residency
+    and 404s for unknown models.
+
+    Timing (load delay, time to first token, tokens per second, chunk
+    size) is set per model. Faults are injected per request with
+    fail_next(): an HTTP error status, a connection dropped mid-stream,
+    or an in-stream {"error": ...} line. Every request is recorded in
+    `requests`.
+
+    Usage:
+        with FakeOllamaServer([FakeModel("llama2", tokens_per_second=50)]) as server:
+            client = OllamaClient(base_url=server.url)
+    """
+
+    def __init__(self, models: Optional[List[FakeModel]] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server (call start() or use it as a context manager)
+
+        Args:
+            models: Models to serve (default: llama2 and nomic-embed-text)
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+        """
+        if models is None:
+            models = [FakeModel("llama2"), FakeModel("nomic-embed-text")]
+        self.models: Dict[str, FakeModel] = {}
+        for model in models:
+            self.add_model(model)
+        self.requests: List[RecordedRequest] = []
+        # Streams the client disconnected from before they finished
+        self.aborted_streams = 0
+        self._loaded: Dict[str, Optional[float]] = {}
+        self._faults: List[_Fault] = []
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        """Start serving on a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted"""
+        try:
+            self._httpd.serve_forever(0.05)
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket"""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def add_model(self, model: FakeModel) -> None:
+        """Serve another model (":latest" is optional in requests)"""
+        self.models[self._canonical(model.name)] = model
+
+    def set_loaded(self, model: str, loaded: bool = True) -> None:
+        """Mark a model as resident (skipping its load delay) or not"""
+        with self._lock:
+            if loaded:
+                self._loaded[self._canonical(model)] = None
+            else:
+                self._loaded.pop(self._canonical(model), None)
+
+    def loaded_models(self) -> List[str]:
+        """Names of models currently resident, dropping expired ones"""
+        now = time.monotonic()
+        with self._lock:
+            for name, expires_at in list(self._loaded.items()):
+                if expires_at is not None and expires_at <= now:
+                    del self._loaded[name]
+            return sorted(self._loaded)
+
+    def fail_next(
+        self,
+        path: Optional[str] = None,
+        status: Optional[int] = None,
+        message: str = "injected failure",
+        disconnect_after: Optional[int] = None,
+        error_after: Optional[int] = None
+    ) -> None:
+        """
+        Inject a failure into the next matching request
+
+        Exactly one of the failure kinds should be given. Calls queue up;
+        each matching request consumes one.
+
+        Args:
+            path: Only match this path (e.g. "/api/chat"; default: any)
+            status: Answer with this HTTP status and {"error": message}
+            message: Error text
+            disconnect_after: Drop the connection after this many chunks
+                              (no final chunk, no terminating zero-chunk)
+            error_after: Send {"error": message} after this many chunks
+        """
+        with self._lock:
+            self._faults.append(_Fault(path, status, message, disconnect_after, error_after))
+
+    def requests_to(self, path: str) -> List[RecordedRequest]:
+        """Recorded requests for one path"""
+        with self._lock:
+            return [r for r in self.requests if r.path == path]
+
+    def _record(self, request: RecordedRequest) -> Optional[_Fault]:
+        """Record a request and take the fault injected for it, if any"""
+        with self._lock:
+            self.requests.append(request)
+            for fault in self._faults:
+                if fault.path is None or fault.path == request.path:
+                    self._faults.remove(fault)
+                    return fault
+        return None
+
+    def _model(self, name: Optional[str]) -> Optional[FakeModel]:
+        """Look up a served model"""
+        return self.models.get(self._canonical(name)) if name else None
+
+    def _load(self, model: FakeModel, keep_alive: Any) -> float:
+        """Make a model resident, sleeping its load delay if it was not; returns the delay"""
+        name = self._canonical(model.name)
+        delay = 0.0 if name in self.loaded_models() else model.load_delay
+        if delay:
+            time.sleep(delay)
+        seconds = _keep_alive_seconds(keep_alive)
+        with self._lock:
+            if seconds == 0:
+                self._loaded.pop(name, None)
+            else:
+                self._loaded[name] = None if seconds is None else time.monotonic() + seconds
+        return delay
+
+    @staticmethod
+    def _canonical(name: str) -> str:
+        """Model name with an explicit tag"""
+        return name if ":" in name else f"{name}:latest"
+
+
+def _keep_alive_seconds(keep_alive: Any) -> Optional[float]:
+    """Convert an Ollama keep_alive value to seconds (None: forever)"""
+    if keep_alive is None:
+        return 300.0
+    if isinstance(keep_alive, (int, float)):
+        return None if keep_alive < 0 else float(keep_alive)
+    match = re.fullmatch(r"(-?\d+(?:\.\d+)?)([smh]?)", str(keep_alive).strip())
+    if not match:
+        return 300.0
+    value = float(match.group(1))
+    if value < 0:
+        return None
+    return value * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """Threaded server that accepts bursts of connections (load tests)"""
+    daemon_threads = True
+    # The default backlog of 5 resets connections beyond a few dozen at once
+    request_queue_size = 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler of FakeOllamaServer"""
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def fake(self) -> FakeOllamaServer:
+        return self.server.fake
+
+    def do_GET(self):
+        fault = self.fake._record(RecordedRequest("GET", self.path, None))
+        if fault is not None and fault.status is not None:
+            self._send_json(fault.status, {"error": fault.message})
+        elif self.path == "/api/tags":
+            self._send_json(200, {"models": [self._model_entry(m) for m in self.fake.models.values()]})
+        elif self.path == "/api/ps":
+            self._send_json(200, {"models": [self._model_entry(self.fake.models[n]) for n in self.fake.loaded_models()]})
+        elif self.path in ("/", "/api/version"):
+            self._send_json(200, {"version": "0.0.0-fake"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+        fault = self.fake._record(RecordedRequest("POST", self.path, body))
+        if fault is not None and fault.status is not None:
+            self._send_json(fault.status, {"error": fault.message})
+            return
+
+        model = self.fake._model(body.get("model"))
+        if self.path not in ("/api/chat", "/api/generate", "/api/embed", "/api/show"):
+            self._send_json(404, {"error": "not found"})
+        elif model is None:
+            self._send_json(404, {"error": f"model '{body.get('model')}' not found"})
+        elif self.path == "/api/show":
+            self._send_json(200, self._show(model))
+        elif self.path == "/api/embed":
+            self._embed(model, body)
+        else:
+            self._generate(model, body, fault)
+
+    def _generate(self, model: FakeModel, body: Dict[str, Any], fault: Optional[_Fault]) -> None:
+        """Answer /api/chat or /api/generate"""
+        started = time.perf_counter()
+        load_delay = self.fake._load(model, body.get("keep_alive"))
+        is_chat = self.path == "/api/chat"
+        if is_chat:
+            messages = body.get("messages") or []
+        else:
+            messages = [{"role": "user", "content": body.get("prompt", "")}] if body.get("prompt") else []
+
+        if not messages:
+            # An empty request only loads (or with keep_alive 0, unloads) the model
+            final = {"model": body["model"], "created_at": _now(), "done": True, "done_reason": "load"}
+            final["message" if is_chat else "response"] = {"role": "assistant", "content": ""} if is_chat else ""
+            self._send_json(200, final)
+            return
+
+        tokens = split_tokens(model.responder(body["model"], messages))
+        num_predict = (body.get("options") or {}).get("num_predict")
+        if num_predict is not None and num_predict >= 0:
+            tokens = tokens[:num_predict]
+        prompt_tokens = sum(len(split_tokens(m.get("content", ""))) for m in messages)
+        chunks = ["".join(tokens[i:i + model.chunk_tokens]) for i in range(0, len(tokens), model.chunk_tokens)]
+
+        def piece(content: str) -> Dict[str, Any]:
+            data = {"model": body["model"], "created_at": _now(), "done": False}
+            if is_chat:
+                data["message"] = {"role": "assistant", "content": content}
+            else:
+                data["response"] = content
+            return data
+
+        eval_started = time.perf_counter()
+        if not body.get("stream", True):
+            self._pace(model, len(tokens), first=True)
+            final = piece("".join(chunks))
+            final.update(self._stats(started, load_delay, eval_started, prompt_tokens, len(tokens)))
+            self._send_json(200, final)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for index, content in enumerate(chunks):
+                if fault is not None and fault.disconnect_after == index:
+                    self._drop_connection()
+                    return
+                if fault is not None and fault.error_after == index:
+                    self._write_line({"error": fault.message})
+                    self.wfile.write(b"0\r\n\r\n")
+                    return
+                self._pace(model, model.chunk_tokens, first=index == 0)
+                self._write_line(piece(content))
+
+            if fault is not None and fault.disconnect_after is not None:
+                self._drop_connection()
+                return
+            final = piece("")
+            final.update(self._stats(started, load_delay, eval_started, prompt_tokens, len(tokens)))
+            self._write_line(final)
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except OSError:
+            # The client went away (cancelled or timed out)
+            with self.fake._lock:
+                self.fake.aborted_streams += 1
+            self.close_connection = True
+
+    def _embed(self, model: FakeModel, body: Dict[str, Any]) -> None:
+        """Answer /api/embed"""
+        started = time.perf_counter()
+        self.fake._load(model, body.get("keep_alive"))
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        self._send_json(200, {
+            "model": body["model"],
+            "embeddings": [fake_embedding(text, model.embedding_dim) for text in texts],
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "prompt_eval_count": sum(len(split_tokens(text)) for text in texts),
+        })
+
+    @staticmethod
+    def _show(model: FakeModel) -> Dict[str, Any]:
+        """Body of /api/show"""
+        return {
+            "modelfile": f"FROM {model.name}",
+            "parameters": "",
+            "template": "{{ .Prompt }}",
+            "details": {
+                "format": "gguf",
+                "family": model.family,
+                "parameter_size": model.parameter_size,
+                "quantization_level": model.quantization_level,
+            },
+            "model_info": {f"{model.family}.context_length": model.context_length},
+        }
+
+    @staticmethod
+    def _model_entry(model: FakeModel) -> Dict[str, Any]:
+        """Entry of /api/tags and /api/ps"""
+        return {
+            "name": FakeOllamaServer._canonical(model.name),
+            "model": FakeOllamaServer._canonical(model.name),
+            "size": 0,
+            "details": {"family": model.family, "parameter_size": model.parameter_size},
+        }
+
+    @staticmethod
+    def _stats(started: float, load_delay: float, eval_started: float, prompt_tokens: int, eval_tokens: int) -> Dict[str, Any]:
+        """Final statistics fields, in nanoseconds"""
+        now = time.perf_counter()
+        return {
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((now - started) * 1e9),
+            "load_duration": int(load_delay * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(max(0.0, eval_started - started - load_delay) * 1e9),
+            "eval_count": eval_tokens,
+            "eval_duration": int((now - eval_started) * 1e9),
+        }
+
+    @staticmethod
+    def _pace(model: FakeModel, tokens: int, first: bool) -> None:
+        """Sleep to simulate time to first token and generation speed"""
+        delay = model.time_to_first_token if first else 0.0
+        if model.tokens_per_second:
+            delay += tokens / model.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+    def _write_line(self, data: Dict[str, Any]) -> None:
+        """Send one NDJSON line as an HTTP chunk"""
+        line = (json.dumps(data) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _drop_connection(self) -> None:
+        """Close the socket without finishing the response"""
+        self.close_connection = True
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+        """Send a complete JSON response"""
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _now() -> str:
+    """Timestamp in Ollama's created_at format"""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def main() -> None:
+    """Serve fake models until interrupted, printing the URL on the first line"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Ollama API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500, help="0 picks a free port")
+    parser.add_argument("--model", action="append", help="model to serve (repeatable; default: llama2)")
+    parser.add_argument("--load-delay", type=float, default=0.0)
+    parser.add_argument("--time-to-first-token", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="default: unlimited")
+    parser.add_argument("--chunk-tokens", type=int, default=1)
+    parser.add_argument("--reply-tokens", type=int, default=None,
+                        help="answer with this many tokens (default: echo the last message)")
+    args = parser.parse_args()
+
+    responder = default_responder
+    if args.reply_tokens is not None:
+        reply = "".join(f" word{i % 100}" for i in range(args.reply_tokens))
+        responder = lambda model, messages: reply
+    models = [
+        FakeModel(
+            name,
+            load_delay=args.load_delay,
+            time_to_first_token=args.time_to_first_token,
+            tokens_per_second=args.tokens_per_second,
+            chunk_tokens=args.chunk_tokens,
+            responder=responder
+        )
+        for name in (args.model or ["llama2"])
+    ]
+    server = FakeOllamaServer(models, host=args.host, port=args.port)
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
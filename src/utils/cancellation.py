@@ -0,0 +1,82 @@
+"""
+Cancellation token for stopping in-flight work from another thread
+"""
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class CancellationToken:
+    """
+    Thread-safe flag used to request cancellation of an operation
+
+    Long-running operations poll `cancelled` and/or register callbacks
+    that actively interrupt blocking work (e.g. closing a network
+    connection) as soon as cancel() is called.
+    """
+
+    def __init__(self):
+        """Initialize a token in the non-cancelled state"""
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.cancel_requested_at: Optional[float] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called"""
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Request cancellation and run registered callbacks (once)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.cancel_requested_at = time.perf_counter()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                # Interrupting work is best-effort; the flag is already set
+                pass
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Register a callback to run when cancellation is requested
+
+        If the token is already cancelled the callback runs immediately.
+
+        Args:
+            callback: Function taking no arguments
+
+        Returns:
+            Function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+
+        callback()
+        return lambda: None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until cancellation is requested or the timeout expires
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if cancelled
+        """
+        return self._event.wait(timeout)
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        """Remove a previously registered callback"""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
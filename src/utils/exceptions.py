@@ -16,3 +16,18 @@ class ModelNotFoundError(Exception):
 class ChatError(Exception):
     """Base exception for chat-related errors"""
     pass
+
+
+class ConversationBusyError(ChatError):
+    """Raised when a message is sent to a conversation still generating a response"""
+    pass
+
+
+class CircuitOpenError(OllamaConnectionError):
+    """Raised when requests are refused because the Ollama server is considered down"""
+    pass
+
+
+class RequestCancelledError(Exception):
+    """Raised when a request is cancelled before it was sent (e.g. while queued)"""
+    pass
@@ -4,6 +4,9 @@ Logging configuration for the application
 import logging
 from pathlib import Path
 
+# Level of the console handler of every logger (see set_console_level)
+_console_level = logging.INFO
+
 
 def setup_logger(name: str, log_file: str, level: str = "INFO") -> logging.Logger:
     """
@@ -28,9 +31,9 @@ def setup_logger(name: str, log_file: str, level: str = "INFO") -> logging.Logge
     file_handler = logging.FileHandler(log_file)
     file_handler.setLevel(logging.DEBUG)
 
-    # Console handler - logs INFO and above
+    # Console handler - logs INFO and above (unless set_console_level changed it)
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(_console_level)
 
     # Formatter
     formatter = logging.Formatter(
@@ -45,3 +48,22 @@ def setup_logger(name: str, log_file: str, level: str = "INFO") -> logging.Logge
     logger.addHandler(console_handler)
 
     return logger
+
+
+def set_console_level(level: str) -> None:
+    """
+    Change the console level of all loggers, including ones set up later
+
+    Front-ends that own the terminal use this to keep log lines out of
+    their output; log files still get everything.
+
+    Args:
+        level: Logging level (DEBUG, INFO, WARNING, ERROR)
+    """
+    global _console_level
+    _console_level = getattr(logging, level.upper())
+    for logger in logging.Logger.manager.loggerDict.values():
+        for handler in getattr(logger, "handlers", []):
+            # FileHandler is a StreamHandler subclass; only change the console ones
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(_console_level)
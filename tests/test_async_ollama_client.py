@@ -0,0 +1,286 @@
+"""
+Unit tests for AsyncOllamaClient and AsyncChatManager
+"""
+import asyncio
+import json
+import threading
+import httpx
+import pytest
+from src.api.async_ollama_client import AsyncOllamaClient
+from src.core.async_chat_manager import AsyncChatManager
+from src.core.message import Message, Role
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+from src.utils.cancellation import CancellationToken
+from src.utils.exceptions import OllamaConnectionError
+
+
+def make_chat_body(*chunks):
+    """Build an NDJSON /api/chat streaming body from content chunks"""
+    lines = [json.dumps({"message": {"content": c}, "done": False}) for c in chunks]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def make_transport(chunks=("Hello", " ", "World"), models=("llama2", "mistral")):
+    """Create a mock transport answering /api/tags and /api/chat"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": m} for m in models]})
+        if request.url.path == "/api/chat":
+            return httpx.Response(200, content=make_chat_body(*chunks))
+        return httpx.Response(404)
+
+    transport = httpx.MockTransport(handler)
+    transport.requests = requests
+    return transport
+
+
+class TestAsyncOllamaClient:
+    """Test cases for AsyncOllamaClient class"""
+
+    def test_initialization_strips_trailing_slash(self):
+        """Test that trailing slash is removed from base_url"""
+        client = AsyncOllamaClient(base_url="http://localhost:11434/")
+        assert client.base_url == "http://localhost:11434"
+
+    def test_check_connection_success(self):
+        """Test successful connection check"""
+        client = AsyncOllamaClient(transport=make_transport())
+        assert asyncio.run(client.check_connection()) is True
+
+    def test_check_connection_failure(self):
+        """Test connection check failure"""
+        def handler(request):
+            raise httpx.ConnectError("Connection refused")
+
+        client = AsyncOllamaClient(transport=httpx.MockTransport(handler))
+        assert asyncio.run(client.check_connection()) is False
+
+    def test_list_models(self):
+        """Test successful model listing"""
+        client = AsyncOllamaClient(transport=make_transport())
+        assert asyncio.run(client.list_models()) == ["llama2", "mistral"]
+
+    def test_list_models_http_error(self):
+        """Test list_models raises exception on HTTP error"""
+        client = AsyncOllamaClient(transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+
+        with pytest.raises(OllamaConnectionError, match="Failed to list models"):
+            asyncio.run(client.list_models())
+
+    def test_generate_stream(self):
+        """Test async streaming yields non-empty content chunks"""
+        transport = make_transport(chunks=("Hello", "", "World"))
+        client = AsyncOllamaClient(transport=transport)
+
+        async def collect():
+            return [c async for c in client.generate_stream("llama2", [{"role": "user", "content": "Hi"}])]
+
+        assert asyncio.run(collect()) == ["Hello", "World"]
+        payload = json.loads(transport.requests[0].content)
+        assert payload["model"] == "llama2"
+        assert payload["stream"] is True
+
+    def test_generate_stream_http_error(self):
+        """Test generate_stream raises exception on HTTP error"""
+        client = AsyncOllamaClient(transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+
+        async def collect():
+            return [c async for c in client.generate_stream("llama2", [])]
+
+        with pytest.raises(OllamaConnectionError, match="Streaming failed"):
+            asyncio.run(collect())
+
+    def test_concurrent_streams_share_client(self):
+        """Test many streams run concurrently on one event loop"""
+        transport = make_transport(chunks=("a", "b", "c"))
+        client = AsyncOllamaClient(transport=transport)
+
+        async def collect():
+            return "".join([c async for c in client.generate_stream("llama2", [])])
+
+        async def run_all():
+            results = await asyncio.gather(*(collect() for _ in range(25)))
+            await client.close()
+            return results
+
+        assert asyncio.run(run_all()) == ["abc"] * 25
+        assert len(transport.requests) == 25
+
+
+class TestAsyncChatManager:
+    """Test cases for AsyncChatManager class"""
+
+    def test_send_message(self, tmp_path):
+        """Test async send adds user and assistant messages"""
+        client = AsyncOllamaClient(transport=make_transport())
+        manager = AsyncChatManager(client, storage_dir=str(tmp_path))
+        manager.start_new_conversation()
+
+        chunks = []
+        asyncio.run(manager.send_message("Hi", chunks.append))
+
+        messages = manager.get_messages()
+        assert chunks == ["Hello", " ", "World"]
+        assert [m.role for m in messages] == [Role.USER, Role.ASSISTANT]
+        assert messages[1].content == "Hello World"
+        assert manager.storage.conversation_exists(manager.get_current_conversation_id())
+
+    def test_save_runs_off_the_loop(self, tmp_path):
+        """Test the finished turn is saved on a worker thread, not the event loop"""
+        client = AsyncOllamaClient(transport=make_transport())
+        manager = AsyncChatManager(client, storage_dir=str(tmp_path))
+        manager.start_new_conversation()
+        save = manager.storage.save_conversation
+        save_threads = []
+
+        def recording_save(conversation):
+            save_threads.append(threading.get_ident())
+            return save(conversation)
+        manager.storage.save_conversation = recording_save
+
+        async def run():
+            await manager.send_message("Hi", lambda chunk: None)
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        assert save_threads and loop_thread not in save_threads
+
+    def test_concurrent_managers(self, tmp_path):
+        """Test several managers stream concurrently over one client"""
+        client = AsyncOllamaClient(transport=make_transport(chunks=("ok",)))
+        managers = [AsyncChatManager(client, storage_dir=str(tmp_path)) for _ in range(5)]
+        for manager in managers:
+            manager.start_new_conversation()
+
+        async def run_all():
+            await asyncio.gather(*(m.send_message(f"Q{i}", lambda c: None) for i, m in enumerate(managers)))
+
+        asyncio.run(run_all())
+
+        for i, manager in enumerate(managers):
+            assert [m.content for m in manager.get_messages()] == [f"Q{i}", "ok"]
+
+    def test_cancel_token_keeps_partial_response(self, tmp_path):
+        """Test a cancelled token stops the stream and keeps the text so far"""
+        client = AsyncOllamaClient(transport=make_transport(chunks=("one", "two", "three")))
+        manager = AsyncChatManager(client, storage_dir=str(tmp_path))
+        token = CancellationToken()
+
+        def on_chunk(chunk):
+            token.cancel()
+
+        reply = asyncio.run(manager.send_message("Hi", on_chunk, cancel_token=token))
+
+        assert reply.content == "one"
+        assert reply.incomplete
+        assert not manager.is_generating()
+
+    def test_cancelled_task_keeps_partial_response(self, tmp_path):
+        """Test cancelling the task closes the stream and saves the partial reply"""
+        with FakeOllamaServer([FakeModel("llama2", tokens_per_second=50)]) as server:
+            client = AsyncOllamaClient(base_url=server.url)
+            manager = AsyncChatManager(client, storage_dir=str(tmp_path))
+            manager.start_new_conversation()
+            chunks = []
+
+            async def run():
+                task = asyncio.ensure_future(manager.send_message("Hi", chunks.append))
+                while not chunks:
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+                await client.close()
+
+            asyncio.run(run())
+
+        reply = manager.get_messages()[-1]
+        assert reply.incomplete
+        assert reply.content == "".join(chunks)
+        saved = manager.storage.load_conversation(manager.get_current_conversation_id())
+        assert saved.messages[-1].incomplete
+
+
+    def test_send_to_conversation_by_id(self, tmp_path):
+        """Test send_message can target a saved conversation that is not current"""
+        client = AsyncOllamaClient(transport=make_transport(chunks=("ok",)))
+        manager = AsyncChatManager(client, storage_dir=str(tmp_path))
+        manager.start_new_conversation()
+        first_id = manager.get_current_conversation_id()
+        asyncio.run(manager.send_message("Q1", lambda chunk: None))
+        manager.start_new_conversation()
+
+        asyncio.run(manager.send_message("Q2", lambda chunk: None, conversation_id=first_id))
+
+        saved = manager.storage.load_conversation(first_id)
+        assert [m.content for m in saved.messages] == ["Q1", "ok", "Q2", "ok"]
+        assert manager.get_messages() == []
+
+    def test_queued_messages_sent_after_reply(self, tmp_path):
+        """Test messages queued while generating are sent once the reply completes"""
+        with FakeOllamaServer([FakeModel("llama2", tokens_per_second=50)]) as server:
+            client = AsyncOllamaClient(base_url=server.url)
+            manager = AsyncChatManager(client, storage_dir=str(tmp_path))
+            manager.start_new_conversation()
+            chunks = []
+
+            async def run():
+                task = asyncio.ensure_future(manager.send_message("one", chunks.append))
+                while not chunks:
+                    await asyncio.sleep(0.01)
+                assert await manager.queue_message("two", chunks.append) is None
+                assert [m.content for m in manager.get_queued_messages()] == ["two"]
+                reply = await task
+                await client.close()
+                return reply
+
+            reply = asyncio.run(run())
+
+        assert reply.content.endswith("one")
+        assert [m.content.split()[-1] for m in manager.get_messages()] == ["one", "one", "two", "two"]
+        assert manager.get_queued_messages() == []
+        assert not manager.is_generating()
+
+    def test_resume_restored_queue(self, tmp_path):
+        """Test a queue restored from storage is sent by resume_queue()"""
+        client = AsyncOllamaClient(transport=make_transport(chunks=("ok",)))
+        manager = AsyncChatManager(client, storage_dir=str(tmp_path))
+        manager.start_new_conversation()
+        manager.current_conversation.pending.append(Message(role=Role.USER, content="later"))
+        manager.storage.save_conversation(manager.current_conversation)
+        conversation_id = manager.get_current_conversation_id()
+
+        restarted = AsyncChatManager(client, storage_dir=str(tmp_path))
+        assert restarted.load_conversation(conversation_id)
+        assert not restarted.is_generating()
+        reply = asyncio.run(restarted.resume_queue(lambda chunk: None))
+
+        assert reply.content == "ok"
+        assert [m.content for m in restarted.get_messages()] == ["later", "ok"]
+        assert asyncio.run(restarted.resume_queue(lambda chunk: None)) is None
+
+    def test_sync_only_features_refused(self, tmp_path):
+        """Test ChatManager features that need the sync client raise TypeError"""
+        manager = AsyncChatManager(AsyncOllamaClient(transport=make_transport()), storage_dir=str(tmp_path))
+        manager.start_new_conversation()
+
+        for call in (
+            lambda: manager.send_async("Hi"),
+            lambda: manager.compare_models("Hi", ["llama2"], lambda model, chunk: None),
+            lambda: manager.warm_up_model("llama2"),
+            lambda: manager.prefill_conversation(),
+            lambda: manager.add_queue_listener(lambda handle: None),
+            lambda: manager.model_catalog.get_models(),
+        ):
+            with pytest.raises(TypeError):
+                call()
+        assert manager.get_model_state("llama2") == "cold"
+        assert manager.model_catalog.get_model_info("llama2") is None
+
+
+# Run tests with: pytest tests/test_async_ollama_client.py -v
@@ -0,0 +1,185 @@
+"""
+Unit tests for the headless batch runner
+"""
+import json
+import subprocess
+import sys
+import pytest
+from src.batch import BatchJob, load_jobs, main, read_checkpoint
+from src.config.settings import settings
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+
+
+def write_jsonl(path, records):
+    """Write records as JSONL"""
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+def read_jsonl(path):
+    """Read a JSONL file"""
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.fixture
+def server():
+    """Fake server with two models"""
+    with FakeOllamaServer([FakeModel("llama2"), FakeModel("mistral")]) as fake:
+        yield fake
+
+
+@pytest.fixture
+def prompts(tmp_path):
+    """Input file with a prompt, a conversation and a line without id"""
+    path = tmp_path / "prompts.jsonl"
+    write_jsonl(path, [
+        {"id": "hello", "prompt": "Hello"},
+        {"id": "chat", "messages": [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hey"},
+                                     {"role": "user", "content": "Bye"}]},
+        {"prompt": "Third"},
+    ])
+    return path
+
+
+class TestLoadJobs:
+    """Test cases for load_jobs"""
+
+    def test_expands_lines_and_models(self, prompts):
+        """Test every line runs against every model"""
+        jobs = load_jobs(str(prompts), ["llama2", "mistral"], {"temperature": 0})
+
+        assert [(job.id, job.model) for job in jobs] == [
+            ("hello", "llama2"), ("hello", "mistral"), ("chat", "llama2"),
+            ("chat", "mistral"), ("3", "llama2"), ("3", "mistral"),
+        ]
+        assert jobs[0].messages == [{"role": "user", "content": "Hello"}]
+        assert len(jobs[2].messages) == 3
+        assert jobs[0].options == {"temperature": 0}
+
+    def test_line_overrides(self, tmp_path):
+        """Test a line's own model and options take precedence"""
+        path = tmp_path / "in.jsonl"
+        write_jsonl(path, [{"prompt": "x", "model": "phi", "options": {"temperature": 1, "seed": 3}}])
+
+        (job,) = load_jobs(str(path), ["llama2"], {"temperature": 0})
+
+        assert job.model == "phi"
+        assert job.options == {"temperature": 1, "seed": 3}
+
+    def test_invalid_lines(self, tmp_path):
+        """Test malformed input is reported with its line number"""
+        path = tmp_path / "in.jsonl"
+        path.write_text('{"prompt": "ok"}\n{"nothing": 1}\n')
+        with pytest.raises(ValueError, match=":2:"):
+            load_jobs(str(path), ["llama2"])
+
+    def test_null_or_invalid_options(self, tmp_path):
+        """Test null options are ignored and non-object options reported with their line"""
+        path = tmp_path / "in.jsonl"
+        write_jsonl(path, [{"prompt": "x", "options": None}])
+        assert load_jobs(str(path), ["llama2"])[0].options is None
+
+        write_jsonl(path, [{"prompt": "x"}, {"prompt": "y", "options": [1]}])
+        with pytest.raises(ValueError, match=":2:"):
+            load_jobs(str(path), ["llama2"])
+
+
+class TestCheckpoint:
+    """Test cases for read_checkpoint"""
+
+    def test_truncates_partial_line(self, tmp_path):
+        """Test a line cut off by a kill is dropped"""
+        path = tmp_path / "out.jsonl"
+        path.write_text('{"id": "a", "model": "m", "error": null}\n{"id": "b", "mod')
+
+        assert read_checkpoint(path) == {BatchJob("a", "m", []).key}
+        assert path.read_text().endswith("}\n")
+
+    def test_retry_failed(self, tmp_path):
+        """Test failed jobs are only skipped unless retried"""
+        path = tmp_path / "out.jsonl"
+        write_jsonl(path, [{"id": "a", "model": "m", "error": None}, {"id": "b", "model": "m", "error": "boom"}])
+
+        assert len(read_checkpoint(path)) == 2
+        assert read_checkpoint(path, retry_failed=True) == {"a\tm"}
+
+    def test_lines_without_keys_skipped(self, tmp_path):
+        """Test hand-edited lines without id or model are ignored"""
+        path = tmp_path / "out.jsonl"
+        write_jsonl(path, [{"model": "m"}, {"id": "a", "model": "m"}, {"id": "b"}, ["a", "m"]])
+
+        assert read_checkpoint(path) == {"a\tm"}
+
+
+class TestBatchMain:
+    """Test cases for the command line"""
+
+    def test_runs_and_resumes(self, server, prompts, tmp_path, capsys):
+        """Test results stream to the output and a rerun skips finished jobs"""
+        output = tmp_path / "out.jsonl"
+        args = [str(prompts), "-o", str(output), "-m", "llama2", "-m", "mistral", "-c", "3", "--url", server.url]
+
+        assert main(args) == 0
+        results = read_jsonl(output)
+        assert len(results) == 6
+        by_key = {(r["id"], r["model"]): r for r in results}
+        assert by_key[("hello", "mistral")]["response"] == "This is mistral answering: Hello"
+        assert by_key[("chat", "llama2")]["stats"]["eval_count"] > 0
+        err = capsys.readouterr().err
+        summary = json.loads(err[err.index("{\n"):])
+        assert summary["jobs"] == 6
+        assert summary["tokens"] > 0
+
+        requests_before = len(server.requests_to("/api/chat"))
+        assert main(args) == 0
+        assert len(read_jsonl(output)) == 6
+        assert len(server.requests_to("/api/chat")) == requests_before
+
+    def test_failed_jobs_retried(self, server, prompts, tmp_path):
+        """Test a failure is recorded, and --retry-failed runs it again"""
+        output = tmp_path / "out.jsonl"
+        args = [str(prompts), "-o", str(output), "-c", "1", "--url", server.url, "-q"]
+        server.fail_next("/api/chat", status=500, message="out of memory")
+
+        assert main(args) == 1
+        assert [bool(r["error"]) for r in read_jsonl(output)] == [True, False, False]
+
+        assert main(args + ["--retry-failed"]) == 0
+        results = read_jsonl(output)
+        assert len(results) == 4
+        assert results[-1]["id"] == "hello" and results[-1]["error"] is None
+
+    def test_restart(self, server, prompts, tmp_path):
+        """Test --restart discards previous results"""
+        output = tmp_path / "out.jsonl"
+        args = [str(prompts), "-o", str(output), "--url", server.url, "-q"]
+        main(args)
+
+        main(args + ["--restart"])
+
+        assert len(read_jsonl(output)) == 3
+
+    def test_uses_configured_response_cache(self, server, prompts, tmp_path, monkeypatch):
+        """Test batch runs share the app's client settings, including the response cache"""
+        monkeypatch.setattr(settings, "response_cache_enabled", True)
+        monkeypatch.setattr(settings, "response_cache_dir", str(tmp_path / "responses"))
+        args = [str(prompts), "-o", str(tmp_path / "out.jsonl"), "--url", server.url, "-q",
+                "--options", '{"temperature": 0}']
+        assert main(args) == 0
+        requests_before = len(server.requests_to("/api/chat"))
+
+        assert main(args + ["--restart"]) == 0
+
+        assert len(server.requests_to("/api/chat")) == requests_before
+        assert len(read_jsonl(tmp_path / "out.jsonl")) == 3
+
+    def test_bad_input(self, tmp_path):
+        """Test unreadable input exits with status 2"""
+        assert main([str(tmp_path / "missing.jsonl"), "-o", str(tmp_path / "out.jsonl")]) == 2
+
+    def test_imports_no_tk(self):
+        """Test the batch runner works without Tk"""
+        code = "import sys, src.batch; sys.exit('tkinter' in sys.modules)"
+        assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+# Run tests with: pytest tests/test_batch.py -v
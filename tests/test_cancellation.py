@@ -0,0 +1,63 @@
+"""
+Unit tests for CancellationToken class
+"""
+import threading
+from src.utils.cancellation import CancellationToken
+
+
+class TestCancellationToken:
+    """Test cases for CancellationToken class"""
+
+    def test_initial_state(self):
+        """Test a new token is not cancelled"""
+        token = CancellationToken()
+        assert token.cancelled is False
+        assert token.cancel_requested_at is None
+
+    def test_cancel_runs_callbacks_once(self):
+        """Test callbacks run once on the first cancel"""
+        token = CancellationToken()
+        calls = []
+        token.register(lambda: calls.append(1))
+
+        token.cancel()
+        token.cancel()
+
+        assert token.cancelled is True
+        assert token.cancel_requested_at is not None
+        assert calls == [1]
+
+    def test_register_after_cancel_runs_immediately(self):
+        """Test registering on a cancelled token calls back at once"""
+        token = CancellationToken()
+        token.cancel()
+        calls = []
+        token.register(lambda: calls.append(1))
+        assert calls == [1]
+
+    def test_unregister(self):
+        """Test unregistered callbacks are not called"""
+        token = CancellationToken()
+        calls = []
+        unregister = token.register(lambda: calls.append(1))
+        unregister()
+        token.cancel()
+        assert calls == []
+
+    def test_callback_errors_are_ignored(self):
+        """Test a failing callback does not prevent others"""
+        token = CancellationToken()
+        calls = []
+        token.register(lambda: 1 / 0)
+        token.register(lambda: calls.append(1))
+        token.cancel()
+        assert calls == [1]
+
+    def test_wait(self):
+        """Test wait returns once cancelled from another thread"""
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+        assert token.wait(timeout=5) is True
+
+
+# Run tests with: pytest tests/test_cancellation.py -v
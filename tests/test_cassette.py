@@ -0,0 +1,157 @@
+"""
+Unit tests for cassette recording and replay
+"""
+import time
+import httpx
+import pytest
+from src.api.cassette import (
+    Cassette, CassetteMissError, RecordingTransport, ReplayTransport, load_cassettes, request_key
+)
+from src.api.ollama_client import OllamaClient
+from src.api.stream_events import DoneEvent, TokenEvent
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+from src.utils.cancellation import CancellationToken
+
+MESSAGES = [{"role": "user", "content": "Hello there"}]
+
+
+@pytest.fixture
+def server():
+    """Fake server streaming at 100 tokens per second"""
+    with FakeOllamaServer([FakeModel("llama2", time_to_first_token=0.05, tokens_per_second=100)]) as fake:
+        yield fake
+
+
+@pytest.fixture
+def recorded(server, tmp_path):
+    """Directory holding one cassette recorded from the fake server"""
+    client = OllamaClient(base_url=server.url, record_dir=str(tmp_path / "cassettes"))
+    list(client.generate_events("llama2", MESSAGES))
+    client.close()
+    return tmp_path / "cassettes"
+
+
+def replay_client(cassettes, **kwargs):
+    """OllamaClient answered by a ReplayTransport"""
+    return OllamaClient(base_url="http://ollama:11434", transport=ReplayTransport(cassettes, **kwargs))
+
+
+class TestCassette:
+    """Test cases for Cassette class"""
+
+    def test_round_trip(self, tmp_path):
+        """Test text and split multi-byte chunks survive saving"""
+        cassette = Cassette("POST", "/api/chat", {"model": "llama2"}, 200, {"content-type": "application/x-ndjson"},
+                            headers_at=0.1, chunks=[(0.2, b'{"a": "\xc3'), (0.3, b'\xa9"}\n')])
+        cassette.save(tmp_path / "c.json")
+
+        loaded = Cassette.load(tmp_path / "c.json")
+
+        assert loaded.chunks == cassette.chunks
+        assert loaded.key == cassette.key
+        assert loaded.duration == 0.3
+
+    def test_request_key_ignores_keep_alive(self):
+        """Test keep_alive does not change the key but the messages do"""
+        body = {"model": "llama2", "messages": MESSAGES}
+        assert request_key("POST", "/api/chat", body) == request_key("POST", "/api/chat", {**body, "keep_alive": "5m"})
+        assert request_key("POST", "/api/chat", body) != request_key("POST", "/api/chat", {**body, "messages": []})
+
+    def test_load_skips_unreadable(self, recorded):
+        """Test broken files are skipped"""
+        (recorded / "broken.json").write_text("{")
+        assert len(load_cassettes(str(recorded))) == 1
+
+
+class TestRecording:
+    """Test cases for recording through OllamaClient"""
+
+    def test_records_chunks_with_timing(self, recorded):
+        """Test a completed stream is saved with increasing chunk times"""
+        cassettes = load_cassettes(str(recorded))
+
+        assert len(cassettes) == 1
+        cassette = cassettes[0]
+        assert cassette.path == "/api/chat"
+        assert cassette.body["messages"] == MESSAGES
+        assert cassette.status == 200
+        offsets = [offset for offset, _ in cassette.chunks]
+        assert offsets == sorted(offsets)
+        # 50 ms to the first token, then 10 ms per token
+        assert offsets[0] >= 0.05
+        assert cassette.duration >= 0.1
+        assert b'"done": true' in cassette.chunks[-1][1]
+
+    def test_cancelled_stream_not_recorded(self, server, tmp_path):
+        """Test partial streams are dropped"""
+        client = OllamaClient(base_url=server.url, record_dir=str(tmp_path))
+        token = CancellationToken()
+
+        for _ in client.generate_stream("llama2", MESSAGES, cancel_token=token):
+            token.cancel()
+
+        client.close()
+        assert load_cassettes(str(tmp_path)) == []
+
+    def test_other_paths_pass_through(self, server, tmp_path):
+        """Test only the configured paths are recorded"""
+        transport = RecordingTransport(str(tmp_path), paths=("/api/chat",))
+        with httpx.Client(transport=transport) as http:
+            assert http.get(f"{server.url}/api/tags").status_code == 200
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestReplayTransport:
+    """Test cases for ReplayTransport class"""
+
+    def test_replays_stream(self, recorded):
+        """Test replayed events match the recording"""
+        client = replay_client(load_cassettes(str(recorded)), speed=None)
+
+        events = list(client.generate_events("llama2", MESSAGES))
+
+        text = "".join(e.content for e in events if isinstance(e, TokenEvent))
+        assert text == "This is llama2 answering: Hello there"
+        assert isinstance(events[-1], DoneEvent)
+        assert events[-1].stats.eval_count == 6
+
+    def test_original_and_accelerated_speed(self, recorded):
+        """Test playback takes the recorded time divided by speed"""
+        cassettes = load_cassettes(str(recorded))
+        duration = cassettes[0].duration
+
+        start = time.perf_counter()
+        list(replay_client(cassettes, speed=1.0).generate_stream("llama2", MESSAGES))
+        original = time.perf_counter() - start
+        start = time.perf_counter()
+        list(replay_client(cassettes, speed=4.0).generate_stream("llama2", MESSAGES))
+        accelerated = time.perf_counter() - start
+
+        assert original >= duration
+        assert duration / 4 <= accelerated < original
+
+    def test_unmatched_requests_play_in_turn(self, recorded):
+        """Test any chat is answered by the recordings unless match_body is set"""
+        cassettes = load_cassettes(str(recorded))
+        other = [{"role": "user", "content": "Something else"}]
+
+        text = "".join(replay_client(cassettes, speed=None).generate_stream("llama2", other))
+        assert text == "This is llama2 answering: Hello there"
+
+        strict = ReplayTransport(cassettes, speed=None, match_body=True)
+        with httpx.Client(transport=strict) as http:
+            with pytest.raises(CassetteMissError):
+                http.post("http://ollama/api/chat", json={"model": "llama2", "messages": other})
+
+    def test_fallback(self, recorded):
+        """Test requests without cassettes go to the fallback transport"""
+        fallback = httpx.MockTransport(lambda request: httpx.Response(200, json={"models": [{"name": "llama2"}]}))
+        transport = ReplayTransport(load_cassettes(str(recorded)), speed=None, fallback=fallback)
+        client = OllamaClient(base_url="http://ollama:11434", transport=transport)
+
+        assert client.list_models() == ["llama2"]
+        assert "".join(client.generate_stream("llama2", MESSAGES)).startswith("This is")
+        assert transport.replayed == 1
+
+
+# Run tests with: pytest tests/test_cassette.py -v
@@ -1,11 +1,24 @@
 """
 Unit tests for ChatManager class
 """
+import threading
+import time
 import pytest
 from unittest.mock import Mock
 from src.core.chat_manager import ChatManager
 from src.core.message import Message, Role, Conversation
+from src.core.model_catalog import ModelCatalog
 from src.api.ollama_client import OllamaClient
+from src.api.stream_events import CancelledEvent, DoneEvent, ErrorEvent, GenerationStats, TokenEvent
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+from src.utils.exceptions import ConversationBusyError, OllamaConnectionError
+
+
+def token_events(chunks, **stats):
+    """Build a generate_events stream from content chunks"""
+    events = [TokenEvent(content=chunk) for chunk in chunks]
+    events.append(DoneEvent(stats=GenerationStats(model="llama2", **stats)))
+    return iter(events)
 
 
 class TestChatManager:
@@ -18,9 +31,9 @@ class TestChatManager:
         return client
 
     @pytest.fixture
-    def chat_manager(self, mock_ollama_client):
+    def chat_manager(self, mock_ollama_client, tmp_path):
         """Create a ChatManager instance with mock client"""
-        return ChatManager(mock_ollama_client)
+        return ChatManager(mock_ollama_client, storage_dir=str(tmp_path))
 
     def test_initialization(self, chat_manager, mock_ollama_client):
         """Test ChatManager initializes correctly"""
@@ -47,7 +60,7 @@ class TestChatManager:
 
     def test_send_message_creates_conversation_if_none(self, chat_manager, mock_ollama_client):
         """Test send_message creates conversation if none exists"""
-        mock_ollama_client.generate_stream.return_value = iter(["Hello", " there", "!"])
+        mock_ollama_client.generate_events.return_value = token_events(["Hello", " there", "!"])
         chunks_received = []
 
         def on_chunk(chunk):
@@ -60,7 +73,7 @@ class TestChatManager:
 
     def test_send_message_adds_user_message(self, chat_manager, mock_ollama_client):
         """Test send_message adds user message to conversation"""
-        mock_ollama_client.generate_stream.return_value = iter(["Response"])
+        mock_ollama_client.generate_events.return_value = token_events(["Response"])
         chat_manager.start_new_conversation()
 
         chat_manager.send_message("Hello", lambda x: None)
@@ -72,7 +85,7 @@ class TestChatManager:
 
     def test_send_message_streams_response(self, chat_manager, mock_ollama_client):
         """Test send_message streams response chunks"""
-        mock_ollama_client.generate_stream.return_value = iter(["Hello", " ", "World"])
+        mock_ollama_client.generate_events.return_value = token_events(["Hello", " ", "World"])
         chat_manager.start_new_conversation()
 
         chunks_received = []
@@ -82,7 +95,7 @@ class TestChatManager:
 
     def test_send_message_adds_assistant_response(self, chat_manager, mock_ollama_client):
         """Test send_message adds complete assistant response"""
-        mock_ollama_client.generate_stream.return_value = iter(["Hello", " ", "World"])
+        mock_ollama_client.generate_events.return_value = token_events(["Hello", " ", "World"])
         chat_manager.start_new_conversation()
 
         chat_manager.send_message("Hi", lambda x: None)
@@ -94,26 +107,123 @@ class TestChatManager:
 
     def test_send_message_calls_ollama_with_correct_params(self, chat_manager, mock_ollama_client):
         """Test send_message calls OllamaClient with correct parameters"""
-        mock_ollama_client.generate_stream.return_value = iter(["Response"])
+        mock_ollama_client.generate_events.return_value = token_events(["Response"])
         chat_manager.start_new_conversation()
         chat_manager.send_message("Test message", lambda x: None)
 
-        mock_ollama_client.generate_stream.assert_called_once()
-        call_args = mock_ollama_client.generate_stream.call_args
+        mock_ollama_client.generate_events.assert_called_once()
+        call_args = mock_ollama_client.generate_events.call_args
 
         assert call_args[0][0] == "llama2"  # model
         assert len(call_args[0][1]) == 1  # messages list
         assert call_args[0][1][0]["role"] == "user"
         assert call_args[0][1][0]["content"] == "Test message"
 
+    def test_partial_response_available_during_streaming(self, chat_manager, mock_ollama_client):
+        """Test partial response text can be read while chunks stream in"""
+        mock_ollama_client.generate_events.return_value = token_events(["Hello", " ", "World"])
+        chat_manager.start_new_conversation()
+
+        partials = []
+        chat_manager.send_message("Hi", lambda chunk: partials.append(chat_manager.get_partial_response()))
+
+        assert partials == ["Hello", "Hello ", "Hello World"]
+        assert chat_manager.get_partial_response() == "Hello World"
+
     def test_send_message_handles_exception(self, chat_manager, mock_ollama_client):
         """Test send_message propagates exceptions"""
-        mock_ollama_client.generate_stream.side_effect = Exception("API Error")
+        mock_ollama_client.generate_events.side_effect = Exception("API Error")
         chat_manager.start_new_conversation()
 
         with pytest.raises(Exception, match="API Error"):
             chat_manager.send_message("Hi", lambda x: None)
 
+    def test_send_message_attaches_stats(self, chat_manager, mock_ollama_client):
+        """Test generation stats are attached to the assistant message"""
+        mock_ollama_client.generate_events.return_value = token_events(
+            ["Hi"], eval_count=10, eval_duration=500_000_000
+        )
+        chat_manager.start_new_conversation()
+        chat_manager.send_message("Hello", lambda x: None)
+
+        assistant = chat_manager.get_messages()[1]
+        assert assistant.stats is not None
+        assert assistant.stats.eval_count == 10
+        assert chat_manager.last_stats is assistant.stats
+        assert chat_manager.get_conversation_stats() == [assistant.stats]
+
+    def test_send_message_error_event(self, chat_manager, mock_ollama_client):
+        """Test an error event from the stream raises and adds no reply"""
+        mock_ollama_client.generate_events.return_value = iter([
+            TokenEvent(content="Par"),
+            ErrorEvent(message="model crashed")
+        ])
+        chat_manager.start_new_conversation()
+
+        with pytest.raises(OllamaConnectionError, match="model crashed"):
+            chat_manager.send_message("Hi", lambda x: None)
+
+        assert len(chat_manager.get_messages()) == 1
+
+    def test_stats_persisted_and_reported(self, tmp_path, mock_ollama_client):
+        """Test stats survive a save/load cycle and feed the stats report"""
+        manager = ChatManager(mock_ollama_client, storage_dir=str(tmp_path))
+        mock_ollama_client.generate_events.side_effect = [
+            token_events(["A"], prompt_eval_count=5, load_duration=2_000_000_000),
+            token_events(["B"], prompt_eval_count=20, load_duration=0)
+        ]
+        manager.start_new_conversation()
+        manager.send_message("one", lambda x: None)
+        manager.send_message("two", lambda x: None)
+
+        reloaded = ChatManager(mock_ollama_client, storage_dir=str(tmp_path))
+        assert reloaded.load_conversation(manager.get_current_conversation_id())
+        stats = reloaded.get_conversation_stats()
+        assert [s.prompt_eval_count for s in stats] == [5, 20]
+
+        report = reloaded.get_stats_report()
+        assert report["llama2"]["count"] == 2
+        assert report["llama2"]["avg_load_seconds"] == pytest.approx(1.0)
+        assert set(report["llama2"]["by_history_length"]) == {"1-1", "2-3"}
+
+    def test_cancel_keeps_partial_response(self, tmp_path, mock_ollama_client):
+        """Test cancelling mid-stream keeps partial text marked incomplete"""
+        manager = ChatManager(mock_ollama_client, storage_dir=str(tmp_path))
+        mock_ollama_client.generate_events.return_value = token_events(["Hello", " there", " friend"])
+        manager.start_new_conversation()
+
+        def on_chunk(chunk):
+            if chunk == " there":
+                assert manager.cancel_generation() is True
+
+        result = manager.send_message("Hi", on_chunk)
+
+        assert result.incomplete is True
+        assert result.content == "Hello there"
+        assert result.stats is None
+        assert manager.last_cancel_latency is not None
+        assert manager.is_generating() is False
+
+        reloaded = manager.storage.load_conversation(manager.get_current_conversation_id())
+        assert reloaded.messages[1].incomplete is True
+        assert reloaded.messages[1].content == "Hello there"
+
+    def test_cancel_before_any_text(self, chat_manager, mock_ollama_client):
+        """Test cancelling before the first chunk adds no assistant message"""
+        chat_manager.start_new_conversation()
+
+        def events(model, messages, cancel_token, **kwargs):
+            cancel_token.cancel()
+            return iter([])
+
+        mock_ollama_client.generate_events.side_effect = events
+        assert chat_manager.send_message("Hi", lambda x: None) is None
+        assert [m.role for m in chat_manager.get_messages()] == [Role.USER]
+
+    def test_cancel_generation_when_idle(self, chat_manager):
+        """Test cancel_generation is a no-op without an active response"""
+        assert chat_manager.cancel_generation() is False
+
     def test_set_model(self, chat_manager):
         """Test setting a new model"""
         chat_manager.set_model("mistral")
@@ -134,7 +244,7 @@ class TestChatManager:
 
     def test_get_messages_with_conversation(self, chat_manager, mock_ollama_client):
         """Test get_messages returns messages from conversation"""
-        mock_ollama_client.generate_stream.return_value = iter(["Response"])
+        mock_ollama_client.generate_events.return_value = token_events(["Response"])
         chat_manager.start_new_conversation()
         chat_manager.send_message("Hello", lambda x: None)
 
@@ -144,7 +254,7 @@ class TestChatManager:
 
     def test_clear_conversation(self, chat_manager, mock_ollama_client):
         """Test clearing conversation removes all messages"""
-        mock_ollama_client.generate_stream.return_value = iter(["Response"])
+        mock_ollama_client.generate_events.return_value = token_events(["Response"])
         chat_manager.start_new_conversation()
         chat_manager.send_message("Hello", lambda x: None)
 
@@ -159,10 +269,10 @@ class TestChatManager:
 
     def test_multi_turn_conversation(self, chat_manager, mock_ollama_client):
         """Test multiple message exchanges in same conversation"""
-        mock_ollama_client.generate_stream.side_effect = [
-            iter(["Response 1"]),
-            iter(["Response 2"]),
-            iter(["Response 3"])
+        mock_ollama_client.generate_events.side_effect = [
+            token_events(["Response 1"]),
+            token_events(["Response 2"]),
+            token_events(["Response 3"])
         ]
 
         chat_manager.start_new_conversation()
@@ -178,4 +288,633 @@ class TestChatManager:
         assert messages[3].content == "Response 2"
 
 
+class TestChatManagerWarmUp:
+    """Test cases for background model warm-up"""
+
+    @pytest.fixture
+    def mock_ollama_client(self):
+        """Create a mock OllamaClient with no resident models"""
+        client = Mock(spec=OllamaClient)
+        client.list_running_models.return_value = []
+        return client
+
+    @pytest.fixture
+    def chat_manager(self, mock_ollama_client, tmp_path):
+        """Create a ChatManager that warms models on selection"""
+        catalog = ModelCatalog(mock_ollama_client, cache_file=None)
+        return ChatManager(
+            mock_ollama_client,
+            storage_dir=str(tmp_path),
+            model_catalog=catalog,
+            keep_alive_policy=lambda model: "30m" if model == "mistral" else "5m",
+            warm_up_on_select=True
+        )
+
+    def test_set_model_preloads_in_background(self, chat_manager, mock_ollama_client):
+        """Test selecting a model preloads it with its keep_alive policy"""
+        states = []
+        loaded = threading.Event()
+
+        def listener(model, state):
+            states.append((model, state))
+            if state != "loading":
+                loaded.set()
+
+        chat_manager.add_model_state_listener(listener)
+        chat_manager.set_model("mistral")
+
+        assert loaded.wait(timeout=5)
+
+        mock_ollama_client.preload_model.assert_called_once_with("mistral", keep_alive="30m")
+        assert states == [("mistral", "loading"), ("mistral", "loaded")]
+        assert chat_manager.get_model_state("mistral") == "loaded"
+
+    def test_resident_model_not_preloaded_again(self, chat_manager, mock_ollama_client):
+        """Test warm-up is skipped for a model that is already loaded"""
+        chat_manager.model_catalog.mark_resident("mistral")
+
+        assert chat_manager.warm_up_model("mistral") is None
+        mock_ollama_client.preload_model.assert_not_called()
+
+    def test_failed_preload_reports_cold(self, chat_manager, mock_ollama_client):
+        """Test a failed warm-up leaves the model cold"""
+        mock_ollama_client.preload_model.side_effect = OllamaConnectionError("down")
+        states = []
+        chat_manager.add_model_state_listener(lambda model, state: states.append(state))
+
+        chat_manager.warm_up_model("llama2").join(timeout=5)
+
+        assert states == ["loading", "cold"]
+        assert chat_manager.get_model_state("llama2") == "cold"
+
+    def test_send_message_uses_keep_alive_policy(self, chat_manager, mock_ollama_client):
+        """Test chat requests carry the model's keep_alive and mark it resident"""
+        mock_ollama_client.generate_events.return_value = token_events(["Hi"])
+        chat_manager.current_model = "mistral"
+
+        chat_manager.send_message("Hello", lambda x: None)
+
+        assert mock_ollama_client.generate_events.call_args[1]["keep_alive"] == "30m"
+        assert chat_manager.get_model_state("mistral") == "loaded"
+
+
+class TestChatManagerPrefill:
+    """Test cases for prompt cache prefill on conversation load"""
+
+    @pytest.fixture
+    def mock_ollama_client(self):
+        """Create a mock OllamaClient whose prefill evaluated 400 tokens in 2s"""
+        client = Mock(spec=OllamaClient)
+        client.prefill.return_value = GenerationStats(
+            model="llama2", prompt_eval_count=400, prompt_eval_duration=2_000_000_000
+        )
+        return client
+
+    @pytest.fixture
+    def chat_manager(self, mock_ollama_client, tmp_path):
+        """Create a ChatManager that prefills on load"""
+        return ChatManager(
+            mock_ollama_client,
+            storage_dir=str(tmp_path),
+            model_catalog=ModelCatalog(mock_ollama_client, cache_file=None),
+            prefill_on_load=True,
+            prefill_min_messages=4
+        )
+
+    def save_conversation(self, chat_manager, turns):
+        """Store a conversation with the given number of exchanges"""
+        conversation = Conversation(model="llama2")
+        for i in range(turns):
+            conversation.add_message(Message(role=Role.USER, content=f"question {i}"))
+            conversation.add_message(Message(role=Role.ASSISTANT, content=f"answer {i}"))
+        chat_manager.storage.save_conversation(conversation)
+        return conversation.id
+
+    def wait_for_prefill(self, chat_manager):
+        """Wait until the background prefill has finished"""
+        deadline = time.monotonic() + 5
+        while chat_manager.is_prefilling() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not chat_manager.is_prefilling()
+
+    def test_load_prefills_history(self, chat_manager, mock_ollama_client):
+        """Test loading a long conversation prefills its history"""
+        chat_manager.load_conversation(self.save_conversation(chat_manager, 2))
+        self.wait_for_prefill(chat_manager)
+
+        args, kwargs = mock_ollama_client.prefill.call_args
+        assert args[0] == "llama2"
+        assert [m["content"] for m in args[1]] == ["question 0", "answer 0", "question 1", "answer 1"]
+        assert kwargs["cancel_token"] is not None
+
+    def test_short_conversation_not_prefilled(self, chat_manager, mock_ollama_client):
+        """Test short histories are not worth a prefill"""
+        chat_manager.load_conversation(self.save_conversation(chat_manager, 1))
+
+        assert not chat_manager.is_prefilling()
+        mock_ollama_client.prefill.assert_not_called()
+
+    def test_first_response_records_saving(self, chat_manager, mock_ollama_client):
+        """Test the response after a prefill records the prompt time saved"""
+        chat_manager.load_conversation(self.save_conversation(chat_manager, 2))
+        self.wait_for_prefill(chat_manager)
+        mock_ollama_client.generate_events.side_effect = [
+            token_events(["A"], prompt_eval_count=12),
+            token_events(["B"], prompt_eval_count=15)
+        ]
+
+        first = chat_manager.send_message("next", lambda x: None)
+        second = chat_manager.send_message("again", lambda x: None)
+
+        assert first.stats.prefill_saved == pytest.approx(2.0)
+        assert second.stats.prefill_saved is None
+        report = chat_manager.get_stats_report()
+        assert report["llama2"]["avg_prefill_saved_seconds"] == pytest.approx(2.0)
+
+    def test_cache_miss_records_no_saving(self, chat_manager, mock_ollama_client):
+        """Test a full prompt re-evaluation counts as no saving"""
+        chat_manager.load_conversation(self.save_conversation(chat_manager, 2))
+        self.wait_for_prefill(chat_manager)
+        mock_ollama_client.generate_events.return_value = token_events(["A"], prompt_eval_count=420)
+
+        assert chat_manager.send_message("next", lambda x: None).stats.prefill_saved == 0.0
+
+    def test_switching_away_cancels_prefill(self, chat_manager, mock_ollama_client):
+        """Test switching conversations cancels a running prefill"""
+        tokens = []
+
+        def slow_prefill(model, messages, keep_alive=None, cancel_token=None):
+            tokens.append(cancel_token)
+            cancel_token.wait(timeout=5)
+            return None
+
+        mock_ollama_client.prefill.side_effect = slow_prefill
+        first_id = self.save_conversation(chat_manager, 2)
+        second_id = self.save_conversation(chat_manager, 1)
+
+        chat_manager.load_conversation(first_id)
+        assert chat_manager.is_prefilling()
+        chat_manager.load_conversation(second_id)
+
+        assert not chat_manager.is_prefilling()
+        assert tokens and tokens[0].cancelled
+
+
+LLAMA_REPLY = " ".join(["llama"] * 20)
+MISTRAL_REPLY = " ".join(["mistral"] * 20)
+
+
+class TestChatManagerCompare:
+    """Test cases for comparing models with ChatManager.compare_models"""
+
+    @pytest.fixture
+    def server(self):
+        """Fake server with two models, each taking 0.4 s to answer"""
+        models = [
+            FakeModel("llama2", tokens_per_second=50, chunk_tokens=2, responder=lambda model, messages: LLAMA_REPLY),
+            FakeModel("mistral", tokens_per_second=50, responder=lambda model, messages: MISTRAL_REPLY),
+        ]
+        with FakeOllamaServer(models) as fake:
+            yield fake
+
+    @pytest.fixture
+    def chat_manager(self, server, tmp_path):
+        """ChatManager talking to the fake server"""
+        client = OllamaClient(base_url=server.url)
+        yield ChatManager(client, storage_dir=str(tmp_path))
+        client.close()
+
+    def test_streams_all_models_concurrently(self, chat_manager):
+        """Test every model answers, in parallel, with its stats"""
+        chunks = {"llama2": [], "mistral": []}
+        start = time.perf_counter()
+
+        results = chat_manager.compare_models("Hi", ["llama2", "mistral"], lambda model, chunk: chunks[model].append(chunk))
+
+        elapsed = time.perf_counter() - start
+        assert [r.model for r in results] == ["llama2", "mistral"]
+        assert "".join(chunks["llama2"]) == LLAMA_REPLY
+        assert "".join(chunks["mistral"]) == MISTRAL_REPLY
+        for result in results:
+            assert result.error is None
+            assert result.stats.eval_count == 20
+            assert result.stats.time_to_first_token is not None
+            assert result.total_time > 0
+        # Twice 0.4 s of generation, overlapping rather than one after another
+        assert elapsed < 0.7
+        assert not chat_manager.is_generating()
+
+    def test_saved_as_linked_conversations(self, chat_manager):
+        """Test each answer is its own saved conversation sharing a comparison_id"""
+        results = chat_manager.compare_models("Hi", ["llama2", "mistral"], lambda model, chunk: None)
+
+        listed = chat_manager.get_conversation_list()
+        assert len(listed) == 2
+        assert {conv["comparison_id"] for conv in listed} == {results[0].conversation.comparison_id}
+        loaded = chat_manager.storage.load_conversation(results[1].conversation.id)
+        assert loaded.model == "mistral"
+        assert [m.content for m in loaded.messages] == ["Hi", MISTRAL_REPLY]
+        assert loaded.messages[1].stats.eval_count == 20
+        assert results[1].reply.content == MISTRAL_REPLY
+
+    def test_failing_model_does_not_stop_others(self, chat_manager):
+        """Test an unknown model reports an error while the others finish"""
+        results = chat_manager.compare_models("Hi", ["llama2", "missing"], lambda model, chunk: None)
+
+        assert results[0].error is None
+        assert results[1].error is not None
+        assert results[1].reply is None
+
+    def test_cancel_stops_all(self, chat_manager, server):
+        """Test cancel_generation stops every stream, keeping partial answers"""
+        server.add_model(FakeModel("endless", tokens_per_second=100, responder=lambda model, messages: "x " * 1000))
+        started = threading.Event()
+
+        def on_chunk(model, chunk):
+            started.set()
+
+        threading.Timer(0.2, chat_manager.cancel_generation).start()
+        results = chat_manager.compare_models("Hi", ["endless", "endless"], on_chunk)
+
+        assert started.is_set()
+        for result in results:
+            assert result.stats is None
+            assert result.reply.incomplete
+
+    def test_overlapping_comparisons_stay_cancellable(self, chat_manager, server):
+        """Test a comparison finishing does not hide another one still running"""
+        server.add_model(FakeModel("endless", tokens_per_second=100, responder=lambda model, messages: "x " * 1000))
+        endless = []
+        thread = threading.Thread(
+            target=lambda: endless.extend(chat_manager.compare_models("Hi", ["endless"], lambda model, chunk: None))
+        )
+        thread.start()
+
+        chat_manager.compare_models("Hi", ["llama2"], lambda model, chunk: None)
+
+        assert chat_manager.is_generating()
+        assert chat_manager.cancel_generation()
+        thread.join(timeout=5)
+        assert endless[0].reply.incomplete
+        assert not chat_manager.is_generating()
+
+
+class TestChatManagerSessions:
+    """Test cases for conversations generating at the same time"""
+
+    @pytest.fixture
+    def server(self):
+        """Fake server whose replies take 0.4 s"""
+        with FakeOllamaServer([
+            FakeModel("llama2", tokens_per_second=50, responder=lambda model, messages: LLAMA_REPLY)
+        ]) as server:
+            yield server
+
+    @pytest.fixture
+    def chat_manager(self, server, tmp_path):
+        """ChatManager talking to the fake server"""
+        client = OllamaClient(base_url=server.url)
+        yield ChatManager(client, storage_dir=str(tmp_path))
+        client.close()
+
+    def send_in_background(self, chat_manager, content):
+        """Send a message on a thread; return the thread, its result and a first-chunk event"""
+        result, first_chunk = {}, threading.Event()
+
+        def worker():
+            result["message"] = chat_manager.send_message(content, lambda chunk: first_chunk.set())
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert first_chunk.wait(5)
+        return thread, result
+
+    def test_conversations_stream_concurrently(self, chat_manager):
+        """Test two conversations generate at once, each into its own history"""
+        chat_manager.start_new_conversation()
+        first_id = chat_manager.get_current_conversation_id()
+        start = time.perf_counter()
+        thread, first = self.send_in_background(chat_manager, "One")
+
+        chat_manager.start_new_conversation()
+        second = chat_manager.send_message("Two", lambda chunk: None)
+        thread.join()
+
+        # Two 0.4 s replies, overlapping rather than one after another
+        assert time.perf_counter() - start < 0.7
+        assert first["message"].content == second.content == LLAMA_REPLY
+        saved = chat_manager.storage.load_conversation(first_id)
+        assert [m.content for m in saved.messages] == ["One", LLAMA_REPLY]
+        assert [m.content for m in chat_manager.get_messages()] == ["Two", LLAMA_REPLY]
+
+    def test_switching_away_keeps_streaming(self, chat_manager):
+        """Test a response keeps streaming into its conversation after switching away and back"""
+        chat_manager.start_new_conversation()
+        first_id = chat_manager.get_current_conversation_id()
+        thread, _ = self.send_in_background(chat_manager, "One")
+
+        chat_manager.start_new_conversation()
+        assert chat_manager.generating_conversations() == [first_id]
+        assert chat_manager.is_generating(first_id)
+        assert not chat_manager.is_generating()
+        # Saved when left, so it can be found in the list while it streams
+        assert [c["id"] for c in chat_manager.get_conversation_list()] == [first_id]
+        assert LLAMA_REPLY.startswith(chat_manager.get_partial_response(first_id))
+
+        assert chat_manager.switch_conversation(first_id)
+        assert chat_manager.is_generating()
+        thread.join()
+
+        assert chat_manager.generating_conversations() == []
+        assert [m.content for m in chat_manager.get_messages()] == ["One", LLAMA_REPLY]
+        saved = chat_manager.storage.load_conversation(first_id)
+        assert saved.messages[-1].content == LLAMA_REPLY
+
+    def test_send_to_saved_conversation_by_id(self, chat_manager):
+        """Test a message can go to a saved conversation that is not current"""
+        chat_manager.start_new_conversation()
+        chat_manager.send_message("One", lambda chunk: None)
+        first_id = chat_manager.get_current_conversation_id()
+        chat_manager.start_new_conversation()
+
+        chat_manager.send_message("Two", lambda chunk: None, conversation_id=first_id)
+
+        assert chat_manager.get_messages() == []
+        saved = chat_manager.storage.load_conversation(first_id)
+        assert [m.content for m in saved.messages if m.role == Role.USER] == ["One", "Two"]
+        with pytest.raises(ValueError):
+            chat_manager.send_message("Three", lambda chunk: None, conversation_id="missing")
+
+    def test_busy_conversation_rejects_messages(self, chat_manager):
+        """Test a second message to a generating conversation is refused"""
+        chat_manager.start_new_conversation()
+        thread, _ = self.send_in_background(chat_manager, "One")
+
+        with pytest.raises(ConversationBusyError):
+            chat_manager.send_message("Two", lambda chunk: None)
+        thread.join()
+        assert [m.content for m in chat_manager.get_messages()] == ["One", LLAMA_REPLY]
+
+    def test_cancel_one_conversation(self, chat_manager):
+        """Test stopping one conversation leaves the other generating"""
+        chat_manager.start_new_conversation()
+        first_id = chat_manager.get_current_conversation_id()
+        first_thread, first = self.send_in_background(chat_manager, "One")
+        chat_manager.start_new_conversation()
+        second_thread, second = self.send_in_background(chat_manager, "Two")
+
+        assert chat_manager.cancel_generation(first_id) is True
+        first_thread.join()
+        second_thread.join()
+
+        assert first["message"].incomplete
+        assert second["message"].content == LLAMA_REPLY
+
+    def test_delete_generating_conversation(self, chat_manager):
+        """Test deleting a conversation stops its response and it is not saved again"""
+        chat_manager.start_new_conversation()
+        first_id = chat_manager.get_current_conversation_id()
+        thread, _ = self.send_in_background(chat_manager, "One")
+        chat_manager.start_new_conversation()
+
+        assert chat_manager.delete_conversation(first_id)
+        thread.join()
+
+        assert not chat_manager.storage.conversation_exists(first_id)
+        assert chat_manager.generating_conversations() == []
+        assert chat_manager.get_current_conversation_id() is not None
+
+
+class TestChatManagerSendAsync:
+    """Test cases for ChatManager.send_async and its response handles"""
+
+    @pytest.fixture
+    def server(self):
+        """Fake server whose replies take 0.4 s"""
+        with FakeOllamaServer([
+            FakeModel("llama2", tokens_per_second=50, responder=lambda model, messages: LLAMA_REPLY)
+        ]) as server:
+            yield server
+
+    @pytest.fixture
+    def chat_manager(self, server, tmp_path):
+        """ChatManager talking to the fake server, streaming one response at a time"""
+        client = OllamaClient(base_url=server.url)
+        manager = ChatManager(client, storage_dir=str(tmp_path), max_concurrent_sends=1)
+        yield manager
+        manager.close()
+        client.close()
+
+    def test_handle_streams_events_and_result(self, chat_manager):
+        """Test the handle reports chunks, the final event, the message and its stats"""
+        events, threads = [], set()
+
+        def listener(event):
+            events.append(event)
+            threads.add(threading.current_thread().name)
+
+        handle = chat_manager.send_async("Hi")
+        # The user message is added before send_async returns
+        assert [m.content for m in chat_manager.get_messages()] == ["Hi"]
+        handle.subscribe(listener)
+        message = handle.result(timeout=5)
+
+        assert message.content == handle.text == LLAMA_REPLY
+        assert handle.done() and handle.stats is message.stats
+        assert "".join(e.content for e in events if isinstance(e, TokenEvent)) == LLAMA_REPLY
+        assert isinstance(events[-1], DoneEvent)
+        assert all(name.startswith("chat-send") for name in threads)
+        assert chat_manager.storage.load_conversation(handle.conversation_id).messages[-1].content == LLAMA_REPLY
+
+    def test_late_subscriber_catches_up(self, chat_manager):
+        """Test subscribing after the response ended still delivers its text and outcome"""
+        handle = chat_manager.send_async("Hi")
+        handle.result(timeout=5)
+        events = []
+
+        handle.subscribe(events.append)
+
+        assert events == [TokenEvent(content=LLAMA_REPLY), DoneEvent(stats=handle.stats)]
+
+    def test_cancel_keeps_partial_response(self, chat_manager):
+        """Test cancelling through the handle ends with a partial message and a CancelledEvent"""
+        events, first_chunk = [], threading.Event()
+
+        def listener(event):
+            events.append(event)
+            first_chunk.set()
+
+        handle = chat_manager.send_async("Hi")
+        handle.subscribe(listener)
+        assert first_chunk.wait(5)
+        assert handle.cancel() is True
+        message = handle.result(timeout=5)
+
+        assert message.incomplete and LLAMA_REPLY.startswith(message.content)
+        assert isinstance(events[-1], CancelledEvent)
+        assert handle.stats is None
+        assert handle.cancel() is False
+
+    def test_queued_response_cancelled_before_start(self, chat_manager, server):
+        """Test a response waiting for a worker can be cancelled without a request"""
+        first = chat_manager.send_async("One")
+        chat_manager.start_new_conversation()
+        second = chat_manager.send_async("Two")
+
+        assert chat_manager.generating_conversations() == [first.conversation_id, second.conversation_id]
+        second.cancel()
+
+        assert second.result(timeout=5) is None
+        assert first.result(timeout=5).content == LLAMA_REPLY
+        assert len(server.requests_to("/api/chat")) == 1
+        assert [m.content for m in chat_manager.get_messages()] == ["Two"]
+
+    def test_failure_resolves_handle(self, chat_manager, server):
+        """Test a failing request raises from result() and ends with an ErrorEvent"""
+        server.fail_next("/api/chat", status=500, message="out of memory")
+        events = []
+
+        handle = chat_manager.send_async("Hi")
+        handle.subscribe(events.append)
+
+        with pytest.raises(OllamaConnectionError):
+            handle.result(timeout=5)
+        assert handle.done()
+        assert isinstance(events[-1], ErrorEvent)
+        assert not chat_manager.is_generating()
+
+
+def slow_echo(model, messages):
+    """Reply naming the last message, taking ~0.25 s at 40 tokens/s"""
+    return " ".join(["re"] * 10 + [messages[-1]["content"]])
+
+
+class TestChatManagerQueue:
+    """Test cases for queueing messages while a response is generating"""
+
+    @pytest.fixture
+    def server(self):
+        """Fake server whose replies name the message they answer"""
+        with FakeOllamaServer([FakeModel("llama2", tokens_per_second=40, responder=slow_echo)]) as server:
+            yield server
+
+    @pytest.fixture
+    def chat_manager(self, server, tmp_path):
+        """ChatManager talking to the fake server"""
+        client = OllamaClient(base_url=server.url)
+        manager = ChatManager(client, storage_dir=str(tmp_path))
+        yield manager
+        manager.close()
+        client.close()
+
+    @staticmethod
+    def started_handles(chat_manager):
+        """Collect the handles of responses started from the queue"""
+        handles = []
+        chat_manager.add_queue_listener(handles.append)
+        return handles
+
+    def wait_idle(self, chat_manager, conversation_id):
+        deadline = time.monotonic() + 5
+        while chat_manager.is_generating(conversation_id):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    def test_queued_messages_sent_in_order(self, chat_manager, server):
+        """Test messages queued while generating are sent back-to-back, oldest first"""
+        handles = self.started_handles(chat_manager)
+
+        first = chat_manager.queue_message("one")
+        assert first is not None
+        assert chat_manager.queue_message("two") is None
+        assert chat_manager.queue_message("three") is None
+        assert [m.content for m in chat_manager.get_queued_messages()] == ["two", "three"]
+
+        first.result(timeout=5)
+        self.wait_idle(chat_manager, first.conversation_id)
+
+        assert [handle.result(timeout=5).content for handle in handles] == [
+            slow_echo("llama2", [{"content": content}]) for content in ("two", "three")
+        ]
+        assert [(m.role, m.content.split()[-1]) for m in chat_manager.get_messages()] == [
+            (Role.USER, "one"), (Role.ASSISTANT, "one"),
+            (Role.USER, "two"), (Role.ASSISTANT, "two"),
+            (Role.USER, "three"), (Role.ASSISTANT, "three"),
+        ]
+        assert chat_manager.get_queued_messages() == []
+        # Each request carried the replies before it
+        assert [len(r.body["messages"]) for r in server.requests_to("/api/chat")] == [1, 3, 5]
+
+    def test_queue_sent_after_sync_send(self, chat_manager):
+        """Test messages queued during send_message() are sent once it completes"""
+        handles = self.started_handles(chat_manager)
+        chat_manager.start_new_conversation()
+        conversation_id = chat_manager.get_current_conversation_id()
+        threading.Timer(0.1, chat_manager.queue_message, args=("two",)).start()
+
+        reply = chat_manager.send_message("one", lambda chunk: None)
+
+        assert reply.content.endswith("one")
+        assert len(handles) == 1
+        assert handles[0].result(timeout=5).content.endswith("two")
+        self.wait_idle(chat_manager, conversation_id)
+        assert [m.content.split()[-1] for m in chat_manager.get_messages()] == ["one", "one", "two", "two"]
+
+    def test_queue_saved_and_resumed_after_restart(self, chat_manager, server, tmp_path):
+        """Test a queue left behind is restored from storage and can be resumed"""
+        first = chat_manager.queue_message("one")
+        chat_manager.queue_message("two")
+        conversation_id = first.conversation_id
+        # Stopping the response pauses the queue
+        first.cancel()
+        first.result(timeout=5)
+        self.wait_idle(chat_manager, conversation_id)
+
+        client = OllamaClient(base_url=server.url)
+        restarted = ChatManager(client, storage_dir=str(tmp_path))
+        try:
+            assert [m.content for m in restarted.get_queued_messages(conversation_id)] == ["two"]
+            assert restarted.load_conversation(conversation_id)
+            # Opening the conversation does not send its queue
+            assert restarted.get_queued_messages() != [] and not restarted.is_generating()
+            handle = restarted.resume_queue()
+
+            assert handle.result(timeout=5).content.endswith("two")
+            assert restarted.resume_queue() is None
+            saved = restarted.storage.load_conversation(conversation_id)
+            assert saved.pending == []
+            assert [m.content for m in saved.messages if m.role == Role.USER] == ["one", "two"]
+        finally:
+            restarted.close()
+            client.close()
+
+    def test_queue_per_conversation(self, chat_manager):
+        """Test each conversation has its own queue, even when not current"""
+        first = chat_manager.queue_message("a1")
+        chat_manager.queue_message("a2")
+        chat_manager.start_new_conversation()
+        other = chat_manager.queue_message("b1")
+
+        assert other is not None
+        assert chat_manager.get_queued_messages() == []
+        assert [m.content for m in chat_manager.get_queued_messages(first.conversation_id)] == ["a2"]
+        other.result(timeout=5)
+        self.wait_idle(chat_manager, first.conversation_id)
+        saved = chat_manager.storage.load_conversation(first.conversation_id)
+        assert [m.content for m in saved.messages if m.role == Role.USER] == ["a1", "a2"]
+
+    def test_deleted_conversation_drops_queue(self, chat_manager, server):
+        """Test deleting a conversation stops its response and its queue"""
+        first = chat_manager.queue_message("one")
+        chat_manager.queue_message("two")
+
+        assert chat_manager.delete_conversation(first.conversation_id)
+        first.result(timeout=5)
+        self.wait_idle(chat_manager, first.conversation_id)
+
+        # The response may be stopped before its request is made; "two" is never sent
+        assert [r.body["messages"][-1]["content"] for r in server.requests_to("/api/chat")] in ([], ["one"])
+        assert not chat_manager.storage.conversation_exists(first.conversation_id)
+
+
 # Run tests with: pytest tests/test_chat_manager.py -v
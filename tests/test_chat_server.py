@@ -0,0 +1,288 @@
+"""
+Unit tests for the local HTTP/SSE chat server
+"""
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from src.api.async_ollama_client import AsyncOllamaClient
+from src.server.chat_server import ChatServer
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+
+
+@pytest.fixture
+def fake():
+    """Fake Ollama with a fast and a slow model"""
+    with FakeOllamaServer([FakeModel("llama2"), FakeModel("slow", tokens_per_second=40)]) as server:
+        yield server
+
+
+def run_scenario(fake, tmp_path, scenario, **kwargs):
+    """Start a ChatServer against the fake Ollama and run scenario(server, http)"""
+    async def main():
+        ollama = AsyncOllamaClient(base_url=fake.url)
+        server = await ChatServer(ollama, storage_dir=str(tmp_path), port=0, **kwargs).start()
+        try:
+            async with httpx.AsyncClient(base_url=server.url, timeout=10) as http:
+                return await scenario(server, http)
+        finally:
+            await server.stop()
+            await ollama.close()
+
+    return asyncio.run(main())
+
+
+async def new_conversation(http, model="llama2"):
+    """Create a conversation and return its ID"""
+    response = await http.post("/api/conversations", json={"model": model})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def read_events(lines):
+    """Parse the lines of a Server-Sent Events response into (event, data) pairs"""
+    events, name = [], None
+    async for line in lines:
+        if line.startswith("event: "):
+            name = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((name, json.loads(line[len("data: "):])))
+    return events
+
+
+async def send(http, conversation_id, content, **body):
+    """Send a message and return the events of its stream"""
+    async with http.stream(
+        "POST", f"/api/conversations/{conversation_id}/messages", json={"content": content, **body}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        return await read_events(response.aiter_lines())
+
+
+def reply_text(events):
+    """Concatenate the token events of a stream"""
+    return "".join(data["content"] for name, data in events if name == "token")
+
+
+class TestChatServer:
+    """Test cases for ChatServer class"""
+
+    def test_send_streams_and_saves(self, fake, tmp_path):
+        """Test a reply streams as events and the conversation is saved"""
+        async def scenario(server, http):
+            conversation_id = await new_conversation(http)
+            events = await send(http, conversation_id, "Hello")
+            listed = (await http.get("/api/conversations")).json()["conversations"]
+            loaded = (await http.get(f"/api/conversations/{conversation_id}")).json()
+            return conversation_id, events, listed, loaded
+
+        conversation_id, events, listed, loaded = run_scenario(fake, tmp_path, scenario)
+
+        assert events[0] == ("start", {"conversation_id": conversation_id, "model": "llama2"})
+        assert reply_text(events) == "This is llama2 answering: Hello"
+        name, data = events[-1]
+        assert name == "done"
+        assert data["message"]["content"] == "This is llama2 answering: Hello"
+        assert data["message"]["stats"]["eval_count"] > 0
+        assert [(c["id"], c["message_count"], c["streaming"]) for c in listed] == [(conversation_id, 2, False)]
+        assert [m["role"] for m in loaded["messages"]] == ["user", "assistant"]
+
+    def test_reopens_saved_conversation(self, fake, tmp_path):
+        """Test a conversation saved earlier continues with its history"""
+        async def first(server, http):
+            conversation_id = await new_conversation(http)
+            await send(http, conversation_id, "One")
+            return conversation_id
+
+        conversation_id = run_scenario(fake, tmp_path, first)
+
+        async def second(server, http):
+            await send(http, conversation_id, "Two", model="slow")
+            return (await http.get(f"/api/conversations/{conversation_id}")).json()
+
+        loaded = run_scenario(fake, tmp_path, second)
+        assert [m["content"] for m in loaded["messages"] if m["role"] == "user"] == ["One", "Two"]
+        assert loaded["model"] == "slow"
+        assert len(fake.requests_to("/api/chat")[-1].body["messages"]) == 3
+
+    def test_concurrent_streams(self, fake, tmp_path):
+        """Test replies in different conversations stream at the same time"""
+        async def scenario(server, http):
+            ids = [await new_conversation(http, "slow") for _ in range(4)]
+            start = time.perf_counter()
+            results = await asyncio.gather(*(send(http, cid, f"Question {i}") for i, cid in enumerate(ids)))
+            return results, time.perf_counter() - start
+
+        results, elapsed = run_scenario(fake, tmp_path, scenario)
+
+        for i, events in enumerate(results):
+            assert reply_text(events) == f"This is slow answering: Question {i}"
+        # Each reply takes ~0.15 s at 40 tokens/s; in sequence it would be ~0.6 s
+        assert elapsed < 0.45
+
+    def test_cancel_keeps_partial_reply(self, fake, tmp_path):
+        """Test cancelling ends the stream and keeps the partial reply"""
+        async def scenario(server, http):
+            conversation_id = await new_conversation(http, "slow")
+            async with http.stream(
+                "POST", f"/api/conversations/{conversation_id}/messages", json={"content": "one two three four"}
+            ) as response:
+                lines = response.aiter_lines()
+                while not (await lines.__anext__()).startswith("event: token"):
+                    pass
+                busy = await http.post(f"/api/conversations/{conversation_id}/messages", json={"content": "x"})
+                cancelled = (await http.post(f"/api/conversations/{conversation_id}/cancel")).json()
+                events = await read_events(lines)
+            again = (await http.post(f"/api/conversations/{conversation_id}/cancel")).json()
+            return busy, cancelled, events, again
+
+        busy, cancelled, events, again = run_scenario(fake, tmp_path, scenario)
+
+        assert busy.status_code == 409
+        assert cancelled == {"cancelled": True}
+        assert again == {"cancelled": False}
+        name, data = events[-1]
+        assert name == "cancelled"
+        assert data["message"]["incomplete"] is True
+        partial = data["message"]["content"]
+        assert partial and "This is slow answering: one two three four".startswith(partial)
+
+    def test_client_disconnect_stops_generation(self, fake, tmp_path):
+        """Test a client leaving mid-stream cancels the request to Ollama"""
+        async def scenario(server, http):
+            conversation_id = await new_conversation(http, "slow")
+            async with http.stream(
+                "POST", f"/api/conversations/{conversation_id}/messages", json={"content": " ".join(["w"] * 50)}
+            ) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("event: token"):
+                        break
+            for _ in range(100):
+                if server.active_streams == 0:
+                    break
+                await asyncio.sleep(0.02)
+            return conversation_id, server.active_streams
+
+        conversation_id, active = run_scenario(fake, tmp_path, scenario)
+
+        assert active == 0
+        time.sleep(0.1)
+        assert fake.aborted_streams == 1
+        saved = json.loads((tmp_path / f"{conversation_id}.json").read_text())
+        assert saved["messages"][-1]["incomplete"] is True
+
+    def test_idle_sessions_evicted(self, fake, tmp_path):
+        """Test only saved idle conversations are dropped from memory, and reload"""
+        async def scenario(server, http):
+            ids = [await new_conversation(http) for _ in range(4)]
+            unsaved_kept = len(server._sessions)
+            for conversation_id in ids:
+                await send(http, conversation_id, "Hi")
+            kept = len(server._sessions)
+            reloaded = (await http.get(f"/api/conversations/{ids[0]}")).json()
+            return unsaved_kept, kept, reloaded
+
+        unsaved_kept, kept, reloaded = run_scenario(fake, tmp_path, scenario, max_sessions=2)
+
+        assert unsaved_kept == 4
+        assert kept == 2
+        assert len(reloaded["messages"]) == 2
+
+    def test_ollama_error_event(self, fake, tmp_path):
+        """Test a failing Ollama request ends the stream with an error event"""
+        fake.fail_next("/api/chat", status=500, message="out of memory")
+
+        async def scenario(server, http):
+            return await send(http, await new_conversation(http), "Hello")
+
+        events = run_scenario(fake, tmp_path, scenario)
+        assert events[-1][0] == "error"
+
+    def test_search_models_and_delete(self, fake, tmp_path):
+        """Test text search, the model list and deletion"""
+        async def scenario(server, http):
+            conversation_id = await new_conversation(http)
+            await send(http, conversation_id, "Tell me about turtles")
+            found = (await http.get("/api/search", params={"q": "TURTLES"})).json()
+            no_query = await http.get("/api/search")
+            models = (await http.get("/api/models")).json()
+            deleted = await http.delete(f"/api/conversations/{conversation_id}")
+            missing = await http.get(f"/api/conversations/{conversation_id}")
+            return conversation_id, found, no_query, models, deleted, missing
+
+        conversation_id, found, no_query, models, deleted, missing = run_scenario(fake, tmp_path, scenario)
+
+        assert found["mode"] == "text"
+        assert [r["conversation_id"] for r in found["results"]] == [conversation_id, conversation_id]
+        assert no_query.status_code == 400
+        assert models == {"models": ["llama2:latest", "slow:latest"]}
+        assert deleted.json() == {"deleted": conversation_id}
+        assert missing.status_code == 404
+
+    def test_bad_requests(self, fake, tmp_path):
+        """Test invalid requests get 4xx errors with a JSON message"""
+        async def scenario(server, http):
+            conversation_id = await new_conversation(http)
+            url = f"/api/conversations/{conversation_id}/messages"
+            return [
+                await http.get("/api/nothing"),
+                await http.put("/api/conversations"),
+                await http.post(url, content=b"{not json", headers={"Content-Type": "application/json"}),
+                await http.post(url, json={"content": ""}),
+                await http.post("/api/conversations/unknown/messages", json={"content": "Hi"}),
+            ]
+
+        responses = run_scenario(fake, tmp_path, scenario)
+
+        assert [r.status_code for r in responses] == [404, 405, 400, 400, 404]
+        assert all("error" in r.json() for r in responses)
+
+    def test_negative_content_length(self, fake, tmp_path):
+        """Test a negative Content-Length is a bad request, not a server error"""
+        async def scenario(server, http):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"POST /api/conversations HTTP/1.1\r\nContent-Length: -1\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        response = run_scenario(fake, tmp_path, scenario)
+
+        assert response.startswith(b"HTTP/1.1 400 ")
+
+    def test_foreign_host_refused(self, fake, tmp_path):
+        """Test requests naming another host are refused (DNS rebinding)"""
+        async def scenario(server, http):
+            return [
+                (await http.get("/api/health", headers={"Host": host})).status_code
+                for host in ("evil.example:%d" % server.port, "localhost:1", "localhost:%d" % server.port,
+                             "127.0.0.1:%d" % server.port, "[::1]:%d" % server.port)
+            ]
+
+        assert run_scenario(fake, tmp_path, scenario) == [403, 403, 200, 200, 200]
+
+    def test_browser_origins(self, fake, tmp_path):
+        """Test only allowed origins may call the API"""
+        async def scenario(server, http):
+            allowed = {"Origin": "http://localhost:3000"}
+            return (
+                await http.get("/api/health", headers=allowed),
+                await http.get("/api/health", headers={"Origin": "http://evil.example"}),
+                await http.options("/api/conversations", headers=allowed),
+            )
+
+        ok, refused, preflight = run_scenario(
+            fake, tmp_path, scenario, allowed_origins=["http://localhost:3000"]
+        )
+
+        assert ok.status_code == 200
+        assert ok.headers["access-control-allow-origin"] == "http://localhost:3000"
+        assert refused.status_code == 403
+        assert preflight.status_code == 204
+        assert "POST" in preflight.headers["access-control-allow-methods"]
+
+
+# Run tests with: pytest tests/test_chat_server.py -v
@@ -0,0 +1,110 @@
+"""
+Unit tests for the terminal front-end
+"""
+import io
+import subprocess
+import sys
+import pytest
+from src.api.ollama_client import OllamaClient
+from src.cli import TerminalChat
+from src.core.chat_manager import ChatManager
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+
+
+@pytest.fixture
+def server():
+    """Fake server with two models"""
+    with FakeOllamaServer([FakeModel("llama2"), FakeModel("mistral")]) as fake:
+        yield fake
+
+
+@pytest.fixture
+def chat(server, tmp_path):
+    """Terminal chat over a manager talking to the fake server"""
+    client = OllamaClient(base_url=server.url)
+    chat = TerminalChat(lambda: ChatManager(client, storage_dir=str(tmp_path)), output=io.StringIO()).start()
+    yield chat
+    chat.close()
+
+
+def run_lines(chat, *lines):
+    """Feed lines to the chat loop and return what it printed"""
+    pending = iter(lines)
+
+    def read_line(prompt):
+        try:
+            return next(pending)
+        except StopIteration:
+            raise EOFError
+
+    start = chat.output.tell()
+    assert chat.run(read_line) == 0
+    return chat.output.getvalue()[start:]
+
+
+class TestTerminalChat:
+    """Test cases for TerminalChat class"""
+
+    def test_send_streams_reply(self, chat):
+        """Test a message streams the reply and its stats"""
+        out = run_lines(chat, "Hello")
+
+        assert "llama2: This is llama2 answering: Hello\n" in out
+        assert "tokens/s)" in out
+        assert chat.manager.storage.list_conversations()[0]["message_count"] == 2
+
+    def test_switch_conversations(self, chat):
+        """Test /new, /list and /open move between saved conversations"""
+        out = run_lines(chat, "First", "/new mistral", "Second", "/list", "/open 2", "/history")
+
+        assert "New conversation with mistral" in out
+        listing = out[out.index("  1. "):]
+        assert listing.index("Second") < listing.index("First")
+        assert "you: First\nllama2: This is llama2 answering: First" in out
+        assert chat.manager.current_model == "llama2"
+
+    def test_search_falls_back_to_text(self, chat):
+        """Test /search finds saved messages without semantic search"""
+        out = run_lines(chat, "Tell me about turtles", "Something else", "/new", "/search TURTLES", "/open 1")
+
+        assert "1. Tell me about turtles" in out
+        assert "user: Tell me about turtles" in out
+        assert out.endswith("you: Something else\nllama2: This is llama2 answering: Something else\n\n")
+
+    def test_models_and_delete(self, chat):
+        """Test /models lists installed models and /delete removes a conversation"""
+        out = run_lines(chat, "/models", "Hi", "/list", "/delete 1", "/list")
+
+        assert "* llama2:latest\n  mistral:latest\n" in out
+        assert "Deleted\nNo saved conversations\n" in out
+
+    def test_errors_keep_the_loop_running(self, chat):
+        """Test bad commands are reported and the loop continues"""
+        out = run_lines(chat, "/nope", "/open 5", "/model mistral", "/quit", "/never reached")
+
+        assert "Unknown command /nope" in out
+        assert "error: no entry 5 in the last listing" in out
+        assert "Model: mistral" in out
+        assert "never reached" not in out
+
+    def test_load_failure_reported(self, tmp_path):
+        """Test a manager that fails to build is reported on use"""
+        def factory():
+            raise RuntimeError("bad settings")
+
+        chat = TerminalChat(factory, output=io.StringIO()).start()
+
+        assert "error: bad settings" in run_lines(chat, "/list")
+
+    def test_startup_imports(self):
+        """Test importing the front-end loads neither Tk nor settings or httpx"""
+        code = (
+            "import sys, src.cli; "
+            "loaded = {'tkinter', 'httpx', 'pydantic_settings'} & set(sys.modules); "
+            "print(sorted(loaded)); sys.exit(bool(loaded))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout
+
+
+# Run tests with: pytest tests/test_cli.py -v
@@ -232,3 +232,49 @@ class TestConversationStorage:
 
         assert original_msg_ids == loaded_msg_ids
         assert original_timestamps == loaded_timestamps
+
+    def test_comparison_id_round_trip(self, storage, sample_conversation):
+        """Test the comparison link is saved, loaded and listed"""
+        linked = Conversation(model="mistral", comparison_id="cmp-1")
+        linked.add_message(Message(role=Role.USER, content="Hello"))
+        storage.save_conversation(linked)
+        storage.save_conversation(sample_conversation)
+
+        assert storage.load_conversation(linked.id).comparison_id == "cmp-1"
+        assert storage.load_conversation(sample_conversation.id).comparison_id is None
+        listed = {conv["id"]: conv["comparison_id"] for conv in storage.list_conversations()}
+        assert listed == {linked.id: "cmp-1", sample_conversation.id: None}
+
+    def test_pending_messages_round_trip(self, storage, sample_conversation):
+        """Test queued messages are saved apart from the history and restored in order"""
+        queued = [Message(role=Role.USER, content="Next"), Message(role=Role.USER, content="Last")]
+        sample_conversation.pending.extend(queued)
+        storage.save_conversation(sample_conversation)
+
+        loaded = storage.load_conversation(sample_conversation.id)
+
+        assert [m.content for m in loaded.messages] == [m.content for m in sample_conversation.messages]
+        assert [(m.id, m.content) for m in loaded.pending] == [(m.id, m.content) for m in queued]
+
+        loaded.pending.clear()
+        storage.save_conversation(loaded)
+        with open(Path(storage.storage_dir) / f"{loaded.id}.json", encoding="utf-8") as f:
+            assert "pending" not in json.load(f)
+
+    def test_find_messages(self, storage, sample_conversation):
+        """Test every query word must appear, in any case"""
+        other = Conversation(model="mistral")
+        other.add_message(Message(role=Role.USER, content="Tell me about Python packaging"))
+        other.add_message(Message(role=Role.ASSISTANT, content="Packaging in python uses pyproject.toml"))
+        storage.save_conversation(sample_conversation)
+        storage.save_conversation(other)
+
+        matches = storage.find_messages("python PACKAGING")
+
+        assert [m["role"] for m in matches] == ["user", "assistant"]
+        assert matches[0]["conversation_id"] == other.id
+        assert matches[0]["title"] == "Tell me about Python packaging"
+        assert matches[1]["snippet"].startswith("Packaging in python")
+        assert storage.find_messages("hello")[0]["conversation_id"] == sample_conversation.id
+        assert storage.find_messages("python", limit=1) == matches[:1]
+        assert storage.find_messages("   ") == []
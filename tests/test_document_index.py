@@ -0,0 +1,243 @@
+"""
+Unit tests for DocumentIndex and retrieval in ChatManager
+"""
+import json
+import os
+import threading
+from types import SimpleNamespace
+import pytest
+from unittest.mock import Mock
+from src.api.ollama_client import OllamaClient
+from src.api.scheduler import Priority
+from src.api.stream_events import DoneEvent, GenerationStats, TokenEvent
+from src.core import document_index
+from src.core.chat_manager import ChatManager
+from src.core.document_index import DocumentIndex, chunk_lines, process_file, tokenize
+
+
+@pytest.fixture
+def docs(tmp_path):
+    """Folder with a few text documents"""
+    folder = tmp_path / "docs"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "garden.md").write_text("Tomatoes need full sun.\nWater the tomatoes every morning.\n")
+    (folder / "sub" / "kitchen.txt").write_text("Bake the bread at 220 degrees.\nLet the dough rise overnight.\n")
+    (folder / "car.txt").write_text("Change the engine oil every 10000 km.\n")
+    (folder / "image.png").write_bytes(b"\x89PNG\0\0tomatoes")
+    (folder / ".git").mkdir()
+    (folder / ".git" / "notes.txt").write_text("tomatoes tomatoes tomatoes")
+    return folder
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Empty document index processing files in-process"""
+    return DocumentIndex(index_file=str(tmp_path / "index.json"), max_workers=1)
+
+
+class TestChunking:
+    """Test cases for chunking and tokenizing"""
+
+    def test_tokenize(self):
+        """Test terms are lowercase words of two or more characters"""
+        assert tokenize("Hello, World! A b2 x") == ["hello", "world", "b2"]
+
+    def test_chunks_respect_size_and_overlap(self):
+        """Test chunks stay near the target size and repeat trailing lines"""
+        lines = [f"line {i:02d} " + "x" * 20 for i in range(20)]
+
+        chunks = list(chunk_lines(lines, chunk_size=100, overlap=40))
+
+        assert chunks[0][0] == 1
+        assert all(len(text) <= 100 + 30 for _, text in chunks)
+        first_lines = chunks[0][1].split("\n")
+        assert chunks[1][1].startswith(first_lines[-1])
+        assert chunks[1][0] == len(first_lines)
+        assert "line 19" in chunks[-1][1]
+
+    def test_long_lines_are_split(self):
+        """Test a line longer than a chunk is cut into several chunks"""
+        chunks = list(chunk_lines(["y" * 250], chunk_size=100, overlap=20))
+
+        assert [len(text) for _, text in chunks] == [100, 100, 90]
+        assert {line for line, _ in chunks} == {1}
+
+    def test_binary_files_have_no_chunks(self, docs):
+        """Test files containing NUL bytes are not indexed"""
+        assert process_file(str(docs / "image.png"), 1000, 200)["chunks"] == []
+
+
+class TestDocumentIndex:
+    """Test cases for DocumentIndex class"""
+
+    def test_search_ranks_relevant_chunk_first(self, docs, index):
+        """Test BM25 finds the document about the query"""
+        index.add_path(str(docs))
+        counts = index.refresh()
+
+        results = index.search("how often to water tomatoes?", k=2)
+
+        assert counts == {"indexed": 3, "removed": 0, "unchanged": 0}
+        assert results[0].path.endswith("garden.md")
+        assert results[0].line == 1
+        assert all(r.score > 0 for r in results)
+        assert index.search("quantum chromodynamics") == []
+
+    def test_incremental_refresh_by_mtime(self, docs, index):
+        """Test only changed files are re-read and deleted files dropped"""
+        index.add_path(str(docs))
+        index.refresh()
+
+        garden = docs / "garden.md"
+        garden.write_text("Peppers like warm soil.\n")
+        os.utime(garden, (garden.stat().st_atime, garden.stat().st_mtime + 10))
+        (docs / "car.txt").unlink()
+
+        assert index.refresh() == {"indexed": 1, "removed": 1, "unchanged": 1}
+        assert index.search("peppers")[0].path.endswith("garden.md")
+        assert index.search("engine oil") == []
+        assert index.refresh() == {"indexed": 0, "removed": 0, "unchanged": 2}
+
+    def test_unchanged_refresh_does_not_rewrite(self, docs, index):
+        """Test the index file is only written when roots or files changed"""
+        index.add_path(str(docs))
+        index.refresh()
+        index.index_file.unlink()
+
+        index.refresh()
+        assert not index.index_file.exists()
+
+        index.add_path(str(docs / "sub"))
+        index.refresh()
+        assert index.index_file.exists()
+
+    def test_persists_across_restarts(self, docs, index, tmp_path):
+        """Test a reopened index answers without re-reading unchanged files"""
+        index.add_path(str(docs))
+        index.refresh()
+
+        reopened = DocumentIndex(index_file=str(tmp_path / "index.json"), max_workers=1)
+
+        assert len(reopened) == len(index)
+        assert reopened.search("bread dough")[0].path.endswith("kitchen.txt")
+        assert reopened.refresh()["unchanged"] == 3
+
+    def test_save_does_not_block_search(self, docs, index, monkeypatch):
+        """Test searches run while the index file is written, and changes made meanwhile are saved later"""
+        index.add_path(str(docs / "car.txt"))
+        hits = []
+
+        def dump(data, f, **kwargs):
+            searcher = threading.Thread(target=lambda: hits.extend(index.search("engine oil")))
+            searcher.start()
+            searcher.join(timeout=2)
+            index.add_path(str(docs / "garden.md"))
+            json.dump(data, f, **kwargs)
+
+        monkeypatch.setattr(document_index, "json", SimpleNamespace(dump=dump, load=json.load))
+        index.refresh()
+
+        assert hits and hits[0].path.endswith("car.txt")
+        monkeypatch.undo()
+        index.refresh()
+        reopened = DocumentIndex(index_file=str(index.index_file), max_workers=1)
+        assert len(reopened.roots) == 2
+
+    def test_process_pool(self, docs, tmp_path):
+        """Test files are indexed the same way by worker processes"""
+        index = DocumentIndex(index_file=str(tmp_path / "pool.json"), max_workers=2)
+        index.add_path(str(docs))
+
+        assert index.refresh()["indexed"] == 3
+        assert index.search("engine oil")[0].path.endswith("car.txt")
+
+    def test_remove_path(self, docs, index):
+        """Test removing a root drops its documents"""
+        index.add_path(str(docs / "car.txt"))
+        index.refresh()
+        assert index.add_path(str(docs / "car.txt")) is False
+        assert index.add_path(str(docs / "missing")) is False
+
+        assert index.remove_path(str(docs / "car.txt"))
+        assert len(index) == 0
+
+    def test_embedding_rerank(self, docs, tmp_path):
+        """Test embedding similarity can reorder BM25 candidates"""
+        def embed(model, texts, **kwargs):
+            # The query and the kitchen text point the same way, the garden text elsewhere
+            return [
+                [1.0, 0.0] if "bread" in text else [0.7, 0.7] if "engine" in text else [0.0, 1.0]
+                for text in texts
+            ]
+
+        client = Mock(spec=OllamaClient)
+        client.embed.side_effect = embed
+        bm25 = DocumentIndex(index_file=str(tmp_path / "bm25.json"), max_workers=1)
+        hybrid = DocumentIndex(index_file=str(tmp_path / "hybrid.json"), max_workers=1, ollama_client=client)
+        for index in (bm25, hybrid):
+            index.add_path(str(docs))
+            index.refresh()
+
+        assert bm25.search("the tomatoes and bread")[0].path.endswith("garden.md")
+        assert hybrid.search("the tomatoes and bread")[0].path.endswith("kitchen.txt")
+        assert client.embed.call_args[0][0] == "nomic-embed-text"
+        assert client.embed.call_args[1]["priority"] == Priority.INTERACTIVE
+
+    def test_embedding_failure_falls_back_to_bm25(self, docs, tmp_path):
+        """Test search still works when embeddings are unavailable"""
+        client = Mock(spec=OllamaClient)
+        client.embed.side_effect = RuntimeError("no embedding model")
+        index = DocumentIndex(index_file=str(tmp_path / "hybrid.json"), max_workers=1, ollama_client=client)
+        index.add_path(str(docs))
+        index.refresh()
+
+        assert index.search("the tomatoes and bread")[0].path.endswith("garden.md")
+
+
+class TestChatManagerRetrieval:
+    """ChatManager sending document excerpts with messages"""
+
+    def test_excerpts_sent_but_not_stored(self, docs, index, tmp_path):
+        """Test relevant excerpts are added to the request only"""
+        index.add_path(str(docs))
+        index.refresh()
+        client = Mock(spec=OllamaClient)
+        client.generate_events.return_value = iter([TokenEvent(content="Every morning."), DoneEvent(stats=GenerationStats())])
+        chat_manager = ChatManager(client, storage_dir=str(tmp_path / "conversations"), document_index=index, retrieval_top_k=1)
+        chat_manager.start_new_conversation()
+
+        chat_manager.send_message("When should I water the tomatoes?", lambda chunk: None)
+
+        sent = client.generate_events.call_args[0][1]
+        assert [m["role"] for m in sent] == ["system", "user"]
+        assert "Water the tomatoes every morning." in sent[0]["content"]
+        assert "garden.md:1]" in sent[0]["content"]
+        assert [c.path for c in chat_manager.last_context] == [str(docs / "garden.md")]
+        assert [m.role.value for m in chat_manager.get_messages()] == ["user", "assistant"]
+
+    def test_no_excerpts_without_matches(self, docs, index, tmp_path):
+        """Test the request is unchanged when nothing matches"""
+        index.add_path(str(docs))
+        index.refresh()
+        client = Mock(spec=OllamaClient)
+        client.generate_events.return_value = iter([DoneEvent(stats=GenerationStats())])
+        chat_manager = ChatManager(client, storage_dir=str(tmp_path / "conversations"), document_index=index)
+        chat_manager.start_new_conversation()
+
+        chat_manager.send_message("Hello!", lambda chunk: None)
+
+        assert [m["role"] for m in client.generate_events.call_args[0][1]] == ["user"]
+        assert chat_manager.last_context == []
+
+    def test_add_documents_indexes_in_background(self, docs, index, tmp_path):
+        """Test add_documents indexes a folder on a worker thread"""
+        chat_manager = ChatManager(Mock(spec=OllamaClient), storage_dir=str(tmp_path / "c"), document_index=index)
+        done = []
+
+        chat_manager.add_documents(str(docs), on_done=done.append).join(timeout=10)
+
+        assert done == [{"indexed": 3, "removed": 0, "unchanged": 0}]
+        assert chat_manager.add_documents(str(docs)) is None
+
+
+# Run tests with: pytest tests/test_document_index.py -v
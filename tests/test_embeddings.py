@@ -0,0 +1,142 @@
+"""
+Unit tests for EmbeddingCache and OllamaClient.embed
+"""
+import pytest
+from array import array
+from src.api.embedding_cache import EmbeddingCache
+from src.api.ollama_client import OllamaClient
+from src.api.scheduler import RequestScheduler
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer, fake_embedding
+from src.utils.cancellation import CancellationToken
+from src.utils.exceptions import ModelNotFoundError, RequestCancelledError
+
+
+def fake_vector(text):
+    """Embedding the fake server returns for a text, at float32 precision"""
+    return array('f', fake_embedding(text, 8)).tolist()
+
+
+def batches(server):
+    """Inputs of the embedding requests the server received"""
+    return [request.body["input"] for request in server.requests_to("/api/embed")]
+
+
+@pytest.fixture
+def server():
+    """Fake Ollama server serving only an embedding model"""
+    with FakeOllamaServer([FakeModel("nomic-embed-text", embedding_dim=8)]) as fake:
+        yield fake
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty embedding cache in a temporary directory"""
+    return EmbeddingCache(cache_dir=str(tmp_path / "embeddings"))
+
+
+class TestEmbeddingCache:
+    """Test cases for EmbeddingCache class"""
+
+    def test_put_and_get(self, cache):
+        """Test stored vectors come back at float32 precision"""
+        cache.put_many("nomic-embed-text", ["a", "bb"], [[0.1, 0.2], [0.3, 0.4]])
+
+        a, missing, bb = cache.get_many("nomic-embed-text", ["a", "c", "bb"])
+
+        assert a == pytest.approx([0.1, 0.2], abs=1e-7)
+        assert bb == pytest.approx([0.3, 0.4], abs=1e-7)
+        assert missing is None
+        assert cache.get_many("other-model", ["a"]) == [None]
+
+    def test_persists_as_float32(self, cache):
+        """Test vectors are reloaded from compact float32 files"""
+        cache.put_many("org/model:latest", ["a", "b"], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+        cache.put_many("org/model:latest", ["a", "c"], [[9.0, 9.0, 9.0], [7.0, 8.0, 9.0]])
+
+        reopened = EmbeddingCache(cache_dir=str(cache.cache_dir))
+
+        assert reopened.count("org/model:latest") == 3
+        assert reopened.get_many("org/model:latest", ["a", "c"]) == [[1.0, 2.0, 3.0], [7.0, 8.0, 9.0]]
+        vector_file = next(cache.cache_dir.glob("*.f32"))
+        assert vector_file.stat().st_size == 3 * 3 * 4
+
+    def test_recovers_from_partial_write(self, cache):
+        """Test rows without a key (interrupted append) are dropped on load"""
+        cache.put_many("m", ["a"], [[1.0, 2.0]])
+        vector_file = next(cache.cache_dir.glob("*.f32"))
+        with open(vector_file, "ab") as f:
+            f.write(b"\0" * 8)
+
+        reopened = EmbeddingCache(cache_dir=str(cache.cache_dir))
+        reopened.put_many("m", ["b"], [[3.0, 4.0]])
+
+        assert reopened.get_many("m", ["a", "b"]) == [[1.0, 2.0], [3.0, 4.0]]
+
+    def test_rejects_mismatched_dimension(self, cache):
+        """Test vectors of a different size cannot be mixed into a model's file"""
+        cache.put_many("m", ["a"], [[1.0, 2.0]])
+
+        with pytest.raises(ValueError):
+            cache.put_many("m", ["b"], [[1.0, 2.0, 3.0]])
+
+
+class TestOllamaClientEmbed:
+    """OllamaClient.embed against a local server"""
+
+    def test_batches_and_order(self, server):
+        """Test texts are sent in batches and vectors returned in input order"""
+        client = OllamaClient(base_url=server.url)
+        texts = [f"text {'x' * i}" for i in range(10)]
+
+        vectors = client.embed("nomic-embed-text", texts, batch_size=4, max_concurrency=3)
+
+        assert vectors == [fake_vector(text) for text in texts]
+        assert sorted(len(batch) for batch in batches(server)) == [2, 4, 4]
+
+    def test_cached_texts_not_resent(self, server, cache):
+        """Test re-embedding after a restart costs no requests"""
+        texts = ["alpha", "beta", "alpha", "gamma"]
+        OllamaClient(base_url=server.url, embedding_cache=cache).embed("nomic-embed-text", texts)
+        assert batches(server) == [["alpha", "beta", "gamma"]]
+
+        restarted = OllamaClient(
+            base_url=server.url,
+            embedding_cache=EmbeddingCache(cache_dir=str(cache.cache_dir))
+        )
+        vectors = restarted.embed("nomic-embed-text", texts + ["delta"])
+
+        assert vectors == [fake_vector(text) for text in texts + ["delta"]]
+        assert batches(server)[1:] == [["delta"]]
+
+    def test_concurrency_within_scheduler_cap(self, server):
+        """Test every batch is admitted by the scheduler"""
+        client = OllamaClient(base_url=server.url, scheduler=RequestScheduler(max_concurrent_per_endpoint=1))
+
+        client.embed("nomic-embed-text", [str(i) for i in range(8)], batch_size=2, max_concurrency=4)
+
+        assert client.scheduler.metrics()["wait"]["background"]["count"] == 4
+
+    def test_unknown_model(self, server):
+        """Test a missing embedding model raises ModelNotFoundError"""
+        client = OllamaClient(base_url=server.url)
+
+        with pytest.raises(ModelNotFoundError):
+            client.embed("llama2", ["hello"])
+
+    def test_cancelled(self, server):
+        """Test a cancelled token stops unsent batches"""
+        client = OllamaClient(base_url=server.url)
+        token = CancellationToken()
+        token.cancel()
+
+        with pytest.raises(RequestCancelledError):
+            client.embed("nomic-embed-text", ["a", "b"], batch_size=1, cancel_token=token)
+        assert batches(server) == []
+
+    def test_empty_input(self, server):
+        """Test no request is sent for no texts"""
+        assert OllamaClient(base_url=server.url).embed("nomic-embed-text", []) == []
+        assert batches(server) == []
+
+
+# Run tests with: pytest tests/test_embeddings.py -v
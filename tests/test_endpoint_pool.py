@@ -0,0 +1,287 @@
+"""
+Unit tests for EndpointPool and multi-endpoint OllamaClient routing
+"""
+import json
+import socket
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.api.endpoint_pool import EndpointPool
+from src.api.ollama_client import OllamaClient
+from src.api.resilience import CircuitBreaker, RetryPolicy
+from src.utils.exceptions import CircuitOpenError, OllamaConnectionError
+
+
+class FakeClock:
+    """Manually advanced clock for circuit breaker tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _NamedServerHandler(BaseHTTPRequestHandler):
+    """Stand-in Ollama server that answers with its own name"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.server.failures:
+            self._send_json(self.server.failures.pop(0), {"error": "busy"})
+        elif self.path == "/api/ps":
+            self._send_json(200, {"models": [{"name": name} for name in self.server.resident]})
+        else:
+            self._send_json(200, {"models": [{"name": "llama2"}, {"name": "mistral"}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(self.path)
+        if self.server.failures:
+            self._send_json(self.server.failures.pop(0), {"error": "busy"})
+            return
+        lines = [
+            {"message": {"content": self.server.name}, "done": False},
+            {"message": {"content": ""}, "done": True},
+        ]
+        body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servers():
+    """Three local stand-in Ollama servers named a, b and c"""
+    started = []
+    for name in "abc":
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), _NamedServerHandler)
+        httpd.daemon_threads = True
+        httpd.name = name
+        httpd.requests = []
+        httpd.failures = []
+        httpd.resident = []
+        httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+        threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+        started.append(httpd)
+    yield started
+    for httpd in started:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def unused_url():
+    """URL of a port with nothing listening"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def dead_url():
+    """URL of a port with nothing listening"""
+    return unused_url()
+
+
+def chat(client, model="llama2"):
+    """Send one chat request and return the answering server's name"""
+    return "".join(client.generate_stream(model, [{"role": "user", "content": "Hi"}]))
+
+
+class TestEndpointPool:
+    """Test cases for EndpointPool class"""
+
+    def test_requires_endpoints(self):
+        """Test an empty pool is rejected"""
+        with pytest.raises(ValueError):
+            EndpointPool([])
+
+    def test_least_outstanding_requests(self):
+        """Test the endpoint with the fewest requests in flight is chosen"""
+        pool = EndpointPool(["http://a", "http://b", "http://c"])
+        a, b, c = pool.endpoints
+
+        with pool.track(a), pool.track(b), pool.track(b), pool.track(c):
+            assert pool.select() in (a, c)
+            with pool.track(a):
+                assert pool.select() is c
+        assert [e.outstanding for e in pool.endpoints] == [0, 0, 0]
+
+    def test_model_affinity(self):
+        """Test endpoints with the model loaded win over idle ones"""
+        pool = EndpointPool(["http://a", "http://b"])
+        a, b = pool.endpoints
+        pool.mark_resident(b, "llama2")
+
+        with pool.track(b):
+            assert pool.select("llama2") is b
+            assert pool.select("mistral") is a
+
+    def test_ejected_endpoints_skipped(self):
+        """Test endpoints with an open circuit receive no requests"""
+        clock = FakeClock()
+        pool = EndpointPool(
+            ["http://a", "http://b"],
+            breaker_factory=lambda url: CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+        )
+        a, b = pool.endpoints
+        a.circuit_breaker.record_failure()
+
+        assert all(pool.select() is b for _ in range(10))
+
+        b.circuit_breaker.record_failure()
+        with pytest.raises(CircuitOpenError, match="retrying in 10s"):
+            pool.select()
+
+    def test_exclude_ignored_without_alternative(self):
+        """Test excluded endpoints are still used if nothing else is healthy"""
+        pool = EndpointPool(["http://a", "http://b"])
+        a, b = pool.endpoints
+
+        assert pool.select(exclude={"http://a"}) is b
+        assert pool.select(exclude={"http://a", "http://b"}) in (a, b)
+
+    def test_check_health_readmits_recovered_endpoint(self):
+        """Test ejected endpoints are re-probed after the recovery timeout"""
+        clock = FakeClock()
+        pool = EndpointPool(
+            ["http://a", "http://b"],
+            breaker_factory=lambda url: CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+        )
+        a, b = pool.endpoints
+        a.circuit_breaker.record_failure()
+        probed = []
+
+        def probe(endpoint):
+            probed.append(endpoint.url)
+            return True
+
+        pool.check_health(probe, refresh_resident=lambda endpoint: ["llama2"])
+        assert probed == []
+        assert not a.healthy
+        assert b.resident_models == {"llama2"}
+
+        clock.now = 11
+        pool.check_health(lambda endpoint: False)
+        assert a.circuit_breaker.state == CircuitBreaker.OPEN
+
+        clock.now = 22
+        pool.check_health(probe)
+        assert probed == ["http://a"]
+        assert a.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+class TestOllamaClientEndpoints:
+    """Multi-endpoint OllamaClient behavior against local servers"""
+
+    def test_requests_follow_least_outstanding(self, servers):
+        """Test a request goes to the server with nothing in flight"""
+        client = OllamaClient(endpoints=[s.url for s in servers])
+        a, b, c = client.pool.endpoints
+
+        with client.pool.track(a), client.pool.track(c):
+            assert chat(client) == "b"
+        assert [e.outstanding for e in client.pool.endpoints] == [0, 0, 0]
+
+    def test_requests_spread_across_servers(self, servers):
+        """Test requests without a model are spread over idle servers"""
+        client = OllamaClient(endpoints=[s.url for s in servers])
+
+        for _ in range(30):
+            client.list_models()
+
+        assert all(server.requests for server in servers)
+
+    def test_affinity_from_running_models(self, servers):
+        """Test requests go to the server that has the model loaded"""
+        servers[2].resident = ["mistral"]
+        client = OllamaClient(endpoints=[s.url for s in servers])
+
+        assert client.list_running_models() == ["mistral"]
+        assert {chat(client, "mistral") for _ in range(5)} == {"c"}
+
+    def test_chat_creates_affinity(self, servers):
+        """Test a model stays on the server that first loaded it"""
+        client = OllamaClient(endpoints=[s.url for s in servers])
+
+        first = chat(client, "llama2")
+
+        assert {chat(client, "llama2") for _ in range(5)} == {first}
+
+    def test_failover_to_healthy_server(self, servers, dead_url):
+        """Test a dead endpoint is failed over without backoff and then ejected"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        client = OllamaClient(
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=5.0),
+            circuit_breaker=breaker,
+            endpoints=[dead_url, servers[0].url]
+        )
+
+        started = time.perf_counter()
+        for _ in range(5):
+            assert client.list_models() == ["llama2", "mistral"]
+
+        assert time.perf_counter() - started < 2.0
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not client.pool.endpoints[0].healthy
+
+    def test_all_endpoints_down(self, dead_url):
+        """Test the circuit error surfaces once every endpoint is ejected"""
+        client = OllamaClient(
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=60),
+            endpoints=[dead_url, unused_url()]
+        )
+
+        assert client.check_connection() is False
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+        assert not any(endpoint.healthy for endpoint in client.pool.endpoints)
+        with pytest.raises(CircuitOpenError):
+            client.list_models()
+
+    def test_health_checks_readmit_server(self, servers):
+        """Test the health check thread re-admits a recovered server"""
+        client = OllamaClient(
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=0.05),
+            endpoints=[servers[0].url, servers[1].url]
+        )
+        first = client.pool.endpoints[0]
+        first.circuit_breaker.record_failure()
+        assert first.circuit_breaker.state == CircuitBreaker.OPEN
+        servers[0].resident = ["llama2"]
+
+        client.start_health_checks(interval=0.02)
+        try:
+            deadline = time.monotonic() + 5
+            while first.circuit_breaker.state != CircuitBreaker.CLOSED and time.monotonic() < deadline:
+                time.sleep(0.01)
+            while "llama2" not in first.resident_models and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            client.close()
+
+        assert first.circuit_breaker.state == CircuitBreaker.CLOSED
+        assert first.resident_models == {"llama2"}
+
+
+# Run tests with: pytest tests/test_endpoint_pool.py -v
@@ -0,0 +1,237 @@
+"""
+Tests for FakeOllamaServer, driving OllamaClient and ChatManager end to end
+"""
+import threading
+import time
+import httpx
+import pytest
+from src.api.ollama_client import OllamaClient
+from src.api.stream_events import DoneEvent, ErrorEvent, TokenEvent
+from src.core.chat_manager import ChatManager
+from src.testing.fake_ollama_server import (
+    FakeModel, FakeOllamaServer, fake_embedding, split_tokens
+)
+from src.utils.cancellation import CancellationToken
+from src.utils.exceptions import ModelNotFoundError, OllamaConnectionError
+
+MESSAGES = [{"role": "user", "content": "Hello there"}]
+
+
+@pytest.fixture
+def server():
+    """Fake server with a chat model and an embedding model"""
+    models = [
+        FakeModel("llama2", chunk_tokens=2, context_length=8192),
+        FakeModel("nomic-embed-text", embedding_dim=16),
+    ]
+    with FakeOllamaServer(models) as fake:
+        yield fake
+
+
+@pytest.fixture
+def client(server):
+    """OllamaClient pointed at the fake server"""
+    client = OllamaClient(base_url=server.url)
+    yield client
+    client.close()
+
+
+class TestHelpers:
+    """Test cases for the module helpers"""
+
+    def test_split_tokens_round_trips(self):
+        """Test tokens concatenate back to the text"""
+        text = "  Hello,  world!\nBye "
+        assert "".join(split_tokens(text)) == text
+        assert split_tokens("a b") == ["a", " b"]
+
+    def test_fake_embedding(self):
+        """Test embeddings are deterministic, unit length and similar for shared words"""
+        vector = fake_embedding("red apple", 32)
+        assert vector == fake_embedding("red apple", 32)
+        assert abs(sum(x * x for x in vector) - 1.0) < 1e-9
+        assert fake_embedding("", 4) == [0.0] * 4
+
+        def similarity(a, b):
+            return sum(x * y for x, y in zip(fake_embedding(a, 256), fake_embedding(b, 256)))
+
+        assert similarity("red apple pie", "red apple") > similarity("red apple pie", "blue sky today")
+
+
+class TestFakeOllamaServer:
+    """Test cases for FakeOllamaServer against OllamaClient"""
+
+    def test_models_and_details(self, client):
+        """Test /api/tags and /api/show"""
+        assert client.list_models() == ["llama2:latest", "nomic-embed-text:latest"]
+        info = client.show_model("llama2")
+        assert info["details"]["family"] == "llama"
+        assert info["model_info"]["llama.context_length"] == 8192
+
+    def test_streamed_chat(self, client, server):
+        """Test a chat streams the responder's text in chunks with final stats"""
+        events = list(client.generate_events("llama2", MESSAGES))
+
+        tokens = [e.content for e in events if isinstance(e, TokenEvent)]
+        assert "".join(tokens) == "This is llama2 answering: Hello there"
+        assert tokens[0] == "This is"
+        stats = events[-1].stats
+        assert isinstance(events[-1], DoneEvent)
+        assert stats.eval_count == 6
+        assert stats.prompt_eval_count == 2
+        assert server.requests_to("/api/chat")[0].body["messages"] == MESSAGES
+
+    def test_custom_responder_and_num_predict(self, server, client):
+        """Test responders shape the reply and num_predict truncates it"""
+        server.add_model(FakeModel("echo", responder=lambda model, messages: "one two three four"))
+
+        text = "".join(client.generate_stream("echo", MESSAGES, options={"num_predict": 2}))
+
+        assert text == "one two"
+
+    def test_unknown_model(self, client):
+        """Test unknown models answer 404"""
+        with pytest.raises(ModelNotFoundError):
+            client.show_model("mistral")
+        with pytest.raises(OllamaConnectionError, match="404"):
+            list(client.generate_stream("mistral", MESSAGES))
+
+    def test_timing(self):
+        """Test load delay, time to first token and generation speed are simulated"""
+        model = FakeModel("slow", load_delay=0.2, time_to_first_token=0.1, tokens_per_second=50,
+                          responder=lambda model, messages: "a b c d e")
+        with FakeOllamaServer([model]) as fake:
+            client = OllamaClient(base_url=fake.url)
+            start = time.monotonic()
+            events = list(client.generate_events("slow", MESSAGES))
+            cold = time.monotonic() - start
+            start = time.monotonic()
+            list(client.generate_events("slow", MESSAGES))
+            warm = time.monotonic() - start
+            client.close()
+
+        # 0.2 s load + 0.1 s first token + 5 tokens at 50/s
+        assert cold >= 0.4
+        assert events[-1].stats.load_duration == pytest.approx(0.2e9, rel=0.1)
+        assert events[-1].stats.time_to_first_token >= 0.3
+        assert 0.2 <= warm < cold
+
+    def test_preload_and_keep_alive(self, client, server):
+        """Test empty requests load and unload models, as /api/ps reports"""
+        assert client.list_running_models() == []
+
+        client.preload_model("llama2")
+        assert client.list_running_models() == ["llama2:latest"]
+
+        client.preload_model("llama2", keep_alive=0)
+        assert client.list_running_models() == []
+
+    def test_keep_alive_expiry(self, client, server):
+        """Test models unload once keep_alive runs out"""
+        list(client.generate_stream("llama2", MESSAGES, keep_alive="0.1s"))
+        assert server.loaded_models() == ["llama2:latest"]
+        time.sleep(0.15)
+        assert server.loaded_models() == []
+
+    def test_embed(self, client):
+        """Test /api/embed returns the deterministic embeddings"""
+        vectors = client.embed("nomic-embed-text", ["red apple", "blue sky"])
+        assert len(vectors) == 2
+        assert vectors[0] == pytest.approx(fake_embedding("red apple", 16), abs=1e-6)
+
+    def test_injected_status(self, client, server):
+        """Test an injected error status is returned once"""
+        server.fail_next("/api/tags", status=404, message="gone")
+
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+        assert client.list_models() == ["llama2:latest", "nomic-embed-text:latest"]
+
+    def test_injected_stream_error(self, client, server):
+        """Test an in-stream error line surfaces as an ErrorEvent"""
+        server.fail_next("/api/chat", error_after=1, message="out of memory")
+
+        events = list(client.generate_events("llama2", MESSAGES))
+
+        assert isinstance(events[0], TokenEvent)
+        assert isinstance(events[-1], ErrorEvent)
+        assert "out of memory" in events[-1].message
+
+    def test_injected_disconnect(self, client, server):
+        """Test a connection dropped mid-stream raises after the chunks sent"""
+        server.fail_next("/api/chat", disconnect_after=2)
+        received = []
+
+        with pytest.raises(OllamaConnectionError):
+            for chunk in client.generate_stream("llama2", MESSAGES):
+                received.append(chunk)
+
+        assert "".join(received) == "This is llama2 answering:"
+
+    def test_client_disconnect_counted(self, server):
+        """Test streams the client abandons are counted"""
+        server.add_model(FakeModel("slow", tokens_per_second=100,
+                                   responder=lambda model, messages: "word " * 500))
+        client = OllamaClient(base_url=server.url)
+        token = CancellationToken()
+
+        for _ in client.generate_stream("slow", MESSAGES, cancel_token=token):
+            token.cancel()
+
+        deadline = time.monotonic() + 5
+        while server.aborted_streams == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert server.aborted_streams == 1
+        client.close()
+
+    def test_non_streaming(self, server):
+        """Test stream=False returns one JSON body"""
+        response = httpx.post(f"{server.url}/api/generate",
+                              json={"model": "llama2", "prompt": "Hi", "stream": False})
+
+        data = response.json()
+        assert data["done"] is True
+        assert data["response"] == "This is llama2 answering: Hi"
+
+
+class TestChatManagerEndToEnd:
+    """ChatManager talking to the fake server over HTTP"""
+
+    def test_conversation_round_trip(self, client, tmp_path):
+        """Test a turn streams, records stats and is saved"""
+        manager = ChatManager(client, storage_dir=str(tmp_path))
+        manager.start_new_conversation("llama2")
+        chunks = []
+
+        message = manager.send_message("Hello there", chunks.append)
+
+        assert message.content == "This is llama2 answering: Hello there"
+        assert len(chunks) == 3
+        assert manager.last_stats.eval_count == 6
+        assert len(manager.get_conversation_list()) == 1
+
+    def test_cancel_mid_stream(self, server, tmp_path):
+        """Test cancelling keeps the partial text"""
+        server.add_model(FakeModel("slow", tokens_per_second=200,
+                                   responder=lambda model, messages: "word " * 400))
+        client = OllamaClient(base_url=server.url)
+        manager = ChatManager(client, storage_dir=str(tmp_path))
+        manager.start_new_conversation("slow")
+        first_chunk = threading.Event()
+        result = {}
+
+        def send():
+            result["message"] = manager.send_message("Go", lambda chunk: first_chunk.set())
+
+        sender = threading.Thread(target=send)
+        sender.start()
+        assert first_chunk.wait(5)
+        manager.cancel_generation()
+        sender.join(5)
+
+        assert not sender.is_alive()
+        assert 0 < len(result["message"].content) < len("word " * 400)
+        client.close()
+
+
+# Run tests with: pytest tests/test_fake_ollama_server.py -v
@@ -0,0 +1,162 @@
+"""
+Unit tests for ModelCatalog class
+"""
+import json
+import pytest
+from unittest.mock import Mock
+from src.api.ollama_client import OllamaClient
+from src.core.model_catalog import ModelCatalog, ModelInfo
+from src.utils.exceptions import OllamaConnectionError
+
+
+SHOW_RESPONSE = {
+    "details": {"family": "llama", "parameter_size": "7B", "quantization_level": "Q4_0"},
+    "model_info": {"general.architecture": "llama", "llama.context_length": 4096}
+}
+
+
+class TestModelCatalog:
+    """Test cases for ModelCatalog class"""
+
+    @pytest.fixture
+    def mock_client(self):
+        """Create a mock OllamaClient"""
+        client = Mock(spec=OllamaClient)
+        client.list_models.return_value = ["llama2", "mistral"]
+        client.show_model.return_value = SHOW_RESPONSE
+        return client
+
+    @pytest.fixture
+    def cache_file(self, tmp_path):
+        """Path of a temporary catalog cache file"""
+        return str(tmp_path / "cache" / "models.json")
+
+    def test_get_models_uses_ttl_cache(self, mock_client, cache_file):
+        """Test the server is only queried once within the TTL"""
+        catalog = ModelCatalog(mock_client, cache_file=cache_file, ttl=60)
+
+        assert catalog.get_models() == ["llama2", "mistral"]
+        assert catalog.get_models() == ["llama2", "mistral"]
+        assert mock_client.list_models.call_count == 1
+        assert catalog.is_fresh()
+
+    def test_get_models_refetches_when_stale(self, mock_client, cache_file):
+        """Test an expired or invalidated cache is refetched"""
+        catalog = ModelCatalog(mock_client, cache_file=cache_file, ttl=0)
+        catalog.get_models()
+        catalog.get_models()
+        assert mock_client.list_models.call_count == 2
+
+        catalog.ttl = 60
+        catalog.invalidate()
+        catalog.get_models()
+        assert mock_client.list_models.call_count == 3
+
+    def test_persisted_list_available_at_startup(self, mock_client, cache_file):
+        """Test a new catalog serves the last known list without fetching"""
+        ModelCatalog(mock_client, cache_file=cache_file).get_models()
+
+        fresh_client = Mock(spec=OllamaClient)
+        catalog = ModelCatalog(fresh_client, cache_file=cache_file)
+
+        assert catalog.cached_models() == ["llama2", "mistral"]
+        assert not catalog.is_fresh()
+        fresh_client.list_models.assert_not_called()
+
+    def test_corrupt_cache_ignored(self, mock_client, tmp_path):
+        """Test an unreadable cache file does not break startup"""
+        cache_file = tmp_path / "models.json"
+        cache_file.write_text("{not json")
+        catalog = ModelCatalog(mock_client, cache_file=str(cache_file))
+        assert catalog.cached_models() == []
+
+    def test_fetch_error_propagates(self, mock_client, cache_file):
+        """Test fetch failures surface to synchronous callers"""
+        mock_client.list_models.side_effect = OllamaConnectionError("down")
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+
+        with pytest.raises(OllamaConnectionError):
+            catalog.get_models()
+
+    def test_refresh_async(self, mock_client, cache_file):
+        """Test background refresh updates the cache and calls back"""
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+        results = []
+
+        thread = catalog.refresh_async(on_success=results.append)
+        thread.join(timeout=5)
+
+        assert results == [["llama2", "mistral"]]
+        assert catalog.cached_models() == ["llama2", "mistral"]
+
+    def test_refresh_async_error(self, mock_client, cache_file):
+        """Test background refresh reports errors via callback"""
+        mock_client.list_models.side_effect = OllamaConnectionError("down")
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+        errors = []
+
+        catalog.refresh_async(on_error=errors.append).join(timeout=5)
+
+        assert len(errors) == 1
+
+    def test_model_info_cached_and_persisted(self, mock_client, cache_file):
+        """Test /api/show details are fetched once and persisted"""
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+
+        info = catalog.get_model_info("llama2")
+        assert info == ModelInfo(
+            name="llama2", context_length=4096, parameter_size="7B",
+            quantization_level="Q4_0", family="llama"
+        )
+        catalog.get_model_info("llama2")
+        assert mock_client.show_model.call_count == 1
+
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            assert json.load(f)["details"]["llama2"]["context_length"] == 4096
+
+        reloaded = ModelCatalog(Mock(spec=OllamaClient), cache_file=cache_file)
+        assert reloaded.get_model_info("llama2", fetch=False).parameter_size == "7B"
+
+    def test_model_info_fetch_failure(self, mock_client, cache_file):
+        """Test a failing /api/show returns None"""
+        mock_client.show_model.side_effect = OllamaConnectionError("down")
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+        assert catalog.get_model_info("llama2") is None
+
+    def test_no_cache_file(self, mock_client):
+        """Test persistence can be disabled"""
+        catalog = ModelCatalog(mock_client, cache_file=None)
+        assert catalog.get_models() == ["llama2", "mistral"]
+
+    def test_resident_models_tracked(self, mock_client, cache_file):
+        """Test /api/ps residency is tracked and warm models sort first"""
+        mock_client.list_running_models.return_value = ["mistral"]
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+
+        assert catalog.refresh_resident() == ["mistral"]
+        assert catalog.is_resident("mistral")
+        assert not catalog.is_resident("llama2")
+        assert catalog.warm_first(["codellama", "llama2", "mistral"]) == ["mistral", "codellama", "llama2"]
+
+        catalog.mark_resident("llama2")
+        assert catalog.resident_models() == ["llama2", "mistral"]
+
+    def test_resident_refresh_failure_keeps_previous(self, mock_client, cache_file):
+        """Test a failing /api/ps leaves the last known residency"""
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+        catalog.mark_resident("llama2")
+        mock_client.list_running_models.side_effect = OllamaConnectionError("down")
+
+        assert catalog.refresh_resident() == ["llama2"]
+
+    def test_refresh_async_updates_residency(self, mock_client, cache_file):
+        """Test a background refresh also refreshes resident models"""
+        mock_client.list_running_models.return_value = ["llama2"]
+        catalog = ModelCatalog(mock_client, cache_file=cache_file)
+
+        catalog.refresh_async().join(timeout=5)
+
+        assert catalog.is_resident("llama2")
+
+
+# Run tests with: pytest tests/test_model_catalog.py -v
@@ -0,0 +1,68 @@
+"""
+Unit tests for NDJSONParser class
+"""
+import json
+import pytest
+from src.api import ndjson
+from src.api.ndjson import NDJSONParser
+
+
+@pytest.fixture(params=["orjson", "json"])
+def parser_backend(request, monkeypatch):
+    """Run each test with both the fast and the stdlib JSON backend"""
+    if request.param == "json":
+        monkeypatch.setattr(ndjson, "_loads", json.loads)
+        monkeypatch.setattr(ndjson, "_DECODE_ERRORS", (json.JSONDecodeError, UnicodeDecodeError))
+        monkeypatch.setattr(ndjson, "_ZERO_COPY", False)
+    elif ndjson.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestNDJSONParser:
+    """Test cases for NDJSONParser class"""
+
+    def test_single_block(self, parser_backend):
+        """Test several complete lines in one block"""
+        parser = NDJSONParser()
+        values = list(parser.feed(b'{"a": 1}\n{"b": 2}\n'))
+        assert values == [{"a": 1}, {"b": 2}]
+
+    def test_lines_split_across_blocks(self, parser_backend):
+        """Test a line split over several feeds is decoded once complete"""
+        parser = NDJSONParser()
+        assert list(parser.feed(b'{"message": {"con')) == []
+        assert list(parser.feed(b'tent": "Hi"}}\n{"do')) == [{"message": {"content": "Hi"}}]
+        assert list(parser.feed(b'ne": true}\n')) == [{"done": True}]
+
+    def test_byte_at_a_time(self, parser_backend):
+        """Test feeding one byte at a time, including multi-byte UTF-8"""
+        payload = '{"message": {"content": "héllo ✓"}}\n'.encode()
+        parser = NDJSONParser()
+        values = [v for i in range(len(payload)) for v in parser.feed(payload[i:i + 1])]
+        assert values == [{"message": {"content": "héllo ✓"}}]
+
+    def test_blank_lines_and_crlf(self, parser_backend):
+        """Test blank lines are skipped and CRLF endings accepted"""
+        parser = NDJSONParser()
+        assert list(parser.feed(b'\n{"a": 1}\r\n\r\n{"b": 2}\n')) == [{"a": 1}, {"b": 2}]
+
+    def test_invalid_line_reported(self, parser_backend):
+        """Test invalid lines are skipped and reported"""
+        errors = []
+        parser = NDJSONParser(on_error=lambda line, e: errors.append(line))
+        values = list(parser.feed(b'{"a": 1}\ninvalid json\n{"b": 2}\n'))
+
+        assert values == [{"a": 1}, {"b": 2}]
+        assert errors == [b"invalid json"]
+        assert parser.error_count == 1
+
+    def test_flush_trailing_line(self, parser_backend):
+        """Test flush decodes a final line without newline"""
+        parser = NDJSONParser()
+        assert list(parser.feed(b'{"a": 1}\n{"b": 2}')) == [{"a": 1}]
+        assert list(parser.flush()) == [{"b": 2}]
+        assert list(parser.flush()) == []
+
+
+# Run tests with: pytest tests/test_ndjson.py -v
@@ -3,11 +3,21 @@ Unit tests for OllamaClient class
 """
 import pytest
 import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 from src.api.ollama_client import OllamaClient
+from src.api.stream_events import DoneEvent, ErrorEvent, TokenEvent
+from src.utils.cancellation import CancellationToken
 from src.utils.exceptions import OllamaConnectionError
 
 
+def ndjson_bytes(lines):
+    """Encode lines as the raw byte blocks iter_bytes() would produce"""
+    return iter([(line + "\n").encode() for line in lines])
+
+
 class TestOllamaClient:
     """Test cases for OllamaClient class"""
 
@@ -109,6 +119,61 @@ class TestOllamaClient:
         with pytest.raises(OllamaConnectionError, match="Failed to list models"):
             client.list_models()
 
+    @patch('src.api.ollama_client.httpx.Client')
+    def test_show_model(self, mock_client_class):
+        """Test fetching model details"""
+        mock_response = Mock()
+        mock_response.json.return_value = {"details": {"parameter_size": "7B"}}
+        mock_response.raise_for_status = Mock()
+
+        mock_http_client = Mock()
+        mock_http_client.post.return_value = mock_response
+        mock_client_class.return_value = mock_http_client
+
+        client = OllamaClient()
+
+        assert client.show_model("llama2") == {"details": {"parameter_size": "7B"}}
+        mock_http_client.post.assert_called_once_with(
+            "http://localhost:11434/api/show", json={"model": "llama2"}
+        )
+
+    @patch('src.api.ollama_client.httpx.Client')
+    def test_preload_model(self, mock_client_class):
+        """Test preloading sends an empty generate with keep_alive"""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+
+        mock_http_client = Mock()
+        mock_http_client.post.return_value = mock_response
+        mock_client_class.return_value = mock_http_client
+
+        client = OllamaClient()
+        assert client.preload_model("llama2", keep_alive="30m") is True
+
+        mock_http_client.post.assert_called_once()
+        args, kwargs = mock_http_client.post.call_args
+        assert args == ("http://localhost:11434/api/generate",)
+        assert kwargs["json"] == {"model": "llama2", "keep_alive": "30m"}
+        assert kwargs["timeout"] == 600.0
+
+    @patch('src.api.ollama_client.httpx.Client')
+    def test_list_running_models(self, mock_client_class):
+        """Test resident models are read from /api/ps"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "models": [{"name": "llama2:latest", "size_vram": 123}]
+        }
+        mock_response.raise_for_status = Mock()
+
+        mock_http_client = Mock()
+        mock_http_client.get.return_value = mock_response
+        mock_client_class.return_value = mock_http_client
+
+        client = OllamaClient()
+
+        assert client.list_running_models() == ["llama2:latest"]
+        mock_http_client.get.assert_called_once_with("http://localhost:11434/api/ps")
+
     @patch('src.api.ollama_client.httpx.Client')
     def test_generate_stream_success(self, mock_client_class):
         """Test successful streaming generation"""
@@ -122,7 +187,7 @@ class TestOllamaClient:
 
         mock_stream_response = Mock()
         mock_stream_response.raise_for_status = Mock()
-        mock_stream_response.iter_lines.return_value = iter(mock_lines)
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes(mock_lines)
         mock_stream_response.__enter__ = Mock(return_value=mock_stream_response)
         mock_stream_response.__exit__ = Mock(return_value=False)
 
@@ -150,7 +215,7 @@ class TestOllamaClient:
 
         mock_stream_response = Mock()
         mock_stream_response.raise_for_status = Mock()
-        mock_stream_response.iter_lines.return_value = iter(mock_lines)
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes(mock_lines)
         mock_stream_response.__enter__ = Mock(return_value=mock_stream_response)
         mock_stream_response.__exit__ = Mock(return_value=False)
 
@@ -178,7 +243,7 @@ class TestOllamaClient:
 
         mock_stream_response = Mock()
         mock_stream_response.raise_for_status = Mock()
-        mock_stream_response.iter_lines.return_value = iter(mock_lines)
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes(mock_lines)
         mock_stream_response.__enter__ = Mock(return_value=mock_stream_response)
         mock_stream_response.__exit__ = Mock(return_value=False)
 
@@ -221,7 +286,7 @@ class TestOllamaClient:
         """Test generate_stream sends correct request payload"""
         mock_stream_response = Mock()
         mock_stream_response.raise_for_status = Mock()
-        mock_stream_response.iter_lines.return_value = iter([
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes([
             json.dumps({"message": {"content": "Hi"}, "done": True})
         ])
         mock_stream_response.__enter__ = Mock(return_value=mock_stream_response)
@@ -248,6 +313,101 @@ class TestOllamaClient:
         assert json_payload["model"] == "mistral"
         assert json_payload["messages"] == messages
         assert json_payload["stream"] is True
+        assert "keep_alive" not in json_payload
+
+        list(client.generate_stream("mistral", messages, keep_alive="-1"))
+        assert mock_http_client.stream.call_args[1]["json"]["keep_alive"] == "-1"
+
+    @patch('src.api.ollama_client.httpx.Client')
+    def test_prefill_limits_output(self, mock_client_class):
+        """Test prefill asks for a single token and returns the stats"""
+        mock_stream_response = Mock()
+        mock_stream_response.raise_for_status = Mock()
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes([
+            json.dumps({"message": {"content": "Ok"}, "done": False}),
+            json.dumps({"done": True, "prompt_eval_count": 300, "prompt_eval_duration": 900})
+        ])
+        mock_stream_response.__enter__ = Mock(return_value=mock_stream_response)
+        mock_stream_response.__exit__ = Mock(return_value=False)
+
+        mock_http_client = Mock()
+        mock_http_client.stream.return_value = mock_stream_response
+        mock_client_class.return_value = mock_http_client
+
+        client = OllamaClient()
+        stats = client.prefill("llama2", [{"role": "user", "content": "Hi"}], keep_alive="10m")
+
+        assert stats.prompt_eval_count == 300
+        json_payload = mock_http_client.stream.call_args[1]["json"]
+        assert json_payload["options"] == {"num_predict": 1}
+        assert json_payload["keep_alive"] == "10m"
+
+    @patch('src.api.ollama_client.httpx.Client')
+    def test_generate_events_with_stats(self, mock_client_class):
+        """Test generate_events yields tokens then a done event with stats"""
+        mock_lines = [
+            json.dumps({"message": {"content": "Hello"}, "done": False}),
+            json.dumps({"message": {"content": " World"}, "done": False}),
+            json.dumps({
+                "model": "llama2",
+                "message": {"content": ""},
+                "done": True,
+                "total_duration": 3_000_000_000,
+                "load_duration": 1_000_000_000,
+                "prompt_eval_count": 12,
+                "prompt_eval_duration": 400_000_000,
+                "eval_count": 2,
+                "eval_duration": 100_000_000
+            })
+        ]
+
+        mock_stream_response = Mock()
+        mock_stream_response.raise_for_status = Mock()
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes(mock_lines)
+        mock_stream_response.__enter__ = Mock(return_value=mock_stream_response)
+        mock_stream_response.__exit__ = Mock(return_value=False)
+
+        mock_http_client = Mock()
+        mock_http_client.stream.return_value = mock_stream_response
+        mock_client_class.return_value = mock_http_client
+
+        client = OllamaClient()
+        events = list(client.generate_events("llama2", [{"role": "user", "content": "Hi"}]))
+
+        assert [type(e) for e in events] == [TokenEvent, TokenEvent, DoneEvent]
+        stats = events[-1].stats
+        assert stats.model == "llama2"
+        assert stats.prompt_eval_count == 12
+        assert stats.load_duration == 1_000_000_000
+        assert stats.server_tokens_per_second == pytest.approx(20.0)
+        assert stats.time_to_first_token is not None
+        assert stats.chunk_count == 2
+
+    @patch('src.api.ollama_client.httpx.Client')
+    def test_generate_stream_server_error(self, mock_client_class):
+        """Test an in-stream error from the server raises"""
+        mock_lines = [
+            json.dumps({"message": {"content": "Hel"}, "done": False}),
+            json.dumps({"error": "model runner has unexpectedly stopped"})
+        ]
+
+        mock_stream_response = Mock()
+        mock_stream_response.raise_for_status = Mock()
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes(mock_lines)
+        mock_stream_response.__enter__ = Mock(return_value=mock_stream_response)
+        mock_stream_response.__exit__ = Mock(return_value=False)
+
+        mock_http_client = Mock()
+        mock_http_client.stream.return_value = mock_stream_response
+        mock_client_class.return_value = mock_http_client
+
+        client = OllamaClient()
+        events = list(client.generate_events("llama2", []))
+        assert isinstance(events[-1], ErrorEvent)
+
+        mock_stream_response.iter_bytes.return_value = ndjson_bytes(mock_lines)
+        with pytest.raises(OllamaConnectionError, match="unexpectedly stopped"):
+            list(client.generate_stream("llama2", []))
 
     @patch('src.api.ollama_client.httpx.Client')
     def test_close_connection(self, mock_client_class):
@@ -261,4 +421,82 @@ class TestOllamaClient:
         mock_http_client.close.assert_called_once()
 
 
+    def test_stream_client_created_once_across_threads(self):
+        """Test concurrent first streams share a single streaming client"""
+        client = OllamaClient()
+        start = threading.Barrier(8)
+        seen = []
+
+        def first_stream():
+            start.wait()
+            seen.append(client._get_stream_client())
+
+        threads = [threading.Thread(target=first_stream) for _ in range(8)]
+        with patch('src.api.ollama_client.httpx.Client', side_effect=lambda **kwargs: (time.sleep(0.01), Mock())[1]):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len({id(stream_client) for stream_client in seen}) == 1
+
+class _SlowChatHandler(BaseHTTPRequestHandler):
+    """Streams one token, then stalls (or stalls before the headers)"""
+    protocol_version = "HTTP/1.1"
+    stall_before_headers = False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        if self.stall_before_headers:
+            time.sleep(5)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._write_chunk(json.dumps({"message": {"content": "Hello"}, "done": False}) + "\n")
+            time.sleep(5)
+            self._write_chunk(json.dumps({"message": {"content": ""}, "done": True}) + "\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOllamaClientCancellation:
+    """Cancellation tests against a local slow HTTP server"""
+
+    @pytest.fixture(params=[False, True], ids=["mid-stream", "before-headers"])
+    def slow_server(self, request):
+        handler = type("Handler", (_SlowChatHandler,), {"stall_before_headers": request.param})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def test_cancel_tears_down_connection_promptly(self, slow_server):
+        """Test cancelling stops a stalled stream well within the budget"""
+        client = OllamaClient(base_url=slow_server)
+        token = CancellationToken()
+        threading.Timer(0.2, token.cancel).start()
+
+        start = time.perf_counter()
+        chunks = list(client.generate_stream("llama2", [], cancel_token=token))
+        latency = time.perf_counter() - token.cancel_requested_at
+
+        assert chunks in ([], ["Hello"])
+        assert time.perf_counter() - start < 1.0
+        assert latency < 0.5
+        client.close()
+
+
 # Run tests with: pytest tests/test_ollama_client.py -v
@@ -0,0 +1,290 @@
+"""
+Unit tests for retry policy, circuit breaker and OllamaClient resilience
+"""
+import json
+import socket
+import threading
+import httpx
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+from src.api.ollama_client import OllamaClient
+from src.api.resilience import CircuitBreaker, RetryPolicy, is_retryable
+from src.utils.exceptions import CircuitOpenError, OllamaConnectionError
+
+
+class FakeClock:
+    """Manually advanced clock for circuit breaker tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers with queued status codes, then succeeds"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        if self._fail_if_scripted():
+            return
+        self._send_json(200, {"models": [{"name": "llama2"}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(("POST", self.path))
+        if self._fail_if_scripted():
+            return
+        lines = [
+            {"message": {"content": "Hello"}, "done": False},
+            {"message": {"content": " World"}, "done": False},
+        ]
+        body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        if self.server.disconnect_mid_stream:
+            # Send headers and part of the body, then drop the connection
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body) * 2))
+            self.end_headers()
+            self.wfile.write(body)
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        body += (json.dumps({"message": {"content": ""}, "done": True}) + "\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fail_if_scripted(self):
+        if self.server.failures:
+            self._send_json(self.server.failures.pop(0), {"error": "server busy"})
+            return True
+        return False
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Local scripted HTTP server standing in for Ollama"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    httpd.failures = []
+    httpd.disconnect_mid_stream = False
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def dead_url():
+    """URL of a port with nothing listening"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy class"""
+
+    def test_exponential_delays_with_jitter(self):
+        """Test delays double per attempt and stay within jitter bounds"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=100.0, jitter=0.5)
+        for attempt, full in ((1, 1.0), (2, 2.0), (3, 4.0)):
+            delay = policy.delay(attempt)
+            assert full * 0.5 <= delay <= full
+
+    def test_max_delay_cap(self):
+        """Test delays never exceed max_delay"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=3.0, jitter=0.0)
+        assert policy.delay(10) == 3.0
+
+    def test_is_retryable(self):
+        """Test only connection-phase failures are retryable"""
+        request = httpx.Request("GET", "http://x")
+        assert is_retryable(httpx.ConnectError("refused"))
+        assert is_retryable(httpx.ConnectTimeout("timeout"))
+        assert is_retryable(httpx.HTTPStatusError("busy", request=request, response=httpx.Response(503)))
+        assert not is_retryable(httpx.HTTPStatusError("nf", request=request, response=httpx.Response(404)))
+        assert not is_retryable(httpx.ReadTimeout("slow"))
+        assert not is_retryable(ValueError("bad"))
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker class"""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit"""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=FakeClock())
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+    def test_success_resets_failures(self):
+        """Test a success resets the failure count"""
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_recovery_with_healthy_probe(self):
+        """Test a passing probe lets one trial through and success closes"""
+        clock = FakeClock()
+        probe = Mock(return_value=True)
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, health_probe=probe, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 11
+        breaker.before_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        probe.assert_called_once()
+
+        # Other callers still fail fast while the trial is in flight
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failing probe keeps the circuit open for another period"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, health_probe=lambda: False, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 11
+        with pytest.raises(CircuitOpenError, match="health check"):
+            breaker.before_request()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        clock.now = 15
+        with pytest.raises(CircuitOpenError, match="retrying"):
+            breaker.before_request()
+
+    def test_failed_trial_reopens(self):
+        """Test a failing trial request re-opens the circuit"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 11
+        breaker.before_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestOllamaClientResilience:
+    """OllamaClient retry and circuit behavior against a local server"""
+
+    def test_list_models_retries_transient_errors(self, server):
+        """Test 503 responses are retried until the server recovers"""
+        server.failures = [503, 503]
+        client = OllamaClient(base_url=server.url, retry_policy=FAST_RETRIES)
+
+        assert client.list_models() == ["llama2"]
+        assert len(server.requests) == 3
+
+    def test_gives_up_after_max_attempts(self, server):
+        """Test the last error is raised once attempts are exhausted"""
+        server.failures = [503, 503, 503]
+        client = OllamaClient(base_url=server.url, retry_policy=FAST_RETRIES)
+
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+        assert len(server.requests) == 3
+
+    def test_client_errors_not_retried(self, server):
+        """Test non-transient statuses fail immediately"""
+        server.failures = [404]
+        client = OllamaClient(base_url=server.url, retry_policy=FAST_RETRIES)
+
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+        assert len(server.requests) == 1
+
+    def test_stream_retries_connection_phase(self, server):
+        """Test a stream is retried when the request is refused up front"""
+        server.failures = [503]
+        client = OllamaClient(base_url=server.url, retry_policy=FAST_RETRIES)
+
+        chunks = list(client.generate_stream("llama2", [{"role": "user", "content": "Hi"}]))
+
+        assert chunks == ["Hello", " World"]
+        assert server.requests == [("POST", "/api/chat"), ("POST", "/api/chat")]
+
+    def test_stream_not_retried_mid_stream(self, server):
+        """Test a stream that fails after starting is never replayed"""
+        server.disconnect_mid_stream = True
+        client = OllamaClient(base_url=server.url, retry_policy=FAST_RETRIES)
+
+        chunks = []
+        with pytest.raises(OllamaConnectionError):
+            for chunk in client.generate_stream("llama2", []):
+                chunks.append(chunk)
+
+        assert chunks == ["Hello", " World"]
+        assert len(server.requests) == 1
+
+    def test_circuit_fails_fast_when_server_down(self, dead_url):
+        """Test the circuit opens and then refuses without connecting"""
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+        client = OllamaClient(base_url=dead_url, retry_policy=FAST_RETRIES, circuit_breaker=breaker)
+
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        client.client = Mock()
+        with pytest.raises(CircuitOpenError):
+            client.list_models()
+        with pytest.raises(CircuitOpenError):
+            list(client.generate_stream("llama2", []))
+        client.client.get.assert_not_called()
+
+    def test_circuit_recovers_via_health_probe(self, server):
+        """Test the probe closes the circuit once the server is back"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+        client = OllamaClient(
+            base_url=server.url,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breaker=breaker
+        )
+        server.failures = [503]
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        clock.now = 6
+        assert client.list_models() == ["llama2"]
+        assert breaker.state == CircuitBreaker.CLOSED
+        # Failing request, health probe, trial request
+        assert [path for _, path in server.requests] == ["/api/tags"] * 3
+
+
+# Run tests with: pytest tests/test_resilience.py -v
@@ -0,0 +1,110 @@
+"""
+Unit tests for ResponseBuffer class
+"""
+import threading
+from src.core.response_buffer import ResponseBuffer
+
+
+class TestResponseBuffer:
+    """Test cases for ResponseBuffer class"""
+
+    def test_empty_buffer(self):
+        """Test a new buffer is empty"""
+        buffer = ResponseBuffer()
+
+        assert buffer.getvalue() == ""
+        assert buffer.snapshot() == ""
+        assert len(buffer) == 0
+        assert buffer.chunk_count == 0
+
+    def test_append_and_getvalue(self):
+        """Test appended chunks are joined in order"""
+        buffer = ResponseBuffer()
+        for chunk in ["Hello", " ", "World"]:
+            buffer.append(chunk)
+
+        assert buffer.getvalue() == "Hello World"
+        assert len(buffer) == 11
+        assert buffer.chunk_count == 3
+
+    def test_empty_chunks_ignored(self):
+        """Test empty chunks are not counted"""
+        buffer = ResponseBuffer()
+        buffer.append("a")
+        buffer.append("")
+        buffer.append("b")
+
+        assert buffer.getvalue() == "ab"
+        assert buffer.chunk_count == 2
+
+    def test_snapshot_during_streaming(self):
+        """Test snapshots reflect text appended so far"""
+        buffer = ResponseBuffer()
+        buffer.append("Hello")
+        assert buffer.snapshot() == "Hello"
+
+        buffer.append(" World")
+        assert buffer.snapshot() == "Hello World"
+
+        buffer.append("!")
+        assert buffer.getvalue() == "Hello World!"
+        assert buffer.chunk_count == 3
+
+    def test_read_from_returns_new_text(self):
+        """Test incremental reads return each chunk once, in order"""
+        buffer = ResponseBuffer()
+        text, cursor = buffer.read_from()
+        assert (text, cursor) == ("", 0)
+
+        buffer.append("Hello")
+        buffer.append(" ")
+        text, cursor = buffer.read_from(cursor)
+        assert text == "Hello "
+
+        text, cursor = buffer.read_from(cursor)
+        assert text == ""
+
+        buffer.append("World")
+        text, cursor = buffer.read_from(cursor)
+        assert text == "World"
+        assert cursor == buffer.chunk_count
+
+    def test_clear(self):
+        """Test clearing discards all text"""
+        buffer = ResponseBuffer()
+        buffer.append("Hello")
+        buffer.clear()
+
+        assert buffer.getvalue() == ""
+        assert len(buffer) == 0
+        assert buffer.chunk_count == 0
+
+    def test_str(self):
+        """Test str() returns accumulated text"""
+        buffer = ResponseBuffer()
+        buffer.append("Hi")
+        assert str(buffer) == "Hi"
+
+    def test_concurrent_snapshot_reads(self):
+        """Test snapshots from another thread never lose chunks"""
+        buffer = ResponseBuffer()
+        chunks = [f"{i}," for i in range(5000)]
+        snapshots = []
+
+        def reader():
+            for _ in range(200):
+                snapshots.append(buffer.snapshot())
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for chunk in chunks:
+            buffer.append(chunk)
+        thread.join()
+
+        expected = "".join(chunks)
+        assert buffer.getvalue() == expected
+        # Every snapshot must be a prefix of the final text
+        assert all(expected.startswith(s) for s in snapshots)
+
+
+# Run tests with: pytest tests/test_response_buffer.py -v
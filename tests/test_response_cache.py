@@ -0,0 +1,141 @@
+"""
+Unit tests for ResponseCache and cached OllamaClient responses
+"""
+import os
+import pytest
+from src.api.ollama_client import OllamaClient
+from src.api.response_cache import ResponseCache
+from src.api.stream_events import DoneEvent, GenerationStats, TokenEvent
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+@pytest.fixture
+def server():
+    """Fake Ollama server always answering "Hello there" in two chunks"""
+    with FakeOllamaServer([FakeModel("llama2", responder=lambda model, messages: "Hello there")]) as fake:
+        yield fake
+
+
+def chat_requests(server):
+    """Number of chat requests the server answered"""
+    return len(server.requests_to("/api/chat"))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty cache in a temporary directory"""
+    return ResponseCache(cache_dir=str(tmp_path / "responses"))
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class"""
+
+    def test_is_cacheable(self):
+        """Test only deterministic requests are cached"""
+        assert ResponseCache.is_cacheable({"temperature": 0})
+        assert ResponseCache.is_cacheable({"seed": 42, "temperature": 0.8})
+        assert not ResponseCache.is_cacheable({"temperature": 0.7})
+        assert not ResponseCache.is_cacheable({"num_predict": 1})
+        assert not ResponseCache.is_cacheable(None)
+
+    def test_key_covers_request(self):
+        """Test model, options and messages all change the key"""
+        key = ResponseCache.make_key("llama2", MESSAGES, {"seed": 1})
+
+        assert key == ResponseCache.make_key("llama2", [dict(m) for m in MESSAGES], {"seed": 1})
+        assert key != ResponseCache.make_key("mistral", MESSAGES, {"seed": 1})
+        assert key != ResponseCache.make_key("llama2", MESSAGES, {"seed": 2})
+        assert key != ResponseCache.make_key("llama2", MESSAGES + [{"role": "user", "content": "?"}], {"seed": 1})
+
+    def test_put_and_get(self, cache):
+        """Test a stored response is returned with its stats"""
+        cache.put("k", ["Hello", " there"], GenerationStats(model="llama2", eval_count=2))
+
+        cached = cache.get("k")
+
+        assert cached.chunks == ["Hello", " there"]
+        assert cached.stats.eval_count == 2
+        assert cache.get("missing") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_persists_across_instances(self, cache):
+        """Test entries are read back from disk by a new cache"""
+        cache.put("k", ["Hello"], GenerationStats())
+
+        reopened = ResponseCache(cache_dir=str(cache.cache_dir))
+
+        assert len(reopened) == 1
+        assert reopened.get("k").chunks == ["Hello"]
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test the size limit evicts the entry unused the longest"""
+        cache.put("a", ["x" * 100], GenerationStats())
+        cache.put("b", ["x" * 100], GenerationStats())
+        # Room for two entries (sizes vary by a few bytes)
+        cache.max_bytes = cache.size_bytes() + 20
+        # Make "a" the most recently used
+        os.utime(cache._path("b"), (1, 1))
+        cache._index["b"] = (cache._index["b"][0], 1)
+        cache.get("a")
+
+        cache.put("c", ["x" * 100], GenerationStats())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.size_bytes() <= cache.max_bytes
+
+    def test_unreadable_entry_dropped(self, cache):
+        """Test a corrupt entry counts as a miss and is removed"""
+        cache.put("k", ["Hello"], GenerationStats())
+        cache._path("k").write_text("not json")
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+
+class TestOllamaClientResponseCache:
+    """OllamaClient replaying cached responses"""
+
+    def test_deterministic_request_replayed(self, server, cache):
+        """Test a repeated deterministic request is served from the cache"""
+        client = OllamaClient(base_url=server.url, response_cache=cache)
+        options = {"temperature": 0}
+
+        first = list(client.generate_events("llama2", MESSAGES, options=options))
+        second = list(client.generate_events("llama2", MESSAGES, options=options))
+
+        assert chat_requests(server) == 1
+        assert [type(e) for e in second] == [TokenEvent, TokenEvent, DoneEvent]
+        assert [e.content for e in second[:-1]] == [e.content for e in first[:-1]]
+        assert first[-1].stats.cached is False
+        stats = second[-1].stats
+        assert stats.cached is True
+        assert stats.eval_count == 2
+        assert stats.chunk_count == 2
+
+    def test_generate_stream_replays_text(self, server, cache):
+        """Test cache hits look like a normal text stream"""
+        client = OllamaClient(base_url=server.url, response_cache=cache)
+
+        list(client.generate_events("llama2", MESSAGES, options={"seed": 7}))
+        chunks = list(client.generate_stream("llama2", MESSAGES, options={"seed": 7}))
+
+        assert "".join(chunks) == "Hello there"
+        assert chat_requests(server) == 1
+
+    def test_non_deterministic_request_not_cached(self, server, cache):
+        """Test sampled requests always reach the server"""
+        client = OllamaClient(base_url=server.url, response_cache=cache)
+
+        for _ in range(2):
+            list(client.generate_events("llama2", MESSAGES))
+            list(client.generate_events("llama2", MESSAGES, options={"temperature": 0.7}))
+
+        assert chat_requests(server) == 4
+        assert len(cache) == 0
+
+
+# Run tests with: pytest tests/test_response_cache.py -v
@@ -0,0 +1,269 @@
+"""
+Unit tests for RequestScheduler and scheduled OllamaClient requests
+"""
+import json
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.api.ollama_client import OllamaClient
+from src.api.scheduler import Priority, RequestScheduler
+from src.api.stream_events import TokenEvent
+from src.testing.fake_ollama_server import FakeModel, FakeOllamaServer
+from src.utils.cancellation import CancellationToken
+from src.utils.exceptions import RequestCancelledError
+
+ENDPOINT = "http://ollama:11434"
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def queue_depth(scheduler, priority):
+    """Number of waiting requests of a priority class"""
+    return scheduler.metrics()["queue_depth"][priority]
+
+
+class _SlowStreamHandler(BaseHTTPRequestHandler):
+    """Streams a token every 20 ms until done or disconnected"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        # Prefills (num_predict set) run long, so they are still busy when a chat arrives
+        tokens = 5 if payload.get("options", {}).get("num_predict") is None else 200
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i in range(tokens):
+                self._chunk({"message": {"content": f"t{i} "}, "done": False})
+                time.sleep(0.02)
+            self._chunk({"message": {"content": ""}, "done": True, "prompt_eval_count": 10})
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass
+
+    def _chunk(self, data):
+        line = (json.dumps(data) + "\n").encode()
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    """Local server streaming slowly, standing in for a busy Ollama"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SlowStreamHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestRequestScheduler:
+    """Test cases for RequestScheduler class"""
+
+    def test_concurrency_cap(self):
+        """Test no more than the cap of requests run on one endpoint"""
+        scheduler = RequestScheduler(max_concurrent_per_endpoint=2)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def work():
+            with scheduler.slot(ENDPOINT):
+                with lock:
+                    running.append(1)
+                    peak.append(len(running))
+                time.sleep(0.02)
+                with lock:
+                    running.pop()
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert max(peak) == 2
+        assert scheduler.metrics()["wait"]["interactive"]["count"] == 6
+
+    def test_endpoint_limits(self):
+        """Test caps are per endpoint and can be overridden"""
+        scheduler = RequestScheduler(max_concurrent_per_endpoint=1, endpoint_limits={"http://big/": 3})
+        assert scheduler.limit_for("http://big") == 3
+        assert scheduler.limit_for(ENDPOINT) == 1
+
+        with scheduler.slot(ENDPOINT), scheduler.slot("http://other"):
+            assert scheduler.metrics()["running"] == {ENDPOINT: 1, "http://other": 1}
+
+    def test_interactive_admitted_before_background(self):
+        """Test waiting interactive requests jump ahead of queued background work"""
+        scheduler = RequestScheduler(max_concurrent_per_endpoint=1, preempt_background=False)
+        order = []
+
+        def work(name, priority):
+            with scheduler.slot(ENDPOINT, priority):
+                order.append(name)
+
+        with scheduler.slot(ENDPOINT):
+            background = threading.Thread(target=work, args=("background", Priority.BACKGROUND))
+            background.start()
+            wait_until(lambda: queue_depth(scheduler, "background") == 1)
+            interactive = threading.Thread(target=work, args=("interactive", Priority.INTERACTIVE))
+            interactive.start()
+            wait_until(lambda: queue_depth(scheduler, "interactive") == 1)
+
+        background.join(timeout=5)
+        interactive.join(timeout=5)
+        assert order == ["interactive", "background"]
+
+    def test_preempts_background_for_interactive(self):
+        """Test an interactive request cancels running background work"""
+        scheduler = RequestScheduler(max_concurrent_per_endpoint=1)
+        token = CancellationToken()
+        admitted = threading.Event()
+
+        def background():
+            with scheduler.slot(ENDPOINT, Priority.BACKGROUND, token):
+                token.wait(timeout=5)
+
+        thread = threading.Thread(target=background)
+        thread.start()
+        wait_until(lambda: scheduler.metrics()["running"].get(ENDPOINT) == 1)
+
+        with scheduler.slot(ENDPOINT, Priority.INTERACTIVE):
+            admitted.set()
+
+        thread.join(timeout=5)
+        assert token.cancelled
+        assert admitted.is_set()
+        assert scheduler.metrics()["preemptions"] == 1
+
+    def test_background_without_token_not_preempted(self):
+        """Test background work without a token is left to finish"""
+        scheduler = RequestScheduler(max_concurrent_per_endpoint=1)
+        release = threading.Event()
+
+        def background():
+            with scheduler.slot(ENDPOINT, Priority.BACKGROUND):
+                release.wait(timeout=5)
+
+        thread = threading.Thread(target=background)
+        thread.start()
+        wait_until(lambda: scheduler.metrics()["running"].get(ENDPOINT) == 1)
+
+        def interactive_work():
+            with scheduler.slot(ENDPOINT):
+                pass
+
+        interactive = threading.Thread(target=interactive_work)
+        interactive.start()
+        wait_until(lambda: queue_depth(scheduler, "interactive") == 1)
+        assert scheduler.metrics()["preemptions"] == 0
+
+        release.set()
+        thread.join(timeout=5)
+        interactive.join(timeout=5)
+        assert queue_depth(scheduler, "interactive") == 0
+
+    def test_cancel_while_queued(self):
+        """Test a queued request can be abandoned through its token"""
+        scheduler = RequestScheduler(max_concurrent_per_endpoint=1, preempt_background=False)
+        token = CancellationToken()
+        errors = []
+
+        def queued():
+            try:
+                with scheduler.slot(ENDPOINT, Priority.BACKGROUND, token):
+                    pass
+            except RequestCancelledError as e:
+                errors.append(e)
+
+        with scheduler.slot(ENDPOINT):
+            thread = threading.Thread(target=queued)
+            thread.start()
+            wait_until(lambda: queue_depth(scheduler, "background") == 1)
+            token.cancel()
+            thread.join(timeout=5)
+
+        assert len(errors) == 1
+        assert queue_depth(scheduler, "background") == 0
+
+
+class TestOllamaClientScheduling:
+    """OllamaClient requests going through the scheduler"""
+
+    def test_chat_preempts_background_prefill(self, slow_server):
+        """Test an interactive chat cancels a running prefill on a full server"""
+        client = OllamaClient(
+            base_url=slow_server,
+            scheduler=RequestScheduler(max_concurrent_per_endpoint=1)
+        )
+        messages = [{"role": "user", "content": "Hi"}]
+        result = {}
+
+        def prefill():
+            result["stats"] = client.prefill("llama2", messages)
+
+        thread = threading.Thread(target=prefill)
+        thread.start()
+        wait_until(lambda: client.scheduler.metrics()["running"])
+
+        started = time.perf_counter()
+        chunks = list(client.generate_stream("llama2", messages))
+        thread.join(timeout=5)
+
+        assert "".join(chunks) == "t0 t1 t2 t3 t4 "
+        assert result["stats"] is None
+        assert time.perf_counter() - started < 2.0
+        metrics = client.scheduler.metrics()
+        assert metrics["preemptions"] == 1
+        assert metrics["running"] == {}
+        assert metrics["wait"]["interactive"]["count"] == 1
+
+
+    def test_chat_preempts_background_embedding(self):
+        """Test an interactive chat aborts an embedding stuck loading its model"""
+        models = [FakeModel("llama2"), FakeModel("nomic-embed-text", load_delay=2.0)]
+        with FakeOllamaServer(models) as server:
+            client = OllamaClient(
+                base_url=server.url,
+                scheduler=RequestScheduler(max_concurrent_per_endpoint=1)
+            )
+            token = CancellationToken()
+            errors = []
+
+            def embed():
+                try:
+                    client.embed("nomic-embed-text", ["some text"], cancel_token=token)
+                except RequestCancelledError as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=embed)
+            thread.start()
+            wait_until(lambda: client.scheduler.metrics()["running"])
+
+            started = time.perf_counter()
+            first_token = None
+            for event in client.generate_events("llama2", [{"role": "user", "content": "Hi"}]):
+                if isinstance(event, TokenEvent) and first_token is None:
+                    first_token = time.perf_counter() - started
+            thread.join(timeout=5)
+            client.close()
+
+        assert first_token is not None and first_token < 0.5
+        assert len(errors) == 1
+        assert client.scheduler.metrics()["preemptions"] == 1
+
+# Run tests with: pytest tests/test_scheduler.py -v
@@ -0,0 +1,253 @@
+"""
+Unit tests for VectorIndex, SemanticSearch and ChatManager search
+"""
+import pytest
+from unittest.mock import Mock
+from src.api.ollama_client import OllamaClient
+from src.core import semantic_search
+from src.core.chat_manager import ChatManager
+from src.core.message import Message, Role
+from src.core.semantic_search import SemanticSearch, VectorIndex
+from src.api.stream_events import DoneEvent, GenerationStats, TokenEvent
+from src.utils.exceptions import ModelNotFoundError, RequestCancelledError
+
+VOCABULARY = ["cat", "dog", "python", "code", "rain"]
+
+
+def bag_of_words(text):
+    """Stand-in embedding: word counts over a small vocabulary"""
+    words = text.lower().replace("?", " ").replace(".", " ").split()
+    return [float(words.count(word)) for word in VOCABULARY]
+
+
+def fake_embed(model, texts, **kwargs):
+    """Embedding function for a mocked OllamaClient"""
+    if model != "nomic-embed-text":
+        raise ModelNotFoundError(f"Model not found: {model}")
+    return [bag_of_words(text) for text in texts]
+
+
+def entry(message_id, conversation_id="c1"):
+    """Row metadata for a test vector"""
+    return {"conversation_id": conversation_id, "message_id": message_id, "role": "user", "snippet": message_id}
+
+
+@pytest.fixture(params=["python", "numpy"])
+def use_numpy(request):
+    """Run index tests with both search backends"""
+    if request.param == "numpy":
+        if semantic_search._numpy() is None:
+            pytest.skip("numpy not installed")
+        return True
+    return False
+
+
+@pytest.fixture
+def client():
+    """Mocked client computing bag-of-words embeddings"""
+    client = Mock(spec=OllamaClient)
+    client.embed.side_effect = fake_embed
+    return client
+
+
+class TestVectorIndex:
+    """Test cases for VectorIndex class"""
+
+    def test_top_k_by_cosine_similarity(self, tmp_path, use_numpy):
+        """Test rows are ranked by cosine similarity, best first"""
+        index = VectorIndex(str(tmp_path), use_numpy=use_numpy)
+        index.reset("m", 3)
+        index.add([entry("x"), entry("y"), entry("z")], [[1, 0, 0], [10, 10, 0], [0, 0, 5]])
+
+        results = index.top_k([1, 0.1, 0], k=2)
+
+        assert [e["message_id"] for e, _ in results] == ["x", "y"]
+        assert results[0][1] == pytest.approx(0.995, abs=1e-3)
+        assert len(index.top_k([0, 0, 1], k=10)) == 3
+
+    def test_removed_rows_excluded(self, tmp_path, use_numpy):
+        """Test a removed conversation no longer matches"""
+        index = VectorIndex(str(tmp_path), use_numpy=use_numpy)
+        index.reset("m", 2)
+        index.add([entry("a", "c1"), entry("b", "c2"), entry("c", "c3")], [[1, 0], [1, 0.1], [0, 1]])
+
+        assert index.remove_conversation("c1") == 1
+
+        assert [e["message_id"] for e, _ in index.top_k([1, 0], k=2)] == ["b", "c"]
+        assert not index.contains("a")
+        assert len(index) == 2
+
+    def test_persistence_and_compaction(self, tmp_path, use_numpy):
+        """Test the index reloads from disk and drops removed rows when compacting"""
+        index = VectorIndex(str(tmp_path), use_numpy=use_numpy)
+        index.reset("m", 2)
+        index.add([entry("a", "c1"), entry("b", "c2"), entry("c", "c2")], [[1, 0], [0, 1], [1, 1]])
+        index.remove_conversation("c1")
+
+        reopened = VectorIndex(str(tmp_path), use_numpy=use_numpy)
+        assert (reopened.model, reopened.dim, len(reopened)) == ("m", 2, 2)
+        assert [e["message_id"] for e, _ in reopened.top_k([0, 1], k=1)] == ["b"]
+
+        reopened.remove_conversation("c2")
+        assert index.vectors_path.stat().st_size == 0
+        assert VectorIndex(str(tmp_path)).top_k([0, 1]) == []
+
+    def test_interrupted_append_truncated(self, tmp_path):
+        """Test vectors without metadata are dropped on load"""
+        index = VectorIndex(str(tmp_path), use_numpy=False)
+        index.reset("m", 2)
+        index.add([entry("a")], [[1, 0]])
+        with open(index.vectors_path, "ab") as f:
+            f.write(b"\0" * 8)
+
+        reopened = VectorIndex(str(tmp_path), use_numpy=False)
+
+        assert len(reopened) == 1
+        assert index.vectors_path.stat().st_size == 8
+
+
+class TestSemanticSearch:
+    """Test cases for SemanticSearch class"""
+
+    def test_search_finds_related_message(self, tmp_path, client):
+        """Test the message closest in meaning ranks first"""
+        search = SemanticSearch(client, index_dir=str(tmp_path))
+        messages = [
+            Message(role=Role.USER, content="My cat chased the dog"),
+            Message(role=Role.ASSISTANT, content="Python code runs fast"),
+        ]
+        assert search.index_conversation("c1", messages) == 2
+
+        hits = search.search("any python code?", k=1)
+
+        assert [(h.conversation_id, h.message_id, h.role) for h in hits] == [("c1", messages[1].id, "assistant")]
+        assert hits[0].snippet == "Python code runs fast"
+
+    def test_indexes_new_messages_only(self, tmp_path, client):
+        """Test re-indexing a conversation embeds only messages added since"""
+        search = SemanticSearch(client, index_dir=str(tmp_path))
+        messages = [Message(role=Role.USER, content="cat"), Message(role=Role.ASSISTANT, content="")]
+        search.index_conversation("c1", messages)
+
+        messages.append(Message(role=Role.USER, content="dog"))
+        assert search.index_conversation("c1", messages) == 1
+
+        assert client.embed.call_args_list[-1][0][1] == ["dog"]
+
+    def test_model_change_rebuilds_in_background(self, tmp_path, client):
+        """Test old vectors keep serving searches until the new model's index is complete"""
+        def embed(model, texts, **kwargs):
+            if model == "old-model":
+                return [[0, 0, 0, 0, 1] for _ in texts]
+            return fake_embed(model, texts)
+        client.embed.side_effect = embed
+        cat, dog = Message(role=Role.USER, content="cat"), Message(role=Role.USER, content="dog")
+        index = VectorIndex(str(tmp_path / "index"))
+        index.reset("old-model", 5)
+        index.add([entry(cat.id, "c1"), entry(dog.id, "c2")], [[0, 0, 0, 0, 1], [0, 0, 0, 0, 1]])
+        storage = Mock()
+        storage.list_conversations.return_value = [{"id": "c1"}, {"id": "c2"}]
+        storage.load_conversation.side_effect = lambda cid: Mock(id=cid, messages=[cat] if cid == "c1" else [dog])
+
+        search = SemanticSearch(client, index_dir=str(tmp_path / "index"))
+        assert search.index_conversation("c1", [cat]) == 1
+
+        # c2 still has only old-model vectors, so the old index keeps answering
+        assert search.index.model == "old-model"
+        assert len(search.search("dog")) == 2
+
+        assert search.index_storage(storage) == 1
+        assert (search.index.model, len(search.index)) == ("nomic-embed-text", 2)
+        assert search.search("dog", k=1)[0].conversation_id == "c2"
+        assert not (tmp_path / "index.rebuild").exists()
+        assert VectorIndex(str(tmp_path / "index")).model == "nomic-embed-text"
+
+    def test_preempted_indexing_resumes(self, tmp_path, client):
+        """Test each pass embeds with its own token and retries after a preemption"""
+        tokens = []
+
+        def embed(model, texts, cancel_token=None, **kwargs):
+            tokens.append(cancel_token)
+            if len(tokens) == 1:
+                raise RequestCancelledError("preempted")
+            return fake_embed(model, texts)
+        client.embed.side_effect = embed
+        search = SemanticSearch(client, index_dir=str(tmp_path))
+
+        assert search.index_conversation("c1", [Message(role=Role.USER, content="cat")]) == 1
+
+        assert len(tokens) == 2 and tokens[0] is not tokens[1]
+        assert all(token is not None for token in tokens)
+        assert client.embed.call_args[1]["max_concurrency"] == 1
+
+    def test_missing_model_disables_indexing(self, tmp_path, client):
+        """Test a missing embedding model stops indexing instead of failing every save"""
+        search = SemanticSearch(client, model="not-pulled", index_dir=str(tmp_path))
+
+        assert search.index_conversation("c1", [Message(role=Role.USER, content="cat")]) == 0
+        assert search.index_conversation("c1", [Message(role=Role.USER, content="dog")]) == 0
+
+        assert not search.available
+        assert client.embed.call_count == 1
+
+
+class TestChatManagerSemanticSearch:
+    """ChatManager keeping the semantic index up to date"""
+
+    @pytest.fixture
+    def chat_manager(self, tmp_path, client):
+        """Chat manager with semantic search over a temporary storage"""
+        search = SemanticSearch(client, index_dir=str(tmp_path / "index"))
+        return ChatManager(client, storage_dir=str(tmp_path / "conversations"), semantic_search=search)
+
+    def wait_for_indexing(self, chat_manager):
+        """Block until queued index updates are done"""
+        chat_manager._index_executor.submit(lambda: None).result(timeout=5)
+
+    def test_saved_turns_are_searchable(self, chat_manager, client):
+        """Test each saved exchange is indexed in the background"""
+        client.generate_events.return_value = iter([TokenEvent(content="Dogs love rain"), DoneEvent(stats=GenerationStats())])
+        chat_manager.start_new_conversation()
+        chat_manager.send_message("Tell me about python code", lambda chunk: None)
+        self.wait_for_indexing(chat_manager)
+
+        hits = chat_manager.search_conversations("rain and dog")
+
+        assert hits[0].snippet == "Dogs love rain"
+        assert hits[0].conversation_id == chat_manager.get_current_conversation_id()
+
+    def test_index_archive_and_delete(self, chat_manager, client, tmp_path):
+        """Test saved conversations are indexed at startup and removed on delete"""
+        chat_manager.start_new_conversation()
+        chat_manager.current_conversation.add_message(Message(role=Role.USER, content="cat"))
+        chat_manager.storage.save_conversation(chat_manager.current_conversation)
+        conversation_id = chat_manager.get_current_conversation_id()
+
+        assert chat_manager.index_archive().result(timeout=5) == 1
+        assert chat_manager.index_archive().result(timeout=5) == 0
+        assert chat_manager.search_conversations("cat")[0].conversation_id == conversation_id
+
+        chat_manager.delete_conversation(conversation_id)
+        self.wait_for_indexing(chat_manager)
+        assert chat_manager.search_conversations("cat") == []
+
+    def test_close_stops_indexing(self, chat_manager):
+        """Test close() shuts the index worker down and later updates are dropped"""
+        chat_manager.close()
+
+        assert chat_manager._index_executor._shutdown
+        assert chat_manager.index_archive() is None
+        chat_manager.start_new_conversation()
+        chat_manager.current_conversation.add_message(Message(role=Role.USER, content="cat"))
+        chat_manager.storage.save_conversation(chat_manager.current_conversation)
+        assert chat_manager.delete_conversation(chat_manager.get_current_conversation_id())
+
+    def test_without_semantic_search(self, client, tmp_path):
+        """Test search is a no-op when not configured"""
+        chat_manager = ChatManager(client, storage_dir=str(tmp_path))
+
+        assert chat_manager.search_conversations("cat") == []
+        assert chat_manager.index_archive() is None
+
+
+# Run tests with: pytest tests/test_semantic_search.py -v
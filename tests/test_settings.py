@@ -27,6 +27,34 @@ class TestSettings:
         assert settings.log_level == "INFO"
         assert settings.log_file == "logs/app.log"
 
+        # Resilience settings
+        assert settings.retry_max_attempts == 3
+        assert settings.circuit_failure_threshold == 5
+
+        # Model residency settings
+        assert settings.model_warmup_enabled is True
+        assert settings.keep_alive_default == "5m"
+        assert settings.keep_alive_overrides == {}
+
+        # Response cache is opt-in
+        assert settings.response_cache_enabled is False
+        assert settings.response_cache_max_mb == 50
+        assert settings.record_streams_dir is None
+
+        # Server listens on localhost and refuses browser origins by default
+        assert settings.server_host == "127.0.0.1"
+        assert settings.server_port == 8765
+        assert settings.server_allowed_origins == []
+
+    def test_keep_alive_policy(self):
+        """Test per-model keep_alive overrides fall back to the default"""
+        with patch.dict(os.environ, {"KEEP_ALIVE_OVERRIDES": '{"llama2": "30m", "mistral:7b": "-1"}'}):
+            settings = Settings()
+            assert settings.keep_alive_for("llama2") == "30m"
+            assert settings.keep_alive_for("llama2:latest") == "30m"
+            assert settings.keep_alive_for("mistral:7b") == "-1"
+            assert settings.keep_alive_for("mistral") == "5m"
+
     def test_custom_ollama_base_url(self):
         """Test setting custom Ollama base URL"""
         with patch.dict(os.environ, {"OLLAMA_BASE_URL": "http://192.168.1.100:11434"}):
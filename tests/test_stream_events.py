@@ -0,0 +1,59 @@
+"""
+Unit tests for stream events and generation statistics
+"""
+import pytest
+from src.api.stream_events import (
+    ChatStreamDecoder, DoneEvent, ErrorEvent, GenerationStats, TokenEvent
+)
+
+
+class TestGenerationStats:
+    """Test cases for GenerationStats class"""
+
+    def test_tokens_per_second(self):
+        """Test client-side rate excludes time to first token"""
+        stats = GenerationStats(eval_count=11, time_to_first_token=1.0, client_duration=3.0)
+        assert stats.tokens_per_second == pytest.approx(5.0)
+
+    def test_tokens_per_second_falls_back_to_chunks(self):
+        """Test rate uses chunk count when eval_count is missing"""
+        stats = GenerationStats(chunk_count=5, time_to_first_token=0.5, client_duration=1.5)
+        assert stats.tokens_per_second == pytest.approx(4.0)
+
+    def test_tokens_per_second_unavailable(self):
+        """Test rate is None without a first token"""
+        assert GenerationStats(eval_count=10).tokens_per_second is None
+
+    def test_round_trip(self):
+        """Test to_dict/from_dict round trip ignores derived fields"""
+        stats = GenerationStats(model="mistral", eval_count=4, eval_duration=2_000_000_000)
+        data = stats.to_dict()
+
+        assert data["server_tokens_per_second"] == pytest.approx(2.0)
+        assert GenerationStats.from_dict(data) == stats
+
+
+class TestChatStreamDecoder:
+    """Test cases for ChatStreamDecoder class"""
+
+    def test_tokens_and_done(self):
+        """Test content chunks become tokens and the final chunk a done event"""
+        decoder = ChatStreamDecoder("llama2")
+
+        assert decoder.feed({"message": {"content": "Hi"}, "done": False}) == [TokenEvent("Hi")]
+        assert decoder.feed({"message": {"content": ""}, "done": False}) == []
+
+        events = decoder.feed({"message": {"content": ""}, "done": True, "eval_count": 1})
+        assert len(events) == 1 and isinstance(events[0], DoneEvent)
+        assert events[0].stats.model == "llama2"
+        assert events[0].stats.eval_count == 1
+        assert events[0].stats.chunk_count == 1
+        assert decoder.done
+
+    def test_error(self):
+        """Test error chunks become error events"""
+        decoder = ChatStreamDecoder("llama2")
+        assert decoder.feed({"error": "boom"}) == [ErrorEvent("boom")]
+
+
+# Run tests with: pytest tests/test_stream_events.py -v